@@ -34,6 +34,32 @@ alter table public.sessions add column if not exists ai_reasoning text null;
 alter table public.sessions add column if not exists ai_verbosity text null;
 alter table public.sessions add column if not exists ai_tone text null;
 
+-- History listing: keyset pages by (updated_at, session_id) and an AI flag
+-- that avoids reading initial_ai_text.
+alter table public.sessions
+  add column if not exists has_initial_ai boolean
+    generated always as (coalesce(initial_ai_text, '') <> '') stored;
+create index if not exists idx_sessions_user_updated
+  on public.sessions (user_id, updated_at desc, session_id desc);
+-- Follow-up flag matching _extract_session_context: a non-empty session_dict
+-- or a legacy snapshot carrying session fields at the top level.
+alter table public.sessions
+  add column if not exists has_session_context boolean
+    generated always as (
+      case
+        when jsonb_typeof(payload_snapshot -> 'session_dict') = 'object'
+          then payload_snapshot -> 'session_dict' <> '{}'::jsonb
+        else coalesce(
+          jsonb_typeof(payload_snapshot) = 'object'
+            and payload_snapshot ?| array[
+              'topic', 'user_question', 'current_time_str', 'method', 'lines',
+              'hex_text', 'bazi_output', 'elements_output', 'najia_data'
+            ],
+          false
+        )
+      end
+    ) stored;
+
 -- Chat transcript, one row per message (user + assistant).
 create table if not exists public.chat_messages (
   id uuid not null default gen_random_uuid(),
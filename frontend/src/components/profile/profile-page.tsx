@@ -34,6 +34,7 @@ const PROFILE_COPY = {
     signedIn: "Signed in",
     accountLabel: "Account",
     readingArchiveBody: "Your private home for readings and personal charts. Reopen any record without starting over.",
+    loadMore: "Load more readings",
     retentionNote: "A 365-day cloud retention limit applies to reading records, with up to 500 saved readings per account; deleting a reading also removes its follow-up transcript.",
     secureRecord: "Secure record",
     secureRecordBody: "Saved readings stay tied to your account and can be reopened from the casting desk.",
@@ -66,6 +67,7 @@ const PROFILE_COPY = {
     signedIn: "已登录",
     accountLabel: "账户",
     readingArchiveBody: "集中管理你的私人卦例与个人命盘，无需重新输入即可继续查看。",
+    loadMore: "加载更多卦例",
     retentionNote: "云端卦例最长保留 365 天，每个账户最多 500 条；删除卦例也会同步删除其追问文本。",
     secureRecord: "安全记录",
     secureRecordBody: "已保存卦例仅绑定当前账户，可从起卦页面重新打开并继续追问。",
@@ -115,7 +117,9 @@ type CloudHistoryPanelProps = {
   continuingId: string | null
   deletingId: string | null
   exportingId: string | null
+  hasMore: boolean
   isFetching: boolean
+  isFetchingMore: boolean
   isLoading: boolean
   historyError: Error | null
   locale: Locale
@@ -123,6 +127,7 @@ type CloudHistoryPanelProps = {
   onContinue: (session: SessionSummary) => void
   onDelete: (session: SessionSummary) => void
   onDownload: (session: SessionSummary) => void
+  onLoadMore: () => void
   onRefresh: () => void
   onSignOut: () => void
   sessions: SessionSummary[]
@@ -346,7 +351,9 @@ function CloudHistoryPanel({
   copy,
   deletingId,
   exportingId,
+  hasMore,
   isFetching,
+  isFetchingMore,
   isLoading,
   historyError,
   locale,
@@ -354,6 +361,7 @@ function CloudHistoryPanel({
   onContinue,
   onDelete,
   onDownload,
+  onLoadMore,
   onRefresh,
   onSignOut,
   sessions,
@@ -423,6 +431,12 @@ function CloudHistoryPanel({
               session={session}
             />
           ))}
+          {hasMore && (
+            <Button type="button" variant="outline" className="w-full" disabled={isFetchingMore} onClick={onLoadMore}>
+              {isFetchingMore && <Loader2 className="size-4 animate-spin" />}
+              {copy.loadMore}
+            </Button>
+          )}
         </div>
       )}
       <p className="mt-5 border-t border-border/60 pt-4 text-xs leading-5 text-muted-foreground">{copy.retentionNote}</p>
@@ -606,7 +620,10 @@ export default function ProfilePage() {
   const [deletingId, setDeletingId] = useState<string | null>(null)
   const [deletingChartId, setDeletingChartId] = useState<string | null>(null)
   const copy = PROFILE_COPY[locale]
-  const sessions = useMemo(() => historyQuery.data?.sessions ?? [], [historyQuery.data?.sessions])
+  const sessions = useMemo(
+    () => historyQuery.data?.pages.flatMap((page) => page.sessions) ?? [],
+    [historyQuery.data?.pages],
+  )
   const charts = useMemo(() => chartHistoryQuery.data?.charts ?? [], [chartHistoryQuery.data?.charts])
   const profileName = auth.displayName ?? auth.user?.email ?? messages.profileMenu.guestMode
   const profileAvatar = auth.avatarUrl ?? null
@@ -826,7 +843,9 @@ export default function ProfilePage() {
             copy={copy}
             deletingId={deletingId}
             exportingId={exportingId}
+            hasMore={historyQuery.hasNextPage}
             isFetching={historyQuery.isFetching}
+            isFetchingMore={historyQuery.isFetchingNextPage}
             isLoading={historyQuery.isLoading}
             historyError={historyQuery.error instanceof Error ? historyQuery.error : null}
             locale={locale}
@@ -834,6 +853,7 @@ export default function ProfilePage() {
             onContinue={handleContinue}
             onDelete={handleDelete}
             onDownload={handleDownload}
+            onLoadMore={() => historyQuery.fetchNextPage()}
             onRefresh={() => historyQuery.refetch()}
             onSignOut={handleSignOut}
             sessions={sessions}
@@ -250,7 +250,7 @@ export function BaziChartView(props: BaziChartViewProps) {
     const requestGeneration = ++periodRequestGeneration.current
     setSelectedCycleIndex(cycle.index)
     setPeriodError(null)
-    if (cycle.years.length || !chart.birth_profile.period_query) {
+    if (cycle.years_expanded || cycle.years.length || !chart.birth_profile.period_query) {
       setPeriodLoadingIndex(null)
       setSelectedYear(cycle.years.find((year) => year.is_current)?.year ?? cycle.years[0]?.year ?? cycle.start_year)
       setSelectedMonthIndex(cycle.years.find((year) => year.is_current)?.months.find((month) => month.is_current)?.index ?? 0)
@@ -285,12 +285,17 @@ export async function streamChatMessage(
   return completed
 }
 
-export async function fetchSessionHistory(token: string): Promise<SessionHistoryResponse> {
-  const response = await fetchWithTimeout(`${getApiBaseUrl()}/api/sessions`, {
+export async function fetchSessionHistory(
+  token: string,
+  cursor?: string | null,
+): Promise<SessionHistoryResponse> {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ""
+  // "no-cache" revalidates with If-None-Match, so unchanged pages come back as 304s.
+  const response = await fetchWithTimeout(`${getApiBaseUrl()}/api/sessions${query}`, {
     headers: {
       Authorization: `Bearer ${token}`,
     },
-    cache: "no-store",
+    cache: "no-cache",
   })
   return handleResponse<SessionHistoryResponse>(response)
 }
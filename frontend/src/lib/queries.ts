@@ -1,4 +1,4 @@
-import { useMutation, useQuery } from "@tanstack/react-query"
+import { useInfiniteQuery, useMutation, useQuery } from "@tanstack/react-query"
 import { createSession, fetchConfig, fetchMetaphysicsCharts, fetchSessionHistory } from "@/lib/api"
 import type { SessionPayload, SessionRequest } from "@/types/api"
 
@@ -26,14 +26,16 @@ export function useSessionMutation(options?: SessionMutationOptions) {
 }
 
 export function useSessionHistoryQuery(accessToken: string | null) {
-  return useQuery({
+  return useInfiniteQuery({
     queryKey: ["session-history", accessToken],
-    queryFn: () => {
+    queryFn: ({ pageParam }) => {
       if (!accessToken) {
         throw new Error("Authentication required to read session history.")
       }
-      return fetchSessionHistory(accessToken)
+      return fetchSessionHistory(accessToken, pageParam)
     },
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.next_cursor ?? undefined,
     enabled: Boolean(accessToken),
   })
 }
@@ -592,6 +592,7 @@ export type DayunCycle = {
   relations: string[]
   theme_activations: PeriodThemeActivations
   years: PeriodYear[]
+  years_expanded?: boolean
   start_timestamp?: string
   end_timestamp?: string
   is_current?: boolean
@@ -1051,4 +1052,5 @@ export type SessionSummary = {
 
 export type SessionHistoryResponse = {
   sessions: SessionSummary[]
+  next_cursor?: string | null
 }
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from iching.core.conformance import (
+    DEFAULT_ALPHA,
+    check_batch_method,
+    check_meihua_calendar,
+    check_scalar_method,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Check divination line frequencies with chi-square tests and report throughput."
+    )
+    parser.add_argument("--casts", type=int, default=2_000_000, help="batch casts per method")
+    parser.add_argument("--scalar-lines", type=int, default=200_000, help="lines drawn per method via the scalar path")
+    parser.add_argument("--seed", type=int, default=20240201)
+    parser.add_argument("--backend", choices=("auto", "numpy", "python"), default="auto")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA)
+    parser.add_argument("--meihua-year", type=int, default=2024)
+    parser.add_argument("--meihua-step-minutes", type=int, default=60)
+    args = parser.parse_args()
+
+    results: List[Dict[str, object]] = []
+    for method_key in ("s", "c"):
+        results.append(
+            check_batch_method(
+                method_key, args.casts, seed=args.seed, backend=args.backend, alpha=args.alpha
+            )
+        )
+        if args.scalar_lines > 0:
+            results.append(
+                check_scalar_method(method_key, args.scalar_lines, seed=args.seed, alpha=args.alpha)
+            )
+    results.append(
+        check_meihua_calendar(
+            datetime(args.meihua_year, 1, 1),
+            days=366,
+            step_minutes=args.meihua_step_minutes,
+        )
+    )
+
+    passed = all(bool(result["passed"]) for result in results)
+    print(json.dumps({"passed": passed, "results": results}, ensure_ascii=False, indent=2))
+    return 0 if passed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from iching.config import PATHS
+from iching.integrations.interpretation_repository import (
+    _SLOT_CONTENT_SQL,
+    InterpretationRepository,
+)
+
+
+HEXAGRAM_NAMES = ("乾为天", "坤为地", "水雷屯", "震为雷", "火水未济", "水火既济")
+
+
+def _unpooled_lookup(db_path: Path) -> Callable[[int], object]:
+    """Reproduce the previous behaviour: one fresh connection per query."""
+
+    def lookup(index: int) -> object:
+        name = HEXAGRAM_NAMES[index % len(HEXAGRAM_NAMES)]
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        with conn:
+            return conn.execute(
+                _SLOT_CONTENT_SQL["line"], (name, "guaci", "zh-CN", index % 6 + 1)
+            ).fetchone()
+
+    return lookup
+
+
+def _pooled_lookup(repo: InterpretationRepository) -> Callable[[int], object]:
+    def lookup(index: int) -> object:
+        return repo.get_slot_content(
+            hexagram_name=HEXAGRAM_NAMES[index % len(HEXAGRAM_NAMES)],
+            source_key="guaci",
+            slot_kind="line",
+            line_no=index % 6 + 1,
+        )
+
+    return lookup
+
+
+def _measure(lookup: Callable[[int], object], *, threads: int, queries: int) -> float:
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        # Warm every worker so connection setup is not billed to one thread only.
+        list(executor.map(lookup, range(threads)))
+        started = time.perf_counter()
+        list(executor.map(lookup, range(queries), chunksize=max(1, queries // (threads * 8))))
+        elapsed = time.perf_counter() - started
+    return queries / elapsed if elapsed > 0 else float("inf")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Measure interpretation slot queries per second with and without pooling."
+    )
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db_path = Path(workdir) / "interpretations.db"
+        repo = InterpretationRepository(
+            db_path=db_path,
+            index_file=PATHS.gua_index_file,
+            guaci_dir=PATHS.guaci_dir,
+            takashima_dir=PATHS.takashima_dir,
+            symbolic_dir=PATHS.symbolic_dir,
+            english_structured_dir=PATHS.english_structured_dir,
+            use_index=False,
+        )
+        strategies: Dict[str, Callable[[int], object]] = {
+            "connect_per_query": _unpooled_lookup(db_path),
+            "pooled": _pooled_lookup(repo),
+        }
+        results: List[Dict[str, object]] = []
+        for threads in args.threads:
+            row: Dict[str, object] = {"threads": threads}
+            for label, lookup in strategies.items():
+                row[f"{label}_qps"] = round(
+                    _measure(lookup, threads=threads, queries=args.queries), 1
+                )
+            row["speedup"] = round(
+                float(row["pooled_qps"]) / max(float(row["connect_per_query_qps"]), 1e-9), 2
+            )
+            results.append(row)
+
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+SRC_ROOT = PROJECT_ROOT / "src"
+if str(SRC_ROOT) not in sys.path:
+    sys.path.insert(0, str(SRC_ROOT))
+
+from iching.core.bazi_structure import _relations, added_relations
+from iching.core.metaphysics import _period_pillar, build_metaphysics_chart
+from iching.core.shensha import NatalShenSha, natal_shensha
+
+Pillar = Dict[str, Any]
+Query = Tuple[List[Pillar], List[Pillar], str]
+
+
+def _period_queries(births: int, *, seed: datetime) -> List[Query]:
+    """Every Da Yun, Liu Nian and Liu Yue context of a few sample charts."""
+    queries: List[Query] = []
+    for offset in range(births):
+        birth = seed + timedelta(days=offset * 811, hours=offset * 5)
+        chart = build_metaphysics_chart(
+            birth,
+            gender="female" if offset % 2 else "male",
+            reference_timestamp=datetime(2026, 7, 16, 12),
+        )
+        natal = chart["pillars"]
+        for cycle in chart["period_layers"]["dayun"]:
+            if not cycle["ganzhi"]:
+                continue
+            cycle_pillar = _period_pillar("大运", cycle["ganzhi"])
+            queries.append((natal, [cycle_pillar], "大运"))
+            for year in cycle["years"]:
+                year_extras = [cycle_pillar, _period_pillar("流年", year["ganzhi"])]
+                queries.append((natal, year_extras, "流年"))
+                for month in year["months"]:
+                    month_extras = [*year_extras, _period_pillar("流月", month["ganzhi"])]
+                    queries.append((natal, month_extras, "流月"))
+    return queries
+
+
+def _full(query: Query) -> Tuple[list, list]:
+    """The previous behaviour: score every rule and pair of the whole context, then filter."""
+    natal, extras, label = query
+    context = [*natal, *extras]
+    hits = [hit for hit in NatalShenSha(context).hits() if label in hit["pillar_labels"]]
+    relations = [
+        relation
+        for relation in _relations(context)
+        if any(item["pillar"] == label for item in relation["participants"])
+    ]
+    return hits, relations
+
+
+def _incremental(query: Query) -> Tuple[list, list]:
+    natal, extras, label = query
+    context = [*natal, *extras]
+    return (
+        natal_shensha(natal).hits(extras, label=label),
+        added_relations(context[:-1], context[-1]),
+    )
+
+
+def _measure(evaluate: Callable[[Query], Tuple[list, list]], queries: List[Query]) -> Tuple[float, list]:
+    started = time.perf_counter()
+    results = [evaluate(query) for query in queries]
+    return time.perf_counter() - started, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Compare full-context and incremental shensha/relation evaluation of period pillars."
+    )
+    parser.add_argument("--births", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=2)
+    args = parser.parse_args()
+
+    queries = _period_queries(args.births, seed=datetime(1972, 3, 14, 9, 30))
+    rows: List[Dict[str, object]] = []
+    for round_index in range(args.rounds):
+        full_seconds, full_results = _measure(_full, queries)
+        incremental_seconds, incremental_results = _measure(_incremental, queries)
+        if incremental_results != full_results:
+            print("incremental evaluation diverged from the full-context result", file=sys.stderr)
+            return 1
+        rows.append(
+            {
+                "round": round_index + 1,
+                "queries": len(queries),
+                "full_seconds": round(full_seconds, 3),
+                "incremental_seconds": round(incremental_seconds, 3),
+                "speedup": round(full_seconds / max(incremental_seconds, 1e-9), 2),
+                "equivalent": True,
+            }
+        )
+
+    print(json.dumps(rows, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
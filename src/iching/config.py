@@ -23,6 +23,7 @@ class PathConfig:
     gua_index_file: Path
     najia_db: Path
     interpretation_db: Path
+    guaci_artifact: Path
     guaci_dir: Path
     takashima_dir: Path
     symbolic_dir: Path
@@ -51,6 +52,7 @@ class AppConfig:
     paths: PathConfig
     enable_ai: bool = True
     preferred_ai_model: Optional[str] = None
+    interpretation_read_only: bool = False
 
 
 def _expand(path_value: str | Path) -> Path:
@@ -88,6 +90,9 @@ def build_path_config() -> PathConfig:
     interpretation_db = _expand(
         os.getenv("ICHING_INTERPRETATION_DB", data_dir / "interpretations.db")
     )
+    guaci_artifact = _expand(
+        os.getenv("ICHING_GUACI_ARTIFACT", data_dir / "guaci_corpus.bin")
+    )
 
     paths = PathConfig(
         project_root=PROJECT_ROOT,
@@ -95,6 +100,7 @@ def build_path_config() -> PathConfig:
         gua_index_file=gua_index_file,
         najia_db=najia_db,
         interpretation_db=interpretation_db,
+        guaci_artifact=guaci_artifact,
         guaci_dir=guaci_dir,
         takashima_dir=takashima_dir,
         symbolic_dir=symbolic_dir,
@@ -115,12 +121,18 @@ def build_app_config(
     """Load the full application configuration."""
     paths = build_path_config()
     ai_default = os.getenv("ICHING_ENABLE_AI", "1") not in {"0", "false", "False"}
+    interpretation_read_only = os.getenv("ICHING_INTERPRETATION_READ_ONLY", "0") in {
+        "1",
+        "true",
+        "True",
+    }
     return AppConfig(
         paths=paths,
         enable_ai=ai_default if enable_ai is None else enable_ai,
         preferred_ai_model=preferred_ai_model
         or os.getenv("ICHING_AI_MODEL")
         or None,
+        interpretation_read_only=interpretation_read_only,
     )
 
 
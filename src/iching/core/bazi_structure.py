@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import os
 from collections import Counter
 from itertools import combinations
 from typing import Any, Iterable, Mapping
 
+from iching.core.cache import BoundedCache
+
+
+RELATION_CACHE_LIMIT = int(os.getenv("ICHING_RELATION_CACHE_LIMIT", "8192"))
 
 ELEMENTS = ("木", "火", "土", "金", "水")
 ELEMENT_GENERATES = {"木": "火", "火": "土", "土": "金", "金": "水", "水": "木"}
@@ -189,64 +194,182 @@ def layered_distribution(pillars: Iterable[Mapping[str, Any]]) -> dict[str, dict
     }
 
 
-def structured_relations(pillars: list[Mapping[str, Any]]) -> list[dict[str, Any]]:
+def _stem_pair_relation(
+    left_pillar: Mapping[str, Any],
+    left: str,
+    right_pillar: Mapping[str, Any],
+    right: str,
+    day_stem: str,
+) -> dict[str, Any] | None:
+    pair = frozenset((left, right))
+    relation_type = ""
+    result_element: str | None = None
+    if pair in STEM_COMBINATIONS:
+        relation_type = "天干合"
+        result_element = STEM_COMBINATIONS[pair]
+    elif pair in STEM_CLASHES:
+        relation_type = "天干冲"
+    elif ELEMENT_CONTROLS[STEM_ELEMENTS[left]] == STEM_ELEMENTS[right] or ELEMENT_CONTROLS[STEM_ELEMENTS[right]] == STEM_ELEMENTS[left]:
+        relation_type = "天干克"
+    if not relation_type:
+        return None
+    return _relation_payload(relation_type, [
+        _participant(left_pillar, layer="stem", value=left, day_stem=day_stem),
+        _participant(right_pillar, layer="stem", value=right, day_stem=day_stem),
+    ], result_element)
+
+
+def _branch_group_relation(
+    found: list[tuple[Mapping[str, Any], str]],
+    group: str,
+    result_element: str,
+    day_stem: str,
+) -> dict[str, Any] | None:
+    distinct = list(dict.fromkeys(branch for _, branch in found))
+    if len(distinct) < 2:
+        return None
+    complete = len(distinct) == 3
+    relation_type = ("三合" if (group, result_element) in TRINES else "三会") if complete else ("半合" if (group, result_element) in TRINES else "半会")
+    return _relation_payload(relation_type, [
+        _participant(pillar, layer="branch", value=branch, day_stem=day_stem)
+        for pillar, branch in found
+    ], result_element)
+
+
+def _branch_pair_relations(
+    left_pillar: Mapping[str, Any],
+    left: str,
+    right_pillar: Mapping[str, Any],
+    right: str,
+    day_stem: str,
+) -> list[dict[str, Any]]:
+    pair = frozenset((left, right))
+    candidates: list[tuple[str, str | None]] = []
+    if pair in BRANCH_COMBINATIONS:
+        candidates.append(("地支六合", BRANCH_COMBINATIONS[pair]))
+    if pair in BRANCH_CLASHES:
+        candidates.append(("地支冲", None))
+    if pair in BRANCH_HARMS:
+        candidates.append(("地支害", None))
+    if pair in BRANCH_BREAKS:
+        candidates.append(("地支破", None))
+    if pair <= frozenset(("寅", "巳", "申")) or pair <= frozenset(("丑", "未", "戌")) or pair == frozenset(("子", "卯")):
+        candidates.append(("地支刑", None))
+    if left == right and left in {"辰", "午", "酉", "亥"}:
+        candidates.append(("地支自刑", None))
+    if not candidates:
+        return []
+    participants = [
+        _participant(left_pillar, layer="branch", value=left, day_stem=day_stem),
+        _participant(right_pillar, layer="branch", value=right, day_stem=day_stem),
+    ]
+    return [
+        _relation_payload(relation_type, participants, result_element)
+        for relation_type, result_element in candidates
+    ]
+
+
+def _relations(pillars: list[Mapping[str, Any]]) -> list[dict[str, Any]]:
     if len(pillars) < 3:
         return []
     day_stem = str(pillars[2]["stem"])
     relations: list[dict[str, Any]] = []
     valid_stems = [(pillar, str(pillar.get("stem", ""))) for pillar in pillars if str(pillar.get("stem", "")) in STEM_ELEMENTS]
     for (left_pillar, left), (right_pillar, right) in combinations(valid_stems, 2):
-        pair = frozenset((left, right))
-        relation_type = ""
-        result_element: str | None = None
-        if pair in STEM_COMBINATIONS:
-            relation_type = "天干合"
-            result_element = STEM_COMBINATIONS[pair]
-        elif pair in STEM_CLASHES:
-            relation_type = "天干冲"
-        elif ELEMENT_CONTROLS[STEM_ELEMENTS[left]] == STEM_ELEMENTS[right] or ELEMENT_CONTROLS[STEM_ELEMENTS[right]] == STEM_ELEMENTS[left]:
-            relation_type = "天干克"
-        if relation_type:
-            relations.append(_relation_payload(relation_type, [
-                _participant(left_pillar, layer="stem", value=left, day_stem=day_stem),
-                _participant(right_pillar, layer="stem", value=right, day_stem=day_stem),
-            ], result_element))
+        relation = _stem_pair_relation(left_pillar, left, right_pillar, right, day_stem)
+        if relation is not None:
+            relations.append(relation)
 
     valid_branches = [(pillar, str(pillar.get("branch", ""))) for pillar in pillars if str(pillar.get("branch", "")) in BRANCH_ELEMENTS]
     for group, result_element in (*TRINES, *MEETINGS):
         found = [(pillar, branch) for pillar, branch in valid_branches if branch in group]
-        distinct = list(dict.fromkeys(branch for _, branch in found))
-        if len(distinct) >= 2:
-            complete = len(distinct) == 3
-            relation_type = ("三合" if (group, result_element) in TRINES else "三会") if complete else ("半合" if (group, result_element) in TRINES else "半会")
-            relations.append(_relation_payload(relation_type, [
-                _participant(pillar, layer="branch", value=branch, day_stem=day_stem)
-                for pillar, branch in found
-            ], result_element))
+        relation = _branch_group_relation(found, group, result_element, day_stem)
+        if relation is not None:
+            relations.append(relation)
     for (left_pillar, left), (right_pillar, right) in combinations(valid_branches, 2):
-        pair = frozenset((left, right))
-        candidates: list[tuple[str, str | None]] = []
-        if pair in BRANCH_COMBINATIONS:
-            candidates.append(("地支六合", BRANCH_COMBINATIONS[pair]))
-        if pair in BRANCH_CLASHES:
-            candidates.append(("地支冲", None))
-        if pair in BRANCH_HARMS:
-            candidates.append(("地支害", None))
-        if pair in BRANCH_BREAKS:
-            candidates.append(("地支破", None))
-        if pair <= frozenset(("寅", "巳", "申")) or pair <= frozenset(("丑", "未", "戌")) or pair == frozenset(("子", "卯")):
-            candidates.append(("地支刑", None))
-        if left == right and left in {"辰", "午", "酉", "亥"}:
-            candidates.append(("地支自刑", None))
-        participants = [
-            _participant(left_pillar, layer="branch", value=left, day_stem=day_stem),
-            _participant(right_pillar, layer="branch", value=right, day_stem=day_stem),
+        relations.extend(_branch_pair_relations(left_pillar, left, right_pillar, right, day_stem))
+    return relations
+
+
+def _added_relations(pillars: list[Mapping[str, Any]], pillar: Mapping[str, Any]) -> list[dict[str, Any]]:
+    label = str(pillar.get("label", ""))
+    if len(pillars) < 3 or any(str(item.get("label", "")) == label for item in pillars):
+        return [
+            relation
+            for relation in _relations([*pillars, pillar])
+            if any(item.get("pillar") == label for item in relation["participants"])
         ]
-        for relation_type, result_element in candidates:
-            relations.append(_relation_payload(relation_type, participants, result_element))
+    day_stem = str(pillars[2]["stem"])
+    relations: list[dict[str, Any]] = []
+    stem = str(pillar.get("stem", ""))
+    if stem in STEM_ELEMENTS:
+        for left_pillar in pillars:
+            left = str(left_pillar.get("stem", ""))
+            if left in STEM_ELEMENTS:
+                relation = _stem_pair_relation(left_pillar, left, pillar, stem, day_stem)
+                if relation is not None:
+                    relations.append(relation)
+    branch = str(pillar.get("branch", ""))
+    if branch not in BRANCH_ELEMENTS:
+        return relations
+    valid_branches = [(item, str(item.get("branch", ""))) for item in pillars if str(item.get("branch", "")) in BRANCH_ELEMENTS]
+    for group, result_element in (*TRINES, *MEETINGS):
+        if branch in group:
+            found = [(item, value) for item, value in valid_branches if value in group]
+            relation = _branch_group_relation([*found, (pillar, branch)], group, result_element, day_stem)
+            if relation is not None:
+                relations.append(relation)
+    for left_pillar, left in valid_branches:
+        relations.extend(_branch_pair_relations(left_pillar, left, pillar, branch, day_stem))
     return relations
 
 
+def _relation_key(pillars: Iterable[Mapping[str, Any]]) -> tuple[tuple[str, str, str], ...]:
+    return tuple(
+        (str(pillar.get("label", "")), str(pillar.get("stem", "")), str(pillar.get("branch", "")))
+        for pillar in pillars
+    )
+
+
+def _copy_relation(relation: Mapping[str, Any]) -> dict[str, Any]:
+    return {
+        **relation,
+        "participants": [dict(item) for item in relation["participants"]],
+        "theme_tags": list(relation["theme_tags"]),
+    }
+
+
+_RELATION_CACHE: BoundedCache[tuple, tuple[dict[str, Any], ...]] = BoundedCache(
+    max_entries=RELATION_CACHE_LIMIT
+)
+
+
+def structured_relations(pillars: list[Mapping[str, Any]]) -> list[dict[str, Any]]:
+    relations = _RELATION_CACHE.get_or_create(
+        ("all", _relation_key(pillars)), lambda: tuple(_relations(pillars))
+    )
+    return [_copy_relation(relation) for relation in relations]
+
+
+def added_relations(pillars: list[Mapping[str, Any]], pillar: Mapping[str, Any]) -> list[dict[str, Any]]:
+    """Relations of ``[*pillars, pillar]`` that involve ``pillar``, in :func:`structured_relations` order.
+
+    Only the pairs and branch groups the new pillar joins are evaluated, so a
+    Da Yun, year or month pillar costs a handful of lookups instead of every
+    pair of the context again. Both functions share one cache keyed by the
+    canonical label/stem/branch tuple.
+    """
+    relations = _RELATION_CACHE.get_or_create(
+        ("added", _relation_key(pillars), _relation_key((pillar,))[0]),
+        lambda: tuple(_added_relations(pillars, pillar)),
+    )
+    return [_copy_relation(relation) for relation in relations]
+
+
+def relation_cache_stats() -> dict[str, object]:
+    return _RELATION_CACHE.stats().to_dict()
+
+
 def _relation_payload(relation_type: str, participants: list[dict[str, str]], result_element: str | None) -> dict[str, Any]:
     topics = _relation_topics(participants)
     return {
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import random
+import sys
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from iching.core.cast_table import CAST_TABLE, TABLE_SIZE, CastOutcome
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the stdlib backend covers the same API.
+    np = None
+
+
+# Exact line-value weights of each random casting method, as (weights, denominator).
+# The yarrow figures follow the three divisions in ShicaoMethod._calculate_line;
+# the coin figures follow three fair tosses in CoinMethod._throw_coins.
+LINE_WEIGHTS: Dict[str, Tuple[Dict[int, int], int]] = {
+    "s": ({6: 1, 7: 5, 8: 7, 9: 3}, 16),
+    "c": ({6: 1, 7: 3, 8: 3, 9: 1}, 8),
+}
+
+BACKENDS = ("auto", "numpy", "python")
+
+
+def _byte_table(method_key: str) -> bytes:
+    """Map every random byte to a line value with the method's exact weights.
+
+    256 is a multiple of both denominators, so ``byte % denominator`` is uniform
+    and each line value is hit by exactly ``weight * 256 / denominator`` bytes.
+    """
+    weights, denominator = LINE_WEIGHTS[method_key]
+    cycle: List[int] = []
+    for value in (6, 7, 8, 9):
+        cycle.extend([value] * weights[value])
+    assert len(cycle) == denominator
+    return bytes(cycle[byte % denominator] for byte in range(256))
+
+
+_BYTE_TABLES: Dict[str, bytes] = {key: _byte_table(key) for key in LINE_WEIGHTS}
+
+
+def _pair_table() -> List[int]:
+    """Map two adjacent line bytes, read as one native uint16, to their 4-bit code."""
+    table = [0] * 65536
+    for first in (6, 7, 8, 9):
+        for second in (6, 7, 8, 9):
+            word = int.from_bytes(bytes((first, second)), sys.byteorder)
+            table[word] = (first - 6) | (second - 6) << 2
+    return table
+
+
+_PAIR_TABLE = _pair_table()
+
+
+@dataclass(frozen=True)
+class CastBatch:
+    """``size`` casts of six lines each, bottom line first.
+
+    ``values`` is an ``(size, 6)`` ``uint8`` array on the NumPy backend and a flat
+    ``bytes`` object of length ``size * 6`` on the stdlib backend.
+    """
+
+    method_key: str
+    size: int
+    backend: str
+    values: object
+
+    def rows(self) -> Iterator[Tuple[int, ...]]:
+        if self.backend == "numpy":
+            for row in self.values:
+                yield tuple(int(value) for value in row)
+            return
+        data = self.values
+        for start in range(0, self.size * 6, 6):
+            yield tuple(data[start : start + 6])
+
+    def codes(self) -> Sequence[int]:
+        """12-bit cast codes, ready to index :data:`~iching.core.cast_table.CAST_TABLE`."""
+        if self.backend == "numpy":
+            shifts = np.arange(0, 12, 2, dtype=np.uint16)
+            return ((self.values.astype(np.uint16) - 6) << shifts).sum(axis=1, dtype=np.uint16)
+        words = memoryview(self.values).cast("H")
+        lookup = _PAIR_TABLE.__getitem__
+        return array(
+            "H",
+            [
+                low | middle << 4 | high << 8
+                for low, middle, high in zip(
+                    map(lookup, words[0::3]),
+                    map(lookup, words[1::3]),
+                    map(lookup, words[2::3]),
+                )
+            ],
+        )
+
+    def outcomes(self) -> Iterator[CastOutcome]:
+        for code in self.codes():
+            yield CAST_TABLE[int(code)]
+
+    def value_counts(self) -> Dict[int, int]:
+        if self.backend == "numpy":
+            counts = np.bincount(self.values.ravel(), minlength=10)
+            return {value: int(counts[value]) for value in (6, 7, 8, 9)}
+        return {value: self.values.count(value) for value in (6, 7, 8, 9)}
+
+    def code_counts(self) -> List[int]:
+        """Histogram of cast codes over all :data:`TABLE_SIZE` outcomes."""
+        if self.backend == "numpy":
+            return [int(count) for count in np.bincount(self.codes(), minlength=TABLE_SIZE)]
+        counts = [0] * TABLE_SIZE
+        for code in self.codes():
+            counts[code] += 1
+        return counts
+
+
+def _resolve_backend(backend: str) -> str:
+    if backend not in BACKENDS:
+        raise ValueError(f"unknown backend: {backend}")
+    if backend == "auto":
+        return "numpy" if np is not None else "python"
+    if backend == "numpy" and np is None:
+        raise RuntimeError("the numpy backend requires NumPy to be installed")
+    return backend
+
+
+def generate_batch(
+    method_key: str,
+    n: int,
+    seed: Optional[int] = None,
+    *,
+    backend: str = "auto",
+) -> CastBatch:
+    """Cast ``n`` hexagrams at once with the yarrow (``"s"``) or coin (``"c"``) model.
+
+    A given ``seed`` reproduces the same batch on the same backend; the NumPy
+    and stdlib backends use different generators and do not match each other.
+    """
+    if method_key not in LINE_WEIGHTS:
+        raise ValueError(f"批量起卦仅支持蓍草法与铜钱法: {method_key}")
+    if n < 0:
+        raise ValueError("n must be non-negative")
+
+    resolved = _resolve_backend(backend)
+    table = _BYTE_TABLES[method_key]
+    if resolved == "numpy":
+        rng = np.random.default_rng(seed)
+        lookup = np.frombuffer(table, dtype=np.uint8)
+        draws = rng.integers(0, 256, size=(n, 6), dtype=np.uint8)
+        return CastBatch(method_key=method_key, size=n, backend=resolved, values=lookup[draws])
+
+    rng_py = random.Random(seed)
+    values = rng_py.randbytes(n * 6).translate(table)
+    return CastBatch(method_key=method_key, size=n, backend=resolved, values=values)
@@ -3,6 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone, tzinfo
 from functools import lru_cache
+import os
 from typing import Any, Iterable, Literal, Optional
 from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
@@ -10,6 +11,9 @@ import sxtwl
 from lunar_python import Solar as SolarCalendar
 
 
+# Period trees look terms up one year at a time, so a lifetime chart touches ~120 entries per timezone.
+SOLAR_TERM_CACHE_LIMIT = int(os.getenv("ICHING_SOLAR_TERM_CACHE_LIMIT", "1024"))
+
 STEMS = ("甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸")
 BRANCHES = ("子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥")
 JIE_QI_NAMES = (
@@ -143,7 +147,7 @@ def solar_term_datetime(item: Any, zone: tzinfo) -> datetime:
     return source.astimezone(zone)
 
 
-@lru_cache(maxsize=96)
+@lru_cache(maxsize=SOLAR_TERM_CACHE_LIMIT)
 def _solar_terms_cached(years: tuple[int, ...], timezone_name: str) -> tuple[SolarTermInstant, ...]:
     zone = timezone_for(timezone_name)
     result: list[SolarTermInstant] = []
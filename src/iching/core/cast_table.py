@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+
+LINE_VALUES = (6, 7, 8, 9)
+TABLE_SIZE = len(LINE_VALUES) ** 6
+
+OverviewLine = Tuple[Tuple[str, object], ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CastOutcome:
+    """Everything about a cast that depends on the line vector alone.
+
+    ``selection`` follows ``Hexagram._select_line_strategy``. When all six lines
+    move the strategy depends on the hexagram *name* (乾/坤 read 用九/用六), so
+    it is left to the caller and stored as ``None``.
+    """
+
+    code: int
+    lines: Tuple[int, ...]
+    binary: str
+    changed_lines: Optional[Tuple[int, ...]]
+    inverse_binary: str
+    reverse_binary: str
+    mutual_binary: Optional[str]
+    moving_count: int
+    selection: Optional[object]
+    rendered_lines: Tuple[str, ...]
+    overview_lines: Tuple[OverviewLine, ...]
+
+    def overview_payload(self) -> List[Dict[str, object]]:
+        return [dict(items) for items in self.overview_lines]
+
+
+def cast_code(lines: Sequence[object]) -> Optional[int]:
+    """Pack six 6/7/8/9 line values into a 12-bit code, bottom line first."""
+    if len(lines) != 6:
+        return None
+    code = 0
+    for shift, value in enumerate(lines):
+        if type(value) is not int or not 6 <= value <= 9:
+            return None
+        code |= (value - 6) << (2 * shift)
+    return code
+
+
+def select_line_strategy(lines: Sequence[object]) -> Optional[object]:
+    moving_indices = [idx for idx, value in enumerate(lines) if value in (6, 9)]
+    count = len(moving_indices)
+
+    if count == 0 or count == 6:
+        return None
+
+    if count == 1:
+        return moving_indices[0]
+
+    if count == 2:
+        first, second = moving_indices
+        values = [lines[first], lines[second]]
+        if set(values) == {6, 9}:
+            return first if lines[first] == 6 else second
+        return max(moving_indices)
+
+    if count == 3:
+        return sorted(moving_indices)[1]
+
+    if count == 4:
+        static_indices = [idx for idx, value in enumerate(lines) if value not in (6, 9)]
+        if static_indices:
+            return sorted(static_indices)[0]
+        return None
+
+    if count == 5:
+        static_indices = [idx for idx, value in enumerate(lines) if value not in (6, 9)]
+        return static_indices[0] if static_indices else None
+
+    return None
+
+
+def derive_outcome(lines: Sequence[object], *, code: int = -1) -> CastOutcome:
+    """Compute a :class:`CastOutcome` from scratch for any line sequence."""
+    binary = "".join("1" if value in (7, 9) else "0" for value in lines)
+
+    changed: List[object] = []
+    has_moving_line = False
+    for value in lines:
+        if value == 9:
+            changed.append(8)
+            has_moving_line = True
+        elif value == 6:
+            changed.append(7)
+            has_moving_line = True
+        else:
+            changed.append(value)
+
+    rendered: List[str] = []
+    overview: List[OverviewLine] = []
+    ordered_changed = list(reversed(changed))
+    for idx, value in enumerate(reversed(lines), start=1):
+        position = 7 - idx
+        symbol = "---" if value in (7, 9) else "- -"
+        moving = " O" if value == 9 else " X" if value == 6 else ""
+        rendered.append(f"第 {position} 爻: {symbol}{moving}")
+
+        changed_value = ordered_changed[idx - 1] if has_moving_line else value
+        changed_type = "yang" if changed_value in (7, 9) else "yin"
+        overview.append(
+            (
+                ("position", position),
+                ("value", value),
+                ("line_type", "yang" if value in (7, 9) else "yin"),
+                ("is_moving", value in (6, 9)),
+                ("moving_symbol", "O" if value == 9 else "X" if value == 6 else ""),
+                ("changed_value", changed_value),
+                ("changed_type", changed_type),
+                ("changed_line_type", changed_type),
+            )
+        )
+
+    return CastOutcome(
+        code=code,
+        lines=tuple(lines),
+        binary=binary,
+        changed_lines=tuple(changed) if has_moving_line else None,
+        inverse_binary="".join("1" if bit == "0" else "0" for bit in binary),
+        reverse_binary=binary[::-1],
+        mutual_binary=binary[1:4] + binary[2:5] if len(binary) == 6 else None,
+        moving_count=sum(1 for value in lines if value in (6, 9)),
+        selection=select_line_strategy(lines),
+        rendered_lines=tuple(rendered),
+        overview_lines=tuple(overview),
+    )
+
+
+def _build_table() -> Tuple[CastOutcome, ...]:
+    table: List[Optional[CastOutcome]] = [None] * TABLE_SIZE
+    for combo in product(LINE_VALUES, repeat=6):
+        code = cast_code(combo)
+        assert code is not None
+        table[code] = derive_outcome(combo, code=code)
+    return tuple(outcome for outcome in table if outcome is not None)
+
+
+CAST_TABLE: Tuple[CastOutcome, ...] = _build_table()
+
+
+def lookup_outcome(lines: Sequence[object]) -> CastOutcome:
+    """Return the precomputed outcome, deriving it only for non-standard input."""
+    code = cast_code(lines)
+    if code is None:
+        return derive_outcome(lines)
+    return CAST_TABLE[code]
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Sequence
+
+from iching.core.bulk_casting import LINE_WEIGHTS, generate_batch
+from iching.core.cast_table import LINE_VALUES, TABLE_SIZE
+from iching.core.divination import CoinMethod, MeihuaMethod, ShicaoMethod
+
+
+DEFAULT_ALPHA = 0.001
+
+_SCALAR_LINE_FUNCS: Dict[str, Callable[[random.Random], int]] = {
+    "s": ShicaoMethod._calculate_line,
+    "c": CoinMethod._throw_coins,
+}
+
+
+def _regularized_gamma_q(a: float, x: float) -> float:
+    """Upper regularized incomplete gamma ``Q(a, x)`` (series / continued fraction)."""
+    if x <= 0:
+        return 1.0
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1:
+        term = total = 1.0 / a
+        denominator = a
+        for _ in range(10000):
+            denominator += 1
+            term *= x / denominator
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    tiny = 1e-300
+    b = x + 1 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for index in range(1, 10000):
+        an = -index * (index - a)
+        b += 2
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def chi_square_p_value(statistic: float, dof: int) -> float:
+    """Probability of a chi-square statistic at least this large under the null."""
+    return _regularized_gamma_q(dof / 2.0, statistic / 2.0)
+
+
+@dataclass(frozen=True, slots=True)
+class ChiSquareResult:
+    label: str
+    samples: int
+    dof: int
+    statistic: float
+    p_value: float
+    alpha: float
+
+    @property
+    def passed(self) -> bool:
+        return self.p_value >= self.alpha
+
+    def to_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = asdict(self)
+        payload["statistic"] = round(self.statistic, 3)
+        payload["p_value"] = round(self.p_value, 6)
+        payload["passed"] = self.passed
+        return payload
+
+
+def chi_square_test(
+    label: str,
+    observed: Sequence[int],
+    probabilities: Sequence[float],
+    *,
+    alpha: float = DEFAULT_ALPHA,
+) -> ChiSquareResult:
+    """Pearson goodness-of-fit test of ``observed`` counts against ``probabilities``."""
+    if len(observed) != len(probabilities):
+        raise ValueError("observed and probabilities must have the same length")
+    samples = sum(observed)
+    statistic = 0.0
+    for count, probability in zip(observed, probabilities):
+        expected = samples * probability
+        if expected > 0:
+            statistic += (count - expected) ** 2 / expected
+    dof = len(observed) - 1
+    return ChiSquareResult(
+        label=label,
+        samples=samples,
+        dof=dof,
+        statistic=statistic,
+        p_value=chi_square_p_value(statistic, dof),
+        alpha=alpha,
+    )
+
+
+def line_probabilities(method_key: str) -> List[float]:
+    weights, denominator = LINE_WEIGHTS[method_key]
+    return [weights[value] / denominator for value in LINE_VALUES]
+
+
+def code_probabilities(method_key: str) -> List[float]:
+    """Expected probability of every 12-bit cast code (lines are independent)."""
+    line_probs = line_probabilities(method_key)
+    probabilities = [1.0] * TABLE_SIZE
+    for code in range(TABLE_SIZE):
+        for shift in range(0, 12, 2):
+            probabilities[code] *= line_probs[(code >> shift) & 3]
+    return probabilities
+
+
+def _rate(count: int, elapsed: float) -> float:
+    return round(count / elapsed, 1) if elapsed > 0 else float("inf")
+
+
+def check_batch_method(
+    method_key: str,
+    casts: int,
+    *,
+    seed: Optional[int] = None,
+    backend: str = "auto",
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, object]:
+    """Cast ``casts`` hexagrams through the batch path and test lines and codes."""
+    started = time.perf_counter()
+    batch = generate_batch(method_key, casts, seed, backend=backend)
+    generated = time.perf_counter()
+    code_counts = batch.code_counts()
+    finished = time.perf_counter()
+
+    value_counts = batch.value_counts()
+    tests = [
+        chi_square_test(
+            "line_values",
+            [value_counts[value] for value in LINE_VALUES],
+            line_probabilities(method_key),
+            alpha=alpha,
+        ),
+        chi_square_test("cast_codes", code_counts, code_probabilities(method_key), alpha=alpha),
+    ]
+    return {
+        "method": method_key,
+        "path": "batch",
+        "backend": batch.backend,
+        "casts": casts,
+        "casts_per_second": _rate(casts, generated - started),
+        "casts_per_second_with_codes": _rate(casts, finished - started),
+        "tests": [test.to_dict() for test in tests],
+        "passed": all(test.passed for test in tests),
+    }
+
+
+def check_scalar_method(
+    method_key: str,
+    lines: int,
+    *,
+    seed: Optional[int] = None,
+    alpha: float = DEFAULT_ALPHA,
+) -> Dict[str, object]:
+    """Draw ``lines`` single lines through the method's own line function."""
+    calculate = _SCALAR_LINE_FUNCS[method_key]
+    rng = random.Random(seed)
+    counts = dict.fromkeys(LINE_VALUES, 0)
+    started = time.perf_counter()
+    for _ in range(lines):
+        counts[calculate(rng)] += 1
+    elapsed = time.perf_counter() - started
+
+    test = chi_square_test(
+        "line_values",
+        [counts[value] for value in LINE_VALUES],
+        line_probabilities(method_key),
+        alpha=alpha,
+    )
+    return {
+        "method": method_key,
+        "path": "scalar",
+        "lines": lines,
+        "lines_per_second": _rate(lines, elapsed),
+        "tests": [test.to_dict()],
+        "passed": test.passed,
+    }
+
+
+def check_meihua_calendar(
+    start: datetime,
+    *,
+    days: int = 366,
+    step_minutes: int = 60,
+) -> Dict[str, object]:
+    """Run ``MeihuaMethod._calculate_trigrams`` over a span of timestamps.
+
+    Time casting is deterministic, so instead of a goodness-of-fit test this
+    checks every result is a valid trigram/line and reports how the results
+    spread; the uniformity statistics are informational only.
+    """
+    upper_counts = [0] * 8
+    lower_counts = [0] * 8
+    line_counts = [0] * 6
+    hexagrams = set()
+    invalid: List[str] = []
+    stamps = 0
+    moment = start
+    end = start + timedelta(days=days)
+    step = timedelta(minutes=step_minutes)
+
+    started = time.perf_counter()
+    while moment < end:
+        upper, lower, changing_line = MeihuaMethod._calculate_trigrams(moment)
+        stamps += 1
+        if not (1 <= upper <= 8 and 1 <= lower <= 8 and 1 <= changing_line <= 6):
+            invalid.append(moment.isoformat())
+        else:
+            upper_counts[upper - 1] += 1
+            lower_counts[lower - 1] += 1
+            line_counts[changing_line - 1] += 1
+            lines = MeihuaMethod._construct_hexagram(upper, lower, changing_line)
+            if sum(1 for value in lines if value in (6, 9)) != 1:
+                invalid.append(moment.isoformat())
+            hexagrams.add((upper, lower))
+        moment += step
+    elapsed = time.perf_counter() - started
+
+    spread = [
+        chi_square_test("upper_trigram", upper_counts, [1 / 8] * 8, alpha=0.0),
+        chi_square_test("lower_trigram", lower_counts, [1 / 8] * 8, alpha=0.0),
+        chi_square_test("changing_line", line_counts, [1 / 6] * 6, alpha=0.0),
+    ]
+    return {
+        "method": "m",
+        "path": "calendar",
+        "start": start.isoformat(),
+        "timestamps": stamps,
+        "timestamps_per_second": _rate(stamps, elapsed),
+        "distinct_hexagrams": len(hexagrams),
+        "invalid": invalid[:20],
+        "spread": [test.to_dict() for test in spread],
+        "passed": not invalid,
+    }
@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import lru_cache
+import hashlib
+import logging
+import marshal
+import os
 import re
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, Iterator, List, Mapping, Tuple, Optional
 
 
 TOP_SECTION_ORDER = ["guaci", "xiangci", "duanyi", "zhaoyong", "fupeirong", "zongjie", "philos"]
@@ -12,6 +16,12 @@ LINE_SECTION_ORDER = ["yaoci", "zhaoyong", "fupeirong", "var", "philos"]
 
 FILENAME_PATTERN = re.compile(r"^第(?P<number>\d+)卦_.*\((?P<name>.+)\)\.txt$")
 
+ARTIFACT_MAGIC = b"ICHGUACI"
+ARTIFACT_FORMAT_VERSION = 2
+_DIGEST_LENGTH = 64
+
+logger = logging.getLogger(__name__)
+
 
 @dataclass(frozen=True)
 class LineText:
@@ -45,22 +55,46 @@ class GuaciText:
         return "\n\n".join(pieces).strip()
 
 
+@dataclass(frozen=True)
+class PackedDirectory:
+    """Pre-parsed texts of one source directory, served from a guaci artifact."""
+
+    directory: Path
+    source_digest: str
+    by_number: Dict[int, GuaciText]
+    by_name: Dict[str, GuaciText]
+
+
+_PACKED_DIRECTORIES: Dict[str, PackedDirectory] = {}
+
+
+def _iter_guaci_files(directory: Path) -> Iterator[Tuple[Path, int, str]]:
+    for file in directory.glob("第*卦*.txt"):
+        match = FILENAME_PATTERN.match(file.name)
+        if not match:
+            continue
+        yield file, int(match.group("number")), match.group("name")
+
+
 @lru_cache(maxsize=None)
 def _scan_directory(directory: str) -> Tuple[Dict[int, Path], Dict[str, Path]]:
     number_map: Dict[int, Path] = {}
     name_map: Dict[str, Path] = {}
-    path = Path(directory)
-    for file in path.glob("第*卦*.txt"):
-        match = FILENAME_PATTERN.match(file.name)
-        if not match:
-            continue
-        number = int(match.group("number"))
-        name = match.group("name")
+    for file, number, name in _iter_guaci_files(Path(directory)):
         number_map[number] = file
         name_map[name] = file
     return number_map, name_map
 
 
+def _packed_directory(directory: Path) -> Optional[PackedDirectory]:
+    if not _PACKED_DIRECTORIES:
+        return None
+    packed = _PACKED_DIRECTORIES.get(str(directory))
+    if packed is None:
+        packed = _PACKED_DIRECTORIES.get(str(Path(directory).resolve()))
+    return packed
+
+
 def _resolve_path_by_number(hex_number: int, directory: Path) -> Path:
     number_map, _ = _scan_directory(str(directory))
     try:
@@ -78,17 +112,162 @@ def _resolve_path_by_name(name: str, directory: Path) -> Path:
 
 
 def load_guaci_by_number(hex_number: int, directory: Path) -> GuaciText:
+    packed = _packed_directory(directory)
+    if packed is not None:
+        try:
+            return packed.by_number[hex_number]
+        except KeyError as exc:
+            raise FileNotFoundError(f"未找到第{hex_number}卦的卦辞文件") from exc
     path = _resolve_path_by_number(hex_number, directory)
     return _load_guaci_file(path)
 
 
 def load_guaci_by_name(name: str, directory: Path) -> GuaciText:
+    packed = _packed_directory(directory)
+    if packed is not None:
+        try:
+            return packed.by_name[name]
+        except KeyError as exc:
+            raise FileNotFoundError(f"未找到名称为 {name} 的卦辞文件") from exc
     path = _resolve_path_by_name(name, directory)
     return _load_guaci_file(path)
 
 
+def _source_digest(directory: Path) -> str:
+    hasher = hashlib.sha256()
+    for file in sorted(file for file, _, _ in _iter_guaci_files(directory)):
+        hasher.update(file.name.encode("utf-8"))
+        hasher.update(b"\0")
+        hasher.update(file.read_bytes())
+        hasher.update(b"\0")
+    return hasher.hexdigest()
+
+
+def compile_guaci_artifact(sources: Mapping[str, Path], output: Path) -> str:
+    """Parse every text under ``sources`` into one marshalled artifact at ``output``.
+
+    ``sources`` maps a label (e.g. ``"guaci"``, ``"takashima"``) to its directory.
+    The file starts with :data:`ARTIFACT_MAGIC` and the sha256 of the payload,
+    which is returned. Directories are stored relative to the artifact so the
+    data directory can be moved as a whole.
+    """
+    output = Path(output)
+    payload_sources: Dict[str, Dict[str, object]] = {}
+    for label, directory in sources.items():
+        directory = Path(directory).resolve()
+        texts = []
+        for file, _, _ in sorted(_iter_guaci_files(directory)):
+            text = _parse_guaci_file(file)
+            texts.append(
+                (
+                    text.number,
+                    text.name,
+                    dict(text.top_sections),
+                    {key: dict(line.sections) for key, line in text.line_sections.items()},
+                )
+            )
+        payload_sources[label] = {
+            "directory": os.path.relpath(directory, output.resolve().parent),
+            "source_digest": _source_digest(directory),
+            "texts": texts,
+        }
+
+    payload = marshal.dumps({"format": ARTIFACT_FORMAT_VERSION, "sources": payload_sources})
+    digest = hashlib.sha256(payload).hexdigest()
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = output.with_name(f"{output.name}.{os.getpid()}.tmp")
+    tmp_path.write_bytes(ARTIFACT_MAGIC + digest.encode("ascii") + payload)
+    os.replace(tmp_path, output)
+    return digest
+
+
+def read_guaci_artifact(path: Path) -> Dict[str, PackedDirectory]:
+    """Load and verify an artifact written by :func:`compile_guaci_artifact`.
+
+    Raises ``ValueError`` for a corrupt or incompatible file. Sources whose
+    files no longer hash to the recorded digest are left out (and logged) so
+    that callers fall back to parsing the text files. Content rather than
+    mtimes decides, so an artifact survives a fresh checkout or deploy.
+    """
+    path = Path(path)
+    data = path.read_bytes()
+    header_length = len(ARTIFACT_MAGIC) + _DIGEST_LENGTH
+    if len(data) < header_length or not data.startswith(ARTIFACT_MAGIC):
+        raise ValueError(f"无法识别的卦辞制品: {path}")
+    digest = data[len(ARTIFACT_MAGIC) : header_length].decode("ascii")
+    payload = data[header_length:]
+    if hashlib.sha256(payload).hexdigest() != digest:
+        raise ValueError(f"卦辞制品校验失败: {path}")
+    document = marshal.loads(payload)
+    if document.get("format") != ARTIFACT_FORMAT_VERSION:
+        raise ValueError(f"卦辞制品版本不兼容: {path}")
+
+    packed: Dict[str, PackedDirectory] = {}
+    base = path.resolve().parent
+    for label, source in document["sources"].items():
+        directory = (base / source["directory"]).resolve()
+        if source["source_digest"] != _source_digest(directory):
+            logger.warning(
+                "Guaci artifact %s is stale for %s (%s); parsing the text files instead",
+                path,
+                label,
+                directory,
+            )
+            continue
+        by_number: Dict[int, GuaciText] = {}
+        by_name: Dict[str, GuaciText] = {}
+        for number, name, top_sections, line_sections in source["texts"]:
+            text = GuaciText(
+                number=number,
+                name=name,
+                top_sections=top_sections,
+                line_sections={
+                    key: LineText(sections=sections) for key, sections in line_sections.items()
+                },
+            )
+            by_number[number] = text
+            by_name[name] = text
+        packed[label] = PackedDirectory(
+            directory=directory,
+            source_digest=source["source_digest"],
+            by_number=by_number,
+            by_name=by_name,
+        )
+    return packed
+
+
+def register_guaci_artifact(path: Path) -> List[str]:
+    """Serve lookups for the artifact's fresh directories from memory.
+
+    Returns the labels that were registered; a missing or unreadable artifact
+    registers nothing and lookups keep parsing the text files.
+    """
+    global _PACKED_DIRECTORIES
+    try:
+        packed = read_guaci_artifact(path)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError, EOFError, TypeError, KeyError) as exc:
+        logger.warning("Ignoring guaci artifact %s: %s", path, exc)
+        return []
+    registry = dict(_PACKED_DIRECTORIES)
+    for source in packed.values():
+        registry[str(source.directory)] = source
+    _PACKED_DIRECTORIES = registry
+    return sorted(packed)
+
+
+def clear_guaci_artifacts() -> None:
+    global _PACKED_DIRECTORIES
+    _PACKED_DIRECTORIES = {}
+
+
 @lru_cache(maxsize=None)
 def _load_guaci_file(path: Path) -> GuaciText:
+    return _parse_guaci_file(path)
+
+
+def _parse_guaci_file(path: Path) -> GuaciText:
     match = FILENAME_PATTERN.match(path.name)
     if not match:
         raise ValueError(f"无法解析卦辞文件名: {path.name}")
@@ -4,6 +4,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
 
+from iching.core.cast_table import CastOutcome, lookup_outcome
 from iching.core.guaci_repository import load_guaci_by_name
 
 if TYPE_CHECKING:
@@ -41,74 +42,77 @@ def load_hexagram_definitions(index_file: Path) -> Dict[str, HexagramDefinition]
     return hexagrams
 
 
+@dataclass(frozen=True, slots=True)
+class ChangedHexagram:
+    """Read-only view of a changed hexagram, resolved from its cast-table entry.
+
+    Readings only need the name, explanation and binary; :meth:`full` builds
+    a complete :class:`Hexagram` when a caller needs the derived forms too.
+    """
+
+    lines: List[int]
+    binary: str
+    name: str
+    explanation: str
+    definitions: Dict[str, HexagramDefinition] = field(repr=False, compare=False)
+
+    def full(self) -> "Hexagram":
+        return Hexagram(list(self.lines), self.definitions)
+
+
 @dataclass(slots=True)
 class Hexagram:
-    """Represents a hexagram and its related derived forms."""
+    """Represents a hexagram and its related derived forms.
+
+    All line-vector-dependent facts come from the precomputed cast table, so
+    construction is a table lookup plus a few definition lookups by binary.
+    """
 
     lines: List[int]
     definitions: Dict[str, HexagramDefinition]
     binary: str = field(init=False)
     name: str = field(init=False)
     explanation: str = field(init=False)
-    changed_hexagram: Optional["Hexagram"] = field(init=False, default=None)
+    changed_hexagram: Optional[ChangedHexagram] = field(init=False, default=None)
     inverse_hexagram: Tuple[str, str] = field(init=False, default=("未知卦", "未找到解释"))
     reverse_hexagram: Tuple[str, str] = field(init=False, default=("未知卦", "未找到解释"))
     mutual_hexagram: Tuple[str, str] = field(init=False, default=("未知卦", "未找到解释"))
+    outcome: CastOutcome = field(init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
-        self.binary = "".join("1" if value in (7, 9) else "0" for value in self.lines)
+        outcome = lookup_outcome(self.lines)
+        self.outcome = outcome
+        self.binary = outcome.binary
         name, explanation = self.definitions.get(self.binary, ("未知卦", "未找到解释"))
         self.name = name
         self.explanation = explanation
 
-        self.changed_hexagram = self._calculate_changed_hexagram()
-        self.inverse_hexagram = self._lookup_hexagram(self._inverse_binary(self.binary))
-        self.reverse_hexagram = self._lookup_hexagram(self.binary[::-1])
-        self.mutual_hexagram = self._lookup_hexagram(self._mutual_binary(self.binary))
+        if outcome.changed_lines is not None:
+            changed_binary = lookup_outcome(outcome.changed_lines).binary
+            changed_name, changed_explanation = self._lookup_hexagram(changed_binary)
+            self.changed_hexagram = ChangedHexagram(
+                lines=list(outcome.changed_lines),
+                binary=changed_binary,
+                name=changed_name,
+                explanation=changed_explanation,
+                definitions=self.definitions,
+            )
+        self.inverse_hexagram = self._lookup_hexagram(outcome.inverse_binary)
+        self.reverse_hexagram = self._lookup_hexagram(outcome.reverse_binary)
+        self.mutual_hexagram = self._lookup_hexagram(outcome.mutual_binary)
 
     @property
     def reversed_lines(self) -> Iterable[Tuple[int, int]]:
         for position, line in enumerate(reversed(self.lines), start=1):
             yield 7 - position, line
 
-    def _calculate_changed_hexagram(self) -> Optional["Hexagram"]:
-        changed_lines: List[int] = []
-        has_moving_line = False
-        for value in self.lines:
-            if value == 9:
-                changed_lines.append(8)
-                has_moving_line = True
-            elif value == 6:
-                changed_lines.append(7)
-                has_moving_line = True
-            else:
-                changed_lines.append(value)
-        if has_moving_line:
-            return Hexagram(changed_lines, self.definitions)
-        return None
-
     def _lookup_hexagram(self, binary: Optional[str]) -> Tuple[str, str]:
         if not binary:
             return "未知卦", "未找到解释"
         return self.definitions.get(binary, ("未知卦", "未找到解释"))
 
-    @staticmethod
-    def _inverse_binary(binary: str) -> str:
-        return "".join("1" if bit == "0" else "0" for bit in binary)
-
-    @staticmethod
-    def _mutual_binary(binary: str) -> Optional[str]:
-        if len(binary) == 6:
-            return binary[1:4] + binary[2:5]
-        return None
-
     def render_lines(self) -> List[str]:
-        rendered: List[str] = []
-        for index, value in enumerate(reversed(self.lines), start=1):
-            symbol = "---" if value in (7, 9) else "- -"
-            moving = " O" if value == 9 else " X" if value == 6 else ""
-            rendered.append(f"第 {7 - index} 爻: {symbol}{moving}")
-        return rendered
+        return list(self.outcome.rendered_lines)
 
     def to_text(
         self,
@@ -290,12 +294,26 @@ class Hexagram:
         interpretation_repo: "InterpretationRepository",
         selection: Optional[object],
     ) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[str]]:
-        main_top_text = interpretation_repo.get_slot_content(
-            hexagram_name=self.name,
-            source_key="guaci",
-            slot_kind="gua",
+        changed_name = self.changed_hexagram.name if self.changed_hexagram else None
+        main_top_key = (self.name, "guaci", "gua", None, None, "zh-CN")
+        main_line_key = None
+        changed_key = None
+        if selection == "all-move-other":
+            if changed_name:
+                changed_key = (changed_name, "guaci", "gua", None, None, "zh-CN")
+        elif selection == "all":
+            main_line_key = (self.name, "guaci", "use", None, None, "zh-CN")
+        elif isinstance(selection, int):
+            line_no = selection + 1
+            main_line_key = (self.name, "guaci", "line", line_no, None, "zh-CN")
+            if changed_name:
+                changed_key = (changed_name, "guaci", "line", line_no, None, "zh-CN")
+
+        contents = interpretation_repo.get_slot_contents(
+            key for key in (main_top_key, main_line_key, changed_key) if key is not None
         )
-        main_line_text: Optional[str] = None
+        main_top_text = contents[main_top_key]
+        main_line_text = contents[main_line_key] if main_line_key else None
         changed_header: Optional[str] = None
         changed_text: Optional[str] = None
 
@@ -304,49 +322,14 @@ class Hexagram:
                 changed_header = "变卦：没有动爻，故无变卦。"
             return main_top_text, None, changed_header, None
 
-        if selection == "all-move-other":
-            if self.changed_hexagram:
-                changed_top = interpretation_repo.get_slot_content(
-                    hexagram_name=self.changed_hexagram.name,
-                    source_key="guaci",
-                    slot_kind="gua",
-                )
-                if changed_top:
-                    changed_header = (
-                        f"\n变卦: {self.changed_hexagram.name} - 解释: {self.changed_hexagram.explanation}"
-                    )
-                    changed_text = changed_top
-            return None, None, changed_header, changed_text
-
-        if selection == "all":
-            main_line_text = interpretation_repo.get_slot_content(
-                hexagram_name=self.name,
-                source_key="guaci",
-                slot_kind="use",
+        if changed_key is not None and contents[changed_key] and self.changed_hexagram:
+            changed_header = (
+                f"\n变卦: {self.changed_hexagram.name} - 解释: {self.changed_hexagram.explanation}"
             )
-            return main_top_text, main_line_text, changed_header, changed_text
-
-        if isinstance(selection, int):
-            line_no = selection + 1
-            main_line_text = interpretation_repo.get_slot_content(
-                hexagram_name=self.name,
-                source_key="guaci",
-                slot_kind="line",
-                line_no=line_no,
-            )
-            if self.changed_hexagram:
-                changed_line = interpretation_repo.get_slot_content(
-                    hexagram_name=self.changed_hexagram.name,
-                    source_key="guaci",
-                    slot_kind="line",
-                    line_no=line_no,
-                )
-                if changed_line:
-                    changed_header = (
-                        f"\n变卦: {self.changed_hexagram.name} - 解释: {self.changed_hexagram.explanation}"
-                    )
-                    changed_text = changed_line
+            changed_text = contents[changed_key]
 
+        if selection == "all-move-other":
+            return None, None, changed_header, changed_text
         return main_top_text, main_line_text, changed_header, changed_text
 
     def _collect_sections(
@@ -574,29 +557,29 @@ class Hexagram:
         selection: Optional[object],
         interpretation_repo: "InterpretationRepository",
     ) -> List[Dict[str, object]]:
-        main_entries = interpretation_repo.list_entries(
-            hexagram_name=self.name,
-            locale="zh-CN",
-            source_keys=("guaci", "takashima", "symbolic"),
-        )
-        main_english_entries = interpretation_repo.list_entries(
-            hexagram_name=self.name,
-            locale="en-US",
-            source_keys=("english_commentary",),
+        hexagram_names = [self.name]
+        if self.changed_hexagram:
+            hexagram_names.append(self.changed_hexagram.name)
+        grouped = interpretation_repo.list_entries_bulk(
+            hexagram_names,
+            locales=("zh-CN", "en-US"),
+            source_keys=("guaci", "takashima", "symbolic", "english_commentary"),
         )
+
+        def entries_for(name: str, locale: str) -> List["InterpretationEntry"]:
+            if locale == "en-US":
+                wanted: Tuple[str, ...] = ("english_commentary",)
+            else:
+                wanted = ("guaci", "takashima", "symbolic")
+            return [entry for entry in grouped.get((name, locale), []) if entry.source_key in wanted]
+
+        main_entries = entries_for(self.name, "zh-CN")
+        main_english_entries = entries_for(self.name, "en-US")
         changed_entries: List["InterpretationEntry"] = []
         changed_english_entries: List["InterpretationEntry"] = []
         if self.changed_hexagram:
-            changed_entries = interpretation_repo.list_entries(
-                hexagram_name=self.changed_hexagram.name,
-                locale="zh-CN",
-                source_keys=("guaci", "takashima", "symbolic"),
-            )
-            changed_english_entries = interpretation_repo.list_entries(
-                hexagram_name=self.changed_hexagram.name,
-                locale="en-US",
-                source_keys=("english_commentary",),
-            )
+            changed_entries = entries_for(self.changed_hexagram.name, "zh-CN")
+            changed_english_entries = entries_for(self.changed_hexagram.name, "en-US")
 
         selected_main_line: Optional[str] = None
         if selection == "all":
@@ -714,36 +697,8 @@ class Hexagram:
         return sections
 
     def _build_overview(self) -> Dict[str, object]:
-        lines_info: List[Dict[str, object]] = []
-        ordered_lines = list(reversed(self.lines))
-        changed_lines = (
-            list(reversed(self.changed_hexagram.lines)) if self.changed_hexagram else None
-        )
-
-        for idx, value in enumerate(ordered_lines, start=1):
-            position = 7 - idx
-            line_type = "yang" if value in (7, 9) else "yin"
-            is_moving = value in (6, 9)
-            moving_symbol = "O" if value == 9 else "X" if value == 6 else ""
-            changed_value = (
-                changed_lines[idx - 1] if changed_lines and len(changed_lines) >= idx else value
-            )
-            changed_type = "yang" if changed_value in (7, 9) else "yin"
-            lines_info.append(
-                {
-                    "position": position,
-                    "value": value,
-                    "line_type": line_type,
-                    "is_moving": is_moving,
-                    "moving_symbol": moving_symbol,
-                    "changed_value": changed_value,
-                    "changed_type": changed_type,
-                    "changed_line_type": changed_type,
-                }
-            )
-
         overview = {
-            "lines": lines_info,
+            "lines": self.outcome.overview_payload(),
             "main_hexagram": {"name": self.name, "explanation": self.explanation},
             "changed_hexagram": None,
         }
@@ -755,37 +710,8 @@ class Hexagram:
         return overview
 
     def _select_line_strategy(self) -> Optional[object]:
-        moving_indices = [idx for idx, value in enumerate(self.lines) if value in (6, 9)]
-        count = len(moving_indices)
-
-        if count == 0:
-            return None
-        if count == 6:
+        if self.outcome.moving_count == 6:
             if self.name in QIAN_NAMES or self.name in KUN_NAMES:
                 return "all"
             return "all-move-other"
-
-        if count == 1:
-            return moving_indices[0]
-
-        if count == 2:
-            first, second = moving_indices
-            values = [self.lines[first], self.lines[second]]
-            if set(values) == {6, 9}:
-                return first if self.lines[first] == 6 else second
-            return max(moving_indices)
-
-        if count == 3:
-            return sorted(moving_indices)[1]
-
-        if count == 4:
-            static_indices = [idx for idx, value in enumerate(self.lines) if value not in (6, 9)]
-            if static_indices:
-                return sorted(static_indices)[0]
-            return None
-
-        if count == 5:
-            static_indices = [idx for idx, value in enumerate(self.lines) if value not in (6, 9)]
-            return static_indices[0] if static_indices else None
-
-        return None
+        return self.outcome.selection
@@ -1,17 +1,27 @@
 from __future__ import annotations
 
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import hashlib
+import json
 import logging
 from math import cos, pi, sin
-from typing import Any, Dict, Iterable, Optional
+import multiprocessing
+import os
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 import sxtwl
 from lunar_python import Lunar as LunarCalendar
 from lunar_python import Solar as SolarCalendar
+from lunar_python.util import LunarUtil
 
 from iching.core.bazi_patterns import assess_patterns
+from iching.core.cache import BoundedCache
 from iching.core.bazi_rules.adapter import (
     build_source_backed_shadow,
     canonical_authority_from_shadow,
@@ -21,7 +31,12 @@ from iching.core.bazi_rules.fact_graph import (
     build_bazi_fact_envelope_from_graphs,
     build_bazi_fact_graph,
 )
-from iching.core.bazi_structure import build_structure_profile, structured_relations
+from iching.core.bazi_structure import (
+    added_relations,
+    build_structure_profile,
+    relation_cache_stats,
+    structured_relations,
+)
 from iching.core.calendar_engine import (
     ENGINE_VERSION as CALENDAR_ENGINE_VERSION,
     JIE_MONTH_BRANCH,
@@ -44,11 +59,23 @@ from iching.core.metaphysics_consumer import (
     build_bazi_consumer_profile,
     consumer_feature_records,
 )
-from iching.core.shensha import RULES_VERSION, evaluate_shensha
+from iching.core.shensha import (
+    RULES_VERSION,
+    evaluate_shensha,
+    natal_shensha,
+    shensha_cache_stats,
+)
 from iching.core.shensha_effects import evaluate_shensha_effects
 
 logger = logging.getLogger(__name__)
 
+CHART_CACHE_LIMIT = int(os.getenv("ICHING_CHART_CACHE_LIMIT", "256"))
+PERIOD_TREE_CACHE_LIMIT = int(os.getenv("ICHING_PERIOD_TREE_CACHE_LIMIT", "64"))
+CHART_CACHE_TTL_SECONDS = int(os.getenv("ICHING_CHART_CACHE_TTL_SECONDS", "3600"))
+CHART_BATCH_LIMIT = int(os.getenv("ICHING_CHART_BATCH_LIMIT", "200"))
+CHART_BATCH_WORKERS = int(os.getenv("ICHING_CHART_BATCH_WORKERS", "0"))
+CHART_BATCH_PARALLEL_MIN = int(os.getenv("ICHING_CHART_BATCH_PARALLEL_MIN", "8"))
+
 STEMS = ["甲", "乙", "丙", "丁", "戊", "己", "庚", "辛", "壬", "癸"]
 BRANCHES = ["子", "丑", "寅", "卯", "辰", "巳", "午", "未", "申", "酉", "戌", "亥"]
 ELEMENTS = ["木", "火", "土", "金", "水"]
@@ -1060,70 +1087,347 @@ def _period_theme_activations(
     return activations
 
 
-def _dayun_payload(
-    value: datetime,
-    *,
-    gender: Optional[str],
-    hour_uncertain: bool,
-    day_boundary: str,
-    algorithm: str,
-    expected_bazi: str,
-    natal_pillars: list[Dict[str, Any]],
-    timezone_name: str,
-    reference_timestamp: Optional[datetime] = None,
-    include_period_details: bool = True,
-    period_cycle_index: Optional[int] = None,
-) -> Dict[str, Any]:
-    if gender not in {"male", "female"}:
-        return {"status": "not_requested", "cycles": []}
-    if hour_uncertain:
+def _period_pillar(label: str, ganzhi: str) -> Dict[str, Any]:
+    return {"label": label, "stem": ganzhi[0], "branch": ganzhi[1], "text": ganzhi}
+
+
+def _period_hits(
+    natal_count: int, context: list[Dict[str, Any]], label: str
+) -> list[Dict[str, Any]]:
+    # The natal matches are shared; only the period pillars are scored here.
+    return natal_shensha(context[:natal_count]).hits(context[natal_count:], label=label)
+
+
+def _period_structured_relations(
+    context: list[Dict[str, Any]], label: str
+) -> list[Dict[str, Any]]:
+    if context and context[-1].get("label") == label:
+        return added_relations(context[:-1], context[-1])
+    return [
+        relation
+        for relation in structured_relations(context)
+        if any(item.get("pillar") == label for item in relation.get("participants", ()))
+    ]
+
+
+def _liu_yue_ganzhi(year_ganzhi: str, month_index: int) -> str:
+    # lunar_python's LiuYue.getGanZhi (五虎遁) without re-deriving the year pillar.
+    year_stem = year_ganzhi[:1]
+    offset = {"甲": 2, "己": 2, "乙": 4, "庚": 4, "丙": 6, "辛": 6, "丁": 8, "壬": 8}.get(
+        year_stem, 0
+    )
+    stem = LunarUtil.GAN[(month_index + offset) % 10 + 1]
+    branch = LunarUtil.ZHI[(month_index + LunarUtil.BASE_MONTH_ZHI_INDEX) % 12 + 1]
+    return stem + branch
+
+
+def _month_label(liu_yue: Any) -> str:
+    return f"{str(liu_yue.getMonthInChinese()).lstrip('0123456789')}月"
+
+
+class PeriodTree:
+    """Da Yun → Liu Nian → Liu Yue layers of one natal chart, expanded on demand.
+
+    Constructing the tree only fixes the Da Yun sequence and the reference
+    moment. A cycle summary, a cycle's years (with their months) and a single
+    year are evaluated the first time they are asked for and then memoised, so
+    a compact chart pays for the current and next cycle instead of every year
+    and month of a lifetime. :meth:`activation_cycles` feeds the life K-line:
+    its baseline still spans the whole horizon, but cycles nobody expanded
+    carry only the per-node theme activations the K-line reads.
+
+    Trees for a fixed reference moment are shared through the chart cache, so
+    callers copy what they return before editing it. Two threads missing the
+    same node may both evaluate it; the results are identical and the later
+    one wins.
+    """
+
+    def __init__(
+        self,
+        value: datetime,
+        *,
+        gender: str,
+        day_boundary: str,
+        algorithm: str,
+        natal_pillars: list[Dict[str, Any]],
+        timezone_name: str,
+        reference_timestamp: Optional[datetime] = None,
+    ) -> None:
+        self.value = value
+        self.gender = gender
+        self.algorithm = algorithm
+        self.natal_pillars = natal_pillars
+        self.day_stem = natal_pillars[2]["stem"]
+        solar = SolarCalendar.fromYmdHms(
+            value.year, value.month, value.day, value.hour, value.minute, value.second
+        )
+        eight_char = solar.getLunar().getEightChar()
+        eight_char.setSect(1 if day_boundary == "forward" else 2)
+        self.engine_bazi = eight_char.toString()
+        self.crosscheck_matches = self.engine_bazi == " ".join(
+            pillar["text"] for pillar in natal_pillars
+        )
+        sect = 2 if algorithm == "sect2" else 1
+        self.yun = eight_char.getYun(1 if gender == "male" else 0, sect)
+        self.reference = (
+            normalize_local_datetime(reference_timestamp, timezone_name).local_datetime
+            if reference_timestamp is not None
+            else datetime.now(value.tzinfo)
+        )
+        reference_facts = calculate_calendar_facts(
+            self.reference,
+            timezone_name=timezone_name,
+            day_boundary=day_boundary,
+        )
+        self.reference_year = reference_facts.lichun_boundary.local_datetime.year
+        self.reference_month_ganzhi = reference_facts.month_gz.text
+        start_solar = self.yun.getStartSolar()
+        self.first_dayun_start = normalize_local_datetime(
+            datetime(
+                start_solar.getYear(),
+                start_solar.getMonth(),
+                start_solar.getDay(),
+                start_solar.getHour(),
+                start_solar.getMinute(),
+                start_solar.getSecond(),
+            ),
+            timezone_name,
+        ).local_datetime
+        self.natal_relations = set(
+            _stem_relations(natal_pillars) + _branch_relations(natal_pillars)
+        )
+        # Keep a stable contemporary minimum, then extend only as far as needed
+        # for the reference age plus the following cycle. The cap covers living
+        # users without allowing an extreme historical input to create an
+        # unbounded API payload.
+        reference_age_years = max(0, self.reference.year - value.year)
+        cycle_count = max(13, min(20, reference_age_years // 10 + 3))
+        self._cycles = {cycle.getIndex(): cycle for cycle in self.yun.getDaYun(cycle_count)}
+        # Every Liu Nian of the chart counts its pillar from the same 立春 year.
+        first_cycle = next(iter(self._cycles.values()))
+        self._year_jiazi = LunarUtil.getJiaZiIndex(
+            first_cycle.getLunar().getJieQiTable()["立春"].getLunar().getYearInGanZhiExact()
+        )
+        self._cycle_nodes: Dict[int, tuple[Dict[str, Any], list[Dict[str, Any]], set[str]]] = {}
+        self._years: Dict[int, list[Dict[str, Any]]] = {}
+        self._year_nodes: Dict[tuple[int, int], Dict[str, Any]] = {}
+        self._terms: Dict[int, list[Any]] = {}
+
+    @property
+    def cycle_indexes(self) -> list[int]:
+        return list(self._cycles)
+
+    @property
+    def current_index(self) -> Optional[int]:
+        return next(
+            (index for index in self._cycles if self._cycle_span(index)[2]),
+            None,
+        )
+
+    def summary(self, cycle_index: int) -> Dict[str, Any]:
+        """Cycle-level facts only; ``years`` stays empty."""
+        return self._cycle_node(cycle_index)[0]
+
+    def cycle(self, cycle_index: int) -> Dict[str, Any]:
+        """The cycle with every year and month evaluated."""
         return {
-            "status": "requires_hour",
-            "algorithm": algorithm,
-            "note": "时辰不确定时，起运时刻与大运交接可能变化，暂不输出伪精确大运。",
-            "cycles": [],
+            **self.summary(cycle_index),
+            "years": self.years(cycle_index),
+            "years_expanded": True,
         }
-    solar = SolarCalendar.fromYmdHms(
-        value.year, value.month, value.day, value.hour, value.minute, value.second
-    )
-    eight_char = solar.getLunar().getEightChar()
-    eight_char.setSect(1 if day_boundary == "forward" else 2)
-    crosscheck_bazi = eight_char.toString()
-    sect = 2 if algorithm == "sect2" else 1
-    yun = eight_char.getYun(1 if gender == "male" else 0, sect)
-    reference = (
-        normalize_local_datetime(reference_timestamp, timezone_name).local_datetime
-        if reference_timestamp is not None
-        else datetime.now(value.tzinfo)
-    )
-    reference_facts = calculate_calendar_facts(
-        reference,
-        timezone_name=timezone_name,
-        day_boundary=day_boundary,
-    )
-    reference_year = reference_facts.lichun_boundary.local_datetime.year
-    reference_month_ganzhi = reference_facts.month_gz.text
-    start_solar = yun.getStartSolar()
-    first_dayun_start = normalize_local_datetime(
-        datetime(
-            start_solar.getYear(),
-            start_solar.getMonth(),
-            start_solar.getDay(),
-            start_solar.getHour(),
-            start_solar.getMinute(),
-            start_solar.getSecond(),
-        ),
-        timezone_name,
-    ).local_datetime
 
-    def add_years(source: datetime, years: int) -> datetime:
-        try:
-            return source.replace(year=source.year + years)
-        except ValueError:
-            return source.replace(year=source.year + years, day=28)
+    def years(self, cycle_index: int) -> list[Dict[str, Any]]:
+        if cycle_index not in self._years:
+            self._years[cycle_index] = [
+                self._year_node(cycle_index, liu_nian)
+                for liu_nian in self._cycles[cycle_index].getLiuNian()
+            ]
+        return self._years[cycle_index]
+
+    def year(self, cycle_index: int, year: int) -> Optional[Dict[str, Any]]:
+        """One Liu Nian with its months, without evaluating the rest of the cycle."""
+        liu_nian = next(
+            (item for item in self._cycles[cycle_index].getLiuNian() if item.getYear() == year),
+            None,
+        )
+        return self._year_node(cycle_index, liu_nian) if liu_nian is not None else None
+
+    def current(self) -> Dict[str, Any]:
+        current_year = None
+        current_month = None
+        index = self.current_index
+        if index is not None:
+            for year_payload in self.years(index):
+                if year_payload["is_current"] and year_payload["year"] == self.reference_year:
+                    current_year = {
+                        key: value for key, value in year_payload.items() if key != "months"
+                    }
+                for month_payload in year_payload["months"]:
+                    if (
+                        month_payload["is_current"]
+                        and month_payload["ganzhi"] == self.reference_month_ganzhi
+                    ):
+                        current_month = month_payload
+        return {
+            "as_of": self.reference.isoformat(),
+            "year": current_year,
+            "month": current_month,
+        }
+
+    def payload(
+        self,
+        *,
+        include_period_details: bool = True,
+        period_cycle_index: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        """The ``dayun`` block of a chart.
+
+        Cycles carry their summary always; ``years`` are filled for the
+        current and following cycle, the requested ``period_cycle_index`` and,
+        with ``include_period_details``, every cycle. ``years_expanded`` tells
+        a client which cycles still need a ``/tools/metaphysics/periods`` call.
+        """
+        current_index = self.current_index
+        expanded = {period_cycle_index}
+        if current_index is not None:
+            expanded.update({current_index, current_index + 1})
+        cycles = []
+        for index in self._cycles:
+            if include_period_details or index in expanded:
+                cycles.append(self.cycle(index))
+            else:
+                cycles.append(self.summary(index))
+        return {
+            "status": "available",
+            "algorithm": self.algorithm,
+            "algorithm_note": "sect2 按分钟精算；sect1 按日数与时辰折算。"
+            if self.algorithm == "sect2"
+            else "sect1 按日数与时辰折算。",
+            "direction": "forward" if self.yun.isForward() else "reverse",
+            "start": {
+                "years": self.yun.getStartYear(),
+                "months": self.yun.getStartMonth(),
+                "days": self.yun.getStartDay(),
+                "hours": self.yun.getStartHour(),
+                "solar_date": self.yun.getStartSolar().toYmdHms(),
+            },
+            "engine_bazi": self.engine_bazi,
+            "crosscheck_matches": self.crosscheck_matches,
+            "cycles": cycles,
+            "current": self.current(),
+        }
 
-    def flow_boundaries(year: int) -> tuple[datetime, datetime, list[datetime]]:
-        terms = solar_terms_for_years(range(year - 1, year + 3), value.tzinfo)
+    def activation_cycles(self) -> list[Dict[str, Any]]:
+        """Every cycle with the year and month activations the life K-line reads.
+
+        Cycles already expanded reuse their full years; the rest get a lean
+        pass that skips solar-term boundaries, xunkong and relation labels.
+        """
+        cycles = []
+        for index in self._cycles:
+            years = self._years.get(index)
+            if years is None:
+                years = [
+                    self._lean_year_node(index, liu_nian)
+                    for liu_nian in self._cycles[index].getLiuNian()
+                ]
+            cycles.append({**self.summary(index), "years": years})
+        return cycles
+
+    def _cycle_span(self, cycle_index: int) -> tuple[datetime, datetime, bool]:
+        def add_years(source: datetime, years: int) -> datetime:
+            try:
+                return source.replace(year=source.year + years)
+            except ValueError:
+                return source.replace(year=source.year + years, day=28)
+
+        start = (
+            self.value
+            if cycle_index == 0
+            else add_years(self.first_dayun_start, (cycle_index - 1) * 10)
+        )
+        end = (
+            self.first_dayun_start
+            if cycle_index == 0
+            else add_years(self.first_dayun_start, cycle_index * 10)
+        )
+        return start, end, start <= self.reference < end
+
+    def _cycle_node(
+        self, cycle_index: int
+    ) -> tuple[Dict[str, Any], list[Dict[str, Any]], set[str]]:
+        node = self._cycle_nodes.get(cycle_index)
+        if node is not None:
+            return node
+        cycle = self._cycles[cycle_index]
+        cycle_start, cycle_end, cycle_is_current = self._cycle_span(cycle_index)
+        cycle_ganzhi = cycle.getGanZhi()
+        cycle_pillar = _period_pillar("大运", cycle_ganzhi) if cycle_ganzhi else None
+        cycle_context = [*self.natal_pillars, *([cycle_pillar] if cycle_pillar else [])]
+        cycle_ten_god = _ten_god(self.day_stem, cycle_ganzhi[0]) if cycle_ganzhi else "—"
+        cycle_hits = (
+            _period_hits(len(self.natal_pillars), cycle_context, "大运") if cycle_pillar else []
+        )
+        cycle_relations = _stem_relations(cycle_context) + _branch_relations(cycle_context)
+        summary = {
+            "index": cycle_index,
+            "label": "童限" if cycle_index == 0 else cycle_ganzhi,
+            "ganzhi": cycle_ganzhi,
+            "start_year": cycle.getStartYear(),
+            "end_year": cycle.getEndYear(),
+            "start_age": cycle.getStartAge(),
+            "end_age": cycle.getEndAge(),
+            "start_timestamp": cycle_start.isoformat(),
+            "end_timestamp": cycle_end.isoformat(),
+            "is_current": cycle_is_current,
+            "ten_god": cycle_ten_god,
+            "shen_sha": [hit["name"] for hit in cycle_hits],
+            "relations": [
+                relation
+                for relation in cycle_relations
+                if relation not in self.natal_relations
+            ],
+            "theme_activations": _period_theme_activations(
+                period_label="大运",
+                ten_god=cycle_ten_god,
+                gender=self.gender,
+                shensha_hits=cycle_hits,
+                relations=_period_structured_relations(cycle_context, "大运"),
+            ),
+            "years": [],
+            "years_expanded": False,
+        }
+        node = (summary, cycle_context, set(cycle_relations))
+        self._cycle_nodes[cycle_index] = node
+        return node
+
+    def _liu_nian_ganzhi(self, cycle_index: int, liu_nian: Any) -> str:
+        # lunar_python's LiuNian.getGanZhi re-derives the 立春 lunar year on every call.
+        offset = self._year_jiazi + liu_nian.getIndex()
+        if cycle_index > 0:
+            offset += self._cycles[cycle_index].getStartAge() - 1
+        return LunarUtil.JIA_ZI[offset % len(LunarUtil.JIA_ZI)]
+
+    def _year_terms(self, year: int) -> list[Any]:
+        if year not in self._terms:
+            self._terms[year] = solar_terms_for_years((year,), self.value.tzinfo)
+        return self._terms[year]
+
+    def _flow_boundaries(self, year: int) -> tuple[datetime, datetime, list[datetime]]:
+        seen: set[tuple[int, datetime]] = set()
+        terms = []
+        for item in sorted(
+            (
+                item
+                for term_year in range(year - 1, year + 3)
+                for item in self._year_terms(term_year)
+            ),
+            key=lambda item: item.instant_utc,
+        ):
+            key = (item.index, item.instant_utc)
+            if key not in seen:
+                seen.add(key)
+                terms.append(item)
         lichun = next(
             item.local_datetime
             for item in terms
@@ -1137,154 +1441,49 @@ def _dayun_payload(
         month_starts = [
             item.local_datetime
             for item in terms
-            if item.index in JIE_MONTH_BRANCH
-            and lichun <= item.local_datetime < next_lichun
+            if item.index in JIE_MONTH_BRANCH and lichun <= item.local_datetime < next_lichun
         ]
         month_starts.sort()
         return lichun, next_lichun, [*month_starts, next_lichun]
 
-    natal_relations = set(
-        _stem_relations(natal_pillars) + _branch_relations(natal_pillars)
-    )
-    cycles = []
-    kline_cycles = []
-    expand_next_cycle = False
-    current_year_payload: Optional[Dict[str, Any]] = None
-    current_month_payload: Optional[Dict[str, Any]] = None
-    # Keep a stable contemporary minimum, then extend only as far as needed for
-    # the reference age plus the following cycle. The cap covers living users
-    # without allowing an extreme historical input to create an unbounded API
-    # payload.
-    reference_age_years = max(0, reference.year - value.year)
-    cycle_count = max(13, min(20, reference_age_years // 10 + 3))
-    for cycle in yun.getDaYun(cycle_count):
-        cycle_index = cycle.getIndex()
-        cycle_start = (
-            value
-            if cycle_index == 0
-            else add_years(first_dayun_start, (cycle_index - 1) * 10)
-        )
-        cycle_end = (
-            first_dayun_start
-            if cycle_index == 0
-            else add_years(first_dayun_start, cycle_index * 10)
-        )
-        cycle_is_current = cycle_start <= reference < cycle_end
-        cycle_ganzhi = cycle.getGanZhi()
-        cycle_pillar = (
-            {
-                "label": "大运",
-                "stem": cycle_ganzhi[0],
-                "branch": cycle_ganzhi[1],
-                "text": cycle_ganzhi,
-            }
-            if cycle_ganzhi
-            else None
-        )
-        cycle_context = [*natal_pillars, *([cycle_pillar] if cycle_pillar else [])]
-        cycle_ten_god = (
-            _ten_god(natal_pillars[2]["stem"], cycle_ganzhi[0]) if cycle_ganzhi else "—"
-        )
-        cycle_hits = (
-            [
-                hit
-                for hit in evaluate_shensha(cycle_context)
-                if "大运" in hit["pillar_labels"]
-            ]
-            if cycle_pillar
-            else []
-        )
-        cycle_relations = _stem_relations(cycle_context) + _branch_relations(
-            cycle_context
-        )
-        cycle_structured_relations = [
-            relation
-            for relation in structured_relations(cycle_context)
-            if any(
-                item.get("pillar") == "大运"
-                for item in relation.get("participants", ())
+    def _year_node(self, cycle_index: int, liu_nian: Any) -> Dict[str, Any]:
+        key = (cycle_index, liu_nian.getYear())
+        cached = self._year_nodes.get(key)
+        if cached is not None:
+            return cached
+        _, cycle_context, cycle_relations = self._cycle_node(cycle_index)
+        cycle_is_current = self._cycle_span(cycle_index)[2]
+        year_start, year_end, month_boundaries = self._flow_boundaries(liu_nian.getYear())
+        year_is_current = cycle_is_current and year_start <= self.reference < year_end
+        year_ganzhi = self._liu_nian_ganzhi(cycle_index, liu_nian)
+        year_context = [*cycle_context, _period_pillar("流年", year_ganzhi)]
+        year_hits = _period_hits(len(self.natal_pillars), year_context, "流年")
+        year_relations = _stem_relations(year_context) + _branch_relations(year_context)
+        year_ten_god = _ten_god(self.day_stem, year_ganzhi[0])
+        months = []
+        for liu_yue in liu_nian.getLiuYue():
+            month_index = liu_yue.getIndex()
+            month_start = month_boundaries[month_index]
+            month_end = month_boundaries[month_index + 1]
+            month_ganzhi = _liu_yue_ganzhi(year_ganzhi, month_index)
+            month_context = [*year_context, _period_pillar("流月", month_ganzhi)]
+            month_hits = _period_hits(len(self.natal_pillars), month_context, "流月")
+            month_relations = _stem_relations(month_context) + _branch_relations(
+                month_context
             )
-        ]
-        years = []
-        is_default_next_cycle = expand_next_cycle
-        should_expand_cycle = (
-            include_period_details
-            or cycle_is_current
-            or is_default_next_cycle
-            or cycle_index == period_cycle_index
-        )
-        expand_next_cycle = cycle_is_current
-        for liu_nian in cycle.getLiuNian():
-            year_start, year_end, month_boundaries = flow_boundaries(liu_nian.getYear())
-            year_is_current = cycle_is_current and year_start <= reference < year_end
-            year_ganzhi = liu_nian.getGanZhi()
-            year_pillar = {
-                "label": "流年",
-                "stem": year_ganzhi[0],
-                "branch": year_ganzhi[1],
-                "text": year_ganzhi,
-            }
-            year_context = [*cycle_context, year_pillar]
-            year_hits = [
-                hit
-                for hit in evaluate_shensha(year_context)
-                if "流年" in hit["pillar_labels"]
-            ]
-            year_relations = _stem_relations(year_context) + _branch_relations(
-                year_context
-            )
-            year_structured_relations = [
-                relation
-                for relation in structured_relations(year_context)
-                if any(
-                    item.get("pillar") == "流年"
-                    for item in relation.get("participants", ())
-                )
-            ]
-            year_ten_god = _ten_god(natal_pillars[2]["stem"], year_ganzhi[0])
-            months = []
-            for liu_yue in liu_nian.getLiuYue():
-                month_index = liu_yue.getIndex()
-                month_start = month_boundaries[month_index]
-                month_end = month_boundaries[month_index + 1]
-                month_is_current = (
-                    year_is_current and month_start <= reference < month_end
-                )
-                month_ganzhi = liu_yue.getGanZhi()
-                month_pillar = {
-                    "label": "流月",
-                    "stem": month_ganzhi[0],
-                    "branch": month_ganzhi[1],
-                    "text": month_ganzhi,
-                }
-                month_context = [*year_context, month_pillar]
-                month_hits = [
-                    hit
-                    for hit in evaluate_shensha(month_context)
-                    if "流月" in hit["pillar_labels"]
-                ]
-                month_relations = _stem_relations(month_context) + _branch_relations(
-                    month_context
-                )
-                month_structured_relations = [
-                    relation
-                    for relation in structured_relations(month_context)
-                    if any(
-                        item.get("pillar") == "流月"
-                        for item in relation.get("participants", ())
-                    )
-                ]
-                month_ten_god = _ten_god(natal_pillars[2]["stem"], month_ganzhi[0])
-                month_payload = {
+            month_ten_god = _ten_god(self.day_stem, month_ganzhi[0])
+            months.append(
+                {
                     "layer": "liuyue",
-                    "index": liu_yue.getIndex(),
-                    "label": f"{str(liu_yue.getMonthInChinese()).lstrip('0123456789')}月",
+                    "index": month_index,
+                    "label": _month_label(liu_yue),
                     "ganzhi": month_ganzhi,
                     "ten_god": month_ten_god,
-                    "xunkong": liu_yue.getXunKong(),
+                    "xunkong": LunarUtil.getXunKong(month_ganzhi),
                     "start_timestamp": month_start.isoformat(),
                     "end_timestamp": month_end.isoformat(),
-                    "is_current": month_is_current,
+                    "is_current": year_is_current
+                    and month_start <= self.reference < month_end,
                     "shen_sha": [hit["name"] for hit in month_hits],
                     "relations": [
                         relation
@@ -1294,108 +1493,274 @@ def _dayun_payload(
                     "theme_activations": _period_theme_activations(
                         period_label="流月",
                         ten_god=month_ten_god,
-                        gender=gender,
+                        gender=self.gender,
                         shensha_hits=month_hits,
-                        relations=month_structured_relations,
+                        relations=_period_structured_relations(month_context, "流月"),
                     ),
                 }
-                months.append(month_payload)
-                if month_is_current and month_ganzhi == reference_month_ganzhi:
-                    current_month_payload = month_payload
-            year_payload = {
-                "layer": "liunian",
-                "index": liu_nian.getIndex(),
-                "year": liu_nian.getYear(),
-                "age": liu_nian.getAge(),
-                "label": str(liu_nian.getYear()),
-                "ganzhi": year_ganzhi,
-                "ten_god": year_ten_god,
-                "xunkong": liu_nian.getXunKong(),
-                "start_timestamp": year_start.isoformat(),
-                "end_timestamp": year_end.isoformat(),
-                "is_current": year_is_current,
-                "shen_sha": [hit["name"] for hit in year_hits],
-                "relations": [
-                    relation
-                    for relation in year_relations
-                    if relation not in set(cycle_relations)
-                ],
-                "theme_activations": _period_theme_activations(
-                    period_label="流年",
-                    ten_god=year_ten_god,
-                    gender=gender,
-                    shensha_hits=year_hits,
-                    relations=year_structured_relations,
-                ),
-                "months": months,
-            }
-            years.append(year_payload)
-            if year_is_current and liu_nian.getYear() == reference_year:
-                current_year_payload = {
-                    key: value for key, value in year_payload.items() if key != "months"
-                }
-        cycle_payload = {
-            "index": cycle_index,
-            "label": "童限" if cycle_index == 0 else cycle_ganzhi,
-            "ganzhi": cycle_ganzhi,
-            "start_year": cycle.getStartYear(),
-            "end_year": cycle.getEndYear(),
-            "start_age": cycle.getStartAge(),
-            "end_age": cycle.getEndAge(),
-            "start_timestamp": cycle_start.isoformat(),
-            "end_timestamp": cycle_end.isoformat(),
-            "is_current": cycle_is_current,
-            "ten_god": cycle_ten_god,
-            "shen_sha": [hit["name"] for hit in cycle_hits],
+            )
+        node = {
+            "layer": "liunian",
+            "index": liu_nian.getIndex(),
+            "year": liu_nian.getYear(),
+            "age": liu_nian.getAge(),
+            "label": str(liu_nian.getYear()),
+            "ganzhi": year_ganzhi,
+            "ten_god": year_ten_god,
+            "xunkong": LunarUtil.getXunKong(year_ganzhi),
+            "start_timestamp": year_start.isoformat(),
+            "end_timestamp": year_end.isoformat(),
+            "is_current": year_is_current,
+            "shen_sha": [hit["name"] for hit in year_hits],
             "relations": [
-                relation
-                for relation in cycle_relations
-                if relation not in natal_relations
+                relation for relation in year_relations if relation not in cycle_relations
             ],
             "theme_activations": _period_theme_activations(
-                period_label="大运",
-                ten_god=cycle_ten_god,
-                gender=gender,
-                shensha_hits=cycle_hits,
-                relations=cycle_structured_relations,
+                period_label="流年",
+                ten_god=year_ten_god,
+                gender=self.gender,
+                shensha_hits=year_hits,
+                relations=_period_structured_relations(year_context, "流年"),
             ),
-            "years": years,
+            "months": months,
         }
-        kline_cycles.append(cycle_payload)
-        cycles.append(
-            cycle_payload if should_expand_cycle else {**cycle_payload, "years": []}
-        )
+        self._year_nodes[key] = node
+        return node
+
+    def _lean_year_node(self, cycle_index: int, liu_nian: Any) -> Dict[str, Any]:
+        _, cycle_context, _ = self._cycle_node(cycle_index)
+        year_ganzhi = self._liu_nian_ganzhi(cycle_index, liu_nian)
+        year_context = [*cycle_context, _period_pillar("流年", year_ganzhi)]
+        months = []
+        for liu_yue in liu_nian.getLiuYue():
+            month_ganzhi = _liu_yue_ganzhi(year_ganzhi, liu_yue.getIndex())
+            month_context = [*year_context, _period_pillar("流月", month_ganzhi)]
+            months.append(
+                {
+                    "index": liu_yue.getIndex(),
+                    "label": _month_label(liu_yue),
+                    "ganzhi": month_ganzhi,
+                    "theme_activations": _period_theme_activations(
+                        period_label="流月",
+                        ten_god=_ten_god(self.day_stem, month_ganzhi[0]),
+                        gender=self.gender,
+                        shensha_hits=_period_hits(len(self.natal_pillars), month_context, "流月"),
+                        relations=_period_structured_relations(month_context, "流月"),
+                    ),
+                }
+            )
+        return {
+            "year": liu_nian.getYear(),
+            "is_current": self._cycle_span(cycle_index)[2]
+            and liu_nian.getYear() == self.reference_year,
+            "theme_activations": _period_theme_activations(
+                period_label="流年",
+                ten_god=_ten_god(self.day_stem, year_ganzhi[0]),
+                gender=self.gender,
+                shensha_hits=_period_hits(len(self.natal_pillars), year_context, "流年"),
+                relations=_period_structured_relations(year_context, "流年"),
+            ),
+            "months": months,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class NatalBasis:
+    """Reference-independent intermediates of one birth input.
+
+    Shared by chart and period requests through the chart cache; treat every
+    field as read-only.
+    """
+
+    local: datetime
+    calendar_input: Dict[str, Any]
+    calculation_time: datetime
+    correction_minutes: float
+    calendar_facts: Any
+    pillars: Tuple[Dict[str, Any], ...]
+    fact_graph: Any
+
+
+_NATAL_CACHE: BoundedCache[str, NatalBasis] = BoundedCache(
+    max_entries=CHART_CACHE_LIMIT,
+    ttl_seconds=CHART_CACHE_TTL_SECONDS,
+)
+_PERIOD_TREE_CACHE: BoundedCache[str, PeriodTree] = BoundedCache(
+    max_entries=PERIOD_TREE_CACHE_LIMIT,
+    ttl_seconds=CHART_CACHE_TTL_SECONDS,
+)
+
+
+def _content_key(payload: Dict[str, Any]) -> str:
+    canonical = json.dumps(
+        payload, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def _detached(value: Any) -> Any:
+    """Copy a JSON-shaped payload; far cheaper than ``copy.deepcopy`` on period trees."""
+    if isinstance(value, dict):
+        return {key: _detached(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_detached(item) for item in value]
+    return value
+
+
+def chart_cache_stats() -> Dict[str, Dict[str, object]]:
     return {
-        "status": "available",
-        "algorithm": algorithm,
-        "algorithm_note": "sect2 按分钟精算；sect1 按日数与时辰折算。"
-        if algorithm == "sect2"
-        else "sect1 按日数与时辰折算。",
-        "direction": "forward" if yun.isForward() else "reverse",
-        "start": {
-            "years": yun.getStartYear(),
-            "months": yun.getStartMonth(),
-            "days": yun.getStartDay(),
-            "hours": yun.getStartHour(),
-            "solar_date": yun.getStartSolar().toYmdHms(),
-        },
-        "engine_bazi": crosscheck_bazi,
-        "crosscheck_matches": crosscheck_bazi == expected_bazi,
-        "cycles": cycles,
-        # Consumed and removed before API serialization. It keeps the personal
-        # baseline fixed across the compact and full-life views.
-        "_kline_cycles": kline_cycles,
-        "current": {
-            "as_of": reference.isoformat(),
-            "year": current_year_payload,
-            "month": current_month_payload,
-        },
+        "natal": _NATAL_CACHE.stats().to_dict(),
+        "period_trees": _PERIOD_TREE_CACHE.stats().to_dict(),
+        "shensha": shensha_cache_stats(),
+        "relations": relation_cache_stats(),
     }
 
 
-def build_metaphysics_chart(
+def clear_chart_cache() -> None:
+    _NATAL_CACHE.clear()
+    _PERIOD_TREE_CACHE.clear()
+
+
+def _natal_basis(
     timestamp: datetime,
     *,
+    timezone_name: str,
+    longitude: Optional[float],
+    use_true_solar_time: bool,
+    day_boundary: str,
+    calendar_type: str,
+    is_leap_month: bool,
+    lunar_year: Optional[int],
+    lunar_month: Optional[int],
+    lunar_day: Optional[int],
+    lunar_hour: Optional[int],
+    lunar_minute: Optional[int],
+    fold_choice: Optional[str],
+) -> Tuple[str, NatalBasis]:
+    """Return the cached basis for a birth input and its content key.
+
+    The key hashes the canonical birth input together with
+    :func:`bazi_rule_versions`, so a rule or calendar upgrade never serves a
+    basis computed under the previous rules.
+    """
+    key = _content_key(
+        {
+            "timestamp": timestamp.isoformat(),
+            "timezone": timezone_name,
+            "longitude": longitude,
+            "use_true_solar_time": use_true_solar_time,
+            "day_boundary": day_boundary,
+            "calendar_type": calendar_type,
+            "is_leap_month": is_leap_month,
+            "lunar": [lunar_year, lunar_month, lunar_day, lunar_hour, lunar_minute],
+            "fold_choice": fold_choice,
+            "rule_versions": bazi_rule_versions(),
+        }
+    )
+    basis = _NATAL_CACHE.get(key)
+    if basis is None:
+        local, calendar_input = _calendar_input_to_solar(
+            timestamp,
+            timezone_name=timezone_name,
+            calendar_type=calendar_type,
+            is_leap_month=is_leap_month,
+            lunar_year=lunar_year,
+            lunar_month=lunar_month,
+            lunar_day=lunar_day,
+            lunar_hour=lunar_hour,
+            lunar_minute=lunar_minute,
+            fold_choice=fold_choice,
+        )
+        calculation_time, correction_minutes, calendar_facts, pillars = _natal_pillars(
+            local,
+            timezone_name=timezone_name,
+            longitude=longitude,
+            use_true_solar_time=use_true_solar_time,
+            day_boundary=day_boundary,
+        )
+        basis = NatalBasis(
+            local=local,
+            calendar_input=calendar_input,
+            calculation_time=calculation_time,
+            correction_minutes=correction_minutes,
+            calendar_facts=calendar_facts,
+            pillars=tuple(pillars),
+            fact_graph=build_bazi_fact_graph(pillars),
+        )
+        _NATAL_CACHE.put(key, basis)
+    return key, basis
+
+
+def _period_tree(
+    natal_key: str,
+    basis: NatalBasis,
+    *,
+    gender: str,
+    day_boundary: str,
+    algorithm: str,
+    timezone_name: str,
+    reference_timestamp: Optional[datetime],
+) -> PeriodTree:
+    """Return the memoised period tree; trees relative to "now" are never cached."""
+
+    def build() -> PeriodTree:
+        return PeriodTree(
+            basis.calculation_time,
+            gender=gender,
+            day_boundary=day_boundary,
+            algorithm=algorithm,
+            natal_pillars=list(basis.pillars),
+            timezone_name=timezone_name,
+            reference_timestamp=reference_timestamp,
+        )
+
+    if reference_timestamp is None:
+        return build()
+    key = _content_key(
+        {
+            "natal": natal_key,
+            "gender": gender,
+            "algorithm": algorithm,
+            "reference_timestamp": reference_timestamp.isoformat(),
+        }
+    )
+    return _PERIOD_TREE_CACHE.get_or_create(key, build)
+
+
+def _natal_pillars(
+    local: datetime,
+    *,
+    timezone_name: str,
+    longitude: Optional[float],
+    use_true_solar_time: bool,
+    day_boundary: str,
+) -> tuple[datetime, float, Any, list[Dict[str, Any]]]:
+    """Return the calculation time, true-solar correction, calendar facts and four pillars."""
+    calculation_time, correction_minutes = (
+        _true_solar_time(local, longitude) if use_true_solar_time else (local, 0.0)
+    )
+    calendar_facts = calculate_calendar_facts(
+        calculation_time,
+        timezone_name=timezone_name,
+        day_boundary=day_boundary,
+    )
+    if calendar_facts.quality["status"] == "conflict":
+        raise ValueError("这个出生时间正处于换柱敏感区，请确认出生时间后继续。")
+    day_stem = STEMS[calendar_facts.day_gz.tg]
+    pillars = [
+        _pillar("年", calendar_facts.year_gz, day_stem),
+        _pillar("月", calendar_facts.month_gz, day_stem),
+        _pillar("日", calendar_facts.day_gz, day_stem),
+        _pillar("时", calendar_facts.hour_gz, day_stem),
+    ]
+    return calculation_time, correction_minutes, calendar_facts, pillars
+
+
+def build_metaphysics_period(
+    timestamp: datetime,
+    *,
+    cycle_index: int,
+    year: Optional[int] = None,
     timezone_name: str = "Asia/Shanghai",
     longitude: Optional[float] = None,
     use_true_solar_time: bool = False,
@@ -1403,7 +1768,6 @@ def build_metaphysics_chart(
     calendar_type: str = "solar",
     is_leap_month: bool = False,
     gender: Optional[str] = None,
-    birth_place: Optional[str] = None,
     hour_uncertain: bool = False,
     dayun_algorithm: str = "sect2",
     lunar_year: Optional[int] = None,
@@ -1413,14 +1777,20 @@ def build_metaphysics_chart(
     lunar_minute: Optional[int] = None,
     fold_choice: Optional[str] = None,
     reference_timestamp: Optional[datetime] = None,
-    include_period_details: bool = True,
-    period_cycle_index: Optional[int] = None,
-) -> Dict[str, Any]:
+) -> Optional[Dict[str, Any]]:
+    """Expand one Da Yun cycle, or one ``year`` of it, without building the chart.
+
+    Returns ``None`` when the chart has no such period (no gender, an
+    uncertain hour, or an index or year outside the cycle list).
+    """
     if dayun_algorithm not in {"sect1", "sect2"}:
         raise ValueError(f"未知大运算法: {dayun_algorithm}")
-    local, calendar_input = _calendar_input_to_solar(
+    natal_key, basis = _natal_basis(
         timestamp,
         timezone_name=timezone_name,
+        longitude=longitude,
+        use_true_solar_time=use_true_solar_time,
+        day_boundary=day_boundary,
         calendar_type=calendar_type,
         is_leap_month=is_leap_month,
         lunar_year=lunar_year,
@@ -1430,7 +1800,61 @@ def build_metaphysics_chart(
         lunar_minute=lunar_minute,
         fold_choice=fold_choice,
     )
+    if hour_uncertain or gender not in {"male", "female"}:
+        return None
+    tree = _period_tree(
+        natal_key,
+        basis,
+        gender=gender,
+        day_boundary=day_boundary,
+        algorithm=dayun_algorithm,
+        timezone_name=timezone_name,
+        reference_timestamp=reference_timestamp,
+    )
+    if cycle_index not in tree.cycle_indexes:
+        return None
+    period = tree.cycle(cycle_index) if year is None else tree.year(cycle_index, year)
+    return _detached(period) if reference_timestamp is not None else period
+
+
+def build_metaphysics_chart(
+    timestamp: datetime,
+    *,
+    timezone_name: str = "Asia/Shanghai",
+    longitude: Optional[float] = None,
+    use_true_solar_time: bool = False,
+    day_boundary: str = "forward",
+    calendar_type: str = "solar",
+    is_leap_month: bool = False,
+    gender: Optional[str] = None,
+    birth_place: Optional[str] = None,
+    hour_uncertain: bool = False,
+    dayun_algorithm: str = "sect2",
+    lunar_year: Optional[int] = None,
+    lunar_month: Optional[int] = None,
+    lunar_day: Optional[int] = None,
+    lunar_hour: Optional[int] = None,
+    lunar_minute: Optional[int] = None,
+    fold_choice: Optional[str] = None,
+    reference_timestamp: Optional[datetime] = None,
+    include_period_details: bool = True,
+    period_cycle_index: Optional[int] = None,
+) -> Dict[str, Any]:
+    if dayun_algorithm not in {"sect1", "sect2"}:
+        raise ValueError(f"未知大运算法: {dayun_algorithm}")
     if hour_uncertain:
+        local, calendar_input = _calendar_input_to_solar(
+            timestamp,
+            timezone_name=timezone_name,
+            calendar_type=calendar_type,
+            is_leap_month=is_leap_month,
+            lunar_year=lunar_year,
+            lunar_month=lunar_month,
+            lunar_day=lunar_day,
+            lunar_hour=lunar_hour,
+            lunar_minute=lunar_minute,
+            fold_choice=fold_choice,
+        )
         return _build_uncertain_metaphysics_chart(
             local,
             calendar_input=calendar_input,
@@ -1442,35 +1866,33 @@ def build_metaphysics_chart(
             birth_place=birth_place,
             dayun_algorithm=dayun_algorithm,
         )
-    effective_local = local
-    calculation_time, correction_minutes = (
-        _true_solar_time(effective_local, longitude)
-        if use_true_solar_time
-        else (effective_local, 0.0)
+    natal_key, basis = _natal_basis(
+        timestamp,
+        timezone_name=timezone_name,
+        longitude=longitude,
+        use_true_solar_time=use_true_solar_time,
+        day_boundary=day_boundary,
+        calendar_type=calendar_type,
+        is_leap_month=is_leap_month,
+        lunar_year=lunar_year,
+        lunar_month=lunar_month,
+        lunar_day=lunar_day,
+        lunar_hour=lunar_hour,
+        lunar_minute=lunar_minute,
+        fold_choice=fold_choice,
     )
+    local = basis.local
+    calendar_input = dict(basis.calendar_input)
+    calculation_time = basis.calculation_time
+    correction_minutes = basis.correction_minutes
+    calendar_facts = basis.calendar_facts
+    # The chart below annotates pillars in place; keep the cached basis pristine.
+    pillars = _detached(list(basis.pillars))
     pillar_date = calculation_time
     if day_boundary == "forward" and calculation_time.hour >= 23:
         pillar_date = calculation_time + timedelta(days=1)
-
-    calendar_facts = calculate_calendar_facts(
-        calculation_time,
-        timezone_name=timezone_name,
-        day_boundary=day_boundary,
-    )
-    if calendar_facts.quality["status"] == "conflict":
-        raise ValueError("这个出生时间正处于换柱敏感区，请确认出生时间后继续。")
     solar_day = sxtwl.fromSolar(pillar_date.year, pillar_date.month, pillar_date.day)
-    year_gz = calendar_facts.year_gz
-    month_gz = calendar_facts.month_gz
-    day_gz = calendar_facts.day_gz
-    hour_gz = calendar_facts.hour_gz
-    day_stem = STEMS[day_gz.tg]
-    pillars = [
-        _pillar("年", year_gz, day_stem),
-        _pillar("月", month_gz, day_stem),
-        _pillar("日", day_gz, day_stem),
-        _pillar("时", hour_gz, day_stem),
-    ]
+    day_stem = pillars[2]["stem"]
     hour_candidates: list[Dict[str, str]] = []
     direct_elements: Iterable[str] = (
         value
@@ -1488,22 +1910,31 @@ def build_metaphysics_chart(
     day_branch = pillars[2]["branch"]
     six_gods = derive_six_gods(day_stem)
     bazi_text = " ".join(pillar["text"] for pillar in pillars)
-    dayun = _dayun_payload(
-        calculation_time,
-        gender=gender,
-        hour_uncertain=hour_uncertain,
-        day_boundary=day_boundary,
-        algorithm=dayun_algorithm,
-        expected_bazi=bazi_text,
-        natal_pillars=pillars,
-        timezone_name=timezone_name,
-        reference_timestamp=reference_timestamp,
-        include_period_details=include_period_details,
-        period_cycle_index=period_cycle_index,
-    )
-    kline_cycles = dayun.pop("_kline_cycles", dayun.get("cycles", []))
+    if gender in {"male", "female"}:
+        period_tree = _period_tree(
+            natal_key,
+            basis,
+            gender=gender,
+            day_boundary=day_boundary,
+            algorithm=dayun_algorithm,
+            timezone_name=timezone_name,
+            reference_timestamp=reference_timestamp,
+        )
+        dayun = period_tree.payload(
+            include_period_details=include_period_details,
+            period_cycle_index=period_cycle_index,
+        )
+        # The K-line baseline spans every cycle, expanded or not, so it stays
+        # fixed across the compact and full-life views.
+        kline_cycles = period_tree.activation_cycles()
+        if reference_timestamp is not None:
+            # A cached tree's nodes are shared with later requests.
+            dayun, kline_cycles = _detached(dayun), _detached(kline_cycles)
+    else:
+        dayun = {"status": "not_requested", "cycles": []}
+        kline_cycles = []
     raw_shen_sha = evaluate_shensha(pillars)
-    fact_graph = build_bazi_fact_graph(pillars)
+    fact_graph = basis.fact_graph
     structure = build_structure_profile(
         pillars,
         gender=gender,
@@ -1663,3 +2094,128 @@ def build_metaphysics_chart(
             },
         },
     }
+
+
+BATCH_CHART_FAILED = "命盘计算失败，请检查输入后重试。"
+
+_BATCH_POOL: Optional[ProcessPoolExecutor] = None
+_BATCH_POOL_LOCK = threading.Lock()
+
+
+def _batch_pool_size() -> int:
+    return max(1, CHART_BATCH_WORKERS or os.cpu_count() or 1)
+
+
+def _batch_pool() -> ProcessPoolExecutor:
+    """The process pool shared by every batch, so its workers keep their caches warm."""
+    global _BATCH_POOL
+    with _BATCH_POOL_LOCK:
+        if _BATCH_POOL is None:
+            _BATCH_POOL = ProcessPoolExecutor(
+                max_workers=_batch_pool_size(), mp_context=multiprocessing.get_context("spawn")
+            )
+        return _BATCH_POOL
+
+
+def _discard_batch_pool(pool: ProcessPoolExecutor) -> None:
+    global _BATCH_POOL
+    with _BATCH_POOL_LOCK:
+        if _BATCH_POOL is pool:
+            _BATCH_POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_chart_batch_pool() -> None:
+    global _BATCH_POOL
+    with _BATCH_POOL_LOCK:
+        pool, _BATCH_POOL = _BATCH_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _build_chart_chunk(
+    chunk: List[Tuple[str, Dict[str, Any]]],
+) -> List[Tuple[str, Dict[str, Any]]]:
+    outcomes: List[Tuple[str, Dict[str, Any]]] = []
+    for key, request in chunk:
+        try:
+            outcomes.append((key, {"chart": build_metaphysics_chart(**request)}))
+        except ValueError as exc:
+            outcomes.append((key, {"error": str(exc)}))
+        except Exception:
+            logger.exception("Batch chart failed")
+            outcomes.append((key, {"error": BATCH_CHART_FAILED}))
+    return outcomes
+
+
+def _batch_order(item: Tuple[str, Dict[str, Any]]) -> Tuple[str, str]:
+    request = item[1]
+    timestamp = request["timestamp"]
+    moment = timestamp.isoformat() if isinstance(timestamp, datetime) else str(timestamp)
+    return str(request.get("timezone_name", "Asia/Shanghai")), moment
+
+
+def build_metaphysics_charts(
+    requests: Iterable[Mapping[str, Any]],
+    *,
+    workers: Optional[int] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Build many charts, yielding ``{"index", "chart"}`` or ``{"index", "error"}`` per request.
+
+    Each request holds the keyword arguments of :func:`build_metaphysics_chart`,
+    ``timestamp`` included; ``index`` is its position in ``requests``. A
+    request that fails yields an error (its ``ValueError`` message, or a
+    generic one) and never stops the rest of the batch.
+    Identical requests are built once. The rest are sorted by timezone and
+    birth time before being cut into chunks, so neighbouring births, which
+    share solar-term years and often all four pillars, land in one process and
+    hit its calendar, natal, shensha and relation caches. With ``workers``
+    above one (default: the pool size, ``ICHING_CHART_BATCH_WORKERS``, 0 = one
+    per CPU) and at least ``ICHING_CHART_BATCH_PARALLEL_MIN`` distinct
+    requests, the chunks go to one process pool shared by every batch and
+    shut down by :func:`shutdown_chart_batch_pool`; items then arrive in
+    completion order.
+    """
+    indexes: Dict[str, List[int]] = {}
+    unique: List[Tuple[str, Dict[str, Any]]] = []
+    for index, request in enumerate(requests):
+        arguments = dict(request)
+        key = _content_key(arguments)
+        if key not in indexes:
+            indexes[key] = []
+            unique.append((key, arguments))
+        indexes[key].append(index)
+    unique.sort(key=_batch_order)
+
+    def emit(outcomes: List[Tuple[str, Dict[str, Any]]]) -> Iterator[Dict[str, Any]]:
+        for key, outcome in outcomes:
+            for position, index in enumerate(indexes[key]):
+                yield {"index": index, **(outcome if position == 0 else _detached(outcome))}
+
+    count = workers if workers is not None else _batch_pool_size()
+    if count <= 1 or len(unique) < max(2, CHART_BATCH_PARALLEL_MIN):
+        for item in unique:
+            yield from emit(_build_chart_chunk([item]))
+        return
+
+    size = max(1, len(unique) // (min(count, len(unique)) * 4))
+    pool = _batch_pool()
+    futures = {
+        pool.submit(_build_chart_chunk, unique[start : start + size]): unique[start : start + size]
+        for start in range(0, len(unique), size)
+    }
+    try:
+        for future in as_completed(futures):
+            try:
+                outcomes = future.result()
+            except Exception:
+                # A dead worker breaks the whole pool; the next batch starts a fresh one.
+                logger.exception("Batch chart chunk failed")
+                if isinstance(future.exception(), BrokenProcessPool):
+                    _discard_batch_pool(pool)
+                outcomes = [(key, {"error": BATCH_CHART_FAILED}) for key, _ in futures[future]]
+            yield from emit(outcomes)
+    finally:
+        # A consumer that stops early (a dropped stream) leaves no queued chunks behind.
+        for future in futures:
+            future.cancel()
@@ -2,9 +2,14 @@ from __future__ import annotations
 
 import hashlib
 import json
+import os
 from dataclasses import dataclass
 from typing import Any, Iterable, Literal, Mapping, Sequence
 
+from iching.core.cache import BoundedCache
+
+
+SHENSHA_CACHE_LIMIT = int(os.getenv("ICHING_SHENSHA_CACHE_LIMIT", "1024"))
 
 RULES_VERSION = "shensha-2026.07-v2.1"
 REGISTRY_VERSION = "shensha-registry-2026.07-v2.1"
@@ -232,7 +237,8 @@ def _sha256(payload: Any) -> str:
     return f"sha256:{hashlib.sha256(canonical).hexdigest()}"
 
 
-FORMULA_DIGESTS = {rule.rule_id: _sha256(_formula_payload(rule)) for rule in RULES}
+_FORMULAS = {rule.rule_id: _formula_payload(rule) for rule in RULES}
+FORMULA_DIGESTS = {rule_id: _sha256(formula) for rule_id, formula in _FORMULAS.items()}
 REGISTRY_DIGEST = _sha256([
     {
         "rule_id": rule.rule_id,
@@ -252,6 +258,8 @@ RULE_BY_ID = {rule.rule_id: rule for rule in RULES}
 CORE_RULE_IDS = tuple(rule.rule_id for rule in RULES if rule.level == "core")
 EXTENDED_RULE_IDS = tuple(rule.rule_id for rule in RULES if rule.level == "extended")
 AXES: tuple[Axis, ...] = ("助力", "才学", "情缘", "执行", "迁动", "考验")
+# Every rule reads its anchor from these natal pillars.
+_ANCHOR_LABELS = frozenset(("年", "月", "日"))
 
 
 def _valid_pillars(pillars: Iterable[Mapping[str, Any]]) -> list[Mapping[str, Any]]:
@@ -282,33 +290,46 @@ def _anchor_detail(
     return detail
 
 
-def _match_details(
-    rule: ShenShaRule,
+def _candidate_value(method: str, pillar: Mapping[str, Any], targets: set[str] | frozenset[str]) -> str:
+    if method == "day_stem_pillar":
+        return str(pillar["text"])
+    if method == "month_mixed":
+        return str(pillar["stem"]) if str(pillar["stem"]) in targets else str(pillar["branch"])
+    if method == "month_branch_stem_roles":
+        return str(pillar["stem"])
+    if method == "fixed_day":
+        return str(pillar["text"]) if pillar.get("label") == "日" else ""
+    return str(pillar["branch"])
+
+
+def _anchor_pillars(
     pillars: list[Mapping[str, Any]],
-) -> tuple[list[str], list[str], list[dict[str, Any]]]:
-    if len(pillars) < 3:
-        return [], [], []
+) -> tuple[Mapping[str, Any], Mapping[str, Any], Mapping[str, Any]]:
     year = next((pillar for pillar in pillars if pillar.get("label") == "年"), pillars[0])
     month = next((pillar for pillar in pillars if pillar.get("label") == "月"), pillars[1])
     day = next((pillar for pillar in pillars if pillar.get("label") == "日"), pillars[2])
+    return year, month, day
+
+
+def _rule_targets(
+    rule: ShenShaRule,
+    year: Mapping[str, Any],
+    month: Mapping[str, Any],
+    day: Mapping[str, Any],
+) -> tuple[set[str], list[dict[str, Any]]] | None:
     targets: set[str] = set()
-    values: list[str] = []
     anchors: list[dict[str, Any]] = []
     if rule.method == "day_stem_branch":
         targets = set(rule.mapping.get(str(day["stem"]), ()))
-        values = [str(pillar["branch"]) for pillar in pillars]
         anchors = [_anchor_detail("日干", day, "stem", targets)]
     elif rule.method == "day_stem_pillar":
         targets = set(rule.mapping.get(str(day["stem"]), ()))
-        values = [str(pillar["text"]) for pillar in pillars]
         anchors = [_anchor_detail("日干", day, "stem", targets)]
     elif rule.method == "month_mixed":
         targets = set(rule.mapping.get(str(month["branch"]), ()))
-        values = [str(pillar["stem"]) if str(pillar["stem"]) in targets else str(pillar["branch"]) for pillar in pillars]
         anchors = [_anchor_detail("月支", month, "branch", targets)]
     elif rule.method == "month_branch":
         targets = set(rule.mapping.get(str(month["branch"]), ()))
-        values = [str(pillar["branch"]) for pillar in pillars]
         anchors = [_anchor_detail("月支", month, "branch", targets)]
     elif rule.method == "month_branch_stem_roles":
         target_roles = next(
@@ -320,28 +341,42 @@ def _match_details(
             for role_targets in target_roles.values()
             for target in role_targets
         }
-        values = [str(pillar["stem"]) for pillar in pillars]
         anchors = [_anchor_detail("月支", month, "branch", targets, target_roles=target_roles)]
     elif rule.method == "year_branch":
         targets = set(rule.mapping.get(str(year["branch"]), ()))
-        values = [str(pillar["branch"]) for pillar in pillars]
         anchors = [_anchor_detail("年支", year, "branch", targets)]
     elif rule.method == "year_day_trine":
         year_targets = _trine_target(str(year["branch"]), rule.mapping)
         day_targets = _trine_target(str(day["branch"]), rule.mapping)
         targets = year_targets | day_targets
-        values = [str(pillar["branch"]) for pillar in pillars]
         anchors = [
             _anchor_detail("年支", year, "branch", year_targets),
             _anchor_detail("日支", day, "branch", day_targets),
         ]
     elif rule.method == "fixed_day":
         targets = set(rule.mapping.get("day", ()))
-        values = [str(pillar["text"]) if pillar.get("label") == "日" else "" for pillar in pillars]
         anchors = [_anchor_detail("日柱", day, "text", targets)]
     else:
+        return None
+    return targets, anchors
+
+
+def _match_details(
+    rule: ShenShaRule,
+    pillars: list[Mapping[str, Any]],
+) -> tuple[list[str], list[str], list[dict[str, Any]]]:
+    """Reference interpreter for one rule; the compiled tables must agree with it."""
+    if len(pillars) < 3:
+        return [], [], []
+    resolved = _rule_targets(rule, *_anchor_pillars(pillars))
+    if resolved is None:
         return [], [], []
-    labels = [str(pillar.get("label", "")) for pillar, value in zip(pillars, values) if value in targets]
+    targets, anchors = resolved
+    labels = [
+        str(pillar.get("label", ""))
+        for pillar in pillars
+        if _candidate_value(rule.method, pillar, targets) in targets
+    ]
     return list(dict.fromkeys(labels)), sorted(targets), anchors
 
 
@@ -365,40 +400,332 @@ def _trigger_text(anchors: Sequence[Mapping[str, Any]], labels: Sequence[str]) -
     return f"{'；'.join(fragments)}，命中{'、'.join(labels)}柱。"
 
 
+_STEM_INDEX = {stem: index for index, stem in enumerate("甲乙丙丁戊己庚辛壬癸")}
+_BRANCH_INDEX = {branch: index for index, branch in enumerate("子丑寅卯辰巳午未申酉戌亥")}
+_CELLS = tuple(
+    (stem, branch) for stem in _STEM_INDEX for branch in _BRANCH_INDEX
+)
+
+
+def _cell(pillar: Mapping[str, Any]) -> int | None:
+    """Index of a pillar's ganzhi in the compiled tables (stem × 12 + branch)."""
+    stem = str(pillar.get("stem", ""))
+    branch = str(pillar.get("branch", ""))
+    if stem not in _STEM_INDEX or branch not in _BRANCH_INDEX or str(pillar.get("text", "")) != stem + branch:
+        return None
+    return _STEM_INDEX[stem] * len(_BRANCH_INDEX) + _BRANCH_INDEX[branch]
+
+
+@dataclass(frozen=True)
+class CompiledRules:
+    """Shensha rules compiled to dense bitmask tables.
+
+    Bit ``i`` stands for ``RULES[i]``. Each anchored table is indexed by the
+    anchor value (day stem, month branch, year branch or day branch) and then
+    by the candidate pillar's cell, and holds the bitmask of rules that
+    candidate satisfies; ``day_pillar`` covers the rules that only look at the
+    day pillar itself. A pillar's matches are therefore the OR of four or five
+    lookups.
+    """
+
+    rule_ids: tuple[str, ...]
+    day_stem: tuple[tuple[int, ...], ...]
+    month_branch: tuple[tuple[int, ...], ...]
+    year_branch: tuple[tuple[int, ...], ...]
+    day_branch: tuple[tuple[int, ...], ...]
+    day_pillar: tuple[int, ...]
+    core_mask: int
+    all_mask: int
+
+    def rows(
+        self,
+        year: Mapping[str, Any],
+        month: Mapping[str, Any],
+        day: Mapping[str, Any],
+    ) -> tuple[tuple[int, ...], ...] | None:
+        """The table rows selected by one chart's anchors, or ``None`` outside the tables."""
+        day_stem = _STEM_INDEX.get(str(day.get("stem", "")))
+        month_branch = _BRANCH_INDEX.get(str(month.get("branch", "")))
+        year_branch = _BRANCH_INDEX.get(str(year.get("branch", "")))
+        day_branch = _BRANCH_INDEX.get(str(day.get("branch", "")))
+        if None in (day_stem, month_branch, year_branch, day_branch):
+            return None
+        return (
+            self.day_stem[day_stem],
+            self.month_branch[month_branch],
+            self.year_branch[year_branch],
+            self.day_branch[day_branch],
+        )
+
+
+def _formula_targets(formula: Mapping[str, Any], anchor: str) -> set[str]:
+    mapping = formula["mapping"]
+    if formula["method"] == "month_branch_stem_roles":
+        roles = next((roles for group, roles in mapping.items() if anchor in group), {})
+        return {str(target) for role_targets in roles.values() for target in role_targets}
+    if formula["method"] == "year_day_trine":
+        return _trine_target(anchor, mapping)
+    if formula["method"] == "fixed_day":
+        return {str(target) for target in mapping.get("day", ())}
+    return {str(target) for target in mapping.get(anchor, ())}
+
+
+def _candidate_matches(field: str, stem: str, branch: str, targets: set[str]) -> bool:
+    if field == "branch":
+        return branch in targets
+    if field == "stem":
+        return stem in targets
+    if field == "text":
+        return stem + branch in targets
+    if field == "stem_or_branch":
+        return stem in targets or branch in targets
+    raise ValueError(f"未知神煞候选字段: {field}")
+
+
+def compile_rules(rules: Sequence[ShenShaRule] = RULES) -> CompiledRules:
+    """Compile ``rules`` from their digested formula payloads.
+
+    Raises ``ValueError`` when a rule's formula no longer matches its entry in
+    :data:`FORMULA_DIGESTS`, so the tables can never drift from the registry.
+    """
+    anchor_tables: dict[str, list[list[int]]] = {
+        "day.stem": [[0] * len(_CELLS) for _ in _STEM_INDEX],
+        "month.branch": [[0] * len(_CELLS) for _ in _BRANCH_INDEX],
+        "year.branch": [[0] * len(_CELLS) for _ in _BRANCH_INDEX],
+        "day.branch": [[0] * len(_CELLS) for _ in _BRANCH_INDEX],
+    }
+    anchor_values = {
+        "day.stem": tuple(_STEM_INDEX),
+        "month.branch": tuple(_BRANCH_INDEX),
+        "year.branch": tuple(_BRANCH_INDEX),
+        "day.branch": tuple(_BRANCH_INDEX),
+    }
+    day_pillar = [0] * len(_CELLS)
+    core_mask = 0
+    for index, rule in enumerate(rules):
+        formula = _formula_payload(rule)
+        if _sha256(formula) != FORMULA_DIGESTS.get(rule.rule_id):
+            raise ValueError(f"神煞规则 {rule.rule_id} 的公式与注册摘要不一致。")
+        bit = 1 << index
+        if rule.level == "core":
+            core_mask |= bit
+        field = formula["candidate_field"]
+        if formula["candidate_scope"] == "day_pillar_only":
+            targets = _formula_targets(formula, "")
+            for cell, (stem, branch) in enumerate(_CELLS):
+                if _candidate_matches(field, stem, branch, targets):
+                    day_pillar[cell] |= bit
+            continue
+        for selector in formula["anchor_selector"].split("+"):
+            table = anchor_tables[selector]
+            for row, anchor in zip(table, anchor_values[selector]):
+                targets = _formula_targets(formula, anchor)
+                for cell, (stem, branch) in enumerate(_CELLS):
+                    if _candidate_matches(field, stem, branch, targets):
+                        row[cell] |= bit
+
+    def freeze(table: list[list[int]]) -> tuple[tuple[int, ...], ...]:
+        return tuple(tuple(row) for row in table)
+
+    return CompiledRules(
+        rule_ids=tuple(rule.rule_id for rule in rules),
+        day_stem=freeze(anchor_tables["day.stem"]),
+        month_branch=freeze(anchor_tables["month.branch"]),
+        year_branch=freeze(anchor_tables["year.branch"]),
+        day_branch=freeze(anchor_tables["day.branch"]),
+        day_pillar=tuple(day_pillar),
+        core_mask=core_mask,
+        all_mask=(1 << len(rules)) - 1,
+    )
+
+
+COMPILED_RULES = compile_rules()
+
+
+def _copy_payload(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: _copy_payload(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy_payload(item) for item in value]
+    return value
+
+
+def _hit_payload(rule: ShenShaRule, labels: list[str], anchors: list[dict[str, Any]]) -> dict[str, Any]:
+    return {
+        "rule_id": rule.rule_id,
+        "feature_id": f"bazi.shensha.{rule.rule_id}",
+        "name": rule.name,
+        "category": rule.category,
+        "axis": rule.axis,
+        "level": rule.level,
+        "pillar_labels": labels,
+        "trigger": _trigger_text(anchors, labels),
+        "anchors": _copy_payload(anchors),
+        "formula": _copy_payload(_FORMULAS[rule.rule_id]),
+        "formula_digest": FORMULA_DIGESTS[rule.rule_id],
+        "topic_tags": list(rule.topic_tags),
+        "source": {"title": rule.source_title, "note": rule.source_note},
+        "school_note": rule.school_note,
+        "rules_version": RULES_VERSION,
+        "registry_version": REGISTRY_VERSION,
+        "registry_digest": REGISTRY_DIGEST,
+    }
+
+
+def _pillar_key(pillar: Mapping[str, Any]) -> tuple[str, str, str, str]:
+    return (
+        str(pillar.get("label", "")),
+        str(pillar.get("stem", "")),
+        str(pillar.get("branch", "")),
+        str(pillar.get("text", "")),
+    )
+
+
+class NatalShenSha:
+    """Rule matches of one set of natal pillars, extendable by period pillars.
+
+    Every rule is anchored on the natal year, month or day pillar, so adding a
+    Da Yun, Liu Nian or Liu Yue pillar never moves an anchor or its targets:
+    it can only append its own label to the rules it hits. :meth:`hits`
+    scores each extra pillar once per label and ganzhi and merges that delta
+    into the natal matches instead of re-running every rule over the whole
+    context. Pillars are scored through :data:`COMPILED_RULES`; values outside
+    the tables go through the rule interpreter instead. Obtain instances from
+    :func:`natal_shensha`, which memoises them by the canonical pillar tuple.
+    """
+
+    def __init__(self, pillars: Iterable[Mapping[str, Any]], *, include_extended: bool = True) -> None:
+        self.include_extended = include_extended
+        valid = _valid_pillars(pillars)
+        self._natal = [
+            {key: pillar[key] for key in ("label", "stem", "branch", "text") if key in pillar}
+            for pillar in valid
+        ]
+        self._incremental = len(valid) >= 3
+        self._level_mask = COMPILED_RULES.all_mask if include_extended else COMPILED_RULES.core_mask
+        self._rules: list[tuple[int, ShenShaRule]] = []
+        self._resolved: dict[int, tuple[frozenset[str], list[dict[str, Any]]] | None] = {}
+        self._anchors: tuple[Mapping[str, Any], ...] = ()
+        self._rows: tuple[tuple[int, ...], ...] | None = None
+        self._labels: dict[int, list[str]] = {}
+        self._natal_mask = 0
+        self._deltas: dict[tuple[str, str, str, str], int] = {}
+        if not self._incremental:
+            return
+        self._anchors = _anchor_pillars(valid)
+        self._rules = [
+            (1 << index, rule)
+            for index, rule in enumerate(RULES)
+            if (1 << index) & self._level_mask
+        ]
+        self._rows = COMPILED_RULES.rows(*self._anchors)
+        for pillar in valid:
+            mask = self._mask(pillar)
+            self._natal_mask |= mask
+            label = str(pillar.get("label", ""))
+            for bit, _ in self._rules:
+                if mask & bit:
+                    labels = self._labels.setdefault(bit, [])
+                    if label not in labels:
+                        labels.append(label)
+
+    def hits(
+        self,
+        extra_pillars: Iterable[Mapping[str, Any]] = (),
+        *,
+        label: str | None = None,
+    ) -> list[dict[str, Any]]:
+        """Hits of the natal pillars followed by ``extra_pillars``.
+
+        Equal to ``evaluate_shensha([*natal, *extra_pillars])``; with ``label``
+        only the hits that include that pillar are returned.
+        """
+        extra = _valid_pillars(extra_pillars)
+        if extra and (
+            not self._incremental
+            or any(pillar.get("label") in _ANCHOR_LABELS for pillar in extra)
+        ):
+            # The extra pillar could become an anchor; score the whole context.
+            full = NatalShenSha([*self._natal, *extra], include_extended=self.include_extended)
+            return full.hits(label=label)
+        deltas = [(str(pillar.get("label", "")), self._delta(pillar)) for pillar in extra]
+        active = self._natal_mask
+        for _, mask in deltas:
+            active |= mask
+        hits: list[dict[str, Any]] = []
+        for bit, rule in self._rules:
+            if not active & bit:
+                continue
+            resolved = self._resolve(bit, rule)
+            if resolved is None:
+                continue
+            labels = list(self._labels.get(bit, ()))
+            for extra_label, mask in deltas:
+                if mask & bit and extra_label not in labels:
+                    labels.append(extra_label)
+            if label is not None and label not in labels:
+                continue
+            hits.append(_hit_payload(rule, labels, resolved[1]))
+        return hits
+
+    def _resolve(self, bit: int, rule: ShenShaRule) -> tuple[frozenset[str], list[dict[str, Any]]] | None:
+        """Targets and anchor details of one rule, resolved on first use."""
+        if bit not in self._resolved:
+            resolved = _rule_targets(rule, *self._anchors)
+            self._resolved[bit] = (
+                (frozenset(resolved[0]), resolved[1]) if resolved is not None else None
+            )
+        return self._resolved[bit]
+
+    def _mask(self, pillar: Mapping[str, Any]) -> int:
+        cell = _cell(pillar)
+        if self._rows is None or cell is None:
+            mask = 0
+            for bit, rule in self._rules:
+                resolved = self._resolve(bit, rule)
+                if resolved is not None and _candidate_value(rule.method, pillar, resolved[0]) in resolved[0]:
+                    mask |= bit
+            return mask
+        day_stem, month_branch, year_branch, day_branch = self._rows
+        mask = day_stem[cell] | month_branch[cell] | year_branch[cell] | day_branch[cell]
+        if pillar.get("label") == "日":
+            mask |= COMPILED_RULES.day_pillar[cell]
+        return mask & self._level_mask
+
+    def _delta(self, pillar: Mapping[str, Any]) -> int:
+        key = _pillar_key(pillar)
+        mask = self._deltas.get(key)
+        if mask is None:
+            mask = self._mask(pillar)
+            self._deltas[key] = mask
+        return mask
+
+
+_NATAL_CACHE: BoundedCache[tuple, NatalShenSha] = BoundedCache(max_entries=SHENSHA_CACHE_LIMIT)
+
+
+def natal_shensha(
+    pillars: Iterable[Mapping[str, Any]],
+    *,
+    include_extended: bool = True,
+) -> NatalShenSha:
+    pillars = list(pillars)
+    key = (include_extended, *(_pillar_key(pillar) for pillar in pillars))
+    return _NATAL_CACHE.get_or_create(
+        key, lambda: NatalShenSha(pillars, include_extended=include_extended)
+    )
+
+
+def shensha_cache_stats() -> dict[str, object]:
+    return _NATAL_CACHE.stats().to_dict()
+
+
 def evaluate_shensha(
     pillars: Iterable[Mapping[str, Any]],
     *,
     include_extended: bool = True,
 ) -> list[dict[str, Any]]:
-    valid = _valid_pillars(pillars)
-    hits: list[dict[str, Any]] = []
-    for rule in RULES:
-        if rule.level == "extended" and not include_extended:
-            continue
-        labels, targets, anchors = _match_details(rule, valid)
-        if not labels:
-            continue
-        formula = _formula_payload(rule)
-        hits.append({
-            "rule_id": rule.rule_id,
-            "feature_id": f"bazi.shensha.{rule.rule_id}",
-            "name": rule.name,
-            "category": rule.category,
-            "axis": rule.axis,
-            "level": rule.level,
-            "pillar_labels": labels,
-            "trigger": _trigger_text(anchors, labels),
-            "anchors": anchors,
-            "formula": formula,
-            "formula_digest": FORMULA_DIGESTS[rule.rule_id],
-            "topic_tags": list(rule.topic_tags),
-            "source": {"title": rule.source_title, "note": rule.source_note},
-            "school_note": rule.school_note,
-            "rules_version": RULES_VERSION,
-            "registry_version": REGISTRY_VERSION,
-            "registry_digest": REGISTRY_DIGEST,
-        })
-    return hits
+    return natal_shensha(pillars, include_extended=include_extended).hits()
 
 
 def registry_payload() -> list[dict[str, Any]]:
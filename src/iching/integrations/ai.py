@@ -4,11 +4,13 @@ from copy import deepcopy
 import json
 import os
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, Iterator, Optional
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional, Tuple
 
+from iching.core.cache import BoundedCache
 from iching.core.najia import derive_six_gods, rebase_relation
+from iching.integrations.openai_clients import get_async_openai_client, get_openai_client
 
-from openai import BadRequestError, OpenAI
+from openai import AsyncOpenAI, BadRequestError, OpenAI
 
 MODEL_CAPABILITIES: Dict[str, Dict[str, Any]] = {
     "gpt-5.6-terra": {
@@ -69,6 +71,15 @@ MODEL_ALIASES: Dict[str, str] = {
 
 DEFAULT_MODEL = "gpt-5.6-terra"
 
+CAPABILITY_CACHE_TTL_SECONDS = int(os.getenv("ICHING_OPENAI_CAPABILITY_TTL_SECONDS", str(24 * 3600)))
+
+# (model, parameter) pairs the API has answered with a 400; such requests are
+# sent without the parameter until the entry expires, instead of failing first.
+_REJECTED_PARAMETERS: BoundedCache[Tuple[str, str], bool] = BoundedCache(
+    max_entries=256,
+    ttl_seconds=CAPABILITY_CACHE_TTL_SECONDS,
+)
+
 TONE_PROFILES: Dict[str, str] = {
     "normal": "现代中文，温和且专业，适度引用经典，保持礼貌敬语。",
     "wenyan": "仿庄子等战国文士，遣词古雅但需可读。",
@@ -305,6 +316,60 @@ def normalize_model_name(model_name: Optional[str]) -> Optional[str]:
     return MODEL_ALIASES.get(model_name, model_name)
 
 
+@dataclass(frozen=True, slots=True)
+class _AnalysisRequest:
+    """Resolved key, model and prompt of one initial analysis."""
+
+    api_key: str
+    model_name: str
+    user_input: str
+    reasoning: Optional[str]
+    verbosity: Optional[str]
+
+    def arguments(self) -> Dict[str, Any]:
+        return {
+            "model_name": self.model_name,
+            "instructions": SYSTEM_PROMPT_PRO.strip(),
+            "user_input": self.user_input,
+            "reasoning": self.reasoning,
+            "verbosity": self.verbosity,
+        }
+
+
+def _prepare_analysis(
+    data: Dict[str, Any],
+    *,
+    api_key: Optional[str],
+    model_hint: Optional[str],
+    reasoning_effort: Optional[str],
+    verbosity: Optional[str],
+    tone: Optional[str],
+    model_selector: Optional[Callable[[], str]] = None,
+) -> Optional[_AnalysisRequest]:
+    """Shared setup of the initial analysis calls; ``None`` when no API key is configured.
+
+    ``model_selector`` is only consulted without a ``model_hint``; the default
+    model is used when neither is given.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+
+    if tone and not data.get("ai_tone"):
+        data["ai_tone"] = tone
+
+    model_name = normalize_model_name(
+        model_hint or (model_selector() if model_selector else DEFAULT_MODEL)
+    )
+    return _AnalysisRequest(
+        api_key=api_key,
+        model_name=model_name,
+        user_input=_build_prompt(data),
+        reasoning=_normalize_reasoning(model_name, reasoning_effort or data.get("ai_reasoning")),
+        verbosity=_normalize_verbosity(model_name, verbosity or data.get("ai_verbosity")),
+    )
+
+
 def start_analysis(
     data: Dict[str, Any],
     *,
@@ -317,53 +382,104 @@ def start_analysis(
     verbosity: Optional[str] = None,
     tone: Optional[str] = None,
 ) -> Optional[AIResponseData]:
-    if not interactive:
+    if interactive:
         # Non-interactive callers are responsible for pre-validating access.
-        include_password_gate = False
-    else:
-        include_password_gate = True
-
-    if include_password_gate:
         (password_provider or _prompt_for_password)()
 
-    if api_key is None:
-        api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
+    request = _prepare_analysis(
+        data,
+        api_key=api_key,
+        model_hint=model_hint,
+        reasoning_effort=reasoning_effort,
+        verbosity=verbosity,
+        tone=tone,
+        model_selector=(model_selector or _interactive_model_selector) if interactive else None,
+    )
+    if request is None:
         if interactive:
             print("OPENAI_API_KEY not set. 请在环境变量或 .env 中配置。")
         return None
 
-    if tone and not data.get("ai_tone"):
-        data["ai_tone"] = tone
+    response = _request_openai_response(client=get_openai_client(request.api_key), **request.arguments())
+    return _response_data(response)
 
-    choose_model = model_selector or _interactive_model_selector
-    model_name = normalize_model_name(model_hint or (choose_model() if interactive else DEFAULT_MODEL))
 
-    selected_reasoning = _normalize_reasoning(model_name, reasoning_effort or data.get("ai_reasoning"))
-    selected_verbosity = _normalize_verbosity(model_name, verbosity or data.get("ai_verbosity"))
-    reasoning_payload = selected_reasoning
+async def start_analysis_async(
+    data: Dict[str, Any],
+    *,
+    api_key: Optional[str] = None,
+    model_hint: Optional[str] = None,
+    reasoning_effort: Optional[str] = None,
+    verbosity: Optional[str] = None,
+    tone: Optional[str] = None,
+) -> Optional[AIResponseData]:
+    """Non-interactive :func:`start_analysis` on ``AsyncOpenAI``.
 
-    client = OpenAI(api_key=api_key)
-    user_prompt = _build_prompt(data)
-    response = _request_openai_response(
-        client=client,
-        model_name=model_name,
-        instructions=SYSTEM_PROMPT_PRO.strip(),
-        user_input=user_prompt,
-        reasoning=reasoning_payload,
-        verbosity=selected_verbosity,
+    Callers are responsible for pre-validating access; the event loop is free
+    while the model works, so one worker can hold many readings in flight.
+    """
+    request = _prepare_analysis(
+        data,
+        api_key=api_key,
+        model_hint=model_hint,
+        reasoning_effort=reasoning_effort,
+        verbosity=verbosity,
+        tone=tone,
     )
-    if response is None:
+    if request is None:
         return None
-    text = _extract_response_text(response)
-    if not text:
-        return None
-    usage = _extract_usage(response)
-    return AIResponseData(
-        text=text,
-        response_id=getattr(response, "id", None),
-        usage=usage,
+
+    response = await _request_openai_response_async(
+        client=get_async_openai_client(request.api_key), **request.arguments()
     )
+    return _response_data(response)
+
+
+def stream_start_analysis(
+    data: Dict[str, Any],
+    *,
+    api_key: Optional[str] = None,
+    model_hint: Optional[str] = None,
+    reasoning_effort: Optional[str] = None,
+    verbosity: Optional[str] = None,
+    tone: Optional[str] = None,
+) -> Optional[AsyncIterator[Dict[str, Any]]]:
+    """Stream the initial analysis on ``AsyncOpenAI`` as follow-up-style events.
+
+    Yields ``{"type": "delta", "delta": ...}`` per text chunk and finally
+    ``{"type": "result", "result": AIResponseData | None}``. Returns ``None``
+    when no API key is configured, like :func:`start_analysis_async`.
+    """
+    request = _prepare_analysis(
+        data,
+        api_key=api_key,
+        model_hint=model_hint,
+        reasoning_effort=reasoning_effort,
+        verbosity=verbosity,
+        tone=tone,
+    )
+    if request is None:
+        return None
+
+    async def generate() -> AsyncIterator[Dict[str, Any]]:
+        stream = await _request_openai_response_async(
+            client=get_async_openai_client(request.api_key), **request.arguments(), stream=True
+        )
+        completed_response: Any = None
+        parts: list[str] = []
+        async with stream:
+            async for event in stream:
+                event_type = getattr(event, "type", "")
+                if event_type == "response.output_text.delta":
+                    delta = getattr(event, "delta", "") or ""
+                    if delta:
+                        parts.append(delta)
+                        yield {"type": "delta", "delta": delta}
+                elif event_type == "response.completed":
+                    completed_response = getattr(event, "response", None)
+        yield {"type": "result", "result": _streamed_response_data(parts, completed_response)}
+
+    return generate()
 
 
 def continue_analysis(
@@ -393,7 +509,7 @@ def continue_analysis(
         descriptor = TONE_PROFILES.get(tone, "用户自定义语气")
         instruction_block += f"\n\n语气设定: {tone} —— {descriptor}"
 
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     response = _request_openai_response(
         client=client,
         model_name=resolved_model,
@@ -456,7 +572,7 @@ def continue_analysis_from_session(
         f"用户追问：{stripped}"
     )
 
-    client = OpenAI(api_key=api_key)
+    client = get_openai_client(api_key)
     response = _request_openai_response(
         client=client,
         model_name=resolved_model,
@@ -564,12 +680,12 @@ def _stream_analysis(
     }
     if previous_response_id:
         payload["previous_response_id"] = previous_response_id
-    if selected_reasoning:
+    if selected_reasoning and not _parameter_rejected(resolved_model, "reasoning"):
         payload["reasoning"] = _reasoning_payload(resolved_model, selected_reasoning)
-    if selected_verbosity:
+    if selected_verbosity and not _parameter_rejected(resolved_model, "verbosity"):
         payload["text"] = {"verbosity": selected_verbosity}
 
-    client = OpenAI(api_key=resolved_api_key)
+    client = get_openai_client(resolved_api_key)
 
     def generate() -> Iterator[Dict[str, Any]]:
         completed_response: Any = None
@@ -585,16 +701,9 @@ def _stream_analysis(
                 elif event_type == "response.completed":
                     completed_response = getattr(event, "response", None)
 
-        text = "".join(parts).strip()
-        if not text and completed_response is not None:
-            text = _extract_response_text(completed_response) or ""
-        if not text:
+        result = _streamed_response_data(parts, completed_response)
+        if result is None:
             raise RuntimeError("OpenAI streaming follow-up returned an empty response.")
-        result = AIResponseData(
-            text=text,
-            response_id=getattr(completed_response, "id", None),
-            usage=_extract_usage(completed_response) if completed_response is not None else None,
-        )
         yield {"type": "result", "result": result}
 
     return generate()
@@ -643,6 +752,71 @@ def _build_followup_session_context(data: Dict[str, Any]) -> str:
     return "\n\n".join(blocks).strip()
 
 
+def _response_payload(
+    *,
+    model_name: str,
+    instructions: str,
+    user_input: str,
+    reasoning: Optional[str],
+    verbosity: Optional[str],
+    previous_response_id: Optional[str],
+    use_reasoning: bool,
+    use_verbosity: bool,
+) -> Dict[str, Any]:
+    payload: Dict[str, Any] = {
+        "model": model_name,
+        "instructions": instructions.strip(),
+        "input": [
+            {
+                "role": "user",
+                "content": user_input,
+            }
+        ],
+    }
+    if previous_response_id:
+        payload["previous_response_id"] = previous_response_id
+    if use_reasoning and reasoning:
+        payload["reasoning"] = _reasoning_payload(model_name, reasoning)
+    if use_verbosity and verbosity:
+        payload["text"] = {"verbosity": verbosity}
+    return payload
+
+
+def _parameter_rejected(model_name: str, parameter: str) -> bool:
+    return _REJECTED_PARAMETERS.get((model_name, parameter)) is not None
+
+
+def clear_capability_cache() -> None:
+    """Forget every remembered rejection, e.g. after the API gains support."""
+    _REJECTED_PARAMETERS.clear()
+
+
+def _initial_flags(model_name: str, reasoning: Optional[str], verbosity: Optional[str]) -> Tuple[bool, bool]:
+    return (
+        bool(reasoning) and not _parameter_rejected(model_name, "reasoning"),
+        bool(verbosity) and not _parameter_rejected(model_name, "verbosity"),
+    )
+
+
+def _downgrade_after_error(
+    exc: BadRequestError, model_name: str, use_reasoning: bool, use_verbosity: bool
+) -> Optional[Tuple[bool, bool]]:
+    """Drop the parameter a 400 complains about, or return ``None`` to re-raise.
+
+    Reasoning is dropped before verbosity when the error mentions both; each is
+    dropped at most once, so a request is tried at most three times. A dropped
+    parameter is remembered for ``model_name`` so later requests skip it.
+    """
+    error_text = str(exc).lower()
+    if use_reasoning and "reasoning" in error_text:
+        _REJECTED_PARAMETERS.put((model_name, "reasoning"), True)
+        return False, use_verbosity
+    if use_verbosity and ("text" in error_text or "verbosity" in error_text):
+        _REJECTED_PARAMETERS.put((model_name, "verbosity"), True)
+        return use_reasoning, False
+    return None
+
+
 def _request_openai_response(
     *,
     client: OpenAI,
@@ -653,59 +827,85 @@ def _request_openai_response(
     verbosity: Optional[str],
     previous_response_id: Optional[str] = None,
 ):
-    def build_payload(use_reasoning: bool, use_verbosity: bool) -> Dict[str, Any]:
-        payload: Dict[str, Any] = {
-            "model": model_name,
-            "instructions": instructions.strip(),
-            "input": [
-                {
-                    "role": "user",
-                    "content": user_input,
-                }
-            ],
-        }
-        if previous_response_id:
-            payload["previous_response_id"] = previous_response_id
-        if use_reasoning and reasoning:
-            payload["reasoning"] = _reasoning_payload(model_name, reasoning)
-        if use_verbosity and verbosity:
-            payload["text"] = {"verbosity": verbosity}
-        return payload
-
-    use_reasoning = bool(reasoning)
-    use_verbosity = bool(verbosity)
-
-    try:
-        return client.responses.create(**build_payload(use_reasoning, use_verbosity))
-    except BadRequestError as exc:
-        error_text = str(exc).lower()
-        retried = False
-        if use_reasoning and "reasoning" in error_text:
-            use_reasoning = False
-            try:
-                response = client.responses.create(**build_payload(use_reasoning, use_verbosity))
-                retried = True
-            except BadRequestError as inner_exc:
-                error_text = str(inner_exc).lower()
-                if use_verbosity and ("text" in error_text or "verbosity" in error_text):
-                    use_verbosity = False
-                    response = client.responses.create(**build_payload(use_reasoning, use_verbosity))
-                    retried = True
-                else:
-                    raise
-        if not retried:
-            if use_verbosity and ("text" in error_text or "verbosity" in error_text):
-                use_verbosity = False
-                try:
-                    return client.responses.create(**build_payload(use_reasoning, use_verbosity))
-                except BadRequestError as inner_exc:
-                    error_text = str(inner_exc).lower()
-                    if use_reasoning and "reasoning" in error_text:
-                        use_reasoning = False
-                        return client.responses.create(**build_payload(use_reasoning, use_verbosity))
-                    raise
-            raise
-        return response
+    use_reasoning, use_verbosity = _initial_flags(model_name, reasoning, verbosity)
+    while True:
+        payload = _response_payload(
+            model_name=model_name,
+            instructions=instructions,
+            user_input=user_input,
+            reasoning=reasoning,
+            verbosity=verbosity,
+            previous_response_id=previous_response_id,
+            use_reasoning=use_reasoning,
+            use_verbosity=use_verbosity,
+        )
+        try:
+            return client.responses.create(**payload)
+        except BadRequestError as exc:
+            downgraded = _downgrade_after_error(exc, model_name, use_reasoning, use_verbosity)
+            if downgraded is None:
+                raise
+            use_reasoning, use_verbosity = downgraded
+
+
+async def _request_openai_response_async(
+    *,
+    client: AsyncOpenAI,
+    model_name: str,
+    instructions: str,
+    user_input: str,
+    reasoning: Optional[str],
+    verbosity: Optional[str],
+    previous_response_id: Optional[str] = None,
+    stream: bool = False,
+):
+    use_reasoning, use_verbosity = _initial_flags(model_name, reasoning, verbosity)
+    while True:
+        payload = _response_payload(
+            model_name=model_name,
+            instructions=instructions,
+            user_input=user_input,
+            reasoning=reasoning,
+            verbosity=verbosity,
+            previous_response_id=previous_response_id,
+            use_reasoning=use_reasoning,
+            use_verbosity=use_verbosity,
+        )
+        if stream:
+            payload["stream"] = True
+        try:
+            return await client.responses.create(**payload)
+        except BadRequestError as exc:
+            downgraded = _downgrade_after_error(exc, model_name, use_reasoning, use_verbosity)
+            if downgraded is None:
+                raise
+            use_reasoning, use_verbosity = downgraded
+
+
+def _streamed_response_data(parts: list[str], completed_response: Any) -> Optional[AIResponseData]:
+    text = "".join(parts).strip()
+    if not text and completed_response is not None:
+        text = _extract_response_text(completed_response) or ""
+    if not text:
+        return None
+    return AIResponseData(
+        text=text,
+        response_id=getattr(completed_response, "id", None),
+        usage=_extract_usage(completed_response) if completed_response is not None else None,
+    )
+
+
+def _response_data(response: Any) -> Optional[AIResponseData]:
+    if response is None:
+        return None
+    text = _extract_response_text(response)
+    if not text:
+        return None
+    return AIResponseData(
+        text=text,
+        response_id=getattr(response, "id", None),
+        usage=_extract_usage(response),
+    )
 
 
 def _extract_response_text(response: Any) -> Optional[str]:
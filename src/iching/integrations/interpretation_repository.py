@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import os
 import re
 import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Union
 
-from iching.core.guaci_repository import load_guaci_by_number
+from iching.core.guaci_repository import _iter_guaci_files, _parse_guaci_file
+from iching.integrations.sqlite_pool import get_connection_pool, open_writer
 
 
 TRIGRAM_SEED: List[Tuple[int, str, str, str]] = [
@@ -42,6 +49,25 @@ SYMBOLIC_HEXAGRAM_ID_BY_STEM: Dict[str, int] = {
 
 SYMBOLIC_NOISE_MARKERS = ("周易六十四卦象意，建议收藏",)
 
+SOURCE_LOCALES: Dict[str, str] = {
+    "guaci": "zh-CN",
+    "takashima": "zh-CN",
+    "symbolic": "zh-CN",
+    "english_commentary": "en-US",
+}
+
+# Bump whenever the schema or the import rules change so that artifacts built
+# by an older release are rebuilt even if the source files are untouched.
+ARTIFACT_FORMAT_VERSION = 2
+
+# 0 means one parser process per CPU.
+SYNC_WORKERS = int(os.getenv("ICHING_INTERPRETATION_SYNC_WORKERS", "0"))
+# Below this many changed files, process start-up costs more than parsing.
+PARALLEL_PARSE_MIN_FILES = 32
+# A file whose mtime was this close to the moment it was recorded may have
+# been rewritten within the same timestamp tick, so it is re-hashed.
+RACY_MTIME_WINDOW_NS = 2_000_000_000
+
 
 @dataclass(frozen=True)
 class InterpretationEntry:
@@ -64,6 +90,92 @@ class InterpretationEntry:
         return None
 
 
+SlotIndexKey = Tuple[str, str, str, Optional[int], Optional[str], str]
+# A hexagram is referenced either by its Chinese name or by its number (1-64).
+HexagramRef = Union[str, int]
+
+_ENTRY_COLUMNS = """
+    h.id AS hexagram_number,
+    h.name_zh AS hexagram_name,
+    slt.canonical_key AS slot_key,
+    slt.slot_kind AS slot_kind,
+    slt.line_no AS line_no,
+    slt.use_kind AS use_kind,
+    src.source_key AS source_key,
+    src.display_name AS source_label,
+    ent.content AS content
+"""
+
+_ENTRY_ORDER = """
+    CASE slt.slot_kind
+      WHEN 'gua' THEN 0
+      WHEN 'line' THEN 1
+      WHEN 'use' THEN 2
+      ELSE 9
+    END,
+    COALESCE(slt.line_no, 99) ASC,
+    CASE src.source_key
+      WHEN 'guaci' THEN 0
+      WHEN 'takashima' THEN 1
+      WHEN 'symbolic' THEN 2
+      WHEN 'english_commentary' THEN 3
+      ELSE 9
+    END,
+    src.source_key ASC
+"""
+
+
+_SLOT_CONTENT_SELECT = """
+    SELECT ent.content
+    FROM interpretation_entry ent
+    JOIN interpretation_slot slt ON slt.id = ent.slot_id
+    JOIN interpretation_hexagram h ON h.id = slt.hexagram_id
+    JOIN interpretation_source src ON src.id = ent.source_id
+    WHERE h.name_zh = ?
+      AND src.source_key = ?
+      AND ent.locale = ?
+      AND ent.is_current = 1
+"""
+
+# The slot lookups are issued with a fixed set of SQL strings so that every
+# pooled connection compiles each of them once and reuses it from its
+# statement cache afterwards.
+_SLOT_CONTENT_SQL: Dict[str, str] = {
+    "gua": _SLOT_CONTENT_SELECT
+    + "  AND slt.slot_kind = 'gua'\nORDER BY ent.version DESC\nLIMIT 1",
+    "line": _SLOT_CONTENT_SELECT
+    + "  AND slt.slot_kind = 'line' AND slt.line_no = ?\nORDER BY ent.version DESC\nLIMIT 1",
+    "use": _SLOT_CONTENT_SELECT
+    + "  AND slt.slot_kind = 'use'\nORDER BY ent.version DESC\nLIMIT 1",
+    "use_kind": _SLOT_CONTENT_SELECT
+    + "  AND slt.slot_kind = 'use' AND slt.use_kind = ?\nORDER BY ent.version DESC\nLIMIT 1",
+}
+
+
+def _entry_from_row(row: sqlite3.Row) -> InterpretationEntry:
+    return InterpretationEntry(
+        hexagram_number=int(row["hexagram_number"]),
+        hexagram_name=str(row["hexagram_name"]),
+        slot_key=str(row["slot_key"]),
+        slot_kind=str(row["slot_kind"]),
+        line_no=int(row["line_no"]) if row["line_no"] is not None else None,
+        use_kind=str(row["use_kind"]) if row["use_kind"] is not None else None,
+        source_key=str(row["source_key"]),
+        source_label=str(row["source_label"]),
+        content=str(row["content"]),
+    )
+
+
+@dataclass(frozen=True)
+class _SlotIndex:
+    """Fully materialised view of the current published entries."""
+
+    content_version: str
+    entries_by_hexagram: Dict[Tuple[str, str], List[InterpretationEntry]]
+    content_by_slot: Dict[SlotIndexKey, str]
+    hexagram_names: Dict[int, str]
+
+
 def _canonical_slot_key(
     hexagram_id: int,
     slot_kind: str,
@@ -253,8 +365,138 @@ def _merge_english_line(previous: str, current: str) -> str:
     return f"{previous} {current}"
 
 
+def _discover_source_files(source_key: str, directory: Path) -> List[Tuple[str, int, Path]]:
+    """List ``(file_name, hexagram_id, path)`` for every file feeding ``source_key``."""
+    files: List[Tuple[str, int, Path]] = []
+    if source_key in ("guaci", "takashima"):
+        for file, number, _ in _iter_guaci_files(directory):
+            if 1 <= number <= 64:
+                files.append((file.name, number, file))
+    elif source_key == "symbolic":
+        for file in directory.glob("*.txt"):
+            hexagram_id = _resolve_symbolic_hexagram_id(file)
+            if hexagram_id is not None:
+                files.append((file.name, hexagram_id, file))
+    elif source_key == "english_commentary":
+        for hexagram_id in range(1, 65):
+            for name in (f"Hexagram {hexagram_id:02d}.json", f"{hexagram_id:02d}.json"):
+                path = directory / name
+                if path.exists():
+                    files.append((name, hexagram_id, path))
+                    break
+    else:
+        raise ValueError(f"unsupported source: {source_key}")
+    return sorted(files)
+
+
+def _parse_source_file(job: Tuple[str, int, str]) -> List[Tuple[str, str]]:
+    """Parse one source file into ``(canonical_slot_key, content)`` pairs.
+
+    Module-level so that it can run in a worker process.
+    """
+    source_key, hexagram_id, raw_path = job
+    path = Path(raw_path)
+    entries: List[Tuple[str, Optional[str]]] = []
+
+    if source_key in ("guaci", "takashima"):
+        data = _parse_guaci_file(path)
+        if source_key == "guaci":
+            top_content = data.combine_top()
+            line_values = {index: data.combine_line(str(index)) for index in range(1, 7)}
+            use_content = data.combine_line("all")
+        else:
+            top_content = _take_takashima_top(data)
+            line_values = {
+                index: _take_takashima_line(data, str(index)) for index in range(1, 7)
+            }
+            use_content = _take_takashima_line(data, "all")
+        entries.append((_canonical_slot_key(hexagram_id, "gua"), top_content))
+        for line_no in range(1, 7):
+            entries.append(
+                (_canonical_slot_key(hexagram_id, "line", line_no=line_no), line_values[line_no])
+            )
+        if hexagram_id == 1:
+            entries.append((_canonical_slot_key(1, "use", use_kind="yong_jiu"), use_content))
+        elif hexagram_id == 2:
+            entries.append((_canonical_slot_key(2, "use", use_kind="yong_liu"), use_content))
+    elif source_key == "symbolic":
+        text = _clean_symbolic_text(path.read_text(encoding="utf-8"))
+        entries.append((_canonical_slot_key(hexagram_id, "gua"), text))
+    elif source_key == "english_commentary":
+        raw = json.loads(path.read_text(encoding="utf-8"))
+        if not isinstance(raw, dict):
+            return []
+        lines_payload = raw.get("lines")
+        lines = lines_payload if isinstance(lines_payload, dict) else {}
+        entries.append(
+            (_canonical_slot_key(hexagram_id, "gua"), _clean_english_structured_text(raw.get("gua")))
+        )
+        for line_no in range(1, 7):
+            entries.append(
+                (
+                    _canonical_slot_key(hexagram_id, "line", line_no=line_no),
+                    _clean_english_structured_text(
+                        lines.get(str(line_no)) or lines.get(f"line_{line_no}")
+                    ),
+                )
+            )
+    else:
+        raise ValueError(f"unsupported source: {source_key}")
+
+    return [(slot_key, text.strip()) for slot_key, text in entries if text and text.strip()]
+
+
+@dataclass(frozen=True)
+class SyncSummary:
+    files_scanned: int
+    files_hashed: int
+    files_parsed: int
+    files_removed: int
+    hexagrams_updated: int
+
+
+def compute_source_digest(
+    *,
+    index_file: Path,
+    guaci_dir: Path,
+    takashima_dir: Path,
+    symbolic_dir: Path,
+    english_structured_dir: Path,
+) -> str:
+    """Hash every interpretation source file together with the artifact format."""
+    digest = hashlib.sha256(f"format:{ARTIFACT_FORMAT_VERSION}".encode("utf-8"))
+    sources: List[Tuple[str, Path, str]] = [
+        ("guaci", guaci_dir, "*.txt"),
+        ("takashima", takashima_dir, "*.txt"),
+        ("symbolic", symbolic_dir, "*.txt"),
+        ("english_commentary", english_structured_dir, "*.json"),
+    ]
+    digest.update(b"\0index\0")
+    if index_file.exists():
+        digest.update(index_file.read_bytes())
+    for source_key, directory, pattern in sources:
+        digest.update(f"\0{source_key}\0".encode("utf-8"))
+        if not directory.exists():
+            continue
+        for path in sorted(directory.glob(pattern)):
+            digest.update(path.name.encode("utf-8"))
+            digest.update(b"\0")
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
 class InterpretationRepository:
-    """SQL-backed storage for slot-based hexagram interpretations."""
+    """SQL-backed storage for slot-based hexagram interpretations.
+
+    The database is a derived artifact: its ``interpretation_meta`` table records
+    the digest of the source files it was built from. On startup the repository
+    only rebuilds when that digest no longer matches, and ``read_only=True``
+    opens a prebuilt artifact without ever writing to it.
+
+    Lookups are served from an in-memory slot index that is loaded once per
+    content version; pass ``use_index=False`` to query SQL directly, e.g. for
+    admin and editing workflows that need to observe uncommitted changes.
+    """
 
     def __init__(
         self,
@@ -265,6 +507,8 @@ class InterpretationRepository:
         takashima_dir: Path,
         symbolic_dir: Path,
         english_structured_dir: Path,
+        read_only: bool = False,
+        use_index: bool = True,
     ) -> None:
         self.db_path = db_path
         self.index_file = index_file
@@ -272,22 +516,45 @@ class InterpretationRepository:
         self.takashima_dir = takashima_dir
         self.symbolic_dir = symbolic_dir
         self.english_structured_dir = english_structured_dir
+        self.read_only = read_only
+        self.use_index = use_index
+        self._build_path: Optional[Path] = None
+        self._index: Optional[_SlotIndex] = None
+        self._index_lock = threading.Lock()
+        self._pool = get_connection_pool(db_path, immutable=read_only)
+        self.source_digest = self._compute_source_digest()
+
+        if self.read_only:
+            if not self.db_path.exists():
+                raise FileNotFoundError(
+                    f"Interpretation artifact not found at {self.db_path}. "
+                    "Please run tools/sync_interpretation_db.py to build it."
+                )
+            if self.stored_digest() != self.source_digest:
+                raise RuntimeError(
+                    f"Interpretation artifact at {self.db_path} is stale. "
+                    "Please run tools/sync_interpretation_db.py to rebuild it."
+                )
+            return
+
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._ensure_schema()
-        self._seed_reference_data()
-        self.sync_from_files()
+        if self.stored_digest() != self.source_digest:
+            if self._read_meta("format_version") == str(ARTIFACT_FORMAT_VERSION):
+                self.refresh()
+            else:
+                self.build_artifact()
 
     # ------------------------------------------------------------------ #
     # Public API
     # ------------------------------------------------------------------ #
 
     def count_slots(self) -> int:
-        with self._connect() as conn:
+        with self._read_connection() as conn:
             row = conn.execute("SELECT COUNT(*) AS count FROM interpretation_slot").fetchone()
             return int(row["count"]) if row else 0
 
     def count_entries(self, source_key: Optional[str] = None) -> int:
-        with self._connect() as conn:
+        with self._read_connection() as conn:
             if source_key:
                 row = conn.execute(
                     """
@@ -304,6 +571,11 @@ class InterpretationRepository:
                 ).fetchone()
             return int(row["count"]) if row else 0
 
+    @property
+    def content_version(self) -> str:
+        """Identifier of the interpretation content currently being served."""
+        return self.source_digest
+
     def list_entries(
         self,
         *,
@@ -311,6 +583,13 @@ class InterpretationRepository:
         locale: str = "zh-CN",
         source_keys: Optional[Sequence[str]] = None,
     ) -> List[InterpretationEntry]:
+        if self.use_index:
+            entries = self._slot_index().entries_by_hexagram.get((hexagram_name, locale), [])
+            if source_keys:
+                wanted = set(source_keys)
+                return [entry for entry in entries if entry.source_key in wanted]
+            return list(entries)
+
         params: List[object] = [hexagram_name, locale]
         source_filter = ""
         if source_keys:
@@ -319,16 +598,7 @@ class InterpretationRepository:
             params.extend(source_keys)
 
         sql = f"""
-            SELECT
-                h.id AS hexagram_number,
-                h.name_zh AS hexagram_name,
-                slt.canonical_key AS slot_key,
-                slt.slot_kind AS slot_kind,
-                slt.line_no AS line_no,
-                slt.use_kind AS use_kind,
-                src.source_key AS source_key,
-                src.display_name AS source_label,
-                ent.content AS content
+            SELECT {_ENTRY_COLUMNS}
             FROM interpretation_entry ent
             JOIN interpretation_slot slt ON slt.id = ent.slot_id
             JOIN interpretation_hexagram h ON h.id = slt.hexagram_id
@@ -338,41 +608,13 @@ class InterpretationRepository:
               AND ent.is_current = 1
               AND ent.status = 'published'
               {source_filter}
-            ORDER BY
-              CASE slt.slot_kind
-                WHEN 'gua' THEN 0
-                WHEN 'line' THEN 1
-                WHEN 'use' THEN 2
-                ELSE 9
-              END,
-              COALESCE(slt.line_no, 99) ASC,
-              CASE src.source_key
-                WHEN 'guaci' THEN 0
-                WHEN 'takashima' THEN 1
-                WHEN 'symbolic' THEN 2
-                WHEN 'english_commentary' THEN 3
-                ELSE 9
-              END,
-              src.source_key ASC
+            ORDER BY {_ENTRY_ORDER}
         """
 
-        with self._connect() as conn:
+        with self._read_connection() as conn:
             rows = conn.execute(sql, params).fetchall()
 
-        return [
-            InterpretationEntry(
-                hexagram_number=int(row["hexagram_number"]),
-                hexagram_name=str(row["hexagram_name"]),
-                slot_key=str(row["slot_key"]),
-                slot_kind=str(row["slot_kind"]),
-                line_no=int(row["line_no"]) if row["line_no"] is not None else None,
-                use_kind=str(row["use_kind"]) if row["use_kind"] is not None else None,
-                source_key=str(row["source_key"]),
-                source_label=str(row["source_label"]),
-                content=str(row["content"]),
-            )
-            for row in rows
-        ]
+        return [_entry_from_row(row) for row in rows]
 
     def get_slot_content(
         self,
@@ -384,60 +626,517 @@ class InterpretationRepository:
         use_kind: Optional[str] = None,
         locale: str = "zh-CN",
     ) -> Optional[str]:
-        where = ["h.name_zh = ?", "src.source_key = ?", "ent.locale = ?", "ent.is_current = 1"]
-        params: List[object] = [hexagram_name, source_key, locale]
+        if slot_kind == "line" and line_no is None:
+            raise ValueError("line_no is required for slot_kind=line")
+        if slot_kind not in {"gua", "line", "use"}:
+            raise ValueError(f"unknown slot_kind: {slot_kind}")
 
-        if slot_kind == "gua":
-            where.append("slt.slot_kind = 'gua'")
-        elif slot_kind == "line":
-            if line_no is None:
-                raise ValueError("line_no is required for slot_kind=line")
-            where.append("slt.slot_kind = 'line'")
-            where.append("slt.line_no = ?")
+        if self.use_index:
+            key: SlotIndexKey = (
+                hexagram_name,
+                source_key,
+                slot_kind,
+                line_no if slot_kind == "line" else None,
+                use_kind if slot_kind == "use" else None,
+                locale,
+            )
+            return self._slot_index().content_by_slot.get(key)
+
+        params: List[object] = [hexagram_name, source_key, locale]
+        if slot_kind == "line":
+            sql = _SLOT_CONTENT_SQL["line"]
             params.append(line_no)
-        elif slot_kind == "use":
-            where.append("slt.slot_kind = 'use'")
-            if use_kind:
-                where.append("slt.use_kind = ?")
-                params.append(use_kind)
+        elif slot_kind == "use" and use_kind:
+            sql = _SLOT_CONTENT_SQL["use_kind"]
+            params.append(use_kind)
         else:
-            raise ValueError(f"unknown slot_kind: {slot_kind}")
+            sql = _SLOT_CONTENT_SQL[slot_kind]
+
+        with self._read_connection() as conn:
+            row = conn.execute(sql, params).fetchone()
+        if not row:
+            return None
+        content = str(row["content"]).strip()
+        return content or None
+
+    def list_entries_bulk(
+        self,
+        hexagrams: Iterable[HexagramRef],
+        *,
+        locales: Sequence[str] = ("zh-CN",),
+        source_keys: Optional[Sequence[str]] = None,
+    ) -> Dict[Tuple[str, str], List[InterpretationEntry]]:
+        """Published entries for many hexagrams, grouped by ``(hexagram_name, locale)``.
+
+        Hexagrams may be given by name or number. Every group is ordered like
+        :meth:`list_entries`; hexagram/locale pairs without entries are omitted.
+        The lookup is one pass over the slot index, or a single SQL query when
+        the index is disabled.
+        """
+        refs = list(dict.fromkeys(hexagrams))
+        if not refs or not locales:
+            return {}
+        wanted_sources = set(source_keys) if source_keys else None
+
+        if self.use_index:
+            index = self._slot_index()
+            grouped: Dict[Tuple[str, str], List[InterpretationEntry]] = {}
+            for ref in refs:
+                name = index.hexagram_names.get(ref) if isinstance(ref, int) else ref
+                if name is None:
+                    continue
+                for locale in locales:
+                    entries = index.entries_by_hexagram.get((name, locale))
+                    if not entries:
+                        continue
+                    if wanted_sources is not None:
+                        entries = [e for e in entries if e.source_key in wanted_sources]
+                        if not entries:
+                            continue
+                    grouped[(name, locale)] = list(entries)
+            return grouped
+
+        names = [ref for ref in refs if not isinstance(ref, int)]
+        numbers = [ref for ref in refs if isinstance(ref, int)]
+        hexagram_filters: List[str] = []
+        params: List[object] = []
+        if names:
+            hexagram_filters.append(f"h.name_zh IN ({', '.join('?' for _ in names)})")
+            params.extend(names)
+        if numbers:
+            hexagram_filters.append(f"h.id IN ({', '.join('?' for _ in numbers)})")
+            params.extend(numbers)
+        params.extend(locales)
+        source_filter = ""
+        if source_keys:
+            source_filter = f"AND src.source_key IN ({', '.join('?' for _ in source_keys)})"
+            params.extend(source_keys)
 
         sql = f"""
-            SELECT ent.content
+            SELECT {_ENTRY_COLUMNS}, ent.locale AS locale
             FROM interpretation_entry ent
             JOIN interpretation_slot slt ON slt.id = ent.slot_id
             JOIN interpretation_hexagram h ON h.id = slt.hexagram_id
             JOIN interpretation_source src ON src.id = ent.source_id
-            WHERE {" AND ".join(where)}
-            ORDER BY ent.version DESC
-            LIMIT 1
+            WHERE ({' OR '.join(hexagram_filters)})
+              AND ent.locale IN ({', '.join('?' for _ in locales)})
+              AND ent.is_current = 1
+              AND ent.status = 'published'
+              {source_filter}
+            ORDER BY h.id ASC, {_ENTRY_ORDER}
         """
+        with self._read_connection() as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        grouped = {}
+        for row in rows:
+            entry = _entry_from_row(row)
+            grouped.setdefault((entry.hexagram_name, str(row["locale"])), []).append(entry)
+        return grouped
+
+    def get_slot_contents(
+        self, keys: Iterable[SlotIndexKey]
+    ) -> Dict[SlotIndexKey, Optional[str]]:
+        """Resolve many slots at once.
+
+        Each key is ``(hexagram_name, source_key, slot_kind, line_no, use_kind,
+        locale)`` with the same meaning as the :meth:`get_slot_content`
+        arguments; unused coordinates are ``None``.
+        """
+        wanted = list(dict.fromkeys(keys))
+        for _, _, slot_kind, line_no, _, _ in wanted:
+            if slot_kind not in {"gua", "line", "use"}:
+                raise ValueError(f"unknown slot_kind: {slot_kind}")
+            if slot_kind == "line" and line_no is None:
+                raise ValueError("line_no is required for slot_kind=line")
+
+        def normalise(key: SlotIndexKey) -> SlotIndexKey:
+            name, source_key, slot_kind, line_no, use_kind, locale = key
+            return (
+                name,
+                source_key,
+                slot_kind,
+                line_no if slot_kind == "line" else None,
+                use_kind if slot_kind == "use" else None,
+                locale,
+            )
+
+        if self.use_index:
+            content_by_slot = self._slot_index().content_by_slot
+            return {key: content_by_slot.get(normalise(key)) for key in wanted}
+
+        found: Dict[SlotIndexKey, str] = {}
+        names = sorted({key[0] for key in wanted})
+        locales = sorted({key[5] for key in wanted})
+        if names:
+            # Like get_slot_content, this also sees current unpublished entries.
+            sql = f"""
+                SELECT {_ENTRY_COLUMNS}, ent.locale AS locale
+                FROM interpretation_entry ent
+                JOIN interpretation_slot slt ON slt.id = ent.slot_id
+                JOIN interpretation_hexagram h ON h.id = slt.hexagram_id
+                JOIN interpretation_source src ON src.id = ent.source_id
+                WHERE h.name_zh IN ({', '.join('?' for _ in names)})
+                  AND ent.locale IN ({', '.join('?' for _ in locales)})
+                  AND ent.is_current = 1
+                ORDER BY h.id ASC, {_ENTRY_ORDER}
+            """
+            with self._read_connection() as conn:
+                rows = conn.execute(sql, [*names, *locales]).fetchall()
+            for row in rows:
+                entry = _entry_from_row(row)
+                content = entry.content.strip()
+                if not content:
+                    continue
+                key = (
+                    entry.hexagram_name,
+                    entry.source_key,
+                    entry.slot_kind,
+                    entry.line_no,
+                    entry.use_kind,
+                    str(row["locale"]),
+                )
+                found.setdefault(key, content)
+                if entry.slot_kind == "use":
+                    found.setdefault(key[:3] + (None, None, key[5]), content)
+        return {key: found.get(normalise(key)) for key in wanted}
+
+    def count_slots_by_hexagram(self) -> Dict[int, int]:
+        with self._read_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT hexagram_id, COUNT(*) AS slot_count
+                FROM interpretation_slot
+                GROUP BY hexagram_id
+                """
+            ).fetchall()
+        return {int(row["hexagram_id"]): int(row["slot_count"]) for row in rows}
+
+    def invalidate_index(self) -> None:
+        """Drop the in-memory slot index; it is reloaded on the next lookup."""
+        with self._index_lock:
+            self._index = None
+
+    def stored_digest(self) -> Optional[str]:
+        """Return the source digest recorded in the artifact, if any."""
+        return self._read_meta("source_digest")
+
+    def build_artifact(self) -> None:
+        """Rebuild the artifact from the source files and swap it into place.
+
+        The new database is written to a private sibling file and atomically
+        renamed over ``db_path``, so concurrent readers keep the previous
+        snapshot and never contend for the write lock.
+        """
+        if self.read_only:
+            raise RuntimeError("cannot build an artifact through a read-only repository")
+
+        build_path = self.db_path.with_name(f"{self.db_path.name}.{os.getpid()}.tmp")
+        if build_path.exists():
+            build_path.unlink()
+        self._build_path = build_path
+        try:
+            self._ensure_schema()
+            self._seed_reference_data()
+            self.sync_from_files()
+            with self._connect() as conn:
+                # Fold the WAL back into the main file so the artifact is
+                # self-contained before it is renamed into place.
+                conn.execute("PRAGMA journal_mode = DELETE")
+            os.replace(build_path, self.db_path)
+        finally:
+            self._build_path = None
+            for leftover in (
+                build_path,
+                build_path.with_name(f"{build_path.name}-wal"),
+                build_path.with_name(f"{build_path.name}-shm"),
+            ):
+                if leftover.exists():
+                    leftover.unlink()
+        self._pool.reset()
+        self.invalidate_index()
+
+    def refresh(self) -> SyncSummary:
+        """Bring an existing artifact up to date in place.
+
+        Only hexagrams whose source files changed are rewritten, in a single
+        short transaction. Processes that opened the artifact with
+        ``read_only=True`` map it immutably and must not share a file that is
+        refreshed this way; rebuild their copy with :meth:`build_artifact`.
+        """
+        self._ensure_schema()
+        self._seed_reference_data()
+        return self.sync_from_files()
+
+    def sync_from_files(self) -> SyncSummary:
+        """Re-import the source files that changed since the last sync.
+
+        Each file's size, mtime and content hash are recorded in
+        ``interpretation_source_file``. Files whose size and mtime are
+        unchanged are skipped without being read; the rest are hashed, and
+        only hexagrams with new, edited or deleted files are re-parsed (in a
+        process pool when there are many) and rewritten.
+        """
+        if self.read_only:
+            raise RuntimeError("cannot sync a read-only interpretation repository")
+        self.source_digest = self._compute_source_digest()
+        synced_at_ns = time.time_ns()
 
         with self._connect() as conn:
-            row = conn.execute(sql, params).fetchone()
-        if not row:
-            return None
-        content = str(row["content"]).strip()
-        return content or None
+            stored = {
+                (str(row["source_key"]), str(row["file_name"])): row
+                for row in conn.execute("SELECT * FROM interpretation_source_file")
+            }
+
+        files_scanned = 0
+        files_hashed = 0
+        file_rows: List[Tuple[str, str, int, int, int, str, int]] = []
+        removed_files: List[Tuple[str, str]] = []
+        dirty_units: Set[Tuple[str, int]] = set()
+        files_by_unit: Dict[Tuple[str, int], List[Path]] = {}
+
+        for source_key, directory in self._source_directories():
+            if not directory.exists():
+                continue
+            seen: Set[str] = set()
+            for file_name, hexagram_id, path in _discover_source_files(source_key, directory):
+                files_scanned += 1
+                seen.add(file_name)
+                files_by_unit.setdefault((source_key, hexagram_id), []).append(path)
+                stat = path.stat()
+                previous = stored.get((source_key, file_name))
+                if (
+                    previous is not None
+                    and int(previous["hexagram_id"]) == hexagram_id
+                    and int(previous["size"]) == stat.st_size
+                    and int(previous["mtime_ns"]) == stat.st_mtime_ns
+                    and stat.st_mtime_ns < int(previous["synced_at_ns"]) - RACY_MTIME_WINDOW_NS
+                ):
+                    continue
+                files_hashed += 1
+                content_hash = hashlib.sha256(path.read_bytes()).hexdigest()
+                if previous is None or str(previous["content_hash"]) != content_hash:
+                    dirty_units.add((source_key, hexagram_id))
+                if previous is not None and int(previous["hexagram_id"]) != hexagram_id:
+                    dirty_units.add((source_key, hexagram_id))
+                    dirty_units.add((source_key, int(previous["hexagram_id"])))
+                file_rows.append(
+                    (
+                        source_key,
+                        file_name,
+                        hexagram_id,
+                        stat.st_size,
+                        stat.st_mtime_ns,
+                        content_hash,
+                        synced_at_ns,
+                    )
+                )
+            for (stored_source, file_name), row in stored.items():
+                if stored_source == source_key and file_name not in seen:
+                    removed_files.append((source_key, file_name))
+                    dirty_units.add((source_key, int(row["hexagram_id"])))
+
+        units = sorted(dirty_units)
+        jobs = [
+            (source_key, hexagram_id, str(path))
+            for source_key, hexagram_id in units
+            for path in files_by_unit.get((source_key, hexagram_id), [])
+        ]
+        content_by_unit: Dict[Tuple[str, int], Dict[str, str]] = {unit: {} for unit in units}
+        for job, entries in zip(jobs, self._parse_files(jobs)):
+            # Later files of the same hexagram override earlier ones.
+            content_by_unit[(job[0], job[1])].update(entries)
 
-    def sync_from_files(self) -> None:
-        self._sync_source_from_directory(source_key="guaci", directory=self.guaci_dir)
-        self._sync_source_from_directory(source_key="takashima", directory=self.takashima_dir)
-        self._sync_symbolic_source(source_key="symbolic", directory=self.symbolic_dir)
-        self._sync_english_source(
-            source_key="english_commentary", directory=self.english_structured_dir
+        with self._connect() as conn:
+            source_ids = {
+                str(row["source_key"]): int(row["id"])
+                for row in conn.execute("SELECT id, source_key FROM interpretation_source")
+            }
+            slot_id_by_key = {
+                str(row["canonical_key"]): int(row["id"])
+                for row in conn.execute("SELECT id, canonical_key FROM interpretation_slot")
+            }
+            conn.executemany(
+                """
+                DELETE FROM interpretation_entry
+                WHERE source_id = ?
+                  AND locale = ?
+                  AND slot_id IN (SELECT id FROM interpretation_slot WHERE hexagram_id = ?)
+                """,
+                [
+                    (source_ids[source_key], SOURCE_LOCALES[source_key], hexagram_id)
+                    for source_key, hexagram_id in units
+                ],
+            )
+            payload: List[Tuple[int, int, str, str, int, str, int]] = []
+            for (source_key, _), contents in content_by_unit.items():
+                for slot_key, content in contents.items():
+                    slot_id = slot_id_by_key.get(slot_key)
+                    if slot_id is None:
+                        continue
+                    payload.append(
+                        (
+                            slot_id,
+                            source_ids[source_key],
+                            SOURCE_LOCALES[source_key],
+                            content,
+                            1,
+                            "published",
+                            1,
+                        )
+                    )
+            conn.executemany(
+                """
+                INSERT INTO interpretation_entry(
+                  slot_id, source_id, locale, content, version, status, is_current
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                payload,
+            )
+            conn.executemany(
+                "DELETE FROM interpretation_source_file WHERE source_key = ? AND file_name = ?",
+                removed_files,
+            )
+            conn.executemany(
+                """
+                INSERT INTO interpretation_source_file(
+                  source_key, file_name, hexagram_id, size, mtime_ns, content_hash, synced_at_ns
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(source_key, file_name) DO UPDATE SET
+                  hexagram_id = excluded.hexagram_id,
+                  size = excluded.size,
+                  mtime_ns = excluded.mtime_ns,
+                  content_hash = excluded.content_hash,
+                  synced_at_ns = excluded.synced_at_ns
+                """,
+                file_rows,
+            )
+            self._record_digest(conn)
+
+        self.invalidate_index()
+        return SyncSummary(
+            files_scanned=files_scanned,
+            files_hashed=files_hashed,
+            files_parsed=len(jobs),
+            files_removed=len(removed_files),
+            hexagrams_updated=len(units),
         )
 
     # ------------------------------------------------------------------ #
     # Internal: schema + seed
     # ------------------------------------------------------------------ #
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
-        return conn
+    @contextmanager
+    def _read_connection(self) -> Iterator[sqlite3.Connection]:
+        with self._pool.connection() as conn:
+            yield conn
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        if self.read_only:
+            raise RuntimeError("cannot write through a read-only interpretation repository")
+        conn = open_writer(self._build_path or self.db_path)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def _compute_source_digest(self) -> str:
+        return compute_source_digest(
+            index_file=self.index_file,
+            guaci_dir=self.guaci_dir,
+            takashima_dir=self.takashima_dir,
+            symbolic_dir=self.symbolic_dir,
+            english_structured_dir=self.english_structured_dir,
+        )
+
+    def _slot_index(self) -> _SlotIndex:
+        index = self._index
+        if index is not None and index.content_version == self.content_version:
+            return index
+        with self._index_lock:
+            index = self._index
+            if index is None or index.content_version != self.content_version:
+                index = self._load_slot_index()
+                self._index = index
+        return index
+
+    def _load_slot_index(self) -> _SlotIndex:
+        sql = f"""
+            SELECT {_ENTRY_COLUMNS}, ent.locale AS locale, ent.status AS status
+            FROM interpretation_entry ent
+            JOIN interpretation_slot slt ON slt.id = ent.slot_id
+            JOIN interpretation_hexagram h ON h.id = slt.hexagram_id
+            JOIN interpretation_source src ON src.id = ent.source_id
+            WHERE ent.is_current = 1
+            ORDER BY h.id ASC, {_ENTRY_ORDER}
+        """
+        with self._read_connection() as conn:
+            rows = conn.execute(sql).fetchall()
+
+        entries_by_hexagram: Dict[Tuple[str, str], List[InterpretationEntry]] = {}
+        content_by_slot: Dict[SlotIndexKey, str] = {}
+        hexagram_names: Dict[int, str] = {}
+        for row in rows:
+            entry = _entry_from_row(row)
+            locale = str(row["locale"])
+            hexagram_names[entry.hexagram_number] = entry.hexagram_name
+            if row["status"] == "published":
+                entries_by_hexagram.setdefault((entry.hexagram_name, locale), []).append(entry)
+            content = entry.content.strip()
+            if not content:
+                continue
+            content_by_slot[
+                (
+                    entry.hexagram_name,
+                    entry.source_key,
+                    entry.slot_kind,
+                    entry.line_no,
+                    entry.use_kind,
+                    locale,
+                )
+            ] = content
+            if entry.slot_kind == "use":
+                # get_slot_content(slot_kind="use") without use_kind matches any use slot.
+                content_by_slot.setdefault(
+                    (entry.hexagram_name, entry.source_key, "use", None, None, locale),
+                    content,
+                )
+
+        return _SlotIndex(
+            content_version=self.content_version,
+            entries_by_hexagram=entries_by_hexagram,
+            content_by_slot=content_by_slot,
+            hexagram_names=hexagram_names,
+        )
+
+    def _read_meta(self, key: str) -> Optional[str]:
+        if not self.db_path.exists():
+            return None
+        try:
+            with self._read_connection() as conn:
+                row = conn.execute(
+                    "SELECT value FROM interpretation_meta WHERE key = ?", (key,)
+                ).fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return str(row["value"]) if row else None
+
+    def _record_digest(self, conn: sqlite3.Connection) -> None:
+        conn.executemany(
+            """
+            INSERT INTO interpretation_meta(key, value)
+            VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = excluded.value
+            """,
+            [
+                ("source_digest", self.source_digest),
+                ("format_version", str(ARTIFACT_FORMAT_VERSION)),
+            ],
+        )
 
     def _ensure_schema(self) -> None:
         with self._connect() as conn:
@@ -516,6 +1215,22 @@ class InterpretationRepository:
                 CREATE UNIQUE INDEX IF NOT EXISTS idx_interpretation_entry_current
                   ON interpretation_entry(slot_id, source_id, locale)
                   WHERE is_current = 1;
+
+                CREATE TABLE IF NOT EXISTS interpretation_meta (
+                  key TEXT PRIMARY KEY,
+                  value TEXT NOT NULL
+                );
+
+                CREATE TABLE IF NOT EXISTS interpretation_source_file (
+                  source_key TEXT NOT NULL,
+                  file_name TEXT NOT NULL,
+                  hexagram_id INTEGER NOT NULL,
+                  size INTEGER NOT NULL,
+                  mtime_ns INTEGER NOT NULL,
+                  content_hash TEXT NOT NULL,
+                  synced_at_ns INTEGER NOT NULL,
+                  PRIMARY KEY (source_key, file_name)
+                );
                 """
             )
 
@@ -662,245 +1377,18 @@ class InterpretationRepository:
     # Internal: content import
     # ------------------------------------------------------------------ #
 
-    def _sync_source_from_directory(self, *, source_key: str, directory: Path) -> None:
-        if not directory.exists():
-            return
-
-        with self._connect() as conn:
-            source_row = conn.execute(
-                "SELECT id FROM interpretation_source WHERE source_key = ?",
-                (source_key,),
-            ).fetchone()
-            if not source_row:
-                raise ValueError(f"source not found: {source_key}")
-            source_id = int(source_row["id"])
-
-            slot_rows = conn.execute(
-                "SELECT id, canonical_key FROM interpretation_slot"
-            ).fetchall()
-            slot_id_by_key = {str(row["canonical_key"]): int(row["id"]) for row in slot_rows}
-
-            conn.execute(
-                "DELETE FROM interpretation_entry WHERE source_id = ? AND locale = ?",
-                (source_id, "zh-CN"),
-            )
-
-            payload: List[Tuple[int, int, str, str, int, str, int]] = []
-
-            for hexagram_id in range(1, 65):
-                try:
-                    data = load_guaci_by_number(hexagram_id, directory)
-                except FileNotFoundError:
-                    continue
-
-                if source_key == "guaci":
-                    top_content = data.combine_top()
-                    line_values = {
-                        str(index): data.combine_line(str(index))
-                        for index in range(1, 7)
-                    }
-                    use_content = data.combine_line("all")
-                elif source_key == "takashima":
-                    top_content = _take_takashima_top(data)
-                    line_values = {
-                        str(index): _take_takashima_line(data, str(index))
-                        for index in range(1, 7)
-                    }
-                    use_content = _take_takashima_line(data, "all")
-                else:
-                    raise ValueError(f"unsupported source for structured sync: {source_key}")
-
-                def append_entry(slot_key: str, text: Optional[str]) -> None:
-                    if not text:
-                        return
-                    cleaned = text.strip()
-                    if not cleaned:
-                        return
-                    slot_id = slot_id_by_key.get(slot_key)
-                    if slot_id is None:
-                        return
-                    payload.append(
-                        (
-                            slot_id,
-                            source_id,
-                            "zh-CN",
-                            cleaned,
-                            1,
-                            "published",
-                            1,
-                        )
-                    )
-
-                append_entry(
-                    _canonical_slot_key(hexagram_id, "gua"),
-                    top_content,
-                )
-                for line_no in range(1, 7):
-                    append_entry(
-                        _canonical_slot_key(hexagram_id, "line", line_no=line_no),
-                        line_values.get(str(line_no)),
-                    )
-
-                if hexagram_id == 1:
-                    append_entry(
-                        _canonical_slot_key(1, "use", use_kind="yong_jiu"),
-                        use_content,
-                    )
-                elif hexagram_id == 2:
-                    append_entry(
-                        _canonical_slot_key(2, "use", use_kind="yong_liu"),
-                        use_content,
-                    )
-
-            if payload:
-                conn.executemany(
-                    """
-                    INSERT INTO interpretation_entry(
-                      slot_id, source_id, locale, content, version, status, is_current
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    payload,
-                )
-
-    def _sync_symbolic_source(self, *, source_key: str, directory: Path) -> None:
-        if not directory.exists():
-            return
-
-        with self._connect() as conn:
-            source_row = conn.execute(
-                "SELECT id FROM interpretation_source WHERE source_key = ?",
-                (source_key,),
-            ).fetchone()
-            if not source_row:
-                raise ValueError(f"source not found: {source_key}")
-            source_id = int(source_row["id"])
-
-            slot_rows = conn.execute(
-                "SELECT id, canonical_key FROM interpretation_slot"
-            ).fetchall()
-            slot_id_by_key = {str(row["canonical_key"]): int(row["id"]) for row in slot_rows}
-
-            conn.execute(
-                "DELETE FROM interpretation_entry WHERE source_id = ? AND locale = ?",
-                (source_id, "zh-CN"),
-            )
-
-            content_by_hexagram: Dict[int, str] = {}
-            for file in sorted(directory.glob("*.txt")):
-                hexagram_id = _resolve_symbolic_hexagram_id(file)
-                if hexagram_id is None:
-                    continue
-                text = _clean_symbolic_text(file.read_text(encoding="utf-8"))
-                if not text:
-                    continue
-                content_by_hexagram[hexagram_id] = text
-
-            payload: List[Tuple[int, int, str, str, int, str, int]] = []
-            for hexagram_id, content in sorted(content_by_hexagram.items()):
-                slot_key = _canonical_slot_key(hexagram_id, "gua")
-                slot_id = slot_id_by_key.get(slot_key)
-                if slot_id is None:
-                    continue
-                payload.append(
-                    (
-                        slot_id,
-                        source_id,
-                        "zh-CN",
-                        content,
-                        1,
-                        "published",
-                        1,
-                    )
-                )
-
-            if payload:
-                conn.executemany(
-                    """
-                    INSERT INTO interpretation_entry(
-                      slot_id, source_id, locale, content, version, status, is_current
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    payload,
-                )
-
-    def _sync_english_source(self, *, source_key: str, directory: Path) -> None:
-        if not directory.exists():
-            return
-
-        with self._connect() as conn:
-            source_row = conn.execute(
-                "SELECT id FROM interpretation_source WHERE source_key = ?",
-                (source_key,),
-            ).fetchone()
-            if not source_row:
-                raise ValueError(f"source not found: {source_key}")
-            source_id = int(source_row["id"])
-
-            slot_rows = conn.execute(
-                "SELECT id, canonical_key FROM interpretation_slot"
-            ).fetchall()
-            slot_id_by_key = {str(row["canonical_key"]): int(row["id"]) for row in slot_rows}
-
-            conn.execute(
-                "DELETE FROM interpretation_entry WHERE source_id = ? AND locale = ?",
-                (source_id, "en-US"),
-            )
-
-            payload: List[Tuple[int, int, str, str, int, str, int]] = []
-            for hexagram_id in range(1, 65):
-                canonical = f"Hexagram {hexagram_id:02d}.json"
-                fallback = f"{hexagram_id:02d}.json"
-                path = directory / canonical
-                if not path.exists():
-                    path = directory / fallback
-                if not path.exists():
-                    continue
-
-                raw = json.loads(path.read_text(encoding="utf-8"))
-                if not isinstance(raw, dict):
-                    continue
-
-                gua_text = _clean_english_structured_text(raw.get("gua"))
-                lines_payload = raw.get("lines")
-                lines = lines_payload if isinstance(lines_payload, dict) else {}
-
-                def append_entry(slot_key: str, text: Optional[str]) -> None:
-                    if not text:
-                        return
-                    slot_id = slot_id_by_key.get(slot_key)
-                    if slot_id is None:
-                        return
-                    payload.append(
-                        (
-                            slot_id,
-                            source_id,
-                            "en-US",
-                            text,
-                            1,
-                            "published",
-                            1,
-                        )
-                    )
-
-                append_entry(_canonical_slot_key(hexagram_id, "gua"), gua_text)
-                for line_no in range(1, 7):
-                    line_text = _clean_english_structured_text(
-                        lines.get(str(line_no)) or lines.get(f"line_{line_no}")
-                    )
-                    append_entry(
-                        _canonical_slot_key(hexagram_id, "line", line_no=line_no),
-                        line_text,
-                    )
+    def _source_directories(self) -> List[Tuple[str, Path]]:
+        return [
+            ("guaci", self.guaci_dir),
+            ("takashima", self.takashima_dir),
+            ("symbolic", self.symbolic_dir),
+            ("english_commentary", self.english_structured_dir),
+        ]
 
-            if payload:
-                conn.executemany(
-                    """
-                    INSERT INTO interpretation_entry(
-                      slot_id, source_id, locale, content, version, status, is_current
-                    )
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    payload,
-                )
+    def _parse_files(self, jobs: Sequence[Tuple[str, int, str]]) -> List[List[Tuple[str, str]]]:
+        workers = SYNC_WORKERS or os.cpu_count() or 1
+        if workers > 1 and len(jobs) >= PARALLEL_PARSE_MIN_FILES:
+            chunksize = max(1, len(jobs) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(_parse_source_file, jobs, chunksize=chunksize))
+        return [_parse_source_file(job) for job in jobs]
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import sqlite3
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
 
+from iching.integrations.sqlite_pool import get_connection_pool
+
 
 @dataclass(frozen=True)
 class NajiaLine:
@@ -74,6 +76,7 @@ class NajiaRepository:
         self.db_path = Path(db_path)
         self._by_bottom: Optional[Dict[str, NajiaEntry]] = None
         self._by_top: Optional[Dict[str, NajiaEntry]] = None
+        self._load_lock = threading.Lock()
 
     def get_by_bottom(self, binary: str) -> Optional[NajiaEntry]:
         self._ensure_loaded()
@@ -88,6 +91,11 @@ class NajiaRepository:
     def _ensure_loaded(self) -> None:
         if self._by_bottom is not None and self._by_top is not None:
             return
+        with self._load_lock:
+            if self._by_bottom is None or self._by_top is None:
+                self._load()
+
+    def _load(self) -> None:
         if not self.db_path.exists():
             raise FileNotFoundError(
                 f"Najia database not found at {self.db_path}. "
@@ -97,8 +105,9 @@ class NajiaRepository:
         by_bottom: Dict[str, NajiaEntry] = {}
         by_top: Dict[str, NajiaEntry] = {}
 
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        # The compiled database is a build artifact that is never written at
+        # runtime, so readers can share an immutable, lock-free connection.
+        with get_connection_pool(self.db_path, immutable=True).connection() as conn:
             hex_rows = conn.execute(
                 "SELECT id, name, palace, descriptor, binary_top_to_bottom, "
                 "binary_bottom_to_top, header, block_text FROM hexagrams"
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+from typing import Dict, Tuple
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+try:
+    import h2  # noqa: F401
+except ImportError:  # HTTP/2 needs httpx's optional ``h2`` extra; keep-alive HTTP/1.1 otherwise.
+    HTTP2_AVAILABLE = False
+else:
+    HTTP2_AVAILABLE = True
+
+
+MAX_CONNECTIONS = int(os.getenv("ICHING_OPENAI_MAX_CONNECTIONS", "200"))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("ICHING_OPENAI_MAX_KEEPALIVE", "50"))
+KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("ICHING_OPENAI_KEEPALIVE_EXPIRY_SECONDS", "60"))
+USE_HTTP2 = os.getenv("ICHING_OPENAI_HTTP2", "1").strip().lower() not in {"0", "false", "no"}
+
+
+def _pool_settings() -> Dict[str, object]:
+    return {
+        "http2": USE_HTTP2 and HTTP2_AVAILABLE,
+        "limits": httpx.Limits(
+            max_connections=MAX_CONNECTIONS,
+            max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    }
+
+
+class OpenAIClientRegistry:
+    """Process-wide OpenAI clients keyed by API key, each on one pooled transport.
+
+    Sync clients are shared by every thread. Async clients are additionally
+    keyed by event loop, because an ``httpx.AsyncClient`` pool must not be
+    used from a loop other than the one its connections were opened on.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._clients: Dict[str, OpenAI] = {}
+        self._async_clients: Dict[Tuple[str, int], Tuple[asyncio.AbstractEventLoop, AsyncOpenAI]] = {}
+
+    def get(self, api_key: str) -> OpenAI:
+        with self._lock:
+            client = self._clients.get(api_key)
+            if client is None:
+                client = OpenAI(api_key=api_key, http_client=DefaultHttpxClient(**_pool_settings()))
+                self._clients[api_key] = client
+            return client
+
+    def get_async(self, api_key: str) -> AsyncOpenAI:
+        loop = asyncio.get_running_loop()
+        key = (api_key, id(loop))
+        with self._lock:
+            for stale_key in [k for k, (owner, _) in self._async_clients.items() if owner.is_closed()]:
+                del self._async_clients[stale_key]
+            entry = self._async_clients.get(key)
+            if entry is None or entry[0] is not loop:
+                client = AsyncOpenAI(
+                    api_key=api_key, http_client=DefaultAsyncHttpxClient(**_pool_settings())
+                )
+                entry = (loop, client)
+                self._async_clients[key] = entry
+            return entry[1]
+
+    def close(self) -> None:
+        """Close the sync pools; async pools need :meth:`close_async` on their loop."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            client.close()
+
+    async def close_async(self) -> None:
+        """Close every pool: the sync ones, and the async ones opened on this loop.
+
+        Async clients of other loops are closed on their own loop when it is
+        still running; clients of loops that are already closed are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entries = list(self._async_clients.values())
+            self._async_clients.clear()
+        self.close()
+        for owner, client in entries:
+            if owner is loop:
+                await client.close()
+            elif owner.is_running():
+                asyncio.run_coroutine_threadsafe(client.close(), owner)
+
+
+_REGISTRY = OpenAIClientRegistry()
+
+
+def get_openai_client(api_key: str) -> OpenAI:
+    return _REGISTRY.get(api_key)
+
+
+def get_async_openai_client(api_key: str) -> AsyncOpenAI:
+    """Return the shared async client for ``api_key``; call from inside a running loop."""
+    return _REGISTRY.get_async(api_key)
+
+
+async def close_openai_clients() -> None:
+    await _REGISTRY.close_async()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, Tuple
+
+
+# 256 MiB is comfortably larger than either bundled database, so every page a
+# reader touches is served straight from the shared page cache of the mapping.
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+DEFAULT_CACHED_STATEMENTS = 256
+
+
+def open_writer(db_path: Path) -> sqlite3.Connection:
+    """Open a short-lived read/write connection in WAL mode."""
+    conn = sqlite3.connect(db_path, cached_statements=DEFAULT_CACHED_STATEMENTS)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    return conn
+
+
+class SQLiteConnectionPool:
+    """Thread-local pool of long-lived, query-only SQLite connections.
+
+    Each worker thread keeps one connection for the lifetime of the pool, so
+    the schema is parsed once per thread and prepared statements stay in the
+    connection's statement cache. ``reset()`` retires every pooled connection,
+    which is required after the database file has been replaced on disk; each
+    thread closes its own stale connection the next time it asks for one.
+
+    ``immutable=True`` additionally skips all file locking and is only safe for
+    files that are never modified in place (they may still be swapped out by an
+    atomic rename followed by ``reset()``).
+    """
+
+    def __init__(self, db_path: Path, *, immutable: bool = False) -> None:
+        self.db_path = Path(db_path)
+        self.immutable = immutable
+        self._local = threading.local()
+        self._generation = 0
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        conn = self._acquire()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+
+    def reset(self) -> None:
+        self._generation += 1
+
+    def _acquire(self) -> sqlite3.Connection:
+        generation = self._generation
+        cached = getattr(self._local, "entry", None)
+        if cached is not None:
+            if cached[0] == generation:
+                return cached[1]
+            cached[1].close()
+        conn = self._open()
+        self._local.entry = (generation, conn)
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        uri = f"{self.db_path.resolve().as_uri()}?mode=ro"
+        if self.immutable:
+            uri += "&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, cached_statements=DEFAULT_CACHED_STATEMENTS)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA mmap_size = {DEFAULT_MMAP_SIZE}")
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute("PRAGMA foreign_keys = ON")
+        return conn
+
+
+_POOLS: Dict[Tuple[str, bool], SQLiteConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(db_path: Path, *, immutable: bool = False) -> SQLiteConnectionPool:
+    """Return the process-wide pool for ``db_path``, creating it on first use."""
+    key = (str(Path(db_path).resolve()), immutable)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            pool = SQLiteConnectionPool(Path(db_path), immutable=immutable)
+            _POOLS[key] = pool
+        return pool
@@ -2,10 +2,12 @@ from __future__ import annotations
 
 import os
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 
+from iching.integrations.supabase_jwt import InvalidTokenError, SupabaseTokenVerifier, VerifiedToken
+
 
 class SupabaseConfigurationError(RuntimeError):
     """Raised when Supabase credentials are missing but required."""
@@ -22,20 +24,20 @@ class SupabaseUser:
     metadata: Optional[Dict[str, Any]] = None
 
 
-class SupabaseRestClient:
-    """Thin wrapper around Supabase REST + auth endpoints using httpx."""
+class _SupabaseEndpoints:
+    """Credentials, endpoint URLs and headers shared by the sync and async clients."""
 
     def __init__(
         self,
         *,
-        project_url: Optional[str] = None,
-        service_key: Optional[str] = None,
-        client: Optional[httpx.Client] = None,
+        project_url: Optional[str],
+        service_key: Optional[str],
+        token_verifier: Optional[SupabaseTokenVerifier] = None,
     ) -> None:
         self.project_url = (project_url or os.getenv("SUPABASE_URL") or "").rstrip("/")
         self.service_key = service_key or os.getenv("SUPABASE_SERVICE_KEY") or ""
+        self.token_verifier = token_verifier or SupabaseTokenVerifier()
         self._timeout = httpx.Timeout(10.0)
-        self._client = client or httpx.Client(timeout=self._timeout)
 
     @property
     def enabled(self) -> bool:
@@ -53,27 +55,113 @@ class SupabaseRestClient:
             raise SupabaseConfigurationError("Supabase Auth endpoint not configured.")
         return f"{self.project_url}/auth/v1"
 
-    def verify_access_token(self, token: str) -> SupabaseUser:
+    @property
+    def jwks_url(self) -> str:
+        return f"{self.auth_base}/.well-known/jwks.json"
+
+    def _auth_headers(self, token: str) -> Dict[str, str]:
         if not self.enabled:
             raise SupabaseConfigurationError("Supabase credentials missing for auth verification.")
         if not token:
             raise SupabaseAuthError("Missing Supabase access token.")
-        headers = {
+        return {
             "apikey": self.service_key,
             "Authorization": f"Bearer {token}",
         }
-        response = self._client.get(f"{self.auth_base}/user", headers=headers)
+
+    def _service_headers(self) -> Dict[str, str]:
+        if not self.enabled:
+            raise SupabaseConfigurationError("Supabase credentials missing.")
+        return {
+            "apikey": self.service_key,
+            "Authorization": f"Bearer {self.service_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _known_user(self, token: str) -> Optional[SupabaseUser]:
+        """Resolve ``token`` from the verified-token cache or its signature alone.
+
+        Returns ``None`` when neither can decide, so the caller asks Supabase.
+        """
+        verified = self.token_verifier.cached(token)
+        if verified is None:
+            try:
+                verified = self.token_verifier.verify_locally(token)
+            except InvalidTokenError as exc:
+                raise SupabaseAuthError("Supabase token verification failed.") from exc
+            if verified is None:
+                return None
+            self.token_verifier.remember(token, verified)
+        return _user_from_verified_token(verified)
+
+    def _remember_user(self, token: str, user: SupabaseUser) -> None:
+        verified = self.token_verifier.from_remote(token, user.id, user.email, user.metadata)
+        if verified is not None:
+            self.token_verifier.remember(token, verified)
+
+    def _load_jwks(self, response: httpx.Response) -> None:
         if response.status_code != 200:
-            raise SupabaseAuthError("Supabase token verification failed.")
-        payload = response.json()
-        user_id = payload.get("id")
-        if not user_id:
-            raise SupabaseAuthError("Supabase response missing user id.")
-        return SupabaseUser(
-            id=user_id,
-            email=payload.get("email"),
-            metadata=payload.get("user_metadata"),
-        )
+            return
+        try:
+            document = response.json()
+        except ValueError:
+            return
+        if isinstance(document, dict):
+            self.token_verifier.load_jwks(document)
+
+
+def _user_from_verified_token(verified: VerifiedToken) -> SupabaseUser:
+    return SupabaseUser(id=verified.user_id, email=verified.email, metadata=verified.metadata)
+
+
+def _user_from_auth_response(response: httpx.Response) -> SupabaseUser:
+    if response.status_code != 200:
+        raise SupabaseAuthError("Supabase token verification failed.")
+    payload = response.json()
+    user_id = payload.get("id")
+    if not user_id:
+        raise SupabaseAuthError("Supabase response missing user id.")
+    return SupabaseUser(
+        id=user_id,
+        email=payload.get("email"),
+        metadata=payload.get("user_metadata"),
+    )
+
+
+def _session_owner_params(session_id: str, user_id: str) -> Dict[str, str]:
+    return {
+        "session_id": f"eq.{session_id}",
+        "user_id": f"eq.{user_id}",
+    }
+
+
+class SupabaseRestClient(_SupabaseEndpoints):
+    """Thin wrapper around Supabase REST + auth endpoints using httpx."""
+
+    def __init__(
+        self,
+        *,
+        project_url: Optional[str] = None,
+        service_key: Optional[str] = None,
+        client: Optional[httpx.Client] = None,
+        token_verifier: Optional[SupabaseTokenVerifier] = None,
+    ) -> None:
+        super().__init__(project_url=project_url, service_key=service_key, token_verifier=token_verifier)
+        self._client = client or httpx.Client(timeout=self._timeout)
+
+    def verify_access_token(self, token: str) -> SupabaseUser:
+        headers = self._auth_headers(token)
+        if self.token_verifier.needs_keys(token):
+            try:
+                self._load_jwks(self._client.get(self.jwks_url, headers={"apikey": self.service_key}))
+            except httpx.HTTPError:
+                pass
+        user = self._known_user(token)
+        if user is None:
+            response = self._client.get(f"{self.auth_base}/user", headers=headers)
+            user = _user_from_auth_response(response)
+            self._remember_user(token, user)
+        return user
 
     def fetch_session(self, *, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         if not self.enabled:
@@ -114,6 +202,15 @@ class SupabaseRestClient:
         records = response.json()
         return records[0] if records else None
 
+    def upsert_sessions(self, payloads: List[Dict[str, Any]]) -> None:
+        """Bulk upsert; every row must carry the same columns."""
+        if not self.enabled or not payloads:
+            return
+        headers = self._service_headers()
+        headers["Prefer"] = "resolution=merge-duplicates,return=minimal"
+        response = self._client.post(f"{self.rest_base}/sessions", headers=headers, json=payloads)
+        response.raise_for_status()
+
     def update_session(self, session_id: str, user_id: str, payload: Dict[str, Any]) -> None:
         if not self.enabled:
             return
@@ -230,6 +327,37 @@ class SupabaseRestClient:
         records = response.json()
         return records if isinstance(records, list) else []
 
+    def list_session_summaries(
+        self,
+        *,
+        user_id: str,
+        limit: int,
+        select: str,
+        before: Optional[Tuple[str, str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """Keyset page of a user's sessions ordered by ``(updated_at, session_id)`` descending.
+
+        ``before`` is the ``(updated_at, session_id)`` of the last row already seen.
+        """
+        if not self.enabled:
+            return []
+        params = {
+            "user_id": f"eq.{user_id}",
+            "order": "updated_at.desc,session_id.desc",
+            "select": select,
+            "limit": str(max(0, limit)),
+        }
+        if before is not None:
+            updated_at, session_id = (value.replace('"', "") for value in before)
+            params["or"] = (
+                f'(updated_at.lt."{updated_at}",'
+                f'and(updated_at.eq."{updated_at}",session_id.lt."{session_id}"))'
+            )
+        response = self._client.get(f"{self.rest_base}/sessions", params=params, headers=self._service_headers())
+        response.raise_for_status()
+        records = response.json()
+        return records if isinstance(records, list) else []
+
     def list_sessions_page(
         self,
         *,
@@ -320,11 +448,126 @@ class SupabaseRestClient:
             raise RuntimeError(f"Supabase delete from {table} returned an invalid response.")
         return records
 
-    def _service_headers(self) -> Dict[str, str]:
+
+class AsyncSupabaseRestClient(_SupabaseEndpoints):
+    """``httpx.AsyncClient`` twin of :class:`SupabaseRestClient` for the request path.
+
+    Only the calls made while creating a session and answering chat requests
+    are mirrored; admin and chart-archive operations stay on the sync client.
+    """
+
+    def __init__(
+        self,
+        *,
+        project_url: Optional[str] = None,
+        service_key: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        token_verifier: Optional[SupabaseTokenVerifier] = None,
+    ) -> None:
+        super().__init__(project_url=project_url, service_key=service_key, token_verifier=token_verifier)
+        self._client = client or httpx.AsyncClient(timeout=self._timeout)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def verify_access_token(self, token: str) -> SupabaseUser:
+        headers = self._auth_headers(token)
+        if self.token_verifier.needs_keys(token):
+            try:
+                self._load_jwks(await self._client.get(self.jwks_url, headers={"apikey": self.service_key}))
+            except httpx.HTTPError:
+                pass
+        user = self._known_user(token)
+        if user is None:
+            response = await self._client.get(f"{self.auth_base}/user", headers=headers)
+            user = _user_from_auth_response(response)
+            self._remember_user(token, user)
+        return user
+
+    async def fetch_session(self, *, session_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         if not self.enabled:
-            raise SupabaseConfigurationError("Supabase credentials missing.")
-        return {
-            "apikey": self.service_key,
-            "Authorization": f"Bearer {self.service_key}",
-            "Content-Type": "application/json",
+            return None
+        params = _session_owner_params(session_id, user_id)
+        params.update({"limit": "1", "select": "*"})
+        response = await self._client.get(
+            f"{self.rest_base}/sessions", params=params, headers=self._service_headers()
+        )
+        response.raise_for_status()
+        records = response.json()
+        return records[0] if records else None
+
+    async def upsert_session(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        if not self.enabled:
+            return None
+        headers = self._service_headers()
+        headers["Prefer"] = "resolution=merge-duplicates,return=representation"
+        response = await self._client.post(f"{self.rest_base}/sessions", headers=headers, json=payload)
+        response.raise_for_status()
+        records = response.json()
+        return records[0] if records else None
+
+    async def update_session(self, session_id: str, user_id: str, payload: Dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        headers = self._service_headers()
+        headers["Prefer"] = "resolution=merge-duplicates"
+        response = await self._client.patch(
+            f"{self.rest_base}/sessions",
+            params=_session_owner_params(session_id, user_id),
+            headers=headers,
+            json=payload,
+        )
+        response.raise_for_status()
+
+    async def delete_session(self, session_id: str, user_id: str) -> None:
+        if not self.enabled:
+            return
+        response = await self._client.delete(
+            f"{self.rest_base}/sessions",
+            params=_session_owner_params(session_id, user_id),
+            headers=self._service_headers(),
+        )
+        response.raise_for_status()
+
+    async def list_session_ids(self, *, user_id: str, limit: int, offset: int) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        params = {
+            "user_id": f"eq.{user_id}",
+            "order": "updated_at.desc",
+            "select": "session_id",
+            "limit": str(max(0, limit)),
+            "offset": str(max(0, offset)),
         }
+        response = await self._client.get(
+            f"{self.rest_base}/sessions", params=params, headers=self._service_headers()
+        )
+        response.raise_for_status()
+        records = response.json()
+        return records if isinstance(records, list) else []
+
+    async def insert_chat_messages(self, records: List[Dict[str, Any]]) -> None:
+        if not self.enabled or not records:
+            return
+        headers = self._service_headers()
+        headers["Prefer"] = "resolution=merge-duplicates"
+        response = await self._client.post(
+            f"{self.rest_base}/chat_messages",
+            headers=headers,
+            json=records,
+        )
+        response.raise_for_status()
+
+    async def fetch_chat_messages(self, *, session_id: str, user_id: str) -> List[Dict[str, Any]]:
+        if not self.enabled:
+            return []
+        params = _session_owner_params(session_id, user_id)
+        params.update({"order": "created_at.asc", "select": "*"})
+        response = await self._client.get(
+            f"{self.rest_base}/chat_messages",
+            params=params,
+            headers=self._service_headers(),
+        )
+        response.raise_for_status()
+        items = response.json()
+        return items if isinstance(items, list) else []
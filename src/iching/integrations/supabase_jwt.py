@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import base64
+import hashlib
+import hmac
+import json
+import os
+import time
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from iching.core.cache import BoundedCache
+
+try:
+    from cryptography.exceptions import InvalidSignature
+    from cryptography.hazmat.primitives import hashes
+    from cryptography.hazmat.primitives.asymmetric import ec, padding, rsa
+    from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+except ImportError:  # Asymmetric (JWKS) tokens then fall back to the remote check.
+    ec = None
+
+
+SUPABASE_JWT_AUDIENCE = os.getenv("SUPABASE_JWT_AUDIENCE", "authenticated")
+TOKEN_CACHE_LIMIT = int(os.getenv("ICHING_SUPABASE_TOKEN_CACHE_LIMIT", "10000"))
+TOKEN_CACHE_TTL_SECONDS = int(os.getenv("ICHING_SUPABASE_TOKEN_CACHE_TTL_SECONDS", "300"))
+JWKS_TTL_SECONDS = int(os.getenv("ICHING_SUPABASE_JWKS_TTL_SECONDS", "600"))
+# Minimum spacing between JWKS refetches triggered by an unknown ``kid``.
+JWKS_RETRY_SECONDS = 60
+CLOCK_SKEW_SECONDS = 30
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+
+class InvalidTokenError(ValueError):
+    """Raised when a token is malformed, forged, expired or meant for someone else."""
+
+
+@dataclass(frozen=True, slots=True)
+class VerifiedToken:
+    user_id: str
+    email: Optional[str]
+    metadata: Optional[Dict[str, Any]]
+    expires_at: float
+
+
+def _b64url_decode(segment: str) -> bytes:
+    try:
+        return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+    except (ValueError, TypeError) as exc:
+        raise InvalidTokenError("Malformed token encoding.") from exc
+
+
+def _b64url_int(segment: str) -> int:
+    return int.from_bytes(_b64url_decode(segment), "big")
+
+
+def decode_unverified(token: str) -> Tuple[Dict[str, Any], Dict[str, Any], bytes, bytes]:
+    """Split a compact JWS into ``(header, claims, signing_input, signature)``."""
+    parts = token.split(".")
+    if len(parts) != 3:
+        raise InvalidTokenError("Token is not a compact JWS.")
+    try:
+        header = json.loads(_b64url_decode(parts[0]))
+        claims = json.loads(_b64url_decode(parts[1]))
+    except ValueError as exc:
+        raise InvalidTokenError("Malformed token segments.") from exc
+    if not isinstance(header, dict) or not isinstance(claims, dict):
+        raise InvalidTokenError("Malformed token segments.")
+    signing_input = f"{parts[0]}.{parts[1]}".encode("ascii")
+    return header, claims, signing_input, _b64url_decode(parts[2])
+
+
+def _public_key_from_jwk(jwk: Dict[str, Any]) -> Optional[object]:
+    if ec is None:
+        return None
+    try:
+        if jwk.get("kty") == "RSA":
+            return rsa.RSAPublicNumbers(_b64url_int(jwk["e"]), _b64url_int(jwk["n"])).public_key()
+        if jwk.get("kty") == "EC" and jwk.get("crv") == "P-256":
+            return ec.EllipticCurvePublicNumbers(
+                _b64url_int(jwk["x"]), _b64url_int(jwk["y"]), ec.SECP256R1()
+            ).public_key()
+    except (KeyError, ValueError, InvalidTokenError):
+        return None
+    return None
+
+
+def _verify_asymmetric(algorithm: str, key: object, signing_input: bytes, signature: bytes) -> bool:
+    try:
+        if algorithm == "RS256":
+            key.verify(signature, signing_input, padding.PKCS1v15(), hashes.SHA256())
+            return True
+        if algorithm == "ES256" and len(signature) == 64:
+            der = encode_dss_signature(
+                int.from_bytes(signature[:32], "big"), int.from_bytes(signature[32:], "big")
+            )
+            key.verify(der, signing_input, ec.ECDSA(hashes.SHA256()))
+            return True
+    except (InvalidSignature, TypeError, ValueError):
+        return False
+    return False
+
+
+class SupabaseTokenVerifier:
+    """Local verification of Supabase access tokens plus a cache of verified ones.
+
+    HS256 tokens are checked against the project JWT secret; RS256/ES256
+    tokens against the project JWKS when ``cryptography`` is installed.
+    ``verify_locally`` returns ``None`` whenever it cannot decide (no key, an
+    unknown algorithm, not a JWS at all), which callers treat as "ask
+    Supabase". Cached entries never outlive the token's ``exp``.
+    """
+
+    def __init__(
+        self,
+        *,
+        secret: Optional[str] = None,
+        audience: Optional[str] = SUPABASE_JWT_AUDIENCE,
+        cache_limit: int = TOKEN_CACHE_LIMIT,
+        cache_ttl_seconds: float = TOKEN_CACHE_TTL_SECONDS,
+        jwks_ttl_seconds: float = JWKS_TTL_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.secret = secret if secret is not None else os.getenv("SUPABASE_JWT_SECRET", "")
+        self.audience = audience or None
+        self._clock = clock
+        self._tokens: BoundedCache[str, VerifiedToken] = BoundedCache(
+            max_entries=cache_limit,
+            ttl_seconds=cache_ttl_seconds,
+        )
+        self._jwks_ttl_seconds = jwks_ttl_seconds
+        self._lock = Lock()
+        self._keys: Dict[str, object] = {}
+        self._keys_loaded_at: Optional[float] = None
+        self._keys_requested_at: Optional[float] = None
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def cached(self, token: str) -> Optional[VerifiedToken]:
+        verified = self._tokens.get(self._cache_key(token))
+        if verified is None or verified.expires_at <= self._clock():
+            return None
+        return verified
+
+    def remember(self, token: str, verified: VerifiedToken) -> None:
+        if verified.expires_at > self._clock():
+            self._tokens.put(self._cache_key(token), verified)
+
+    def clear(self) -> None:
+        self._tokens.clear()
+
+    def needs_keys(self, token: str) -> bool:
+        """Whether a JWKS (re)fetch could let ``token`` be verified locally."""
+        if ec is None:
+            return False
+        try:
+            header = decode_unverified(token)[0]
+        except InvalidTokenError:
+            return False
+        if header.get("alg") not in ASYMMETRIC_ALGORITHMS:
+            return False
+        now = self._clock()
+        with self._lock:
+            fresh = (
+                self._keys_loaded_at is not None
+                and now - self._keys_loaded_at < self._jwks_ttl_seconds
+            )
+            if fresh and header.get("kid") in self._keys:
+                return False
+            recently_requested = (
+                self._keys_requested_at is not None
+                and now - self._keys_requested_at < JWKS_RETRY_SECONDS
+            )
+            if recently_requested and (fresh or not self._keys):
+                return False
+            self._keys_requested_at = now
+            return True
+
+    def load_jwks(self, document: Dict[str, Any]) -> None:
+        keys: Dict[str, object] = {}
+        for jwk in document.get("keys") or []:
+            if not isinstance(jwk, dict) or not jwk.get("kid"):
+                continue
+            key = _public_key_from_jwk(jwk)
+            if key is not None:
+                keys[str(jwk["kid"])] = key
+        with self._lock:
+            self._keys = keys
+            self._keys_loaded_at = self._clock()
+
+    def verify_locally(self, token: str) -> Optional[VerifiedToken]:
+        try:
+            header, claims, signing_input, signature = decode_unverified(token)
+        except InvalidTokenError:
+            return None
+        algorithm = header.get("alg")
+        if algorithm == "HS256":
+            if not self.secret:
+                return None
+            expected = hmac.new(self.secret.encode("utf-8"), signing_input, hashlib.sha256).digest()
+            if not hmac.compare_digest(expected, signature):
+                raise InvalidTokenError("Token signature mismatch.")
+        elif algorithm in ASYMMETRIC_ALGORITHMS:
+            with self._lock:
+                key = self._keys.get(str(header.get("kid")))
+            if key is None:
+                return None
+            if not _verify_asymmetric(algorithm, key, signing_input, signature):
+                raise InvalidTokenError("Token signature mismatch.")
+        else:
+            return None
+        return self._check_claims(claims)
+
+    def from_remote(
+        self,
+        token: str,
+        user_id: str,
+        email: Optional[str],
+        metadata: Optional[Dict[str, Any]],
+    ) -> Optional[VerifiedToken]:
+        """Wrap a user Supabase confirmed; ``None`` if the token carries no usable ``exp``."""
+        try:
+            claims = decode_unverified(token)[1]
+        except InvalidTokenError:
+            return None
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)):
+            return None
+        return VerifiedToken(user_id=user_id, email=email, metadata=metadata, expires_at=float(expires_at))
+
+    def _check_claims(self, claims: Dict[str, Any]) -> VerifiedToken:
+        now = self._clock()
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= now:
+            raise InvalidTokenError("Token has expired.")
+        not_before = claims.get("nbf")
+        if isinstance(not_before, (int, float)) and not_before > now + CLOCK_SKEW_SECONDS:
+            raise InvalidTokenError("Token is not valid yet.")
+        if self.audience is not None:
+            audience = claims.get("aud")
+            audiences = audience if isinstance(audience, list) else [audience]
+            if self.audience not in audiences:
+                raise InvalidTokenError("Token audience mismatch.")
+        user_id = claims.get("sub")
+        if not user_id:
+            raise InvalidTokenError("Token is missing its subject.")
+        metadata = claims.get("user_metadata")
+        return VerifiedToken(
+            user_id=str(user_id),
+            email=claims.get("email"),
+            metadata=metadata if isinstance(metadata, dict) else None,
+            expires_at=float(expires_at),
+        )
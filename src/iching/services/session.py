@@ -1,15 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import copy
 import os
 import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import asdict, dataclass, field
 from datetime import datetime
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
 from uuid import uuid4
 
 from iching.config import AppConfig, PATHS, build_app_config
 from iching.core.bazi import BaZiCalculator
+from iching.core.cache import BoundedCache
 from iching.core.divination import AVAILABLE_METHODS, DivinationMethod
+from iching.core.guaci_repository import register_guaci_artifact
 from iching.core.hexagram import Hexagram, load_hexagram_definitions
 from iching.core.najia import derive_six_gods, rebase_relation
 from iching.core.time_utils import get_current_time
@@ -19,21 +27,54 @@ from iching.integrations.ai import (
     AIResponseData,
     normalize_model_name,
     start_analysis,
+    start_analysis_async,
 )
 from iching.integrations.interpretation_repository import InterpretationRepository
 from iching.integrations.najia_repository import NajiaEntry, NajiaRepository
 
 
+READING_CACHE_LIMIT = int(os.getenv("ICHING_READING_CACHE_LIMIT", "1024"))
+READING_CACHE_TTL_SECONDS = int(os.getenv("ICHING_READING_CACHE_TTL_SECONDS", str(6 * 3600)))
+CPU_WORKERS = int(os.getenv("ICHING_CPU_WORKERS", "4"))
+SESSION_HISTORY_LIMIT = int(os.getenv("ICHING_SESSION_HISTORY_LIMIT", "100"))
+
+ReadingCacheKey = Tuple[Tuple[object, ...], str]
+
+_CPU_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_CPU_EXECUTOR_LOCK = Lock()
+
+
+def get_cpu_executor() -> ThreadPoolExecutor:
+    """Bounded pool for chart and text work started from async request handlers."""
+    global _CPU_EXECUTOR
+    with _CPU_EXECUTOR_LOCK:
+        if _CPU_EXECUTOR is None:
+            _CPU_EXECUTOR = ThreadPoolExecutor(
+                max_workers=max(1, CPU_WORKERS), thread_name_prefix="iching-cpu"
+            )
+        return _CPU_EXECUTOR
+
+
+@dataclass(frozen=True, slots=True)
+class RenderedReading:
+    """Deterministic text assembly for one line vector; shared across sessions."""
+
+    hex_text: str
+    hex_sections: List[Dict[str, object]]
+    hex_overview: Dict[str, object]
+    najia_skeleton: Dict[str, object]
+
+
 def _default_input(prompt: str) -> str:
     return input(prompt)
 
 
-def _build_najia_table(
+def _build_najia_skeleton(
     main_entry: Optional[NajiaEntry],
     changed_entry: Optional[NajiaEntry],
     line_overview: List[Dict[str, object]],
-    day_stem: Optional[str],
 ) -> Dict[str, object]:
+    """Najia table for a line vector before the day-dependent six gods are set."""
     meta: Dict[str, Optional[Dict[str, Optional[str]]]] = {"main": None, "changed": None}
     if main_entry:
         meta["main"] = {
@@ -54,9 +95,6 @@ def _build_najia_table(
     if len(overview) < 6:
         overview.extend({} for _ in range(6 - len(overview)))
 
-    six_gods = derive_six_gods(day_stem)
-    god_map = {index + 1: god for index, god in enumerate(six_gods)}
-
     rows: List[Dict[str, object]] = []
     for idx in range(6):
         line_info = overview[idx] if idx < len(overview) else {}
@@ -82,7 +120,7 @@ def _build_najia_table(
                 "changed_line_type": changed_line_type,
                 "is_moving": is_moving,
                 "moving_symbol": moving_symbol,
-                "god": god_map.get(position, ""),
+                "god": "",
                 "hidden": main_line.hidden if main_line else "",
                 "main_relation": main_line.relation if main_line else "",
                 "main_mark": main_line.glyph if main_line else "",
@@ -96,6 +134,33 @@ def _build_najia_table(
     return {"meta": meta, "rows": rows}
 
 
+def _apply_six_gods(skeleton: Dict[str, object], day_stem: Optional[str]) -> Dict[str, object]:
+    """Return a copy of a Najia skeleton with the six gods for ``day_stem`` filled in."""
+    meta = skeleton.get("meta")
+    rows = skeleton.get("rows")
+    if not isinstance(rows, list) or not rows:
+        return {"meta": copy.deepcopy(meta), "rows": []}
+
+    six_gods = derive_six_gods(day_stem)
+    god_map = {index + 1: god for index, god in enumerate(six_gods)}
+    filled: List[Dict[str, object]] = []
+    for row in rows:
+        entry = dict(row)
+        entry["god"] = god_map.get(entry.get("position"), "")
+        filled.append(entry)
+    return {"meta": copy.deepcopy(meta), "rows": filled}
+
+
+def _build_najia_table(
+    main_entry: Optional[NajiaEntry],
+    changed_entry: Optional[NajiaEntry],
+    line_overview: List[Dict[str, object]],
+    day_stem: Optional[str],
+) -> Dict[str, object]:
+    skeleton = _build_najia_skeleton(main_entry, changed_entry, line_overview)
+    return _apply_six_gods(skeleton, day_stem)
+
+
 def _normalized_entry_payload(
     entry: Optional[NajiaEntry],
     rows: List[Dict[str, object]],
@@ -168,10 +233,12 @@ def build_session_najia_payload(
     changed_entry: Optional[NajiaEntry],
     line_overview: List[Dict[str, object]],
     day_stem: Optional[str],
+    *,
+    najia_skeleton: Optional[Dict[str, object]] = None,
 ) -> Tuple[Dict[str, object], Dict[str, object], str]:
-    najia_table = _build_najia_table(
-        main_entry, changed_entry, line_overview, day_stem
-    )
+    if najia_skeleton is None:
+        najia_skeleton = _build_najia_skeleton(main_entry, changed_entry, line_overview)
+    najia_table = _apply_six_gods(najia_skeleton, day_stem)
     rows = najia_table.get("rows")
     normalized_rows = rows if isinstance(rows, list) else []
     najia_text = _render_najia_text(najia_table)
@@ -802,10 +869,17 @@ class SessionService:
         "q": "就地退出",
     }
 
-    def __init__(self, config: Optional[AppConfig] = None) -> None:
+    def __init__(
+        self,
+        config: Optional[AppConfig] = None,
+        *,
+        history_limit: int = SESSION_HISTORY_LIMIT,
+    ) -> None:
         self.config = config or build_app_config()
         self.definitions = load_hexagram_definitions(self.config.paths.gua_index_file)
         self.najia_repo = NajiaRepository(self.config.paths.najia_db)
+        if self.config.paths.guaci_artifact.exists():
+            register_guaci_artifact(self.config.paths.guaci_artifact)
         self.interpretation_repo = InterpretationRepository(
             db_path=self.config.paths.interpretation_db,
             index_file=self.config.paths.gua_index_file,
@@ -813,8 +887,14 @@ class SessionService:
             takashima_dir=self.config.paths.takashima_dir,
             symbolic_dir=self.config.paths.symbolic_dir,
             english_structured_dir=self.config.paths.english_structured_dir,
+            read_only=self.config.interpretation_read_only,
+        )
+        self.reading_cache: BoundedCache[ReadingCacheKey, RenderedReading] = BoundedCache(
+            max_entries=READING_CACHE_LIMIT,
+            ttl_seconds=READING_CACHE_TTL_SECONDS,
         )
-        self._history: List[SessionResult] = []
+        # Ring buffer of the most recent results; a limit of 0 keeps none.
+        self._history: Deque[SessionResult] = deque(maxlen=max(0, history_limit))
 
     @property
     def history(self) -> List[SessionResult]:
@@ -1001,6 +1081,115 @@ class SessionService:
         interactive: bool = False,
         input_func: Callable[[str], str] = _default_input,
     ) -> SessionResult:
+        session_payload, should_use_ai = self._prepare_session(
+            topic=topic,
+            user_question=user_question,
+            method_key=method_key,
+            user_context=user_context,
+            use_current_time=use_current_time,
+            timestamp=timestamp,
+            manual_lines=manual_lines,
+            lines_override=lines_override,
+            enable_ai=enable_ai,
+            ai_model=ai_model,
+            ai_reasoning=ai_reasoning,
+            ai_verbosity=ai_verbosity,
+            ai_tone=ai_tone,
+            interactive=interactive,
+            input_func=input_func,
+        )
+        ai_result: Optional[AIResponseData] = None
+        if should_use_ai:
+            ai_result = start_analysis(
+                session_payload,
+                api_key=api_key,
+                model_hint=session_payload["ai_model"],
+                interactive=interactive,
+                reasoning_effort=session_payload["ai_reasoning"],
+                verbosity=session_payload["ai_verbosity"],
+                tone=session_payload["ai_tone"],
+            )
+        return self._finish_session(session_payload, ai_result)
+
+    async def create_session_async(
+        self,
+        *,
+        topic: str,
+        user_question: Optional[str],
+        method_key: str,
+        user_context: Optional[str] = None,
+        use_current_time: bool = True,
+        timestamp: Optional[datetime] = None,
+        manual_lines: Optional[List[int]] = None,
+        lines_override: Optional[List[int]] = None,
+        enable_ai: Optional[bool] = None,
+        ai_model: Optional[str] = None,
+        ai_reasoning: Optional[str] = None,
+        ai_verbosity: Optional[str] = None,
+        ai_tone: Optional[str] = "normal",
+        api_key: Optional[str] = None,
+    ) -> SessionResult:
+        """Non-interactive :meth:`create_session` for an event loop.
+
+        Casting, charting and rendering run on :func:`get_cpu_executor`; the AI
+        call is awaited on the async OpenAI client so the loop stays free.
+        """
+        loop = asyncio.get_running_loop()
+        executor = get_cpu_executor()
+        session_payload, should_use_ai = await loop.run_in_executor(
+            executor,
+            partial(
+                self._prepare_session,
+                topic=topic,
+                user_question=user_question,
+                method_key=method_key,
+                user_context=user_context,
+                use_current_time=use_current_time,
+                timestamp=timestamp,
+                manual_lines=manual_lines,
+                lines_override=lines_override,
+                enable_ai=enable_ai,
+                ai_model=ai_model,
+                ai_reasoning=ai_reasoning,
+                ai_verbosity=ai_verbosity,
+                ai_tone=ai_tone,
+                interactive=False,
+            ),
+        )
+        ai_result: Optional[AIResponseData] = None
+        if should_use_ai:
+            ai_result = await start_analysis_async(
+                session_payload,
+                api_key=api_key,
+                model_hint=session_payload["ai_model"],
+                reasoning_effort=session_payload["ai_reasoning"],
+                verbosity=session_payload["ai_verbosity"],
+                tone=session_payload["ai_tone"],
+            )
+        return await loop.run_in_executor(
+            executor, self._finish_session, session_payload, ai_result
+        )
+
+    def _prepare_session(
+        self,
+        *,
+        topic: str,
+        user_question: Optional[str],
+        method_key: str,
+        user_context: Optional[str] = None,
+        use_current_time: bool = True,
+        timestamp: Optional[datetime] = None,
+        manual_lines: Optional[List[int]] = None,
+        lines_override: Optional[List[int]] = None,
+        enable_ai: Optional[bool] = None,
+        ai_model: Optional[str] = None,
+        ai_reasoning: Optional[str] = None,
+        ai_verbosity: Optional[str] = None,
+        ai_tone: Optional[str] = "normal",
+        interactive: bool = False,
+        input_func: Callable[[str], str] = _default_input,
+    ) -> Tuple[Dict[str, Any], bool]:
+        """Cast, chart and render a session up to (not including) the AI call."""
         method = self.methods.get(method_key)
         if method is None:
             raise ValueError(f"未知的占卜方法: {method_key}")
@@ -1027,11 +1216,10 @@ class SessionService:
         day_stem = bazi_components.get("day_stem")
 
         hexagram = Hexagram(lines, self.definitions)
-        hex_text, hex_sections, hex_overview = hexagram.to_text_package(
-            guaci_path=self.config.paths.guaci_dir,
-            takashima_path=self.config.paths.takashima_dir,
-            interpretation_repo=self.interpretation_repo,
-        )
+        reading = self.render_reading(hexagram)
+        hex_text = reading.hex_text
+        hex_sections = copy.deepcopy(reading.hex_sections)
+        hex_overview = copy.deepcopy(reading.hex_overview)
 
         main_najia_entry = self.najia_repo.get_by_bottom(hexagram.binary)
         changed_najia_entry = (
@@ -1040,12 +1228,13 @@ class SessionService:
             else None
         )
         najia_table, najia_data, najia_text = build_session_najia_payload(
-            main_najia_entry, changed_najia_entry, hex_overview.get("lines", []), day_stem
+            main_najia_entry,
+            changed_najia_entry,
+            hex_overview.get("lines", []),
+            day_stem,
+            najia_skeleton=reading.najia_skeleton,
         )
 
-        ai_analysis_text = None
-        ai_response_id: Optional[str] = None
-        ai_usage: Optional[Dict[str, int]] = None
         tone_profile = ai_tone or "normal"
         should_use_ai = self.config.enable_ai if enable_ai is None else enable_ai
         model_hint = normalize_model_name(ai_model or self.config.preferred_ai_model or DEFAULT_MODEL)
@@ -1098,30 +1287,65 @@ class SessionService:
             "ai_response_id": None,
             "ai_usage": None,
         }
+        return session_payload, should_use_ai
+
+    def analyze_session(self, result: SessionResult, *, api_key: Optional[str] = None) -> SessionResult:
+        """Run the AI step for a session created without it.
+
+        Returns a new result carrying the analysis and an AI-aware reading brief;
+        ``result`` and the session history are left untouched.
+        """
+        ai_result = start_analysis(
+            result.to_dict(),
+            api_key=api_key,
+            model_hint=result.ai_model,
+            interactive=False,
+            reasoning_effort=result.ai_reasoning,
+            verbosity=result.ai_verbosity,
+            tone=result.ai_tone,
+        )
+        return self.with_analysis(result, ai_result)
 
-        if should_use_ai:
-            ai_result = start_analysis(
-                session_payload,
-                api_key=api_key,
-                model_hint=model_hint,
-                interactive=interactive,
-                reasoning_effort=reasoning_effort,
-                verbosity=verbosity_level,
-                tone=tone_profile,
-            )
-            if ai_result:
-                ai_analysis_text = ai_result.text
-                ai_response_id = ai_result.response_id
-                ai_usage = ai_result.usage
-                session_payload["ai_analysis"] = ai_analysis_text
-                session_payload["ai_response_id"] = ai_response_id
-                session_payload["ai_usage"] = ai_usage
+    def with_analysis(self, result: SessionResult, ai_result: Optional[AIResponseData]) -> SessionResult:
+        """Copy of ``result`` with ``ai_result`` folded in (brief and full text rebuilt)."""
+        session_payload = result.to_dict()
+        session_payload.pop("reading_brief", None)
+        return self._finish_session(session_payload, ai_result, record=False)
+
+    def _finish_session(
+        self,
+        session_payload: Dict[str, Any],
+        ai_result: Optional[AIResponseData],
+        *,
+        record: bool = True,
+    ) -> SessionResult:
+        """Fold the AI result into a prepared session and record it in history."""
+        ai_analysis_text: Optional[str] = None
+        if ai_result:
+            ai_analysis_text = ai_result.text
+            session_payload["ai_analysis"] = ai_analysis_text
+            session_payload["ai_response_id"] = ai_result.response_id
+            session_payload["ai_usage"] = ai_result.usage
+
+        topic = session_payload["topic"]
+        user_question = session_payload["user_question"]
+        user_context = session_payload["user_context"]
+        method_name = session_payload["method"]
+        lines = session_payload["lines"]
+        current_time_str = session_payload["current_time_str"]
+        bazi_output = session_payload["bazi_output"]
+        elements_output = session_payload["elements_output"]
+        hex_text = session_payload["hex_text"]
+        hex_sections = session_payload["hex_sections"]
+        hex_overview = session_payload["hex_overview"]
+        najia_table = session_payload["najia_table"]
+        najia_text = session_payload["najia_text"]
 
         reading_brief = _build_reading_brief(
             topic=topic,
             user_question=user_question,
             user_context=user_context,
-            method_name=method.name,
+            method_name=method_name,
             lines=lines,
             current_time_str=current_time_str,
             bazi_output=bazi_output,
@@ -1146,12 +1370,12 @@ class SessionService:
         full_text = "\n".join(chunks)
 
         result = SessionResult(
-            session_id=session_id,
+            session_id=session_payload["session_id"],
             timestamp=session_payload["timestamp"],
             topic=topic,
             user_question=user_question,
             user_context=user_context,
-            method=method.name,
+            method=method_name,
             lines=lines,
             current_time_str=current_time_str,
             bazi_output=bazi_output,
@@ -1162,7 +1386,7 @@ class SessionService:
             najia_text=najia_text,
             najia_data=session_payload["najia_data"],
             najia_table=najia_table,
-            bazi_detail=bazi_detail,
+            bazi_detail=session_payload["bazi_detail"],
             reading_brief=reading_brief,
             ai_model=session_payload.get("ai_model"),
             ai_reasoning=session_payload.get("ai_reasoning"),
@@ -1173,9 +1397,44 @@ class SessionService:
             ai_usage=session_payload.get("ai_usage"),
             full_text=full_text,
         )
-        self._history.append(result)
+        if record:
+            self._history.append(result)
         return result
 
+    def render_reading(self, hexagram: Hexagram) -> RenderedReading:
+        """Return the cached deterministic text package for ``hexagram``.
+
+        Entries are keyed by line vector and interpretation content version.
+        The returned value is shared; callers must copy before mutating.
+        """
+        key: ReadingCacheKey = (
+            tuple(hexagram.lines),
+            self.interpretation_repo.content_version,
+        )
+        return self.reading_cache.get_or_create(key, lambda: self._build_reading(hexagram))
+
+    def _build_reading(self, hexagram: Hexagram) -> RenderedReading:
+        hex_text, hex_sections, hex_overview = hexagram.to_text_package(
+            guaci_path=self.config.paths.guaci_dir,
+            takashima_path=self.config.paths.takashima_dir,
+            interpretation_repo=self.interpretation_repo,
+        )
+        main_najia_entry = self.najia_repo.get_by_bottom(hexagram.binary)
+        changed_najia_entry = (
+            self.najia_repo.get_by_bottom(hexagram.changed_hexagram.binary)
+            if hexagram.changed_hexagram
+            else None
+        )
+        najia_skeleton = _build_najia_skeleton(
+            main_najia_entry, changed_najia_entry, hex_overview.get("lines", [])
+        )
+        return RenderedReading(
+            hex_text=hex_text,
+            hex_sections=hex_sections,
+            hex_overview=hex_overview,
+            najia_skeleton=najia_skeleton,
+        )
+
     def _get_valid_choice(
         self,
         prompt: str,
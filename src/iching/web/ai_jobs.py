@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import logging
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Event, Lock
+from typing import Callable, Dict, Optional
+from uuid import uuid4
+
+from iching.core.cache import BoundedCache
+
+
+AI_JOB_WORKERS = int(os.getenv("ICHING_AI_JOB_WORKERS", "8"))
+AI_JOB_QUEUE_LIMIT = int(os.getenv("ICHING_AI_JOB_QUEUE_LIMIT", "256"))
+AI_JOB_LIMIT = int(os.getenv("ICHING_AI_JOB_LIMIT", "10000"))
+AI_JOB_TTL_SECONDS = int(os.getenv("ICHING_AI_JOB_TTL_SECONDS", "3600"))
+AI_JOB_BROKER = os.getenv("ICHING_AI_JOB_BROKER", "thread")
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class JobQueueFullError(RuntimeError):
+    """Raised when the broker cannot accept another analysis job."""
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+@dataclass(slots=True)
+class AnalysisJob:
+    job_id: str
+    session_id: str
+    user_id: Optional[str]
+    status: str = JOB_QUEUED
+    created_at: str = field(default_factory=_now)
+    updated_at: str = field(default_factory=_now)
+    result: Optional[Dict[str, object]] = None
+    error: Optional[str] = None
+    _done: Event = field(default_factory=Event, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self._done.is_set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def mark_running(self) -> None:
+        self.status = JOB_RUNNING
+        self.updated_at = _now()
+
+    def complete(self, result: Dict[str, object]) -> None:
+        self.result = result
+        self.status = JOB_COMPLETED
+        self.updated_at = _now()
+        self._done.set()
+
+    def fail(self, message: str) -> None:
+        self.error = message
+        self.status = JOB_FAILED
+        self.updated_at = _now()
+        self._done.set()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "updated_at": self.updated_at,
+            "error": self.error,
+            "session": self.result,
+        }
+
+
+class JobBroker(ABC):
+    """Runs submitted analysis tasks somewhere other than the request handler.
+
+    Subclasses decide where: :class:`ThreadJobBroker` is the in-process queue,
+    :class:`InlineJobBroker` a synchronous stand-in for tests and local tools.
+    An adapter for an external queue only needs to implement ``submit``.
+    """
+
+    @abstractmethod
+    def submit(self, task: Callable[[], None]) -> None:
+        ...
+
+    def shutdown(self) -> None:
+        return None
+
+
+class ThreadJobBroker(JobBroker):
+    """Bounded worker pool with a cap on queued plus running tasks."""
+
+    def __init__(self, *, workers: int = AI_JOB_WORKERS, queue_limit: int = AI_JOB_QUEUE_LIMIT) -> None:
+        self._executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="iching-ai-job")
+        self._queue_limit = max(1, queue_limit)
+        self._lock = Lock()
+        self._pending = 0
+
+    def submit(self, task: Callable[[], None]) -> None:
+        with self._lock:
+            if self._pending >= self._queue_limit:
+                raise JobQueueFullError("AI 分析队列已满，请稍后再试。")
+            self._pending += 1
+        try:
+            future = self._executor.submit(task)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+
+class InlineJobBroker(JobBroker):
+    """Runs every task immediately in the submitting thread."""
+
+    def submit(self, task: Callable[[], None]) -> None:
+        task()
+
+
+def build_job_broker(kind: str = AI_JOB_BROKER) -> JobBroker:
+    if kind == "thread":
+        return ThreadJobBroker()
+    if kind == "inline":
+        return InlineJobBroker()
+    raise ValueError(f"Unknown AI job broker: {kind}")
+
+
+class AnalysisJobManager:
+    """Tracks deferred AI analyses and hands their work to a :class:`JobBroker`."""
+
+    def __init__(
+        self,
+        broker: JobBroker,
+        *,
+        max_jobs: int = AI_JOB_LIMIT,
+        ttl_seconds: float = AI_JOB_TTL_SECONDS,
+    ) -> None:
+        self.broker = broker
+        self._jobs: BoundedCache[str, AnalysisJob] = BoundedCache(
+            max_entries=max_jobs,
+            ttl_seconds=ttl_seconds,
+        )
+
+    def submit(
+        self,
+        *,
+        session_id: str,
+        user_id: Optional[str],
+        work: Callable[[], Dict[str, object]],
+    ) -> AnalysisJob:
+        job = AnalysisJob(job_id=str(uuid4()), session_id=session_id, user_id=user_id)
+        self._jobs.put(job.job_id, job)
+        try:
+            self.broker.submit(lambda: self._run(job, work))
+        except JobQueueFullError as exc:
+            # The reading is already built; report the overflow through the job.
+            job.fail(str(exc))
+        return job
+
+    def get(self, job_id: str) -> Optional[AnalysisJob]:
+        return self._jobs.get(job_id)
+
+    @staticmethod
+    def _run(job: AnalysisJob, work: Callable[[], Dict[str, object]]) -> None:
+        job.mark_running()
+        try:
+            result = work()
+        except Exception:
+            logger.exception("AI analysis job failed", extra={"job_id": job.job_id})
+            job.fail("AI 分析失败，请重试。")
+            return
+        job.complete(result)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import os
-from typing import List
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from iching.core.metaphysics import shutdown_chart_batch_pool
+from iching.integrations.openai_clients import close_openai_clients
 from iching.web.api.routes import router
+from iching.web.service import get_chat_service, get_job_manager, get_session_runner
 
 
 def _allowed_origins() -> List[str]:
@@ -16,10 +20,32 @@ def _allowed_origins() -> List[str]:
     return [item.strip() for item in raw.split(",") if item.strip()]
 
 
+@asynccontextmanager
+async def _lifespan(_: FastAPI) -> AsyncIterator[None]:
+    chat_service = get_chat_service()
+    write_queue = chat_service.write_queue
+    if write_queue is not None:
+        # Replays writes a previous process spooled but never delivered.
+        write_queue.start()
+    yield
+    get_job_manager().broker.shutdown()
+    if write_queue is not None:
+        write_queue.close()
+    archive = get_session_runner().archive
+    if archive is not None:
+        # Writes the texts still queued for the archive.
+        archive.close()
+    shutdown_chart_batch_pool()
+    await close_openai_clients()
+    if chat_service.async_client is not None:
+        await chat_service.async_client.aclose()
+
+
 app = FastAPI(
     title="I Ching API",
     version="1.0.0",
     description="FastAPI service exposing the I Ching session engine.",
+    lifespan=_lifespan,
 )
 
 app.add_middleware(
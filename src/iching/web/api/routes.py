@@ -1,31 +1,47 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
 import logging
+import os
 import re
+from contextlib import contextmanager
+from typing import Iterator
 
 import httpx
-from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.responses import StreamingResponse
 
-from iching.integrations.supabase_client import SupabaseAuthError
+from iching.integrations.supabase_client import SupabaseAuthError, SupabaseUser
 from iching.core.bazi_rules.registry import load_packaged_shen_registry
-from iching.core.metaphysics import build_metaphysics_chart
+from iching.core.metaphysics import (
+    BATCH_CHART_FAILED,
+    build_metaphysics_chart,
+    build_metaphysics_charts,
+    build_metaphysics_period,
+    chart_cache_stats,
+)
 from iching.core.metaphysics_statistics import lookup_statistics
 from iching.core.pattern_product_catalog import pattern_library
-from iching.web.chat_service import ChatRateLimitError
+from iching.web.ai_jobs import JOB_COMPLETED, AnalysisJob, AnalysisJobManager
+from iching.web.chat_service import SESSION_PAGE_SIZE, SESSION_PAGE_SIZE_MAX, ChatRateLimitError
 from iching.web.chart_service import ChartArchiveService
 from iching.web.models import (
+    AnalysisJobResponse,
     MetaphysicsChartListResponse,
     MetaphysicsChartRecord,
     ChatTranscriptResponse,
     ChatTurnRequest,
     ChatTurnResponse,
     ConfigResponse,
+    MetaphysicsBatchRequest,
     MetaphysicsChartRequest,
     MetaphysicsChartResponse,
     MetaphysicsPeriodRequest,
     MetaphysicsPeriodResponse,
+    MetaphysicsPeriodYearRequest,
+    MetaphysicsPeriodYearResponse,
     PatternRuleSummaryResponse,
     PatternLibraryResponse,
     MetaphysicsStatisticsRequest,
@@ -39,6 +55,7 @@ from iching.web.service import (
     AccessDeniedError,
     RateLimitError,
     get_chat_service,
+    get_job_manager,
     SessionRunner,
     get_session_runner,
 )
@@ -47,6 +64,15 @@ from iching.web.service import (
 router = APIRouter(prefix="/api", tags=["api"])
 logger = logging.getLogger(__name__)
 
+JOB_EVENT_POLL_SECONDS = float(os.getenv("ICHING_AI_JOB_EVENT_POLL_SECONDS", "0.5"))
+JOB_EVENT_HEARTBEAT_SECONDS = 15.0
+
+_SSE_HEADERS = {
+    "Cache-Control": "no-cache, no-transform",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
 _RULE_PATH_ID = re.compile(r"^[a-z0-9][a-z0-9_.-]{0,159}$")
 _PATTERN_LABELS = {
     "direct_officer": "正官格",
@@ -93,6 +119,10 @@ def _get_chat_service():
     return get_chat_service()
 
 
+def _get_job_manager() -> AnalysisJobManager:
+    return get_job_manager()
+
+
 def _get_chart_service() -> ChartArchiveService:
     return ChartArchiveService(get_chat_service().client)
 
@@ -102,18 +132,97 @@ def healthcheck() -> dict[str, str]:
     return {"status": "ok"}
 
 
+@router.get("/health/caches", tags=["meta"])
+def read_cache_stats(runner: SessionRunner = Depends(_get_runner)) -> dict[str, object]:
+    return {
+        "charts": chart_cache_stats(),
+        "readings": runner.service.reading_cache.stats().to_dict(),
+    }
+
+
 @router.get("/config", response_model=ConfigResponse)
 def read_config(runner: SessionRunner = Depends(_get_runner)) -> ConfigResponse:
     return runner.config_response()
 
 
+def _chart_arguments(payload: MetaphysicsChartRequest) -> dict:
+    return {
+        "timestamp": payload.timestamp,
+        "timezone_name": payload.timezone,
+        "longitude": payload.longitude,
+        "use_true_solar_time": payload.use_true_solar_time,
+        "day_boundary": payload.day_boundary,
+        "calendar_type": payload.calendar_type,
+        "is_leap_month": payload.is_leap_month,
+        "gender": payload.gender,
+        "birth_place": payload.birth_place,
+        "hour_uncertain": payload.hour_uncertain,
+        "dayun_algorithm": payload.dayun_algorithm,
+        "lunar_year": payload.lunar_year,
+        "lunar_month": payload.lunar_month,
+        "lunar_day": payload.lunar_day,
+        "lunar_hour": payload.lunar_hour,
+        "lunar_minute": payload.lunar_minute,
+        "fold_choice": payload.fold_choice,
+        "reference_timestamp": payload.reference_timestamp,
+        "include_period_details": payload.include_period_details,
+        "period_cycle_index": payload.period_cycle_index,
+    }
+
+
 @router.post("/tools/metaphysics", response_model=MetaphysicsChartResponse)
 def calculate_metaphysics_chart(
     payload: MetaphysicsChartRequest,
 ) -> MetaphysicsChartResponse:
     try:
-        result = build_metaphysics_chart(
+        result = build_metaphysics_chart(**_chart_arguments(payload))
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
+    return MetaphysicsChartResponse(**result)
+
+
+@router.post("/tools/metaphysics/batch")
+async def calculate_metaphysics_charts(
+    payload: MetaphysicsBatchRequest,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    chat_service=Depends(_get_chat_service),
+) -> StreamingResponse:
+    """Stream one NDJSON line per requested chart as it finishes: ``{"index", "chart"}`` or ``{"index", "error"}``."""
+    token = _parse_bearer(authorization)
+    try:
+        await chat_service.authenticate_async(token)
+    except SupabaseAuthError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
+        ) from exc
+    except RuntimeError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
+        ) from exc
+    requests = [_chart_arguments(item) for item in payload.charts]
+
+    def lines():
+        for item in build_metaphysics_charts(requests):
+            if "chart" in item:
+                try:
+                    chart = MetaphysicsChartResponse(**item["chart"])
+                    item = {"index": item["index"], "chart": chart.model_dump(mode="json", by_alias=True)}
+                except Exception:
+                    logger.exception("Batch chart serialisation failed")
+                    item = {"index": item["index"], "error": BATCH_CHART_FAILED}
+            yield json.dumps(item, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+def _expand_period(payload: MetaphysicsPeriodRequest, year: int | None = None) -> dict:
+    try:
+        result = build_metaphysics_period(
             payload.timestamp,
+            cycle_index=payload.cycle_index,
+            year=year,
             timezone_name=payload.timezone,
             longitude=payload.longitude,
             use_true_solar_time=payload.use_true_solar_time,
@@ -121,7 +230,6 @@ def calculate_metaphysics_chart(
             calendar_type=payload.calendar_type,
             is_leap_month=payload.is_leap_month,
             gender=payload.gender,
-            birth_place=payload.birth_place,
             hour_uncertain=payload.hour_uncertain,
             dayun_algorithm=payload.dayun_algorithm,
             lunar_year=payload.lunar_year,
@@ -131,66 +239,33 @@ def calculate_metaphysics_chart(
             lunar_minute=payload.lunar_minute,
             fold_choice=payload.fold_choice,
             reference_timestamp=payload.reference_timestamp,
-            include_period_details=payload.include_period_details,
-            period_cycle_index=payload.period_cycle_index,
         )
     except ValueError as exc:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
         ) from exc
-    return MetaphysicsChartResponse(**result)
+    if not result:
+        detail = "未找到所选大运周期。" if year is None else "未找到所选流年。"
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detail)
+    return result
 
 
 @router.post("/tools/metaphysics/periods", response_model=MetaphysicsPeriodResponse)
 def calculate_metaphysics_period(
     payload: MetaphysicsPeriodRequest,
 ) -> MetaphysicsPeriodResponse:
-    try:
-        request = payload.model_copy(
-            update={
-                "include_period_details": False,
-                "period_cycle_index": payload.cycle_index,
-            }
-        )
-        result = build_metaphysics_chart(
-            request.timestamp,
-            timezone_name=request.timezone,
-            longitude=request.longitude,
-            use_true_solar_time=request.use_true_solar_time,
-            day_boundary=request.day_boundary,
-            calendar_type=request.calendar_type,
-            is_leap_month=request.is_leap_month,
-            gender=request.gender,
-            birth_place=request.birth_place,
-            hour_uncertain=request.hour_uncertain,
-            dayun_algorithm=request.dayun_algorithm,
-            lunar_year=request.lunar_year,
-            lunar_month=request.lunar_month,
-            lunar_day=request.lunar_day,
-            lunar_hour=request.lunar_hour,
-            lunar_minute=request.lunar_minute,
-            fold_choice=request.fold_choice,
-            reference_timestamp=request.reference_timestamp,
-            include_period_details=False,
-            period_cycle_index=request.cycle_index,
-        )
-    except ValueError as exc:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
-        ) from exc
-    cycle = next(
-        (
-            item
-            for item in result.get("period_layers", {}).get("dayun", [])
-            if item.get("index") == request.cycle_index
-        ),
-        None,
-    )
-    if not cycle:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="未找到所选大运周期。"
-        )
-    return MetaphysicsPeriodResponse(cycle=cycle)
+    """Expand the years and months of one Da Yun cycle left collapsed in the chart."""
+    return MetaphysicsPeriodResponse(cycle=_expand_period(payload))
+
+
+@router.post(
+    "/tools/metaphysics/periods/year", response_model=MetaphysicsPeriodYearResponse
+)
+def calculate_metaphysics_period_year(
+    payload: MetaphysicsPeriodYearRequest,
+) -> MetaphysicsPeriodYearResponse:
+    """Expand a single Liu Nian (with its twelve months) of one Da Yun cycle."""
+    return MetaphysicsPeriodYearResponse(year=_expand_period(payload, payload.year))
 
 
 @router.post(
@@ -418,28 +493,22 @@ def _extract_ip(request: Request) -> str:
     return "unknown"
 
 
-@router.post(
-    "/sessions", response_model=SessionPayload, status_code=status.HTTP_201_CREATED
-)
-def create_session(
-    request: SessionCreateRequest,
-    http_request: Request,
-    authorization: str | None = Header(default=None, alias="Authorization"),
-    runner: SessionRunner = Depends(_get_runner),
-    chat_service=Depends(_get_chat_service),
-) -> SessionPayload:
-    client_ip = _extract_ip(http_request)
-    supabase_user = None
-    if authorization:
-        token = _parse_bearer(authorization)
-        try:
-            supabase_user = chat_service.authenticate(token)
-        except SupabaseAuthError as exc:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
-            ) from exc
+async def _optional_user(authorization: str | None, chat_service) -> SupabaseUser | None:
+    if not authorization:
+        return None
+    token = _parse_bearer(authorization)
     try:
-        return runner.run(request, client_ip=client_ip, user=supabase_user)
+        return await chat_service.authenticate_async(token)
+    except SupabaseAuthError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
+        ) from exc
+
+
+@contextmanager
+def _session_errors() -> Iterator[None]:
+    try:
+        yield
     except AccessDeniedError as exc:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail=str(exc)
@@ -454,6 +523,51 @@ def create_session(
         ) from exc
 
 
+@router.post(
+    "/sessions", response_model=SessionPayload, status_code=status.HTTP_201_CREATED
+)
+async def create_session(
+    request: SessionCreateRequest,
+    http_request: Request,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    runner: SessionRunner = Depends(_get_runner),
+    chat_service=Depends(_get_chat_service),
+) -> SessionPayload:
+    client_ip = _extract_ip(http_request)
+    supabase_user = await _optional_user(authorization, chat_service)
+    with _session_errors():
+        return await runner.run_async(request, client_ip=client_ip, user=supabase_user)
+
+
+@router.post("/sessions/stream")
+async def stream_session(
+    request: SessionCreateRequest,
+    http_request: Request,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    runner: SessionRunner = Depends(_get_runner),
+    chat_service=Depends(_get_chat_service),
+):
+    client_ip = _extract_ip(http_request)
+    supabase_user = await _optional_user(authorization, chat_service)
+    with _session_errors():
+        events = await runner.stream(request, client_ip=client_ip, user=supabase_user)
+
+    async def event_source():
+        try:
+            async for item in events:
+                event_type = str(item.get("type") or "message")
+                yield _sse_event(
+                    event_type, {key: value for key, value in item.items() if key != "type"}
+                )
+        except Exception:
+            logger.exception("Streaming session failed")
+            yield _sse_event("error", {"detail": "AI 流式响应失败，请重试。"})
+
+    return StreamingResponse(
+        event_source(), media_type="text/event-stream", headers=_SSE_HEADERS
+    )
+
+
 def _parse_bearer(header_value: str | None) -> str:
     if not header_value:
         raise HTTPException(
@@ -474,6 +588,88 @@ def _parse_bearer(header_value: str | None) -> str:
     return token
 
 
+async def _owned_job(
+    job_id: str,
+    authorization: str | None,
+    chat_service,
+    job_manager: AnalysisJobManager,
+) -> AnalysisJob:
+    token = _parse_bearer(authorization)
+    try:
+        user = await chat_service.authenticate_async(token)
+    except SupabaseAuthError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
+        ) from exc
+    job = job_manager.get(job_id)
+    if job is None or job.user_id != user.id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="AI 分析任务不存在或已过期。"
+        )
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJobResponse)
+async def read_analysis_job(
+    job_id: str,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    chat_service=Depends(_get_chat_service),
+    job_manager: AnalysisJobManager = Depends(_get_job_manager),
+) -> AnalysisJobResponse:
+    job = await _owned_job(job_id, authorization, chat_service, job_manager)
+    return AnalysisJobResponse(**job.to_dict())
+
+
+@router.get("/jobs/{job_id}/events")
+async def stream_analysis_job(
+    job_id: str,
+    authorization: str | None = Header(default=None, alias="Authorization"),
+    chat_service=Depends(_get_chat_service),
+    job_manager: AnalysisJobManager = Depends(_get_job_manager),
+):
+    job = await _owned_job(job_id, authorization, chat_service, job_manager)
+
+    async def event_source():
+        yield _sse_event("status", {"job_id": job.job_id, "status": job.status})
+        idle = 0.0
+        while not job.finished:
+            await asyncio.sleep(JOB_EVENT_POLL_SECONDS)
+            idle += JOB_EVENT_POLL_SECONDS
+            if idle >= JOB_EVENT_HEARTBEAT_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+        if job.status == JOB_COMPLETED:
+            yield _sse_event("completed", {"job_id": job.job_id, "session": job.result})
+        else:
+            yield _sse_event("error", {"job_id": job.job_id, "detail": job.error})
+
+    return StreamingResponse(
+        event_source(), media_type="text/event-stream", headers=_SSE_HEADERS
+    )
+
+
+def _revalidated_json(request: Request, body: bytes) -> Response:
+    """Serve ``body`` with a content ETag, or a bare 304 when the client already has it."""
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Authorization"}
+    known = _etags(request.headers.get("if-none-match"))
+    if etag in known or "*" in known:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _etags(header: str | None) -> set[str]:
+    if not header:
+        return set()
+    tags = {tag.strip() for tag in header.split(",")}
+    # Weak comparison: a strong validator matches its weak twin.
+    return tags | {f"W/{tag}" for tag in tags if not tag.startswith("W/")}
+
+
+def _sse_event(event_type: str, payload: dict) -> str:
+    return f"event: {event_type}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+
 @router.get(
     "/sessions/{session_id}/chat",
     response_model=ChatTranscriptResponse,
@@ -626,40 +822,42 @@ def stream_chat_message(
                 payload_data = {
                     key: value for key, value in item.items() if key != "type"
                 }
-                yield f"event: {event_type}\ndata: {json.dumps(payload_data, ensure_ascii=False)}\n\n"
+                yield _sse_event(event_type, payload_data)
         except Exception:
             logger.exception("Streaming chat failed", extra={"session_id": session_id})
-            yield f"event: error\ndata: {json.dumps({'detail': 'AI 流式响应失败，请重试。'}, ensure_ascii=False)}\n\n"
+            yield _sse_event("error", {"detail": "AI 流式响应失败，请重试。"})
 
     return StreamingResponse(
-        event_source(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache, no-transform",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        },
+        event_source(), media_type="text/event-stream", headers=_SSE_HEADERS
     )
 
 
 @router.get("/sessions", response_model=SessionHistoryResponse)
 def list_sessions(
+    request: Request,
+    limit: int = Query(default=SESSION_PAGE_SIZE, ge=1, le=SESSION_PAGE_SIZE_MAX),
+    cursor: str | None = Query(default=None, max_length=512),
     authorization: str | None = Header(default=None, alias="Authorization"),
     chat_service=Depends(_get_chat_service),
 ):
     token = _parse_bearer(authorization)
     try:
         user = chat_service.authenticate(token)
-        items = chat_service.list_sessions(user=user)
+        page = chat_service.list_sessions(user=user, limit=limit, cursor=cursor)
     except SupabaseAuthError as exc:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail=str(exc)
         ) from exc
+    except ValueError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)
+        ) from exc
     except RuntimeError as exc:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(exc)
         ) from exc
-    return SessionHistoryResponse(sessions=items)
+    body = SessionHistoryResponse(**page).model_dump_json().encode("utf-8")
+    return _revalidated_json(request, body)
 
 
 @router.delete("/sessions/{session_id}", status_code=status.HTTP_204_NO_CONTENT)
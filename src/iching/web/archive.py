@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import gzip
+import logging
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Tuple
+
+from iching.integrations.sqlite_pool import open_writer
+
+
+ARCHIVE_ENABLED = os.getenv("ICHING_ARCHIVE", "1").strip().lower() not in {"0", "false", "no"}
+ARCHIVE_SEGMENT_BYTES = int(os.getenv("ICHING_ARCHIVE_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+ARCHIVE_FLUSH_SECONDS = float(os.getenv("ICHING_ARCHIVE_FLUSH_SECONDS", "2"))
+ARCHIVE_MAX_PENDING = int(os.getenv("ICHING_ARCHIVE_MAX_PENDING", "1000"))
+
+INDEX_FILENAME = "index.db"
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS archive_entries (
+    key TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    archived_at REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def archive_key(prefix: str, session_id: str) -> str:
+    """Name one archived text; unique per session, sortable by time."""
+    timestamp = datetime.now().strftime("%Y.%m.%d.%H%M%S")
+    return f"{prefix}_{timestamp}_{session_id}"
+
+
+class SegmentArchive:
+    """Session texts batched into rotating gzip segments with a SQLite index.
+
+    ``save`` only queues the text; a daemon thread appends each batch to the
+    current segment of this process with one write, then records where every
+    text landed in ``index.db``. Each text is its own gzip member, so a
+    segment is still a plain ``.gz`` file (``zcat`` prints every text in
+    order) while :meth:`read` can decompress a single entry by offset.
+    Segments rotate once they pass ``segment_bytes``.
+
+    Saving an existing key again (the analysis arriving after the reading)
+    appends the new text and repoints the index; segments are never rewritten.
+    When ``max_pending`` texts are already queued, ``save`` writes the batch
+    inline instead, which bounds memory if the disk falls behind.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        *,
+        segment_bytes: int = ARCHIVE_SEGMENT_BYTES,
+        flush_interval: float = ARCHIVE_FLUSH_SECONDS,
+        max_pending: int = ARCHIVE_MAX_PENDING,
+    ) -> None:
+        self.directory = Path(directory)
+        self.segment_bytes = max(1, segment_bytes)
+        self.flush_interval = flush_interval
+        self.max_pending = max(1, max_pending)
+        self._pending: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+        # Serialises segment appends and index updates between the flusher and inline writes.
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._index: Optional[sqlite3.Connection] = None
+        self._segment: Optional[BinaryIO] = None
+        self._segment_name = ""
+        self._segment_count = 0
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def save(self, key: str, content: str) -> str:
+        """Queue ``content`` under ``key`` and return ``key``."""
+        self.start()
+        with self._lock:
+            self._pending.append((key, content))
+            overflow = len(self._pending) >= self.max_pending or self._closed.is_set()
+        if overflow:
+            self.flush()
+        return key
+
+    def read(self, key: str) -> Optional[str]:
+        # Under the write lock a text is always either still queued or already indexed.
+        with self._write_lock:
+            with self._lock:
+                for pending_key, content in reversed(self._pending):
+                    if pending_key == key:
+                        return content
+            row = self._connection().execute(
+                "SELECT segment, offset, length FROM archive_entries WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        with open(self.directory / row[0], "rb") as handle:
+            handle.seek(row[1])
+            return gzip.decompress(handle.read(row[2])).decode("utf-8")
+
+    def flush(self) -> None:
+        """Write everything queued so far."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if batch:
+                self._write(batch)
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None or self._closed.is_set():
+                return
+            thread = threading.Thread(target=self._run, name="iching-archive", daemon=True)
+            self._thread = thread
+        thread.start()
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+        with self._write_lock:
+            if self._segment is not None:
+                self._segment.close()
+                self._segment = None
+            if self._index is not None:
+                self._index.close()
+                self._index = None
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Archive flush failed")
+
+    def _write(self, batch: List[Tuple[str, str]]) -> None:
+        members = [gzip.compress(content.encode("utf-8"), mtime=0) for _, content in batch]
+        segment = self._current_segment()
+        offset = segment.tell()
+        segment.write(b"".join(members))
+        segment.flush()
+        now = time.time()
+        rows: Dict[str, Tuple[str, str, int, int, float]] = {}
+        for (key, _), member in zip(batch, members):
+            rows[key] = (key, self._segment_name, offset, len(member), now)
+            offset += len(member)
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO archive_entries (key, segment, offset, length, archived_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                list(rows.values()),
+            )
+
+    def _current_segment(self) -> BinaryIO:
+        if self._segment is not None and self._segment.tell() < self.segment_bytes:
+            return self._segment
+        if self._segment is not None:
+            self._segment.close()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._segment_count += 1
+        # One writer per segment: the pid keeps sibling workers out of each other's files.
+        stamp = datetime.now().strftime("%Y%m%d%H%M%S")
+        self._segment_name = f"sessions-{stamp}-{os.getpid()}-{self._segment_count:04d}.gz"
+        self._segment = open(self.directory / self._segment_name, "ab")
+        return self._segment
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._index is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            index_path = self.directory / INDEX_FILENAME
+            setup = open_writer(index_path)
+            setup.execute(_SCHEMA)
+            setup.commit()
+            setup.close()
+            self._index = sqlite3.connect(index_path, check_same_thread=False)
+            self._index.execute("PRAGMA synchronous = NORMAL")
+            self._index.execute("PRAGMA busy_timeout = 5000")
+        return self._index
+
+
+def build_session_archive(directory: Path) -> Optional[SegmentArchive]:
+    if not ARCHIVE_ENABLED:
+        return None
+    return SegmentArchive(directory)
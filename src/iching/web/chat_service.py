@@ -1,10 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import base64
+import json
 import os
+from collections import Counter
 from dataclasses import dataclass
 from datetime import datetime, timezone
-from threading import Lock
-from typing import Dict, Iterator, List, Optional
+from uuid import uuid4
+from typing import Dict, Iterator, List, Optional, Tuple
 
 from iching.integrations.ai import (
     MODEL_CAPABILITIES,
@@ -15,12 +19,15 @@ from iching.integrations.ai import (
     stream_continue_analysis_from_session,
 )
 from iching.integrations.supabase_client import (
+    AsyncSupabaseRestClient,
     SupabaseAuthError,
     SupabaseRestClient,
     SupabaseUser,
 )
 from iching.services.session import SessionResult
 from iching.web.chat_state import SessionState, SessionStateStore
+from iching.web.rate_limits import DAY_SECONDS, CounterStore, MemoryCounterStore
+from iching.web.write_behind import WriteBehindQueue
 
 
 CHAT_TURN_LIMIT = int(os.getenv("ICHING_CHAT_TURN_LIMIT", "10"))
@@ -30,6 +37,33 @@ CHAT_MESSAGE_CHAR_LIMIT = int(os.getenv("ICHING_CHAT_MESSAGE_LIMIT", "10000"))
 ANONYMOUS_USER_ID = os.getenv("ICHING_ANON_USER_ID", "00000000-0000-0000-0000-000000000000")
 USER_DAILY_TOKEN_LIMIT = int(os.getenv("ICHING_USER_DAILY_TOKEN_LIMIT", "300000"))
 USER_SESSION_LIMIT = int(os.getenv("ICHING_USER_SESSION_LIMIT", "500"))
+SESSION_PAGE_SIZE = int(os.getenv("ICHING_SESSION_PAGE_SIZE", "50"))
+SESSION_PAGE_SIZE_MAX = int(os.getenv("ICHING_SESSION_PAGE_SIZE_MAX", "200"))
+
+# History rows read only these columns; topic/method and the follow-up flag
+# come out of the snapshot server-side, so the (large) snapshot and AI text
+# never leave the database.
+SESSION_SUMMARY_COLUMNS = ",".join(
+    (
+        "session_id",
+        "summary_text",
+        "created_at",
+        "updated_at",
+        "has_initial_ai",
+        "has_session_context",
+        "session_topic:payload_snapshot->session_dict->>topic",
+        "session_method:payload_snapshot->session_dict->>method",
+        "snapshot_topic:payload_snapshot->>topic",
+        "snapshot_method:payload_snapshot->>method",
+    )
+)
+
+
+# Kinds of deferred Supabase writes handed to the write-behind queue.
+WRITE_SNAPSHOT = "sessions.snapshot"
+WRITE_UPSERT = "sessions.upsert"
+WRITE_UPDATE = "sessions.update"
+WRITE_MESSAGES = "chat_messages.insert"
 
 
 class ChatRateLimitError(RuntimeError):
@@ -44,40 +78,23 @@ class ChatMessageRecord:
     tokens_out: int = 0
 
 
-@dataclass(slots=True)
-class UserTokenCounter:
-    date: str
-    tokens: int = 0
-
-
 class UserTokenLimiter:
-    def __init__(self, daily_limit: int) -> None:
+    """Per-user AI follow-up token allowance over a sliding 24-hour window."""
+
+    def __init__(self, daily_limit: int, store: Optional[CounterStore] = None) -> None:
         self.daily_limit = max(0, daily_limit)
-        self._lock = Lock()
-        self._counters: Dict[str, UserTokenCounter] = {}
+        self.store = store or MemoryCounterStore()
 
     def ensure_allowance(self, user_id: str) -> None:
         if self.daily_limit <= 0:
             return
-        with self._lock:
-            counter = self._get_counter(user_id)
-            if counter.tokens >= self.daily_limit:
-                raise ChatRateLimitError("今日 AI 追问用量已达 300k tokens 上限，请明日再试。")
+        if self.store.total(f"user:tokens:{user_id}", window=DAY_SECONDS) >= self.daily_limit:
+            raise ChatRateLimitError("过去 24 小时 AI 追问用量已达 300k tokens 上限，请稍后再试。")
 
     def record_usage(self, user_id: str, tokens: int) -> None:
         if self.daily_limit <= 0 or tokens <= 0:
             return
-        with self._lock:
-            counter = self._get_counter(user_id)
-            counter.tokens += tokens
-
-    def _get_counter(self, user_id: str) -> UserTokenCounter:
-        today = datetime.now(timezone.utc).date().isoformat()
-        counter = self._counters.get(user_id)
-        if counter is None or counter.date != today:
-            counter = UserTokenCounter(date=today)
-            self._counters[user_id] = counter
-        return counter
+        self.store.add(f"user:tokens:{user_id}", tokens, window=DAY_SECONDS)
 
 
 class ChatService:
@@ -88,16 +105,29 @@ class ChatService:
         store: SessionStateStore,
         client: SupabaseRestClient,
         token_limiter: Optional[UserTokenLimiter] = None,
+        async_client: Optional[AsyncSupabaseRestClient] = None,
+        write_queue: Optional[WriteBehindQueue] = None,
     ) -> None:
         self.store = store
         self.client = client
         self.token_limiter = token_limiter or UserTokenLimiter(USER_DAILY_TOKEN_LIMIT)
+        self.async_client = async_client
+        self.write_queue = write_queue
+        if write_queue is not None:
+            write_queue.set_writer(self._apply_writes)
 
     def authenticate(self, access_token: str) -> SupabaseUser:
         if not self.client.enabled:
             raise RuntimeError("Supabase is not configured on the server.")
         return self.client.verify_access_token(access_token)
 
+    async def authenticate_async(self, access_token: str) -> SupabaseUser:
+        if self.async_client is None:
+            return await asyncio.to_thread(self.authenticate, access_token)
+        if not self.async_client.enabled:
+            raise RuntimeError("Supabase is not configured on the server.")
+        return await self.async_client.verify_access_token(access_token)
+
     def record_session_snapshot(
         self,
         result: SessionResult,
@@ -108,35 +138,66 @@ class ChatService:
         """Persist the initial response so future follow-ups can resume."""
         if not self.client.enabled:
             return
-        snapshot = session_payload or result.to_dict()
-        tokens_used = 0
-        if isinstance(result.ai_usage, dict):
-            tokens_used = int(result.ai_usage.get("total_tokens") or 0)
-        user_id = user.id if user else ANONYMOUS_USER_ID
-        if user and user.id:
-            self._enforce_session_limit(user.id)
-        payload = {
-            "session_id": result.session_id,
-            "user_id": user_id,
-            "last_response_id": result.ai_response_id,
-            "ai_model": result.ai_model or CHAT_FOLLOWUP_MODEL,
-            "followup_model": result.ai_model or CHAT_FOLLOWUP_MODEL,
-            "ai_reasoning": result.ai_reasoning,
-            "ai_verbosity": result.ai_verbosity,
-            "ai_tone": result.ai_tone,
-            "chat_turns": 0,
-            "tokens_used": tokens_used,
-            "summary_text": summary_text,
-            "initial_ai_text": result.ai_analysis or "",
-            "payload_snapshot": snapshot,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat(),
+        self._write(
+            WRITE_SNAPSHOT,
+            _snapshot_record(result, summary_text, user, session_payload),
+            session_id=result.session_id,
+        )
+
+    def record_session_analysis(
+        self,
+        result: SessionResult,
+        user: Optional[SupabaseUser] = None,
+        session_payload: Optional[Dict[str, object]] = None,
+    ) -> None:
+        """Patch a late AI analysis onto an already recorded snapshot.
+
+        Only the AI columns change, so the row keeps its ``created_at`` and
+        counters and does not count against the session limit a second time.
+        """
+        if not self.client.enabled:
+            return
+        record = _snapshot_record(result, "", user, session_payload)
+        patch = {
+            column: record[column]
+            for column in (
+                "last_response_id",
+                "ai_model",
+                "tokens_used",
+                "initial_ai_text",
+                "payload_snapshot",
+                "updated_at",
+            )
         }
-        self.client.upsert_session(payload)
+        self._update_session(result.session_id, str(record["user_id"]), patch)
+
+    async def record_session_snapshot_async(
+        self,
+        result: SessionResult,
+        summary_text: str,
+        user: Optional[SupabaseUser] = None,
+        session_payload: Optional[Dict[str, object]] = None,
+    ) -> None:
+        """Awaitable :meth:`record_session_snapshot` on the async Supabase client."""
+        if self.write_queue is not None or self.async_client is None:
+            # Spooling is a SQLite write, and a full queue drains and applies writes inline.
+            await asyncio.to_thread(
+                self.record_session_snapshot, result, summary_text, user, session_payload
+            )
+            return
+        if not self.async_client.enabled:
+            return
+        if user and user.id:
+            await self._enforce_session_limit_async(user.id)
+        await self.async_client.upsert_session(
+            _snapshot_record(result, summary_text, user, session_payload)
+        )
 
     def ensure_session_row(self, session_id: str, user: SupabaseUser) -> Dict[str, object]:
         if not self.client.enabled:
             raise RuntimeError("Supabase is not configured on the server.")
+        if self.write_queue is not None:
+            self.write_queue.drain(session_id)
         record = self.client.fetch_session(session_id=session_id, user_id=user.id)
         if record:
             return self._sync_followup_model(record, user.id)
@@ -163,7 +224,11 @@ class ChatService:
             "created_at": datetime.now(timezone.utc).isoformat(),
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
-        record = self.client.upsert_session(payload) or payload
+        if self.write_queue is None:
+            record = self.client.upsert_session(payload) or payload
+        else:
+            self._write(WRITE_UPSERT, payload, session_id=session_id)
+            record = payload
         self._persist_initial_message(state=state, user=user)
         return record
 
@@ -177,7 +242,7 @@ class ChatService:
             "user_id": user.id,
             "updated_at": datetime.now(timezone.utc).isoformat(),
         }
-        self.client.update_session(session_id=session_id, user_id=ANONYMOUS_USER_ID, payload=payload)
+        self._update_session(session_id, ANONYMOUS_USER_ID, payload)
         record["user_id"] = user.id
         return record
 
@@ -188,7 +253,7 @@ class ChatService:
             return record
         next_model = normalized if normalized in MODEL_CAPABILITIES else CHAT_FOLLOWUP_MODEL
         payload = {"followup_model": next_model}
-        self.client.update_session(session_id=record["session_id"], user_id=user_id, payload=payload)
+        self._update_session(str(record["session_id"]), user_id, payload)
         record["followup_model"] = next_model
         return record
 
@@ -216,7 +281,7 @@ class ChatService:
                 "tone": state.ai_tone,
             }
         ]
-        self.client.insert_chat_messages(records)
+        self._insert_chat_messages(state.session_id, records)
 
     def fetch_transcript(self, *, session_id: str, user: SupabaseUser) -> Dict[str, object]:
         record = self.ensure_session_row(session_id, user)
@@ -226,42 +291,39 @@ class ChatService:
             "messages": messages,
         }
 
-    def list_sessions(self, user: SupabaseUser) -> List[Dict[str, object]]:
+    def list_sessions(
+        self,
+        user: SupabaseUser,
+        *,
+        limit: int = SESSION_PAGE_SIZE,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, object]:
+        """One page of the user's history, newest first, plus the cursor of the next page."""
         if not self.client.enabled:
             raise RuntimeError("Supabase is not configured on the server.")
-        params = {
-            "user_id": f"eq.{user.id}",
-            "order": "updated_at.desc",
-            "select": (
-                "session_id,summary_text,created_at,updated_at,initial_ai_text,payload_snapshot"
-            ),
+        limit = max(1, min(limit, SESSION_PAGE_SIZE_MAX))
+        records = self.client.list_session_summaries(
+            user_id=user.id,
+            limit=limit + 1,
+            before=_decode_history_cursor(cursor) if cursor else None,
+            select=SESSION_SUMMARY_COLUMNS,
+        )
+        next_cursor = None
+        if len(records) > limit:
+            records = records[:limit]
+            next_cursor = _encode_history_cursor(records[-1])
+        return {
+            "sessions": [_session_summary(record) for record in records],
+            "next_cursor": next_cursor,
         }
-        headers = self.client._service_headers()
-        response = self.client._client.get(f"{self.client.rest_base}/sessions", params=params, headers=headers)
-        response.raise_for_status()
-        records = response.json()
-        return [
-            {
-                "session_id": record.get("session_id"),
-                "summary_text": record.get("summary_text"),
-                "created_at": record.get("created_at") or record.get("updated_at"),
-                "ai_enabled": bool(record.get("initial_ai_text")),
-                "followup_available": _is_followup_available(record),
-                "topic_label": _extract_snapshot_field(record, "topic")
-                or _infer_label_from_summary(record.get("summary_text"), prefix="主题")
-                or record.get("topic_label"),
-                "method_label": _extract_snapshot_field(record, "method")
-                or _infer_label_from_summary(record.get("summary_text"), prefix="方法")
-                or record.get("method_label"),
-            }
-            for record in records or []
-        ]
 
     def delete_session(self, session_id: str, user: SupabaseUser) -> None:
         if not self.client.enabled:
             raise RuntimeError("Supabase is not configured on the server.")
         if not user.id:
             raise ValueError("用户无效。")
+        if self.write_queue is not None:
+            self.write_queue.discard(session_id)
         self.client.delete_session(session_id=session_id, user_id=user.id)
         self.store.remove(session_id)
 
@@ -292,11 +354,7 @@ class ChatService:
             chosen_model = CHAT_FOLLOWUP_MODEL
         model_changed = restart or bool(configured_raw and chosen_model != configured_model)
         if chosen_model != configured_raw:
-            self.client.update_session(
-                session_id=session_id,
-                user_id=user.id,
-                payload={"followup_model": chosen_model},
-            )
+            self._update_session(session_id, user.id, {"followup_model": chosen_model})
             record["followup_model"] = chosen_model
         turns_used = int(record.get("chat_turns") or 0)
         if turns_used >= CHAT_TURN_LIMIT:
@@ -365,7 +423,7 @@ class ChatService:
             "tokens_used": tokens_used,
             "updated_at": timestamp,
         }
-        self.client.update_session(session_id=session_id, user_id=user.id, payload=update_payload)
+        self._update_session(session_id, user.id, update_payload)
 
         user_record = {
             "session_id": session_id,
@@ -397,7 +455,7 @@ class ChatService:
             user_record["id"] = user_message_id
         if assistant_message_id := regeneration_ids.get("assistant"):
             assistant_record["id"] = assistant_message_id
-        self.client.insert_chat_messages([user_record, assistant_record])
+        self._insert_chat_messages(session_id, [user_record, assistant_record])
 
         self.store.update_response(session_id, ai_result.response_id or "", increment_turn=True)
         self.store.add_tokens(session_id, total_tokens)
@@ -435,11 +493,7 @@ class ChatService:
             chosen_model = CHAT_FOLLOWUP_MODEL
         model_changed = restart or bool(configured_raw and chosen_model != configured_model)
         if chosen_model != configured_raw:
-            self.client.update_session(
-                session_id=session_id,
-                user_id=user.id,
-                payload={"followup_model": chosen_model},
-            )
+            self._update_session(session_id, user.id, {"followup_model": chosen_model})
             record["followup_model"] = chosen_model
 
         turns_used = int(record.get("chat_turns") or 0)
@@ -510,10 +564,10 @@ class ChatService:
             next_turns_used = turns_used + 1
             timestamp = datetime.now(timezone.utc).isoformat()
 
-            self.client.update_session(
-                session_id=session_id,
-                user_id=user.id,
-                payload={
+            self._update_session(
+                session_id,
+                user.id,
+                {
                     "last_response_id": ai_result.response_id,
                     "followup_model": chosen_model,
                     "ai_reasoning": applied_reasoning,
@@ -554,7 +608,7 @@ class ChatService:
                 user_record["id"] = user_message_id
             if assistant_message_id := regeneration_ids.get("assistant"):
                 assistant_record["id"] = assistant_message_id
-            self.client.insert_chat_messages([user_record, assistant_record])
+            self._insert_chat_messages(session_id, [user_record, assistant_record])
             self.store.update_response(session_id, ai_result.response_id or "", increment_turn=True)
             self.store.add_tokens(session_id, total_tokens)
             self._record_user_usage(user, total_tokens)
@@ -572,18 +626,148 @@ class ChatService:
             return
         self.token_limiter.record_usage(user.id, tokens)
 
-    def _enforce_session_limit(self, user_id: str) -> None:
+    def _write(self, kind: str, payload: Dict[str, object], *, session_id: str) -> None:
+        if self.write_queue is None:
+            self._apply_writes(kind, [payload])
+        else:
+            self.write_queue.submit(kind, payload, session_id=session_id)
+
+    def _update_session(self, session_id: str, user_id: str, patch: Dict[str, object]) -> None:
+        self._write(
+            WRITE_UPDATE,
+            {"session_id": session_id, "user_id": user_id, "patch": patch},
+            session_id=session_id,
+        )
+
+    def _insert_chat_messages(self, session_id: str, records: List[Dict[str, object]]) -> None:
+        if self.write_queue is not None:
+            # Fixed ids make a retried batch an idempotent upsert, and give every
+            # row of a bulk insert the same columns.
+            for record in records:
+                record.setdefault("id", str(uuid4()))
+        self._write(WRITE_MESSAGES, {"records": records}, session_id=session_id)
+
+    def _apply_writes(self, kind: str, payloads: List[Dict[str, object]]) -> None:
+        """Apply a run of same-kind writes to Supabase, in submission order."""
+        if kind == WRITE_SNAPSHOT:
+            # A session re-snapshotted within the run is still one new row.
+            owners = Counter(
+                user_id
+                for user_id, _ in {
+                    (str(payload["user_id"]), payload.get("session_id"))
+                    for payload in payloads
+                    if payload.get("user_id") and payload["user_id"] != ANONYMOUS_USER_ID
+                }
+            )
+            for user_id, incoming in owners.items():
+                self._enforce_session_limit(user_id, incoming=incoming)
+        if kind in (WRITE_SNAPSHOT, WRITE_UPSERT):
+            rows = _latest_rows(payloads)
+            if len(rows) == 1:
+                self.client.upsert_session(rows[0])
+            else:
+                self.client.upsert_sessions(rows)
+        elif kind == WRITE_UPDATE:
+            for payload in _coalesced_updates(payloads):
+                self.client.update_session(
+                    session_id=str(payload["session_id"]),
+                    user_id=str(payload["user_id"]),
+                    payload=dict(payload["patch"]),
+                )
+        elif kind == WRITE_MESSAGES:
+            self.client.insert_chat_messages(
+                [record for payload in payloads for record in payload["records"]]
+            )
+        else:
+            raise ValueError(f"Unknown write kind: {kind}")
+
+    def _enforce_session_limit(self, user_id: str, *, incoming: int = 1) -> None:
         if USER_SESSION_LIMIT <= 0:
             return
-        records = self.client.list_session_ids(user_id=user_id, limit=1, offset=USER_SESSION_LIMIT - 1)
+        incoming = min(max(1, incoming), USER_SESSION_LIMIT)
+        records = self.client.list_session_ids(
+            user_id=user_id, limit=incoming, offset=USER_SESSION_LIMIT - incoming
+        )
         surplus_ids = [record.get("session_id") for record in records if record and record.get("session_id")]
         for session_id in surplus_ids:
             try:
+                if self.write_queue is not None:
+                    self.write_queue.discard(session_id)
                 self.client.delete_session(session_id=session_id, user_id=user_id)
                 self.store.remove(session_id)
             except Exception:
                 continue
 
+    async def _enforce_session_limit_async(self, user_id: str) -> None:
+        if USER_SESSION_LIMIT <= 0 or self.async_client is None:
+            return
+        records = await self.async_client.list_session_ids(
+            user_id=user_id, limit=1, offset=USER_SESSION_LIMIT - 1
+        )
+        surplus_ids = [record.get("session_id") for record in records if record and record.get("session_id")]
+        for session_id in surplus_ids:
+            try:
+                await self.async_client.delete_session(session_id=session_id, user_id=user_id)
+                self.store.remove(session_id)
+            except Exception:
+                continue
+
+
+def _snapshot_record(
+    result: SessionResult,
+    summary_text: str,
+    user: Optional[SupabaseUser],
+    session_payload: Optional[Dict[str, object]],
+) -> Dict[str, object]:
+    snapshot = session_payload or result.to_dict()
+    tokens_used = 0
+    if isinstance(result.ai_usage, dict):
+        tokens_used = int(result.ai_usage.get("total_tokens") or 0)
+    return {
+        "session_id": result.session_id,
+        "user_id": user.id if user else ANONYMOUS_USER_ID,
+        "last_response_id": result.ai_response_id,
+        "ai_model": result.ai_model or CHAT_FOLLOWUP_MODEL,
+        "followup_model": result.ai_model or CHAT_FOLLOWUP_MODEL,
+        "ai_reasoning": result.ai_reasoning,
+        "ai_verbosity": result.ai_verbosity,
+        "ai_tone": result.ai_tone,
+        "chat_turns": 0,
+        "tokens_used": tokens_used,
+        "summary_text": summary_text,
+        "initial_ai_text": result.ai_analysis or "",
+        "payload_snapshot": snapshot,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _latest_rows(rows: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """Keep the last row per primary key; one upsert statement cannot touch a row twice."""
+    latest: Dict[Tuple[object, object], Dict[str, object]] = {}
+    for row in rows:
+        key = (row.get("session_id"), row.get("user_id"))
+        latest.pop(key, None)
+        latest[key] = row
+    return list(latest.values())
+
+
+def _coalesced_updates(payloads: List[Dict[str, object]]) -> List[Dict[str, object]]:
+    """Merge back-to-back patches of the same row into one PATCH."""
+    merged: List[Dict[str, object]] = []
+    for payload in payloads:
+        previous = merged[-1] if merged else None
+        if (
+            previous is not None
+            and (previous["session_id"], previous["user_id"]) == (payload["session_id"], payload["user_id"])
+            # A patch that re-keys the row moves it out from under later patches.
+            and not {"session_id", "user_id"} & set(previous["patch"])
+        ):
+            previous["patch"] = {**previous["patch"], **payload["patch"]}
+        else:
+            merged.append({**payload, "patch": dict(payload["patch"])})
+    return merged
+
 
 def _history_before_regeneration(records: List[Dict[str, object]], message: str) -> List[Dict[str, object]]:
     history = list(records)
@@ -610,13 +794,38 @@ def _regeneration_message_ids(records: List[Dict[str, object]], message: str) ->
     return result
 
 
-def _extract_snapshot_field(record: Dict[str, object], key: str) -> Optional[str]:
-    session_context = _extract_session_context(record)
-    if isinstance(session_context, dict):
-        value = session_context.get(key)
-        if isinstance(value, str):
-            return value
-    return None
+def _session_summary(record: Dict[str, object]) -> Dict[str, object]:
+    topic = record.get("session_topic")
+    method = record.get("session_method")
+    if topic is None and method is None:
+        topic = record.get("snapshot_topic")
+        method = record.get("snapshot_method")
+    summary_text = record.get("summary_text")
+    return {
+        "session_id": record.get("session_id"),
+        "summary_text": summary_text,
+        "created_at": record.get("created_at") or record.get("updated_at"),
+        "ai_enabled": bool(record.get("has_initial_ai")),
+        "followup_available": bool(record.get("has_session_context")),
+        "topic_label": topic or _infer_label_from_summary(summary_text, prefix="主题"),
+        "method_label": method or _infer_label_from_summary(summary_text, prefix="方法"),
+    }
+
+
+def _encode_history_cursor(record: Dict[str, object]) -> str:
+    raw = json.dumps([record.get("updated_at"), record.get("session_id")], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).rstrip(b"=").decode("ascii")
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        updated_at, session_id = json.loads(raw)
+    except (ValueError, TypeError) as exc:
+        raise ValueError("分页游标无效。") from exc
+    if not isinstance(updated_at, str) or not isinstance(session_id, str):
+        raise ValueError("分页游标无效。")
+    return updated_at, session_id
 
 
 def _infer_label_from_summary(summary: Optional[str], prefix: str) -> Optional[str]:
@@ -631,17 +840,15 @@ def _infer_label_from_summary(summary: Optional[str], prefix: str) -> Optional[s
     return None
 
 
-def _is_followup_available(record: Dict[str, object]) -> bool:
-    return _extract_session_context(record) is not None
-
-
 def _extract_session_context(record: Dict[str, object]) -> Optional[Dict[str, object]]:
     snapshot = record.get("payload_snapshot")
     if not isinstance(snapshot, dict):
         return None
     session_dict = snapshot.get("session_dict")
+    # Keep in step with the has_session_context column in supabase/migrations.
     if isinstance(session_dict, dict):
-        return session_dict
+        # An empty session_dict carries no context, as in the SQL column.
+        return session_dict or None
     # Legacy rows may have stored raw SessionResult dict at top-level.
     has_context = any(
         key in snapshot
@@ -1,14 +1,25 @@
 from __future__ import annotations
 
+import json
 import os
+import sqlite3
+import threading
 import time
+from abc import ABC, abstractmethod
 from collections import OrderedDict
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
 from threading import Lock
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional, Tuple
+
+from iching.config import PATHS
+from iching.integrations.sqlite_pool import open_writer
 
 MAX_SESSION_CACHE = int(os.getenv("ICHING_SESSION_CACHE_LIMIT", "100"))
 SESSION_CACHE_TTL_SECONDS = int(os.getenv("ICHING_SESSION_CACHE_TTL_SECONDS", str(6 * 3600)))
+SESSION_STATE_BACKEND = os.getenv("ICHING_SESSION_STATE_BACKEND", "memory")
+SESSION_STATE_DB = os.getenv("ICHING_SESSION_STATE_DB", str(PATHS.data_dir / "session_states.db"))
+SHARED_SESSION_CACHE_LIMIT = int(os.getenv("ICHING_SHARED_SESSION_CACHE_LIMIT", "10000"))
 
 
 @dataclass(slots=True)
@@ -43,15 +54,216 @@ class SessionState:
         }
 
 
+class SessionStateTier(ABC):
+    """Shared second tier behind :class:`SessionStateStore`.
+
+    Entries carry a version that increases on every write, so a worker can
+    tell whether its local copy is still current with a single key lookup.
+    """
+
+    @abstractmethod
+    def version(self, session_id: str) -> Optional[int]:
+        ...
+
+    @abstractmethod
+    def load(self, session_id: str) -> Optional[Tuple[int, SessionState]]:
+        ...
+
+    @abstractmethod
+    def save(self, state: SessionState) -> int:
+        ...
+
+    @abstractmethod
+    def mutate(
+        self, session_id: str, change: Callable[[SessionState], None]
+    ) -> Optional[Tuple[int, SessionState]]:
+        """Apply ``change`` to the shared copy atomically; ``None`` if it is gone."""
+        ...
+
+    def touch(self, session_id: str) -> None:
+        return None
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        ...
+
+
+def _encode_state(state: SessionState) -> str:
+    payload = state.to_dict()
+    payload["session_payload"] = state.session_payload
+    payload["last_access"] = state.last_access
+    return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def _decode_state(raw: str) -> SessionState:
+    return SessionState(**json.loads(raw))
+
+
+class SQLiteSessionStateTier(SessionStateTier):
+    """Session states in a local SQLite file shared by every worker on the host."""
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS session_states (
+        session_id TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        expires_at REAL NOT NULL,
+        state TEXT NOT NULL
+    )
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        ttl_seconds: float = SESSION_CACHE_TTL_SECONDS,
+        max_entries: int = SHARED_SESSION_CACHE_LIMIT,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self.ttl_seconds = ttl_seconds if ttl_seconds > 0 else 10 * 365 * 86400
+        self.max_entries = max(1, max_entries)
+        self._local = threading.local()
+        self._init_lock = Lock()
+        self._initialised = False
+        self._writes = 0
+
+    def version(self, session_id: str) -> Optional[int]:
+        row = self._connection().execute(
+            "SELECT version FROM session_states WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+        ).fetchone()
+        return row[0] if row else None
+
+    def load(self, session_id: str) -> Optional[Tuple[int, SessionState]]:
+        row = self._connection().execute(
+            "SELECT version, state FROM session_states WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+        ).fetchone()
+        return (row[0], _decode_state(row[1])) if row else None
+
+    def save(self, state: SessionState) -> int:
+        conn = self._connection()
+        row = conn.execute(
+            "INSERT INTO session_states (session_id, version, expires_at, state) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET version = version + 1, "
+            "expires_at = excluded.expires_at, state = excluded.state RETURNING version",
+            (state.session_id, time.time() + self.ttl_seconds, _encode_state(state)),
+        ).fetchone()
+        self._after_write(conn)
+        return row[0]
+
+    def mutate(
+        self, session_id: str, change: Callable[[SessionState], None]
+    ) -> Optional[Tuple[int, SessionState]]:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT version, state FROM session_states WHERE session_id = ? AND expires_at > ?",
+                (session_id, time.time()),
+            ).fetchone()
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            state = _decode_state(row[1])
+            change(state)
+            state.last_access = time.time()
+            conn.execute(
+                "UPDATE session_states SET version = ?, expires_at = ?, state = ? WHERE session_id = ?",
+                (row[0] + 1, state.last_access + self.ttl_seconds, _encode_state(state), session_id),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return row[0] + 1, state
+
+    def touch(self, session_id: str) -> None:
+        # Only the expiry moves; the version stays so other workers keep their copies.
+        self._connection().execute(
+            "UPDATE session_states SET expires_at = ? WHERE session_id = ?",
+            (time.time() + self.ttl_seconds, session_id),
+        )
+
+    def delete(self, session_id: str) -> None:
+        self._connection().execute("DELETE FROM session_states WHERE session_id = ?", (session_id,))
+
+    def _after_write(self, conn: sqlite3.Connection) -> None:
+        self._writes += 1
+        if self._writes % 256:
+            return
+        conn.execute("DELETE FROM session_states WHERE expires_at <= ?", (time.time(),))
+        conn.execute(
+            "DELETE FROM session_states WHERE session_id IN ("
+            "SELECT session_id FROM session_states ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._init_lock:
+            if not self._initialised:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                setup = open_writer(self.db_path)
+                setup.execute(self._SCHEMA)
+                setup.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_session_states_expiry ON session_states (expires_at)"
+                )
+                setup.commit()
+                setup.close()
+                self._initialised = True
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        self._local.conn = conn
+        return conn
+
+
+@dataclass(frozen=True, slots=True)
+class SessionStoreStats:
+    local_hits: int
+    shared_hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    size: int
+    max_entries: int
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.local_hits + self.shared_hits + self.misses
+        return (self.local_hits + self.shared_hits) / total if total else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        payload: Dict[str, object] = asdict(self)
+        payload["hit_rate"] = round(self.hit_rate, 4)
+        return payload
+
+
 class SessionStateStore:
-    """In-memory registry so chat endpoints can look up recent sessions quickly."""
+    """Registry so chat endpoints can look up recent sessions quickly.
+
+    The first tier is an in-process LRU. Every access moves a session to the
+    end of the LRU order and stamps ``last_access``, so the order is also the
+    expiry order and TTL eviction only ever pops from the front. An optional
+    shared :class:`SessionStateTier` backs it, so a follow-up that lands on
+    another worker still finds the session; local copies are revalidated
+    against the tier's version on every read and writes go through to it.
+    """
 
-    def __init__(self) -> None:
+    def __init__(self, shared: Optional[SessionStateTier] = None) -> None:
         self._lock = Lock()
-        self._sessions: Dict[str, SessionState] = {}
-        self._order: "OrderedDict[str, None]" = OrderedDict()
+        # session_id -> (shared version, state, when the shared copy's expiry was last pushed)
+        self._sessions: "OrderedDict[str, Tuple[int, SessionState, float]]" = OrderedDict()
         self._max_sessions = max(1, MAX_SESSION_CACHE)
         self._ttl_seconds = max(0, SESSION_CACHE_TTL_SECONDS)
+        self.shared = shared
+        self._local_hits = 0
+        self._shared_hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
 
     def register(
         self,
@@ -81,66 +293,117 @@ class SessionStateStore:
             initial_tokens=initial_tokens,
             session_payload=session_payload,
         )
+        version = self.shared.save(state) if self.shared else 0
         with self._lock:
-            self._sessions[session_id] = state
-            self._order[session_id] = None
-            self._touch_locked(session_id)
-            self._evict_locked()
+            self._put_locked(session_id, version, state, time.time())
         return state
 
     def get(self, session_id: str) -> Optional[SessionState]:
         with self._lock:
-            state = self._sessions.get(session_id)
-            if state:
-                self._touch_locked(session_id)
-            return state
+            self._expire_locked()
+            entry = self._sessions.get(session_id)
+            if self.shared is None:
+                if entry is None:
+                    self._misses += 1
+                    return None
+                self._local_hits += 1
+                self._put_locked(session_id, entry[0], entry[1], entry[2])
+                return entry[1]
+        shared_version = self.shared.version(session_id)
+        if entry is not None and shared_version == entry[0]:
+            synced_at = entry[2]
+            if time.time() - synced_at > self._ttl_seconds / 2:
+                self.shared.touch(session_id)
+                synced_at = time.time()
+            with self._lock:
+                self._local_hits += 1
+                self._put_locked(session_id, entry[0], entry[1], synced_at)
+            return entry[1]
+        loaded = self.shared.load(session_id) if shared_version is not None else None
+        with self._lock:
+            if loaded is None:
+                self._sessions.pop(session_id, None)
+                self._misses += 1
+                return None
+            self._shared_hits += 1
+            self._put_locked(session_id, loaded[0], loaded[1], time.time())
+            return loaded[1]
 
     def update_response(self, session_id: str, response_id: str, *, increment_turn: bool = False) -> None:
-        with self._lock:
-            state = self._sessions.get(session_id)
-            if not state:
-                return
+        def change(state: SessionState) -> None:
             state.last_response_id = response_id
             if increment_turn:
                 state.chat_turns += 1
-            self._touch_locked(session_id)
-            self._evict_locked()
+
+        self._mutate(session_id, change)
 
     def add_tokens(self, session_id: str, delta: int) -> None:
         if delta <= 0:
             return
-        with self._lock:
-            state = self._sessions.get(session_id)
-            if not state:
-                return
+
+        def change(state: SessionState) -> None:
             state.initial_tokens += delta
-            self._touch_locked(session_id)
-            self._evict_locked()
+
+        self._mutate(session_id, change)
 
     def remove(self, session_id: str) -> None:
+        if self.shared is not None:
+            self.shared.delete(session_id)
         with self._lock:
             self._sessions.pop(session_id, None)
-            self._order.pop(session_id, None)
 
-    def _touch_locked(self, session_id: str) -> None:
-        state = self._sessions.get(session_id)
-        if not state:
+    def stats(self) -> SessionStoreStats:
+        with self._lock:
+            return SessionStoreStats(
+                local_hits=self._local_hits,
+                shared_hits=self._shared_hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                expirations=self._expirations,
+                size=len(self._sessions),
+                max_entries=self._max_sessions,
+            )
+
+    def _mutate(self, session_id: str, change: Callable[[SessionState], None]) -> None:
+        if self.shared is not None:
+            updated = self.shared.mutate(session_id, change)
+            with self._lock:
+                if updated is None:
+                    self._sessions.pop(session_id, None)
+                else:
+                    self._put_locked(session_id, updated[0], updated[1], time.time())
             return
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None:
+                return
+            change(entry[1])
+            self._put_locked(session_id, entry[0], entry[1], entry[2])
+
+    def _put_locked(self, session_id: str, version: int, state: SessionState, synced_at: float) -> None:
         state.last_access = time.time()
-        if session_id in self._order:
-            self._order.move_to_end(session_id)
-
-    def _evict_locked(self) -> None:
-        now = time.time()
-        if self._ttl_seconds > 0:
-            expired = [
-                session_id
-                for session_id, state in list(self._sessions.items())
-                if now - state.last_access > self._ttl_seconds
-            ]
-            for session_id in expired:
-                self._sessions.pop(session_id, None)
-                self._order.pop(session_id, None)
+        self._sessions[session_id] = (version, state, synced_at)
+        self._sessions.move_to_end(session_id)
         while len(self._sessions) > self._max_sessions:
-            oldest, _ = self._order.popitem(last=False)
-            self._sessions.pop(oldest, None)
+            self._sessions.popitem(last=False)
+            self._evictions += 1
+        self._expire_locked()
+
+    def _expire_locked(self) -> None:
+        if self._ttl_seconds <= 0:
+            return
+        cutoff = time.time() - self._ttl_seconds
+        while self._sessions:
+            oldest = next(iter(self._sessions.values()))[1]
+            if oldest.last_access > cutoff:
+                break
+            self._sessions.popitem(last=False)
+            self._expirations += 1
+
+
+def build_session_state_store() -> SessionStateStore:
+    if SESSION_STATE_BACKEND == "memory":
+        return SessionStateStore()
+    if SESSION_STATE_BACKEND == "sqlite":
+        return SessionStateStore(shared=SQLiteSessionStateTier(Path(SESSION_STATE_DB)))
+    raise ValueError(f"Unknown session state backend: {SESSION_STATE_BACKEND}")
@@ -6,6 +6,7 @@ from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel, ConfigDict, Field, model_validator
 
+from iching.core.metaphysics import CHART_BATCH_LIMIT
 from iching.integrations.ai import DEFAULT_MODEL
 
 ALLOWED_LINE_VALUES = {6, 7, 8, 9}
@@ -46,6 +47,7 @@ class SessionCreateRequest(BaseModel):
     ai_reasoning: Optional[str] = None
     ai_verbosity: Optional[str] = None
     ai_tone: Optional[str] = "normal"
+    defer_ai: bool = False
 
     model_config = ConfigDict(extra="forbid")
 
@@ -93,6 +95,18 @@ class SessionPayload(BaseModel):
     ai_response_id: Optional[str] = None
     ai_usage: Dict[str, int] = Field(default_factory=dict)
     user_authenticated: bool = False
+    ai_job_id: Optional[str] = None
+    ai_job_status: Optional[str] = None
+
+
+class AnalysisJobResponse(BaseModel):
+    job_id: str
+    session_id: str
+    status: str
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+    session: Optional[SessionPayload] = None
 
 
 class ConfigResponse(BaseModel):
@@ -138,10 +152,18 @@ class MetaphysicsChartRequest(BaseModel):
         return self
 
 
+class MetaphysicsBatchRequest(BaseModel):
+    charts: List[MetaphysicsChartRequest] = Field(min_length=1, max_length=CHART_BATCH_LIMIT)
+
+
 class MetaphysicsPeriodRequest(MetaphysicsChartRequest):
     cycle_index: int = Field(ge=0, le=19)
 
 
+class MetaphysicsPeriodYearRequest(MetaphysicsPeriodRequest):
+    year: int = Field(ge=1, le=9999)
+
+
 class PatternLifecycleTransitionResponse(BaseModel):
     before: str
     after: str
@@ -233,6 +255,7 @@ class DayunCycleResponse(BaseModel):
         default_factory=dict
     )
     years: List[PeriodYearResponse] = Field(default_factory=list)
+    years_expanded: bool = False
 
     model_config = ConfigDict(extra="forbid")
 
@@ -243,6 +266,12 @@ class MetaphysicsPeriodResponse(BaseModel):
     model_config = ConfigDict(extra="forbid")
 
 
+class MetaphysicsPeriodYearResponse(BaseModel):
+    year: PeriodYearResponse
+
+    model_config = ConfigDict(extra="forbid")
+
+
 class RuleVersions(BaseModel):
     """Version tuple required to reproduce a generated BaZi result."""
 
@@ -574,3 +603,4 @@ class SessionSummary(BaseModel):
 
 class SessionHistoryResponse(BaseModel):
     sessions: List[SessionSummary]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from iching.config import PATHS
+from iching.integrations.sqlite_pool import open_writer
+
+
+RATE_LIMIT_BACKEND = os.getenv("ICHING_RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_DB = os.getenv("ICHING_RATE_LIMIT_DB", str(PATHS.data_dir / "rate_limits.db"))
+RATE_LIMIT_SWEEP_SECONDS = float(os.getenv("ICHING_RATE_LIMIT_SWEEP_SECONDS", "300"))
+
+DAY_SECONDS = 86400.0
+
+
+def _sliding_total(
+    window_start: float, previous: float, current: float, now: float, window: float
+) -> Tuple[float, float, float]:
+    """Roll a two-bucket window forward to ``now``.
+
+    Returns ``(window_start, previous, current)`` for the fixed window holding
+    ``now``; the sliding estimate is ``previous * (1 - elapsed / window) + current``.
+    """
+    start = now - (now % window)
+    if start == window_start:
+        return window_start, previous, current
+    if start - window_start == window:
+        return start, current, 0.0
+    return start, 0.0, 0.0
+
+
+def _estimate(window_start: float, previous: float, current: float, now: float, window: float) -> float:
+    weight = 1.0 - (now - window_start) / window
+    return previous * weight + current
+
+
+class CounterStore(ABC):
+    """Sliding-window counters keyed by string, shared by the rate limiters.
+
+    Each key keeps two fixed-window buckets (previous and current); the count
+    over the last ``window`` seconds is estimated by weighting the previous
+    bucket by how much of it still overlaps the sliding window. That is O(1)
+    per key and never undercounts a burst at a window boundary by more than
+    the previous bucket's share.
+    """
+
+    @abstractmethod
+    def add(self, key: str, amount: float, *, window: float) -> float:
+        """Add ``amount`` to ``key`` and return the new sliding-window total."""
+        ...
+
+    @abstractmethod
+    def total(self, key: str, *, window: float) -> float:
+        ...
+
+    def sweep(self) -> int:
+        """Drop counters that have fallen out of their window; returns how many."""
+        return 0
+
+
+class MemoryCounterStore(CounterStore):
+    """Per-process counters; fine for a single worker."""
+
+    def __init__(
+        self,
+        *,
+        sweep_interval: float = RATE_LIMIT_SWEEP_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Tuple[float, float, float, float]] = {}
+        self._sweep_interval = sweep_interval
+        self._swept_at = clock()
+
+    def add(self, key: str, amount: float, *, window: float) -> float:
+        now = self._clock()
+        with self._lock:
+            start, previous, current = self._rolled(key, now, window)
+            current += amount
+            self._counters[key] = (start, previous, current, window)
+            self._maybe_sweep(now)
+            return _estimate(start, previous, current, now, window)
+
+    def total(self, key: str, *, window: float) -> float:
+        now = self._clock()
+        with self._lock:
+            start, previous, current = self._rolled(key, now, window)
+            return _estimate(start, previous, current, now, window)
+
+    def sweep(self) -> int:
+        with self._lock:
+            return self._sweep(self._clock())
+
+    def __len__(self) -> int:
+        return len(self._counters)
+
+    def _rolled(self, key: str, now: float, window: float) -> Tuple[float, float, float]:
+        entry = self._counters.get(key)
+        if entry is None:
+            return _sliding_total(-window * 2, 0.0, 0.0, now, window)
+        return _sliding_total(entry[0], entry[1], entry[2], now, window)
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._swept_at >= self._sweep_interval:
+            self._sweep(now)
+
+    def _sweep(self, now: float) -> int:
+        self._swept_at = now
+        expired = [key for key, entry in self._counters.items() if now - entry[0] >= 2 * entry[3]]
+        for key in expired:
+            del self._counters[key]
+        return len(expired)
+
+
+class SQLiteCounterStore(CounterStore):
+    """Counters in a local SQLite file, shared by every worker process on the host.
+
+    Each update is one short ``BEGIN IMMEDIATE`` transaction, so concurrent
+    workers serialise on the database lock instead of losing increments.
+    """
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rate_counters (
+        key TEXT PRIMARY KEY,
+        window_start REAL NOT NULL,
+        previous REAL NOT NULL,
+        current REAL NOT NULL,
+        window REAL NOT NULL
+    ) WITHOUT ROWID
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        *,
+        sweep_interval: float = RATE_LIMIT_SWEEP_SECONDS,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.db_path = Path(db_path)
+        self._clock = clock
+        self._sweep_interval = sweep_interval
+        self._swept_at = clock()
+        self._local = threading.local()
+        self._init_lock = threading.Lock()
+        self._initialised = False
+
+    def add(self, key: str, amount: float, *, window: float) -> float:
+        now = self._clock()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            start, previous, current = self._rolled(conn, key, now, window)
+            current += amount
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_counters (key, window_start, previous, current, window) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, start, previous, current, window),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        if now - self._swept_at >= self._sweep_interval:
+            self.sweep()
+        return _estimate(start, previous, current, now, window)
+
+    def total(self, key: str, *, window: float) -> float:
+        now = self._clock()
+        start, previous, current = self._rolled(self._connection(), key, now, window)
+        return _estimate(start, previous, current, now, window)
+
+    def sweep(self) -> int:
+        now = self._clock()
+        self._swept_at = now
+        cursor = self._connection().execute(
+            "DELETE FROM rate_counters WHERE ? - window_start >= 2 * window", (now,)
+        )
+        return cursor.rowcount
+
+    @staticmethod
+    def _rolled(conn: sqlite3.Connection, key: str, now: float, window: float) -> Tuple[float, float, float]:
+        row = conn.execute(
+            "SELECT window_start, previous, current FROM rate_counters WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return _sliding_total(-window * 2, 0.0, 0.0, now, window)
+        return _sliding_total(row[0], row[1], row[2], now, window)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            return conn
+        with self._init_lock:
+            if not self._initialised:
+                self.db_path.parent.mkdir(parents=True, exist_ok=True)
+                setup = open_writer(self.db_path)
+                setup.execute(self._SCHEMA)
+                setup.commit()
+                setup.close()
+                self._initialised = True
+        conn = sqlite3.connect(self.db_path, isolation_level=None)
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.execute("PRAGMA busy_timeout = 5000")
+        self._local.conn = conn
+        return conn
+
+
+def build_counter_store(kind: str = RATE_LIMIT_BACKEND, db_path: Optional[str] = RATE_LIMIT_DB) -> CounterStore:
+    if kind == "memory":
+        return MemoryCounterStore()
+    if kind == "sqlite":
+        return SQLiteCounterStore(Path(db_path or PATHS.data_dir / "rate_limits.db"))
+    raise ValueError(f"Unknown rate limit backend: {kind}")
@@ -1,18 +1,27 @@
 from __future__ import annotations
 
+import asyncio
 import json
 import os
-import tempfile
 from dataclasses import dataclass
-from datetime import datetime, timezone
-from pathlib import Path
-from threading import Lock
-from typing import Dict, Optional, Tuple
+from functools import partial
+from typing import AsyncIterator, Dict, Optional, Tuple
 
 from iching.config import AppConfig, build_app_config
-from iching.integrations.ai import DEFAULT_MODEL, MODEL_ALIASES, MODEL_CAPABILITIES
-from iching.integrations.supabase_client import SupabaseRestClient, SupabaseUser
-from iching.services.session import SessionService
+from iching.integrations.ai import (
+    DEFAULT_MODEL,
+    MODEL_ALIASES,
+    MODEL_CAPABILITIES,
+    stream_start_analysis,
+)
+from iching.integrations.supabase_client import (
+    AsyncSupabaseRestClient,
+    SupabaseRestClient,
+    SupabaseUser,
+)
+from iching.integrations.supabase_jwt import SupabaseTokenVerifier
+from iching.services.session import SessionResult, SessionService, get_cpu_executor
+from iching.web.rate_limits import DAY_SECONDS, CounterStore, MemoryCounterStore, build_counter_store
 from iching.web.models import (
     ConfigResponse,
     MethodInfo,
@@ -26,6 +35,7 @@ from iching.web.models import (
 MAX_QUESTION_LENGTH = 2000
 MAX_DAILY_ATTEMPTS = 1000
 MAX_DAILY_AI_SUCCESSES = 50
+API_SESSION_HISTORY_LIMIT = int(os.getenv("ICHING_API_SESSION_HISTORY_LIMIT", "0"))
 
 
 class AccessDeniedError(RuntimeError):
@@ -36,74 +46,37 @@ class RateLimitError(RuntimeError):
     """Raised when a client exceeds allowed request quotas."""
 
 
-@dataclass
-class RateCounter:
-    date: str
-    attempts: int = 0
-    ai_successes: int = 0
-
-
 class RateLimiter:
-    def __init__(self, max_attempts: int, max_ai_successes: int) -> None:
+    """Per-IP request and AI quotas over a sliding 24-hour window."""
+
+    def __init__(
+        self,
+        max_attempts: int,
+        max_ai_successes: int,
+        store: Optional[CounterStore] = None,
+    ) -> None:
         self.max_attempts = max_attempts
         self.max_ai_successes = max_ai_successes
-        self._lock = Lock()
-        self._counters: Dict[str, RateCounter] = {}
+        self.store = store or MemoryCounterStore()
 
     def record_attempt(self, ip: str) -> None:
-        normalized = self._normalize_ip(ip)
-        with self._lock:
-            counter = self._get_counter(normalized)
-            counter.attempts += 1
-            if counter.attempts > self.max_attempts:
-                raise RateLimitError("请求过于频繁，请明天再试。")
+        attempts = self.store.add(f"ip:attempts:{self._normalize_ip(ip)}", 1, window=DAY_SECONDS)
+        if attempts > self.max_attempts:
+            raise RateLimitError("过去 24 小时内请求过于频繁，请稍后再试。")
 
     def ensure_ai_quota(self, ip: str) -> None:
-        normalized = self._normalize_ip(ip)
-        with self._lock:
-            counter = self._get_counter(normalized)
-            if counter.ai_successes >= self.max_ai_successes:
-                raise RateLimitError("AI 请求达到每日上限，请明天再试。")
+        successes = self.store.total(f"ip:ai:{self._normalize_ip(ip)}", window=DAY_SECONDS)
+        if successes >= self.max_ai_successes:
+            raise RateLimitError("AI 请求已达 24 小时上限，请稍后再试。")
 
     def record_ai_success(self, ip: str) -> None:
-        normalized = self._normalize_ip(ip)
-        with self._lock:
-            counter = self._get_counter(normalized)
-            counter.ai_successes += 1
-
-    def _get_counter(self, ip: str) -> RateCounter:
-        today = datetime.now(timezone.utc).date().isoformat()
-        counter = self._counters.get(ip)
-        if counter is None or counter.date != today:
-            counter = RateCounter(date=today)
-            self._counters[ip] = counter
-        return counter
+        self.store.add(f"ip:ai:{self._normalize_ip(ip)}", 1, window=DAY_SECONDS)
 
     @staticmethod
     def _normalize_ip(ip: str) -> str:
         return ip or "unknown"
 
 
-def _ensure_dir(path: Path) -> Path:
-    path.mkdir(parents=True, exist_ok=True)
-    return path
-
-
-def _save_archive(directory: Path, prefix: str, content: str) -> Path:
-    target_dir = _ensure_dir(directory)
-    timestamp = datetime.now().strftime("%Y.%m.%d.%H%M%S")
-    filepath = target_dir / f"{prefix}_{timestamp}.txt"
-    try:
-        filepath.write_text(content, encoding="utf-8")
-        return filepath
-    except OSError:
-        fallback_dir = Path(tempfile.gettempdir()) / "iching-archives"
-        fallback_dir.mkdir(parents=True, exist_ok=True)
-        fallback_path = fallback_dir / filepath.name
-        fallback_path.write_text(content, encoding="utf-8")
-        return fallback_path
-
-
 def _validate_ai_password(password: str | None) -> Tuple[bool, str]:
     expected = os.getenv("OPENAI_PW", "")
     if not expected:
@@ -115,8 +88,11 @@ def _validate_ai_password(password: str | None) -> Tuple[bool, str]:
     return True, ""
 
 
-from iching.web.chat_state import SessionStateStore
-from iching.web.chat_service import ChatService
+from iching.web.ai_jobs import AnalysisJobManager, build_job_broker
+from iching.web.archive import SegmentArchive, archive_key, build_session_archive
+from iching.web.chat_state import SessionStateStore, build_session_state_store
+from iching.web.chat_service import USER_DAILY_TOKEN_LIMIT, ChatService, UserTokenLimiter
+from iching.web.write_behind import build_write_queue
 
 
 @dataclass(slots=True)
@@ -126,6 +102,8 @@ class SessionRunner:
     rate_limiter: RateLimiter
     session_state_store: SessionStateStore
     chat_service: ChatService
+    job_manager: Optional[AnalysisJobManager] = None
+    archive: Optional[SegmentArchive] = None
 
     def run(
         self,
@@ -134,6 +112,167 @@ class SessionRunner:
         user: Optional[SupabaseUser] = None,
     ) -> SessionPayload:
         ip = client_ip or "unknown"
+        ai_allowed = self._admit(request, ip, user)
+        result = self.service.create_session(
+            **self._session_arguments(request, ai_allowed), interactive=False
+        )
+        archive_path = self._archive(result)
+        payload = self._complete(request, result, archive_path, ip, user, ai_allowed)
+        if self._should_snapshot(result, user):
+            self.chat_service.record_session_snapshot(
+                result=result,
+                summary_text=payload.summary_text,
+                user=user,
+                session_payload=payload.model_dump(),
+            )
+        return payload
+
+    async def run_async(
+        self,
+        request: SessionCreateRequest,
+        client_ip: str | None = None,
+        user: Optional[SupabaseUser] = None,
+    ) -> SessionPayload:
+        """Event-loop twin of :meth:`run`: awaits the AI and Supabase calls.
+
+        With ``request.defer_ai`` the reading is returned without waiting for
+        the model; the analysis runs as a job on :attr:`job_manager`.
+        """
+        ip = client_ip or "unknown"
+        # The quota counters may live in SQLite; keep their transactions off the loop.
+        ai_allowed = await asyncio.to_thread(self._admit, request, ip, user)
+        defer_ai = ai_allowed and request.defer_ai and self.job_manager is not None
+        result = await self.service.create_session_async(
+            **self._session_arguments(request, ai_allowed and not defer_ai)
+        )
+        archive_path = self._archive(result)
+        payload = await asyncio.to_thread(
+            self._complete, request, result, archive_path, ip, user, ai_allowed
+        )
+        if self._should_snapshot(result, user):
+            await self.chat_service.record_session_snapshot_async(
+                result=result,
+                summary_text=payload.summary_text,
+                user=user,
+                session_payload=payload.model_dump(),
+            )
+        # Submitted after the snapshot so a fast job's AI snapshot is not overwritten.
+        if defer_ai:
+            job = self.job_manager.submit(
+                session_id=result.session_id,
+                user_id=user.id if user else None,
+                work=partial(self._run_analysis_job, request, result, archive_path, ip, user),
+            )
+            payload.ai_job_id = job.job_id
+            payload.ai_job_status = job.status
+        return payload
+
+    async def stream(
+        self,
+        request: SessionCreateRequest,
+        client_ip: str | None = None,
+        user: Optional[SupabaseUser] = None,
+    ) -> AsyncIterator[Dict[str, object]]:
+        """Create a session as events: ``session``, then any ``delta`` events, then ``completed``.
+
+        Quotas and input are checked before the iterator is returned, so those
+        errors surface as exceptions rather than mid-stream.
+        """
+        ip = client_ip or "unknown"
+        ai_allowed = await asyncio.to_thread(self._admit, request, ip, user)
+        return self._stream_events(request, ip, user, ai_allowed)
+
+    async def _stream_events(
+        self,
+        request: SessionCreateRequest,
+        ip: str,
+        user: Optional[SupabaseUser],
+        ai_allowed: bool,
+    ) -> AsyncIterator[Dict[str, object]]:
+        result = await self.service.create_session_async(**self._session_arguments(request, False))
+        archive_path = self._archive(result)
+        payload = await asyncio.to_thread(
+            self._complete, request, result, archive_path, ip, user, ai_allowed
+        )
+        yield {"type": "session", "session": payload.model_dump()}
+
+        events = None
+        if ai_allowed:
+            events = stream_start_analysis(
+                result.to_dict(),
+                model_hint=result.ai_model,
+                reasoning_effort=result.ai_reasoning,
+                verbosity=result.ai_verbosity,
+                tone=result.ai_tone,
+            )
+        ai_result = None
+        if events is not None:
+            async for event in events:
+                if event.get("type") == "delta":
+                    yield event
+                elif event.get("type") == "result":
+                    ai_result = event.get("result")
+        if ai_result is not None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                get_cpu_executor(), self.service.with_analysis, result, ai_result
+            )
+            self._archive(result, archive_path)
+            # Registers chat state, a blocking write with the SQLite session tier.
+            payload = await asyncio.to_thread(
+                self._complete, request, result, archive_path, ip, user, ai_allowed
+            )
+
+        if self._should_snapshot(result, user):
+            await self.chat_service.record_session_snapshot_async(
+                result=result,
+                summary_text=payload.summary_text,
+                user=user,
+                session_payload=payload.model_dump(),
+            )
+        yield {"type": "completed", "session": payload.model_dump(), "usage": result.ai_usage or {}}
+
+    def _run_analysis_job(
+        self,
+        request: SessionCreateRequest,
+        result: SessionResult,
+        archive_path: str,
+        ip: str,
+        user: Optional[SupabaseUser],
+    ) -> Dict[str, object]:
+        """Job body: add the AI analysis, then refresh archive, chat state and Supabase."""
+        analyzed = self.service.analyze_session(result)
+        self._archive(analyzed, archive_path)
+        payload = self._complete(request, analyzed, archive_path, ip, user, True)
+        if self._should_snapshot(result, user):
+            # The request already wrote the row; only the AI columns are new.
+            self.chat_service.record_session_analysis(
+                result=analyzed,
+                user=user,
+                session_payload=payload.model_dump(),
+            )
+        elif self._should_snapshot(analyzed, user):
+            self.chat_service.record_session_snapshot(
+                result=analyzed,
+                summary_text=payload.summary_text,
+                user=user,
+                session_payload=payload.model_dump(),
+            )
+        return payload.model_dump()
+
+    def _archive(self, result: SessionResult, key: Optional[str] = None) -> str:
+        """Queue the session text for the archive; saving ``key`` again replaces it."""
+        if self.archive is None:
+            return ""
+        return self.archive.save(key or archive_key("session", result.session_id), result.full_text)
+
+    def _admit(
+        self,
+        request: SessionCreateRequest,
+        ip: str,
+        user: Optional[SupabaseUser],
+    ) -> bool:
+        """Apply quotas and input checks; return whether AI analysis may run."""
         self.rate_limiter.record_attempt(ip)
         user_authenticated = user is not None
 
@@ -150,8 +289,6 @@ class SessionRunner:
         if request.method_key not in allowed_methods:
             raise ValueError(f"未知的占卜方法: {request.method_key}")
 
-        timestamp = request.timestamp if not request.use_current_time else None
-
         ai_allowed = False
         if request.enable_ai:
             if not user_authenticated:
@@ -161,29 +298,40 @@ class SessionRunner:
             if not ok:
                 raise AccessDeniedError(message)
             ai_allowed = True
+        return ai_allowed
 
-        result = self.service.create_session(
-            topic=request.topic,
-            user_question=request.user_question,
-            user_context=request.user_context,
-            method_key=request.method_key,
-            use_current_time=request.use_current_time,
-            timestamp=timestamp,
-            manual_lines=request.manual_lines,
-            enable_ai=ai_allowed,
-            ai_model=request.ai_model or DEFAULT_MODEL,
-            ai_reasoning=request.ai_reasoning,
-            ai_verbosity=request.ai_verbosity,
-            ai_tone=request.ai_tone,
-            interactive=False,
-        )
+    @staticmethod
+    def _session_arguments(request: SessionCreateRequest, ai_allowed: bool) -> Dict[str, object]:
+        return {
+            "topic": request.topic,
+            "user_question": request.user_question,
+            "user_context": request.user_context,
+            "method_key": request.method_key,
+            "use_current_time": request.use_current_time,
+            "timestamp": request.timestamp if not request.use_current_time else None,
+            "manual_lines": request.manual_lines,
+            "enable_ai": ai_allowed,
+            "ai_model": request.ai_model or DEFAULT_MODEL,
+            "ai_reasoning": request.ai_reasoning,
+            "ai_verbosity": request.ai_verbosity,
+            "ai_tone": request.ai_tone,
+        }
 
-        archive_path = _save_archive(
-            self.config.paths.archive_complete_dir,
-            prefix="session",
-            content=result.full_text,
-        )
+    @staticmethod
+    def _should_snapshot(result: SessionResult, user: Optional[SupabaseUser]) -> bool:
+        return user is not None or bool(result.ai_response_id)
 
+    def _complete(
+        self,
+        request: SessionCreateRequest,
+        result: SessionResult,
+        archive_path: str,
+        ip: str,
+        user: Optional[SupabaseUser],
+        ai_allowed: bool,
+    ) -> SessionPayload:
+        """Build the response and register chat state for an AI-backed session."""
+        user_authenticated = user is not None
         summary = [
             f"主题: {result.topic or '（未填）'}",
             f"问题: {result.user_question or '（无）'}",
@@ -209,7 +357,7 @@ class SessionRunner:
             najia_table=result.najia_table,
             ai_text=result.ai_analysis or "",
             session_dict=safe_session,
-            archive_path=str(archive_path),
+            archive_path=archive_path,
             full_text=result.full_text,
             session_id=result.session_id,
             ai_enabled=bool(result.ai_analysis),
@@ -241,15 +389,6 @@ class SessionRunner:
             if request.enable_ai and ai_allowed:
                 self.rate_limiter.record_ai_success(ip)
 
-        should_snapshot = bool(user_authenticated) or bool(result.ai_response_id)
-        if should_snapshot:
-            self.chat_service.record_session_snapshot(
-                result=result,
-                summary_text=payload.summary_text,
-                user=user,
-                session_payload=payload.model_dump(),
-            )
-
         return payload
 
     def config_response(self) -> ConfigResponse:
@@ -285,20 +424,36 @@ class SessionRunner:
 
 
 _APP_CONFIG = build_app_config()
-_SESSION_SERVICE = SessionService(config=_APP_CONFIG)
+# The API never reads the in-process history, so by default it keeps none.
+_SESSION_SERVICE = SessionService(config=_APP_CONFIG, history_limit=API_SESSION_HISTORY_LIMIT)
+# Shared by the session quotas here and the chat token allowance.
+_COUNTER_STORE = build_counter_store()
 _RATE_LIMITER = RateLimiter(
     max_attempts=MAX_DAILY_ATTEMPTS,
     max_ai_successes=MAX_DAILY_AI_SUCCESSES,
+    store=_COUNTER_STORE,
+)
+_SESSION_STATE_STORE = build_session_state_store()
+# One verified-token cache serves both clients.
+_TOKEN_VERIFIER = SupabaseTokenVerifier()
+_SUPABASE_CLIENT = SupabaseRestClient(token_verifier=_TOKEN_VERIFIER)
+_ASYNC_SUPABASE_CLIENT = AsyncSupabaseRestClient(token_verifier=_TOKEN_VERIFIER)
+_CHAT_SERVICE = ChatService(
+    store=_SESSION_STATE_STORE,
+    client=_SUPABASE_CLIENT,
+    async_client=_ASYNC_SUPABASE_CLIENT,
+    token_limiter=UserTokenLimiter(USER_DAILY_TOKEN_LIMIT, store=_COUNTER_STORE),
+    write_queue=build_write_queue() if _SUPABASE_CLIENT.enabled else None,
 )
-_SESSION_STATE_STORE = SessionStateStore()
-_SUPABASE_CLIENT = SupabaseRestClient()
-_CHAT_SERVICE = ChatService(store=_SESSION_STATE_STORE, client=_SUPABASE_CLIENT)
+_JOB_MANAGER = AnalysisJobManager(build_job_broker())
 _SESSION_RUNNER = SessionRunner(
     service=_SESSION_SERVICE,
     config=_APP_CONFIG,
     rate_limiter=_RATE_LIMITER,
     session_state_store=_SESSION_STATE_STORE,
     chat_service=_CHAT_SERVICE,
+    job_manager=_JOB_MANAGER,
+    archive=build_session_archive(_APP_CONFIG.paths.archive_complete_dir / "segments"),
 )
 
 
@@ -312,3 +467,7 @@ def get_session_state_store() -> SessionStateStore:
 
 def get_chat_service() -> ChatService:
     return _CHAT_SERVICE
+
+
+def get_job_manager() -> AnalysisJobManager:
+    return _JOB_MANAGER
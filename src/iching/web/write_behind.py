@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from uuid import uuid4
+
+from iching.config import PATHS
+from iching.integrations.sqlite_pool import open_writer
+
+
+WRITE_BEHIND_ENABLED = os.getenv("ICHING_WRITE_BEHIND", "1").strip().lower() not in {"0", "false", "no"}
+WRITE_BEHIND_SPOOL = os.getenv("ICHING_WRITE_BEHIND_SPOOL", str(PATHS.data_dir / "write_behind.db"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("ICHING_WRITE_BEHIND_MAX_PENDING", "5000"))
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("ICHING_WRITE_BEHIND_BATCH_SIZE", "100"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("ICHING_WRITE_BEHIND_FLUSH_SECONDS", "0.5"))
+WRITE_BEHIND_MAX_BACKOFF_SECONDS = float(os.getenv("ICHING_WRITE_BEHIND_MAX_BACKOFF_SECONDS", "60"))
+# Spooled writes whose owner stopped renewing this lease are adopted by another process.
+WRITE_BEHIND_LEASE_SECONDS = 120.0
+
+logger = logging.getLogger(__name__)
+
+Writer = Callable[[str, List[Dict[str, object]]], None]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    lease_until REAL NOT NULL
+)
+"""
+
+
+@dataclass(slots=True)
+class PendingWrite:
+    session_id: str
+    kind: str
+    payload: Dict[str, object]
+    spool_id: Optional[int] = None
+
+
+def _is_permanent(exc: Exception) -> bool:
+    """4xx answers other than timeouts and throttling will not improve on retry."""
+    response = getattr(exc, "response", None)
+    status_code = getattr(response, "status_code", None)
+    return isinstance(status_code, int) and 400 <= status_code < 500 and status_code not in (408, 429)
+
+
+def _runs(writes: List[PendingWrite]) -> List[List[PendingWrite]]:
+    """Split ``writes`` into consecutive same-kind runs, preserving order."""
+    runs: List[List[PendingWrite]] = []
+    for write in writes:
+        if runs and runs[-1][0].kind == write.kind:
+            runs[-1].append(write)
+        else:
+            runs.append([write])
+    return runs
+
+
+class WriteBehindQueue:
+    """Ordered write-behind buffer with a durable SQLite spool.
+
+    ``submit`` records a write and returns; a daemon thread hands consecutive
+    runs of the same ``kind`` to the writer in batches, retrying with
+    exponential backoff. Writes are opaque to the queue: the writer registered
+    with :meth:`set_writer` decides what each kind means. Order is global, so
+    one session's writes always land in the order they were submitted.
+
+    Every write is spooled before ``submit`` returns and deleted once applied.
+    Writes left behind by a crash are replayed on the next start (or adopted
+    by a sibling process once their lease lapses). When ``max_pending`` writes
+    are already buffered, ``submit`` applies the write inline instead, which
+    bounds memory and pushes back on callers while Supabase lags; if the
+    session's own backlog cannot be applied first, the write is queued behind
+    it rather than overtaking it.
+    """
+
+    def __init__(
+        self,
+        *,
+        spool_path: Optional[Path] = None,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_backoff: float = WRITE_BEHIND_MAX_BACKOFF_SECONDS,
+        lease_seconds: float = WRITE_BEHIND_LEASE_SECONDS,
+    ) -> None:
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.max_pending = max(1, max_pending)
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.max_backoff = max_backoff
+        self.lease_seconds = lease_seconds
+        self.owner = uuid4().hex
+        self._writer: Optional[Writer] = None
+        self._pending: List[PendingWrite] = []
+        self._lock = threading.Lock()
+        # Held while writes are being applied, so a drain never overtakes the flusher.
+        self._apply_lock = threading.RLock()
+        self._wake = threading.Event()
+        self._closed = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._spool: Optional[sqlite3.Connection] = None
+        self._spool_lock = threading.Lock()
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lease_renewed_at = 0.0
+
+    def set_writer(self, writer: Writer) -> None:
+        self._writer = writer
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def submit(self, kind: str, payload: Dict[str, object], *, session_id: str) -> None:
+        if self._writer is None:
+            raise RuntimeError("Write-behind queue has no writer.")
+        self.start()
+        with self._lock:
+            overflow = len(self._pending) >= self.max_pending
+        if overflow:
+            self.drain(session_id)
+            if not self._has_pending(session_id):
+                self._writer(kind, [payload])
+                return
+            # The drain hit a transient failure; overtaking the requeued writes would reorder them.
+        write = PendingWrite(session_id=session_id, kind=kind, payload=payload)
+        write.spool_id = self._spool_insert(write)
+        with self._lock:
+            self._pending.append(write)
+            wake = len(self._pending) >= self.batch_size
+        if wake:
+            self._wake.set()
+
+    def drain(self, session_id: str) -> None:
+        """Apply every buffered write of ``session_id`` now (read-your-writes)."""
+        with self._apply_lock:
+            writes = self._take(lambda write: write.session_id == session_id)
+            if writes:
+                self._apply(writes)
+
+    def discard(self, session_id: str) -> None:
+        """Forget buffered writes of a session that is being deleted."""
+        with self._apply_lock:
+            writes = self._take(lambda write: write.session_id == session_id)
+            self._spool_delete(writes)
+
+    def flush(self) -> None:
+        """Apply everything buffered, once; failed writes stay queued."""
+        with self._apply_lock:
+            writes = self._take(lambda _: True)
+            if writes:
+                self._apply(writes)
+
+    def close(self) -> None:
+        self._closed.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        if self._writer is not None:
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Final write-behind flush failed; writes stay spooled")
+        with self._spool_lock:
+            if self._spool is not None:
+                # Whatever is left is released for the next process to replay at once.
+                self._spool.execute("UPDATE pending_writes SET lease_until = 0 WHERE owner = ?", (self.owner,))
+                self._spool.close()
+                self._spool = None
+
+    def start(self) -> None:
+        """Open the spool, pick up writes left by earlier runs and start flushing."""
+        if self._writer is None:
+            raise RuntimeError("Write-behind queue has no writer.")
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._open_spool()
+            thread = threading.Thread(target=self._run, name="iching-write-behind", daemon=True)
+            self._thread = thread
+        self._adopt()
+        thread.start()
+
+    def _run(self) -> None:
+        while not self._closed.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            if self._closed.is_set():
+                return
+            if time.monotonic() < self._retry_at:
+                continue
+            try:
+                self._renew_lease()
+                self._adopt()
+                with self._apply_lock:
+                    with self._lock:
+                        batch = self._pending[: self.batch_size]
+                        del self._pending[: self.batch_size]
+                    if batch:
+                        self._apply(batch)
+            except Exception:
+                logger.exception("Write-behind flush loop failed")
+
+    def _has_pending(self, session_id: str) -> bool:
+        with self._lock:
+            return any(write.session_id == session_id for write in self._pending)
+
+    def _take(self, predicate: Callable[[PendingWrite], bool]) -> List[PendingWrite]:
+        with self._lock:
+            taken = [write for write in self._pending if predicate(write)]
+            if taken:
+                self._pending = [write for write in self._pending if not predicate(write)]
+            return taken
+
+    def _apply(self, writes: List[PendingWrite]) -> None:
+        """Apply ``writes`` in order; on a transient failure requeue the unapplied tail."""
+        for index, run in enumerate(_runs(writes)):
+            try:
+                self._writer(run[0].kind, [write.payload for write in run])
+            except Exception as exc:
+                if not _is_permanent(exc):
+                    remaining = [write for later in _runs(writes)[index:] for write in later]
+                    with self._lock:
+                        self._pending[:0] = remaining
+                    self._back_off(exc)
+                    return
+                self._apply_individually(run)
+            self._spool_delete(run)
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def _apply_individually(self, run: List[PendingWrite]) -> None:
+        # A rejected batch is retried row by row so one bad row cannot sink the rest.
+        for write in run:
+            try:
+                self._writer(write.kind, [write.payload])
+            except Exception:
+                logger.exception(
+                    "Dropping write rejected by Supabase",
+                    extra={"session_id": write.session_id, "kind": write.kind},
+                )
+
+    def _back_off(self, exc: Exception) -> None:
+        self._failures += 1
+        delay = min(self.max_backoff, self.flush_interval * (2 ** self._failures))
+        self._retry_at = time.monotonic() + delay * random.uniform(0.5, 1.0)
+        logger.warning("Write-behind flush failed (%s); retrying in %.1fs", exc, delay)
+
+    def _open_spool(self) -> None:
+        if self.spool_path is None:
+            return
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = open_writer(self.spool_path)
+        conn.execute(_SCHEMA)
+        conn.commit()
+        conn.close()
+        self._spool = sqlite3.connect(self.spool_path, check_same_thread=False, isolation_level=None)
+        self._spool.execute("PRAGMA synchronous = NORMAL")
+        self._spool.execute("PRAGMA busy_timeout = 5000")
+
+    def _spool_insert(self, write: PendingWrite) -> Optional[int]:
+        with self._spool_lock:
+            if self._spool is None:
+                return None
+            cursor = self._spool.execute(
+                "INSERT INTO pending_writes (session_id, kind, payload, owner, lease_until) VALUES (?, ?, ?, ?, ?)",
+                (
+                    write.session_id,
+                    write.kind,
+                    json.dumps(write.payload, ensure_ascii=False, default=str),
+                    self.owner,
+                    time.time() + self.lease_seconds,
+                ),
+            )
+            return cursor.lastrowid
+
+    def _spool_delete(self, writes: List[PendingWrite]) -> None:
+        ids = [(write.spool_id,) for write in writes if write.spool_id is not None]
+        if not ids:
+            return
+        with self._spool_lock:
+            if self._spool is not None:
+                self._spool.executemany("DELETE FROM pending_writes WHERE id = ?", ids)
+
+    def _renew_lease(self) -> None:
+        now = time.time()
+        if now - self._lease_renewed_at < self.lease_seconds / 4:
+            return
+        self._lease_renewed_at = now
+        with self._spool_lock:
+            if self._spool is not None:
+                self._spool.execute(
+                    "UPDATE pending_writes SET lease_until = ? WHERE owner = ?",
+                    (now + self.lease_seconds, self.owner),
+                )
+
+    def _adopt(self) -> None:
+        """Take over spooled writes whose owner is gone, oldest first, within the memory cap."""
+        with self._lock:
+            room = self.max_pending - len(self._pending)
+        if room <= 0:
+            return
+        now = time.time()
+        with self._spool_lock:
+            if self._spool is None:
+                return
+            self._spool.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._spool.execute(
+                    "SELECT id, session_id, kind, payload FROM pending_writes "
+                    "WHERE owner != ? AND lease_until < ? ORDER BY id LIMIT ?",
+                    (self.owner, now, room),
+                ).fetchall()
+                self._spool.executemany(
+                    "UPDATE pending_writes SET owner = ?, lease_until = ? WHERE id = ?",
+                    [(self.owner, now + self.lease_seconds, row[0]) for row in rows],
+                )
+                self._spool.execute("COMMIT")
+            except Exception:
+                self._spool.execute("ROLLBACK")
+                raise
+        if not rows:
+            return
+        adopted = [
+            PendingWrite(session_id=row[1], kind=row[2], payload=json.loads(row[3]), spool_id=row[0])
+            for row in rows
+        ]
+        logger.info("Replaying %d spooled writes", len(adopted))
+        with self._lock:
+            self._pending[:0] = adopted
+
+
+def build_write_queue() -> Optional[WriteBehindQueue]:
+    if not WRITE_BEHIND_ENABLED:
+        return None
+    return WriteBehindQueue(spool_path=Path(WRITE_BEHIND_SPOOL) if WRITE_BEHIND_SPOOL else None)
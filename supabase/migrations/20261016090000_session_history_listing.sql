@@ -0,0 +1,10 @@
+-- Keyset-paginated session history reads lightweight columns only.
+
+alter table public.sessions
+  add column if not exists has_initial_ai boolean
+    generated always as (coalesce(initial_ai_text, '') <> '') stored;
+
+create index if not exists idx_sessions_user_updated
+  on public.sessions (user_id, updated_at desc, session_id desc);
+
+notify pgrst, 'reload schema';
@@ -0,0 +1,21 @@
+-- History rows flag follow-up availability the way _extract_session_context
+-- decides it, without reading payload_snapshot.
+
+alter table public.sessions
+  add column if not exists has_session_context boolean
+    generated always as (
+      case
+        when jsonb_typeof(payload_snapshot -> 'session_dict') = 'object'
+          then payload_snapshot -> 'session_dict' <> '{}'::jsonb
+        else coalesce(
+          jsonb_typeof(payload_snapshot) = 'object'
+            and payload_snapshot ?| array[
+              'topic', 'user_question', 'current_time_str', 'method', 'lines',
+              'hex_text', 'bazi_output', 'elements_output', 'najia_data'
+            ],
+          false
+        )
+      end
+    ) stored;
+
+notify pgrst, 'reload schema';
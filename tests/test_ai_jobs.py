@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from threading import Event
+
+from iching.web.ai_jobs import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    AnalysisJobManager,
+    InlineJobBroker,
+    ThreadJobBroker,
+)
+
+
+def test_inline_broker_runs_jobs_to_completion_and_reports_failures() -> None:
+    manager = AnalysisJobManager(InlineJobBroker())
+
+    done = manager.submit(session_id="s1", user_id="u1", work=lambda: {"ai_text": "ok"})
+    assert done.finished and done.status == JOB_COMPLETED
+    assert manager.get(done.job_id).to_dict()["session"] == {"ai_text": "ok"}
+
+    def explode():
+        raise RuntimeError("model unavailable")
+
+    failed = manager.submit(session_id="s2", user_id="u1", work=explode)
+    assert failed.status == JOB_FAILED
+    assert failed.error and "model unavailable" not in failed.error
+
+
+def test_thread_broker_fails_jobs_beyond_its_queue_limit() -> None:
+    release = Event()
+    broker = ThreadJobBroker(workers=1, queue_limit=1)
+    manager = AnalysisJobManager(broker)
+    try:
+        blocking = manager.submit(
+            session_id="s1", user_id="u1", work=lambda: {"released": release.wait(10)}
+        )
+        overflow = manager.submit(session_id="s2", user_id="u1", work=lambda: {})
+        assert overflow.finished and overflow.status == JOB_FAILED
+        assert not blocking.finished
+
+        release.set()
+        assert blocking.wait(10)
+        assert blocking.result == {"released": True}
+    finally:
+        release.set()
+        broker.shutdown()
@@ -1,11 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import BadRequestError
+
 from iching.integrations.ai import (
     DEFAULT_MODEL,
     MODEL_CAPABILITIES,
     _reasoning_payload,
+    _request_openai_response,
+    _request_openai_response_async,
+    clear_capability_cache,
     normalize_model_name,
+    stream_start_analysis,
 )
+from iching.integrations.openai_clients import OpenAIClientRegistry
 from iching.web.chat_service import CHAT_FOLLOWUP_MODEL
 
 
@@ -34,3 +46,163 @@ def test_current_ai_model_catalog_and_aliases() -> None:
         "context": "all_turns",
     }
     assert _reasoning_payload("gpt-5.5", "medium") == {"effort": "medium"}
+
+
+class _FakeResponses:
+    def __init__(self, errors) -> None:
+        self.errors = list(errors)
+        self.payloads = []
+
+    def create(self, **payload):
+        self.payloads.append(payload)
+        if self.errors:
+            raise self.errors.pop(0)
+        return SimpleNamespace(id="resp_1", output_text=" ok ", usage=None)
+
+
+class _FakeAsyncResponses(_FakeResponses):
+    async def create(self, **payload):
+        return _FakeResponses.create(self, **payload)
+
+
+def _bad_request(message: str) -> BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    return BadRequestError(message, response=httpx.Response(400, request=request), body=None)
+
+
+def test_openai_request_drops_rejected_parameters_in_sync_and_async_paths() -> None:
+    arguments = dict(
+        model_name="gpt-5.5",
+        instructions="instructions",
+        user_input="question",
+        reasoning="high",
+        verbosity="low",
+    )
+
+    for responses_class, call in (
+        (_FakeResponses, lambda client: _request_openai_response(client=client, **arguments)),
+        (
+            _FakeAsyncResponses,
+            lambda client: asyncio.run(_request_openai_response_async(client=client, **arguments)),
+        ),
+    ):
+        clear_capability_cache()
+        responses = responses_class(
+            [_bad_request("Unsupported parameter: reasoning"), _bad_request("text.verbosity unsupported")]
+        )
+        assert call(SimpleNamespace(responses=responses)).id == "resp_1"
+        assert [("reasoning" in p, "text" in p) for p in responses.payloads] == [
+            (True, True),
+            (False, True),
+            (False, False),
+        ]
+
+        # The rejections are remembered, so the next request goes out clean.
+        repeat = responses_class([])
+        assert call(SimpleNamespace(responses=repeat)).id == "resp_1"
+        assert [("reasoning" in p, "text" in p) for p in repeat.payloads] == [(False, False)]
+
+        other_model = _FakeResponses([])
+        _request_openai_response(
+            client=SimpleNamespace(responses=other_model), **{**arguments, "model_name": "gpt-5.6-sol"}
+        )
+        assert [("reasoning" in p, "text" in p) for p in other_model.payloads] == [(True, True)]
+    clear_capability_cache()
+
+
+def test_openai_clients_are_shared_per_key_and_per_event_loop() -> None:
+    registry = OpenAIClientRegistry()
+    first = registry.get("sk-one")
+    assert registry.get("sk-one") is first
+    assert registry.get("sk-two") is not first
+
+    async def pair():
+        return registry.get_async("sk-one"), registry.get_async("sk-one")
+
+    left, right = asyncio.run(pair())
+    assert left is right
+    other_loop, _ = asyncio.run(pair())
+    assert other_loop is not left
+    registry.close()
+
+
+def test_closing_the_registry_closes_the_async_pools_of_the_running_loop() -> None:
+    registry = OpenAIClientRegistry()
+    sync_client = registry.get("sk-one")
+
+    async def open_and_close():
+        client = registry.get_async("sk-one")
+        await registry.close_async()
+        return client
+
+    client = asyncio.run(open_and_close())
+
+    assert client.is_closed()
+    assert sync_client.is_closed()
+
+
+def test_openai_request_reraises_unrelated_bad_request() -> None:
+    clear_capability_cache()
+    responses = _FakeResponses([_bad_request("model not found")])
+    with pytest.raises(BadRequestError):
+        _request_openai_response(
+            client=SimpleNamespace(responses=responses),
+            model_name="gpt-5.5",
+            instructions="instructions",
+            user_input="question",
+            reasoning="high",
+            verbosity="low",
+        )
+    assert len(responses.payloads) == 1
+
+
+def test_stream_start_analysis_yields_deltas_then_result(monkeypatch) -> None:
+    clear_capability_cache()
+    captured = {}
+
+    class FakeStream:
+        def __init__(self) -> None:
+            self.events = [
+                SimpleNamespace(type="response.output_text.delta", delta="卦"),
+                SimpleNamespace(type="response.output_text.delta", delta="象"),
+                SimpleNamespace(
+                    type="response.completed",
+                    response=SimpleNamespace(id="resp_s", usage={"total_tokens": 7}),
+                ),
+            ]
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc_info):
+            return None
+
+        def __aiter__(self):
+            return self._iterate()
+
+        async def _iterate(self):
+            for event in self.events:
+                yield event
+
+    class FakeResponses:
+        async def create(self, **payload):
+            captured.update(payload)
+            return FakeStream()
+
+    monkeypatch.setattr(
+        "iching.integrations.ai.get_async_openai_client",
+        lambda api_key: SimpleNamespace(responses=FakeResponses()),
+    )
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    assert stream_start_analysis({"topic": "事业"}) is None
+
+    async def collect():
+        events = stream_start_analysis({"topic": "事业"}, api_key="sk-test", model_hint="gpt-5.5")
+        return [event async for event in events]
+
+    events = asyncio.run(collect())
+    assert [event["type"] for event in events] == ["delta", "delta", "result"]
+    assert events[-1]["result"].text == "卦象"
+    assert events[-1]["result"].response_id == "resp_s"
+    assert events[-1]["result"].usage == {"total_tokens": 7}
+    assert captured["stream"] is True and captured["model"] == "gpt-5.5"
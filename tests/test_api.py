@@ -1,11 +1,20 @@
 from __future__ import annotations
 
+import asyncio
+import json
 from datetime import datetime
+from types import SimpleNamespace
 
+import httpx
+import pytest
 from fastapi.testclient import TestClient
 
 from iching.integrations.ai import AIResponseData
-from iching.integrations.supabase_client import SupabaseUser
+from iching.integrations.supabase_client import (
+    AsyncSupabaseRestClient,
+    SupabaseRestClient,
+    SupabaseUser,
+)
 from iching.core.bazi_rules.registry import load_packaged_shen_registry
 from iching.core.calendar_engine import ENGINE_VERSION as CALENDAR_ENGINE_VERSION
 from iching.core.metaphysics_consumer import CONSUMER_RULES_VERSION
@@ -13,6 +22,9 @@ from iching.core.metaphysics_statistics import BaselineVersionMismatchError
 from iching.core.shensha import RULES_VERSION as SHENSHA_RULES_VERSION
 from iching.web.api.main import app
 from iching.web.api import routes
+from iching.web.ai_jobs import AnalysisJobManager, ThreadJobBroker
+from iching.web.chat_service import ChatService, _extract_session_context
+from iching.web.chat_state import SessionStateStore
 
 
 client = TestClient(app)
@@ -24,6 +36,14 @@ def test_healthcheck() -> None:
     assert response.json() == {"status": "ok"}
 
 
+def test_cache_stats_endpoint_reports_chart_and_reading_caches() -> None:
+    response = client.get("/api/health/caches")
+    data = response.json()
+    assert response.status_code == 200
+    assert {"natal", "period_trees"} <= set(data["charts"])
+    assert {"hits", "misses", "size", "hit_rate"} <= set(data["readings"])
+
+
 def test_config_endpoint() -> None:
     response = client.get("/api/config")
     data = response.json()
@@ -109,6 +129,67 @@ def test_metaphysics_period_endpoint_returns_typed_activity_cycle() -> None:
     assert all(activation["activity"] >= 0 for activation in activations)
 
 
+def test_metaphysics_batch_endpoint_streams_one_ndjson_line_per_chart() -> None:
+    chart = {
+        "timestamp": "2004-06-26T04:30:00",
+        "timezone": "Asia/Shanghai",
+        "gender": "male",
+        "reference_timestamp": "2026-07-16T12:00:00",
+    }
+    class FakeChatService:
+        async def authenticate_async(self, token: str) -> SupabaseUser:
+            return SupabaseUser(id="00000000-0000-0000-0000-000000000001")
+
+    batch = {"charts": [chart, {**chart, "timezone": "Mars/Olympus"}, chart]}
+    assert client.post("/api/tools/metaphysics/batch", json=batch).status_code == 401
+    app.dependency_overrides[routes._get_chat_service] = lambda: FakeChatService()
+    try:
+        response = client.post(
+            "/api/tools/metaphysics/batch",
+            json=batch,
+            headers={"Authorization": "Bearer test-token"},
+        )
+        empty = client.post(
+            "/api/tools/metaphysics/batch",
+            json={"charts": []},
+            headers={"Authorization": "Bearer test-token"},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = sorted(
+        (json.loads(line) for line in response.text.splitlines()), key=lambda item: item["index"]
+    )
+    assert [line["index"] for line in lines] == [0, 1, 2]
+    assert lines[0]["chart"] == client.post("/api/tools/metaphysics", json=chart).json()
+    assert lines[2]["chart"] == lines[0]["chart"]
+    assert "未知时区" in lines[1]["error"]
+    assert empty.status_code == 422
+
+
+def test_metaphysics_period_year_endpoint_expands_a_single_year() -> None:
+    request = {
+        "timestamp": "2004-06-26T04:30:00",
+        "timezone": "Asia/Shanghai",
+        "gender": "male",
+        "cycle_index": 2,
+    }
+    cycle = client.post("/api/tools/metaphysics/periods", json=request).json()["cycle"]
+    target = cycle["years"][4]
+
+    response = client.post(
+        "/api/tools/metaphysics/periods/year", json={**request, "year": target["year"]}
+    )
+
+    assert response.status_code == 200
+    assert response.json()["year"] == target
+    assert len(target["months"]) == 12
+    missing = client.post("/api/tools/metaphysics/periods/year", json={**request, "year": 1900})
+    assert missing.status_code == 404
+
+
 def test_pattern_rule_endpoint_returns_compact_verified_source_summary() -> None:
     registry = load_packaged_shen_registry()
     rule = registry.rules[0]
@@ -265,9 +346,15 @@ def test_create_session_ai_enabled_returns_reading_brief(monkeypatch) -> None:
                 id="00000000-0000-0000-0000-000000000001", email="reader@example.com"
             )
 
+        async def authenticate_async(self, token: str) -> SupabaseUser:
+            return self.authenticate(token)
+
         def record_session_snapshot(self, *args, **kwargs) -> None:
             return None
 
+        async def record_session_snapshot_async(self, *args, **kwargs) -> None:
+            return None
+
     def fake_start_analysis(*args, **kwargs):
         return AIResponseData(
             text=(
@@ -287,7 +374,13 @@ def test_create_session_ai_enabled_returns_reading_brief(monkeypatch) -> None:
     monkeypatch.setattr(
         "iching.web.service._validate_ai_password", lambda password: (True, "")
     )
+    async def fake_start_analysis_async(*args, **kwargs):
+        return fake_start_analysis(*args, **kwargs)
+
     monkeypatch.setattr("iching.services.session.start_analysis", fake_start_analysis)
+    monkeypatch.setattr(
+        "iching.services.session.start_analysis_async", fake_start_analysis_async
+    )
     fake_chat_service = FakeChatService()
     monkeypatch.setattr(routes.get_session_runner(), "chat_service", fake_chat_service)
     app.dependency_overrides[routes._get_chat_service] = lambda: fake_chat_service
@@ -319,3 +412,300 @@ def test_create_session_ai_enabled_returns_reading_brief(monkeypatch) -> None:
     assert data["reading_brief"]["timing"][0]["window"] == "一周内"
     assert data["reading_brief"]["actions"][0]["action"] == "先问清负责人"
     assert data["reading_brief"]["followup_prompts"][0] == "应该先问谁？"
+
+
+def test_chat_service_records_snapshot_through_async_supabase_client() -> None:
+    requests: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/auth/v1/user"):
+            return httpx.Response(200, json={"id": "user-1", "email": "reader@example.com"})
+        if request.method == "GET":
+            return httpx.Response(200, json=[])
+        return httpx.Response(201, json=[json.loads(request.content)])
+
+    settings = dict(project_url="https://example.supabase.co", service_key="service-key")
+    async_client = AsyncSupabaseRestClient(
+        **settings, client=httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    )
+    chat_service = ChatService(
+        store=SessionStateStore(),
+        client=SupabaseRestClient(**settings),
+        async_client=async_client,
+    )
+    result = SimpleNamespace(
+        session_id="session-1",
+        ai_usage={"total_tokens": 42},
+        ai_response_id="resp_1",
+        ai_model="gpt-5.5",
+        ai_reasoning="high",
+        ai_verbosity="low",
+        ai_tone="normal",
+        ai_analysis="text",
+    )
+
+    async def scenario() -> SupabaseUser:
+        user = await chat_service.authenticate_async("user-token")
+        await chat_service.record_session_snapshot_async(
+            result, "summary", user=user, session_payload={"session_id": "session-1"}
+        )
+        await async_client.aclose()
+        return user
+
+    user = asyncio.run(scenario())
+
+    assert user.id == "user-1"
+    assert [request.method for request in requests] == ["GET", "GET", "POST"]
+    assert requests[0].headers["Authorization"] == "Bearer user-token"
+    assert requests[1].url.params["user_id"] == "eq.user-1"
+    upserted = json.loads(requests[2].content)
+    assert upserted["user_id"] == "user-1"
+    assert upserted["tokens_used"] == 42
+    assert upserted["payload_snapshot"] == {"session_id": "session-1"}
+
+
+def test_create_session_defer_ai_returns_reading_then_job_result(monkeypatch) -> None:
+    owner = SupabaseUser(id="00000000-0000-0000-0000-000000000002", email="reader@example.com")
+    snapshots = []
+
+    class FakeChatService:
+        async def authenticate_async(self, token: str) -> SupabaseUser:
+            if token == "other-token":
+                return SupabaseUser(id="00000000-0000-0000-0000-000000000003")
+            return owner
+
+        def record_session_snapshot(self, result, **kwargs) -> None:
+            snapshots.append(("job", result.ai_response_id))
+
+        def record_session_analysis(self, result, **kwargs) -> None:
+            snapshots.append(("analysis", result.ai_response_id))
+
+        async def record_session_snapshot_async(self, result, **kwargs) -> None:
+            snapshots.append(("request", result.ai_response_id))
+
+    def fake_start_analysis(*args, **kwargs):
+        return AIResponseData(
+            text="# 一句话结论\n- 后台分析完成。",
+            response_id="resp_job",
+            usage={"total_tokens": 9},
+        )
+
+    monkeypatch.setattr("iching.web.service._validate_ai_password", lambda password: (True, ""))
+    monkeypatch.setattr("iching.services.session.start_analysis", fake_start_analysis)
+    job_manager = AnalysisJobManager(ThreadJobBroker(workers=1))
+    fake_chat_service = FakeChatService()
+    runner = routes.get_session_runner()
+    monkeypatch.setattr(runner, "chat_service", fake_chat_service)
+    monkeypatch.setattr(runner, "job_manager", job_manager)
+    app.dependency_overrides[routes._get_chat_service] = lambda: fake_chat_service
+    app.dependency_overrides[routes._get_job_manager] = lambda: job_manager
+    headers = {"Authorization": "Bearer test-token"}
+    try:
+        response = client.post(
+            "/api/sessions",
+            json={
+                "topic": "事业",
+                "method_key": "x",
+                "manual_lines": [7, 8, 7, 8, 7, 8],
+                "use_current_time": False,
+                "timestamp": datetime(2024, 5, 1, 8, 30).isoformat(),
+                "enable_ai": True,
+                "access_password": "test",
+                "defer_ai": True,
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+        data = response.json()
+        assert data["ai_enabled"] is False
+        assert data["ai_text"] == ""
+        assert data["reading_brief"]["headline"]
+        job_id = data["ai_job_id"]
+        assert job_id
+
+        assert job_manager.get(job_id).wait(timeout=30)
+        polled = client.get(f"/api/jobs/{job_id}", headers=headers)
+        events = client.get(f"/api/jobs/{job_id}/events", headers=headers)
+        stranger = client.get(f"/api/jobs/{job_id}", headers={"Authorization": "Bearer other-token"})
+    finally:
+        app.dependency_overrides.clear()
+        job_manager.broker.shutdown()
+
+    assert polled.status_code == 200
+    job = polled.json()
+    assert job["status"] == "completed"
+    assert job["session"]["session_id"] == data["session_id"]
+    assert job["session"]["ai_text"].endswith("后台分析完成。")
+    assert "后台分析完成" in job["session"]["reading_brief"]["headline"]
+    assert events.status_code == 200
+    assert "event: status" in events.text and "event: completed" in events.text
+    assert stranger.status_code == 404
+    assert snapshots == [("request", None), ("analysis", "resp_job")]
+    assert runner.session_state_store.get(data["session_id"]).ai_text.endswith("后台分析完成。")
+
+
+def test_stream_session_sends_reading_first_then_ai_deltas(monkeypatch) -> None:
+    owner = SupabaseUser(id="00000000-0000-0000-0000-000000000004")
+    snapshots = []
+
+    class FakeChatService:
+        async def authenticate_async(self, token: str) -> SupabaseUser:
+            return owner
+
+        async def record_session_snapshot_async(self, result, **kwargs) -> None:
+            snapshots.append((result.ai_response_id, kwargs["session_payload"]["ai_text"]))
+
+    def fake_stream_start_analysis(data, **kwargs):
+        assert data["hex_text"]
+
+        async def generate():
+            for chunk in ("# 一句话结论\n", "- 流式结论。"):
+                yield {"type": "delta", "delta": chunk}
+            yield {
+                "type": "result",
+                "result": AIResponseData(
+                    text="# 一句话结论\n- 流式结论。",
+                    response_id="resp_stream",
+                    usage={"total_tokens": 5},
+                ),
+            }
+
+        return generate()
+
+    monkeypatch.setattr("iching.web.service._validate_ai_password", lambda password: (True, ""))
+    monkeypatch.setattr("iching.web.service.stream_start_analysis", fake_stream_start_analysis)
+    fake_chat_service = FakeChatService()
+    monkeypatch.setattr(routes.get_session_runner(), "chat_service", fake_chat_service)
+    app.dependency_overrides[routes._get_chat_service] = lambda: fake_chat_service
+    try:
+        response = client.post(
+            "/api/sessions/stream",
+            json={
+                "topic": "事业",
+                "method_key": "x",
+                "manual_lines": [7, 8, 7, 8, 7, 8],
+                "use_current_time": False,
+                "timestamp": datetime(2024, 5, 1, 8, 30).isoformat(),
+                "enable_ai": True,
+                "access_password": "test",
+            },
+            headers={"Authorization": "Bearer test-token"},
+        )
+        rejected = client.post(
+            "/api/sessions/stream",
+            json={"topic": "未知", "method_key": "x", "manual_lines": [7, 8, 7, 8, 7, 8]},
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        (block.split("\n")[0].removeprefix("event: "), json.loads(block.split("\n")[1].removeprefix("data: ")))
+        for block in response.text.strip().split("\n\n")
+    ]
+    assert [name for name, _ in events] == ["session", "delta", "delta", "completed"]
+    assert events[0][1]["session"]["ai_text"] == ""
+    assert events[0][1]["session"]["hex_text"]
+    assert events[1][1] == {"delta": "# 一句话结论\n"}
+    completed = events[-1][1]
+    assert completed["usage"] == {"total_tokens": 5}
+    assert completed["session"]["ai_response_id"] == "resp_stream"
+    assert "流式结论" in completed["session"]["reading_brief"]["headline"]
+    assert snapshots == [("resp_stream", "# 一句话结论\n- 流式结论。")]
+    assert rejected.status_code == 400
+
+
+@pytest.mark.parametrize(
+    ("snapshot", "expected"),
+    [
+        ({"session_dict": {"topic": "事业"}}, {"topic": "事业"}),
+        ({"session_dict": {}, "topic": "事业"}, None),
+        ({"topic": "事业"}, {"topic": "事业"}),
+        ({"summary": "x"}, None),
+    ],
+)
+def test_session_context_rule_matches_the_history_column(snapshot, expected) -> None:
+    # Mirrors has_session_context in supabase/migrations: an empty session_dict is no context.
+    assert _extract_session_context({"payload_snapshot": snapshot}) == expected
+
+
+def test_session_history_is_keyset_paginated_projected_and_revalidated() -> None:
+    requests: list[httpx.Request] = []
+    rows = [
+        {
+            "session_id": f"s{index}",
+            "summary_text": "方法: 五十蓍草法",
+            "created_at": None,
+            "updated_at": f"2026-10-0{9 - index}T00:00:00+00:00",
+            "has_initial_ai": index == 0,
+            "has_session_context": index < 2,
+            "session_topic": "事业" if index == 0 else None,
+            "session_method": None,
+            "snapshot_topic": None,
+            "snapshot_method": None,
+        }
+        for index in range(3)
+    ]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.path.endswith("/auth/v1/user"):
+            return httpx.Response(200, json={"id": "user-1"})
+        limit = int(request.url.params["limit"])
+        page = rows[2:] if "or" in request.url.params else rows
+        return httpx.Response(200, json=page[:limit])
+
+    chat_service = ChatService(
+        store=SessionStateStore(),
+        client=SupabaseRestClient(
+            project_url="https://example.supabase.co",
+            service_key="service-key",
+            client=httpx.Client(transport=httpx.MockTransport(handler)),
+        ),
+    )
+    app.dependency_overrides[routes._get_chat_service] = lambda: chat_service
+    headers = {"Authorization": "Bearer test-token"}
+    try:
+        first = client.get("/api/sessions?limit=2", headers=headers)
+        cursor = first.json()["next_cursor"]
+        second = client.get("/api/sessions", params={"limit": 2, "cursor": cursor}, headers=headers)
+        revalidated = client.get(
+            "/api/sessions?limit=2", headers={**headers, "If-None-Match": first.headers["ETag"]}
+        )
+        bad_cursor = client.get("/api/sessions?cursor=%%%", headers=headers)
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == 200
+    page = first.json()
+    assert [item["session_id"] for item in page["sessions"]] == ["s0", "s1"]
+    assert page["sessions"][0]["ai_enabled"] is True
+    assert page["sessions"][0]["followup_available"] is True
+    assert page["sessions"][0]["topic_label"] == "事业"
+    assert page["sessions"][0]["method_label"] == "五十蓍草法"
+    assert page["sessions"][1]["ai_enabled"] is False
+    assert page["sessions"][1]["followup_available"] is True
+
+    listing = [request for request in requests if request.url.path.endswith("/rest/v1/sessions")]
+    select = listing[0].url.params["select"]
+    assert "payload_snapshot->session_dict->>topic" in select
+    assert "has_session_context" in select
+    assert "payload_snapshot," not in select and "initial_ai_text" not in select
+    assert listing[0].url.params["limit"] == "3"
+    assert listing[0].url.params["order"] == "updated_at.desc,session_id.desc"
+
+    assert second.status_code == 200
+    assert [item["session_id"] for item in second.json()["sessions"]] == ["s2"]
+    assert second.json()["next_cursor"] is None
+    assert second.json()["sessions"][0]["followup_available"] is False
+    assert listing[1].url.params["or"] == (
+        '(updated_at.lt."2026-10-08T00:00:00+00:00",'
+        'and(updated_at.eq."2026-10-08T00:00:00+00:00",session_id.lt."s1"))'
+    )
+
+    assert revalidated.status_code == 304
+    assert revalidated.headers["ETag"] == first.headers["ETag"]
+    assert not revalidated.content
+    assert bad_cursor.status_code == 400
@@ -0,0 +1,43 @@
+from iching.core.cache import BoundedCache
+
+
+def test_bounded_cache_evicts_least_recently_used_entry():
+    cache = BoundedCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert stats.evictions == 1
+    assert stats.hits == 3
+    assert stats.misses == 1
+    assert stats.size == 2
+
+
+def test_bounded_cache_expires_entries_after_ttl():
+    now = [100.0]
+    cache = BoundedCache(max_entries=4, ttl_seconds=10, clock=lambda: now[0])
+    cache.put("a", 1)
+    now[0] += 9
+    assert cache.get("a") == 1
+    now[0] += 2
+    assert cache.get("a") is None
+    assert cache.stats().expirations == 1
+
+
+def test_bounded_cache_get_or_create_builds_once_per_key():
+    cache = BoundedCache(max_entries=4)
+    calls = []
+
+    def factory():
+        calls.append(None)
+        return "value"
+
+    assert cache.get_or_create("k", factory) == "value"
+    assert cache.get_or_create("k", factory) == "value"
+    assert len(calls) == 1
+    assert cache.stats().hit_rate == 0.5
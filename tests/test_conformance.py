@@ -0,0 +1,49 @@
+from datetime import datetime
+
+import pytest
+
+from iching.core.conformance import (
+    chi_square_p_value,
+    chi_square_test,
+    check_batch_method,
+    check_meihua_calendar,
+    check_scalar_method,
+    code_probabilities,
+)
+
+
+@pytest.mark.parametrize(
+    ("statistic", "dof", "expected"),
+    [(7.815, 3, 0.05), (11.345, 3, 0.01), (1.0, 1, 0.3173), (4095.0, 4095, 0.497)],
+)
+def test_chi_square_p_value_matches_reference_quantiles(statistic, dof, expected):
+    assert chi_square_p_value(statistic, dof) == pytest.approx(expected, abs=1e-3)
+
+
+def test_chi_square_test_flags_a_biased_sample():
+    result = chi_square_test("biased", [400, 100, 100, 400], [0.25] * 4)
+
+    assert result.dof == 3
+    assert not result.passed
+
+
+def test_code_probabilities_sum_to_one():
+    for method_key in ("s", "c"):
+        assert sum(code_probabilities(method_key)) == pytest.approx(1.0)
+
+
+@pytest.mark.parametrize("method_key", ["s", "c"])
+def test_batch_and_scalar_paths_conform_to_expected_line_weights(method_key):
+    batch = check_batch_method(method_key, 50_000, seed=1, backend="python")
+    scalar = check_scalar_method(method_key, 20_000, seed=1)
+
+    assert batch["passed"], batch
+    assert scalar["passed"], scalar
+
+
+def test_meihua_calendar_produces_valid_hexagrams_for_every_timestamp():
+    report = check_meihua_calendar(datetime(2024, 1, 1), days=31, step_minutes=120)
+
+    assert report["timestamps"] == 31 * 12
+    assert report["invalid"] == []
+    assert report["passed"]
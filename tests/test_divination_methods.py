@@ -80,3 +80,55 @@ def test_meihua_time_uses_chinese_new_year_as_year_boundary():
 
 def test_meihua_constructs_upper_zhen_over_lower_kan_bottom_to_top():
     assert MeihuaMethod._construct_hexagram(4, 6, 4) == [8, 7, 8, 9, 8, 8]
+
+
+def test_bulk_casting_python_backend_matches_exact_line_weights():
+    from iching.core.bulk_casting import LINE_WEIGHTS, generate_batch
+
+    for method_key in ("s", "c"):
+        batch = generate_batch(method_key, 4096, seed=7, backend="python")
+        weights, denominator = LINE_WEIGHTS[method_key]
+        counts = batch.value_counts()
+
+        assert batch.size == 4096
+        assert sum(counts.values()) == 4096 * 6
+        for value, weight in weights.items():
+            expected = 4096 * 6 * weight / denominator
+            assert abs(counts[value] - expected) < 0.1 * expected
+
+
+def test_bulk_casting_codes_index_the_precomputed_cast_table():
+    from iching.core.bulk_casting import generate_batch
+    from iching.core.cast_table import cast_code
+
+    batch = generate_batch("s", 500, seed=11, backend="python")
+    rows = list(batch.rows())
+
+    assert list(batch.codes()) == [cast_code(row) for row in rows]
+    assert [outcome.lines for outcome in batch.outcomes()] == rows
+    assert sum(batch.code_counts()) == 500
+
+
+def test_bulk_casting_is_reproducible_and_rejects_non_random_methods():
+    from iching.core.bulk_casting import generate_batch
+
+    first = generate_batch("c", 100, seed=3, backend="python")
+    second = generate_batch("c", 100, seed=3, backend="python")
+
+    assert first.values == second.values
+    for method_key in ("m", "x"):
+        with pytest.raises(ValueError):
+            generate_batch(method_key, 10, seed=3)
+
+
+def test_bulk_casting_numpy_backend_agrees_with_cast_code():
+    np = pytest.importorskip("numpy")
+    from iching.core.bulk_casting import generate_batch
+    from iching.core.cast_table import cast_code
+
+    batch = generate_batch("s", 500, seed=5, backend="numpy")
+
+    assert batch.values.shape == (500, 6)
+    assert batch.values.dtype == np.uint8
+    assert [int(code) for code in batch.codes()] == [cast_code(row) for row in batch.rows()]
+    assert generate_batch("s", 500, seed=5, backend="numpy").values.tolist() == batch.values.tolist()
@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pytest
+
+from iching.config import PATHS
+from iching.core import guaci_repository
+from iching.core.guaci_repository import (
+    clear_guaci_artifacts,
+    compile_guaci_artifact,
+    load_guaci_by_name,
+    load_guaci_by_number,
+    read_guaci_artifact,
+    register_guaci_artifact,
+)
+
+
+@pytest.fixture()
+def corpus(tmp_path):
+    guaci_dir = tmp_path / "data" / "guaci"
+    shutil.copytree(PATHS.guaci_dir, guaci_dir)
+    yield guaci_dir
+    clear_guaci_artifacts()
+
+
+def test_artifact_serves_the_same_texts_as_parsing(corpus, tmp_path):
+    parsed = {
+        number: guaci_repository._parse_guaci_file(file)
+        for file, number, _ in guaci_repository._iter_guaci_files(corpus)
+    }
+    artifact = tmp_path / "data" / "guaci_corpus.bin"
+    compile_guaci_artifact({"guaci": corpus}, artifact)
+
+    assert register_guaci_artifact(artifact) == ["guaci"]
+    assert len(parsed) == 64
+    for number, text in parsed.items():
+        assert load_guaci_by_number(number, corpus) == text
+        assert load_guaci_by_name(text.name, corpus) is load_guaci_by_number(number, corpus)
+    with pytest.raises(FileNotFoundError):
+        load_guaci_by_name("不存在", corpus)
+
+
+def test_artifact_skips_directories_that_changed_since_compilation(corpus, tmp_path, caplog):
+    artifact = tmp_path / "data" / "guaci_corpus.bin"
+    compile_guaci_artifact({"guaci": corpus}, artifact)
+    first = next(corpus.glob("第1卦*.txt"))
+    first.write_text(first.read_text(encoding="utf-8") + "\n", encoding="utf-8")
+
+    assert read_guaci_artifact(artifact) == {}
+    assert register_guaci_artifact(artifact) == []
+    assert "stale" in caplog.text
+
+
+def test_artifact_stays_fresh_when_only_file_mtimes_change(corpus, tmp_path):
+    artifact = tmp_path / "data" / "guaci_corpus.bin"
+    compile_guaci_artifact({"guaci": corpus}, artifact)
+    for file in corpus.glob("第*卦*.txt"):
+        os.utime(file, ns=(0, 0))
+
+    assert register_guaci_artifact(artifact) == ["guaci"]
+
+
+def test_artifact_rejects_corrupted_payload_and_survives_relocation(corpus, tmp_path):
+    artifact = tmp_path / "data" / "guaci_corpus.bin"
+    compile_guaci_artifact({"guaci": corpus}, artifact)
+
+    moved_root = tmp_path / "moved"
+    os.replace(tmp_path / "data", moved_root)
+    assert set(read_guaci_artifact(moved_root / "guaci_corpus.bin")) == {"guaci"}
+
+    corrupted = bytearray((moved_root / "guaci_corpus.bin").read_bytes())
+    corrupted[-1] ^= 0xFF
+    (moved_root / "guaci_corpus.bin").write_bytes(bytes(corrupted))
+    with pytest.raises(ValueError):
+        read_guaci_artifact(moved_root / "guaci_corpus.bin")
+    assert register_guaci_artifact(moved_root / "guaci_corpus.bin") == []
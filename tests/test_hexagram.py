@@ -1,7 +1,7 @@
 from pathlib import Path
 
 from iching.config import PATHS
-from iching.core.hexagram import Hexagram, load_hexagram_definitions
+from iching.core.hexagram import KUN_NAMES, Hexagram, load_hexagram_definitions
 
 
 def test_hexagram_basic_properties():
@@ -65,3 +65,28 @@ def test_hexagram_text_package_includes_takashima_sections():
     assert takashima_sections, "expected takashima sections to be included"
     assert any(section.get("line_key") == "1" for section in takashima_sections)
     assert any(section.get("line_key") == "all" for section in takashima_sections)
+
+
+def test_cast_table_covers_every_line_vector():
+    from itertools import product
+
+    from iching.core.cast_table import CAST_TABLE, cast_code, derive_outcome
+
+    assert len(CAST_TABLE) == 4096
+    for combo in product((6, 7, 8, 9), repeat=6):
+        code = cast_code(combo)
+        assert CAST_TABLE[code] == derive_outcome(combo, code=code)
+
+
+def test_hexagram_full_moving_strategy_depends_on_name():
+    definitions = load_hexagram_definitions(PATHS.gua_index_file)
+    qian = Hexagram([9, 9, 9, 9, 9, 9], definitions)
+    other = Hexagram([9, 6, 9, 6, 9, 6], definitions)
+
+    assert qian._select_line_strategy() == "all"
+    assert other._select_line_strategy() == "all-move-other"
+    assert qian.changed_hexagram is not None
+    assert qian.changed_hexagram.binary == "000000"
+    assert other.changed_hexagram.lines == [8, 7, 8, 7, 8, 7]
+    assert qian.changed_hexagram.name in KUN_NAMES
+    assert other.changed_hexagram.full().name == other.changed_hexagram.name
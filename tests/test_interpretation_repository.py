@@ -1,5 +1,7 @@
 from pathlib import Path
 
+import pytest
+
 from iching.config import PATHS
 from iching.integrations.interpretation_repository import (
     InterpretationRepository,
@@ -132,3 +134,201 @@ def test_clean_english_structured_text_does_not_split_lowercase_colon() -> None:
     )
     cleaned = _clean_english_structured_text(raw)
     assert cleaned == "Ritsema/Karcher: This hexagram says to: hide your brightness!"
+
+
+def test_interpretation_repository_skips_sync_when_digest_matches(
+    tmp_path: Path, monkeypatch
+) -> None:
+    repo = _build_repo(tmp_path)
+    assert repo.stored_digest() == repo.source_digest
+
+    def fail_sync(self) -> None:
+        raise AssertionError("sync_from_files should not run for a fresh artifact")
+
+    monkeypatch.setattr(InterpretationRepository, "sync_from_files", fail_sync)
+    reopened = _build_repo(tmp_path)
+    assert reopened.count_slots() == 450
+    assert reopened.count_entries("guaci") == repo.count_entries("guaci")
+
+
+def test_interpretation_repository_read_only_serves_prebuilt_artifact(tmp_path: Path) -> None:
+    _build_repo(tmp_path)
+    repo = InterpretationRepository(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=PATHS.symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+        read_only=True,
+    )
+    assert repo.get_slot_content(hexagram_name="乾为天", source_key="guaci", slot_kind="gua")
+    with pytest.raises(RuntimeError):
+        repo.sync_from_files()
+
+
+def test_interpretation_repository_read_only_rejects_stale_artifact(tmp_path: Path) -> None:
+    symbolic_dir = tmp_path / "symbolic"
+    symbolic_dir.mkdir()
+    (symbolic_dir / "qian.txt").write_text("乾象", encoding="utf-8")
+    kwargs = dict(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+    )
+    InterpretationRepository(**kwargs)
+    (symbolic_dir / "qian.txt").write_text("乾象更新", encoding="utf-8")
+
+    with pytest.raises(RuntimeError, match="stale"):
+        InterpretationRepository(**kwargs, read_only=True)
+
+    rebuilt = InterpretationRepository(**kwargs)
+    assert rebuilt.get_slot_content(
+        hexagram_name="乾为天", source_key="symbolic", slot_kind="gua"
+    ) == "乾象更新"
+
+
+def test_interpretation_repository_index_matches_sql_lookups(tmp_path: Path) -> None:
+    indexed = _build_repo(tmp_path)
+    direct = InterpretationRepository(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=PATHS.symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+        use_index=False,
+    )
+    for name in ("乾为天", "坤为地", "震为雷", "水雷屯"):
+        assert indexed.list_entries(hexagram_name=name) == direct.list_entries(
+            hexagram_name=name
+        )
+        assert indexed.list_entries(
+            hexagram_name=name, locale="en-US", source_keys=("english_commentary",)
+        ) == direct.list_entries(
+            hexagram_name=name, locale="en-US", source_keys=("english_commentary",)
+        )
+        for line_no in range(1, 7):
+            assert indexed.get_slot_content(
+                hexagram_name=name, source_key="takashima", slot_kind="line", line_no=line_no
+            ) == direct.get_slot_content(
+                hexagram_name=name, source_key="takashima", slot_kind="line", line_no=line_no
+            )
+        assert indexed.get_slot_content(
+            hexagram_name=name, source_key="guaci", slot_kind="use"
+        ) == direct.get_slot_content(hexagram_name=name, source_key="guaci", slot_kind="use")
+
+
+def test_interpretation_repository_index_reloads_after_rebuild(tmp_path: Path) -> None:
+    symbolic_dir = tmp_path / "symbolic"
+    symbolic_dir.mkdir()
+    (symbolic_dir / "qian.txt").write_text("乾象", encoding="utf-8")
+    repo = InterpretationRepository(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+    )
+    assert repo.get_slot_content(
+        hexagram_name="乾为天", source_key="symbolic", slot_kind="gua"
+    ) == "乾象"
+
+    (symbolic_dir / "qian.txt").write_text("乾象更新", encoding="utf-8")
+    repo.build_artifact()
+    assert repo.stored_digest() == repo.source_digest
+    assert repo.get_slot_content(
+        hexagram_name="乾为天", source_key="symbolic", slot_kind="gua"
+    ) == "乾象更新"
+
+
+def test_interpretation_repository_syncs_only_changed_files(tmp_path: Path, monkeypatch) -> None:
+    symbolic_dir = tmp_path / "symbolic"
+    symbolic_dir.mkdir()
+    (symbolic_dir / "qian.txt").write_text("乾象", encoding="utf-8")
+    (symbolic_dir / "kun.txt").write_text("坤象", encoding="utf-8")
+    kwargs = dict(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+    )
+    repo = InterpretationRepository(**kwargs)
+    guaci_count = repo.count_entries("guaci")
+
+    unchanged = repo.sync_from_files()
+    assert unchanged.hexagrams_updated == 0
+    assert unchanged.files_parsed == 0
+
+    (symbolic_dir / "qian.txt").write_text("乾象更新", encoding="utf-8")
+    (symbolic_dir / "kun.txt").unlink()
+
+    def fail_build(self) -> None:
+        raise AssertionError("a stale artifact of the current format is refreshed in place")
+
+    monkeypatch.setattr(InterpretationRepository, "build_artifact", fail_build)
+    reopened = InterpretationRepository(**kwargs)
+
+    assert reopened.stored_digest() == reopened.source_digest
+    assert reopened.get_slot_content(
+        hexagram_name="乾为天", source_key="symbolic", slot_kind="gua"
+    ) == "乾象更新"
+    assert reopened.get_slot_content(
+        hexagram_name="坤为地", source_key="symbolic", slot_kind="gua"
+    ) is None
+    assert reopened.count_entries("symbolic") == 1
+    assert reopened.count_entries("guaci") == guaci_count
+
+    summary = reopened.sync_from_files()
+    assert summary.files_removed == 0
+    assert summary.hexagrams_updated == 0
+
+
+def test_interpretation_repository_bulk_lookups_match_single_lookups(tmp_path: Path) -> None:
+    indexed = _build_repo(tmp_path)
+    direct = InterpretationRepository(
+        db_path=tmp_path / "interpretations-test.db",
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=PATHS.symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+        use_index=False,
+    )
+    names = ("乾为天", "坤为地", "水雷屯")
+    keys = [
+        (name, source_key, slot_kind, line_no, None, "zh-CN")
+        for name in names
+        for source_key in ("guaci", "takashima", "symbolic")
+        for slot_kind, line_no in (("gua", None), ("line", 3), ("use", None))
+    ]
+    keys.append(("乾为天", "english_commentary", "line", 1, None, "en-US"))
+
+    for repo in (indexed, direct):
+        grouped = repo.list_entries_bulk([*names, 29], locales=("zh-CN", "en-US"))
+        for name in (*names, "坎为水"):
+            assert grouped[(name, "zh-CN")] == repo.list_entries(hexagram_name=name)
+            assert grouped[(name, "en-US")] == repo.list_entries(
+                hexagram_name=name, locale="en-US"
+            )
+
+        filtered = repo.list_entries_bulk(names, source_keys=("symbolic",))
+        assert set(filtered) == {("乾为天", "zh-CN"), ("坤为地", "zh-CN")}
+
+        contents = repo.get_slot_contents(keys)
+        for key in keys:
+            name, source_key, slot_kind, line_no, use_kind, locale = key
+            assert contents[key] == repo.get_slot_content(
+                hexagram_name=name,
+                source_key=source_key,
+                slot_kind=slot_kind,
+                line_no=line_no,
+                use_kind=use_kind,
+                locale=locale,
+            )
@@ -12,7 +12,12 @@ from iching.core.metaphysics import (
     _jieqi_datetime,
     _stem_relations,
     build_metaphysics_chart,
+    build_metaphysics_charts,
+    build_metaphysics_period,
+    chart_cache_stats,
+    clear_chart_cache,
 )
+from iching.core import metaphysics
 from iching.core.calendar_engine import normalize_local_datetime
 
 
@@ -263,6 +268,107 @@ def test_compact_periods_cover_an_older_users_current_and_next_dayun() -> None:
     assert len(life_kline["stages"]) == 3
 
 
+def test_collapsed_cycles_expand_on_demand_to_the_full_chart_values() -> None:
+    birth = datetime(1985, 11, 2, 6, 10)
+    options = {
+        "timezone_name": "Asia/Shanghai",
+        "gender": "female",
+        "reference_timestamp": datetime(2026, 7, 16, 12),
+    }
+    compact = build_metaphysics_chart(birth, include_period_details=False, **options)
+    full = build_metaphysics_chart(birth, include_period_details=True, **options)
+
+    collapsed = next(
+        item
+        for item in compact["period_layers"]["dayun"]
+        if item["index"] > 0 and not item["years_expanded"]
+    )
+    assert collapsed["years"] == []
+    expected = next(
+        item for item in full["period_layers"]["dayun"] if item["index"] == collapsed["index"]
+    )
+    cycle = build_metaphysics_period(birth, cycle_index=collapsed["index"], **options)
+    assert cycle == expected
+    assert {key: value for key, value in cycle.items() if key not in {"years", "years_expanded"}} == {
+        key: value for key, value in collapsed.items() if key not in {"years", "years_expanded"}
+    }
+
+    year = build_metaphysics_period(
+        birth, cycle_index=collapsed["index"], year=expected["years"][3]["year"], **options
+    )
+    assert year == expected["years"][3]
+    assert build_metaphysics_period(birth, cycle_index=collapsed["index"], year=1, **options) is None
+    assert compact["consumer"]["life_kline"]["baseline"] == full["consumer"]["life_kline"]["baseline"]
+
+
+def test_period_requests_reuse_the_cached_chart_basis() -> None:
+    birth = datetime(1992, 3, 8, 21, 40)
+    options = {
+        "timezone_name": "Asia/Shanghai",
+        "gender": "male",
+        "reference_timestamp": datetime(2026, 7, 16, 12),
+    }
+    clear_chart_cache()
+    first = build_metaphysics_chart(birth, **options)
+    first["pillars"][0]["stem"] = "X"
+    first["period_layers"]["dayun"][1]["years"].clear()
+    repeat = build_metaphysics_chart(birth, **options)
+    clear_chart_cache()
+    assert repeat == build_metaphysics_chart(birth, **options)
+
+    before = chart_cache_stats()
+    cycle = build_metaphysics_period(birth, cycle_index=1, **options)
+    after = chart_cache_stats()
+    assert cycle == repeat["period_layers"]["dayun"][1]
+    assert after["natal"]["hits"] == before["natal"]["hits"] + 1
+    assert after["period_trees"]["hits"] == before["period_trees"]["hits"] + 1
+    assert after["natal"]["misses"] == before["natal"]["misses"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_batch_charts_dedupe_requests_and_match_single_charts(
+    monkeypatch: pytest.MonkeyPatch, workers: int
+) -> None:
+    monkeypatch.setattr(metaphysics, "CHART_BATCH_PARALLEL_MIN", 2)
+    options = {"reference_timestamp": datetime(2026, 7, 16, 12), "include_period_details": False}
+    requests = [
+        {"timestamp": datetime(1992, 3, 8, 21, 40), "gender": "male", **options},
+        {"timestamp": datetime(1985, 11, 2, 6, 15), "gender": "female", **options},
+        {"timestamp": datetime(1992, 3, 8, 21, 40), "gender": "male", **options},
+        {"timestamp": datetime(2026, 7, 12, 10, 30), "timezone_name": "Mars/Olympus"},
+        {"timestamp": datetime(1985, 11, 2, 6, 55), "gender": "female", **options},
+    ]
+
+    try:
+        items = sorted(build_metaphysics_charts(requests, workers=workers), key=lambda item: item["index"])
+    finally:
+        metaphysics.shutdown_chart_batch_pool()
+
+    assert [item["index"] for item in items] == [0, 1, 2, 3, 4]
+    assert "未知时区" in items[3]["error"]
+    assert items[1]["chart"] == build_metaphysics_chart(**requests[1])
+    assert items[2]["chart"] == items[0]["chart"]
+    assert items[2]["chart"] is not items[0]["chart"]
+    assert items[1]["chart"]["pillars"] == items[4]["chart"]["pillars"]
+
+
+def test_batch_reports_unexpected_failures_per_request(monkeypatch: pytest.MonkeyPatch) -> None:
+    def build(timestamp: datetime, **kwargs: object) -> dict:
+        if timestamp.year == 1900:
+            raise KeyError("boom")
+        return {"timestamp": timestamp.isoformat()}
+
+    monkeypatch.setattr(metaphysics, "build_metaphysics_chart", build)
+    requests = [{"timestamp": datetime(1900, 1, 1)}, {"timestamp": datetime(1990, 1, 1)}]
+
+    items = sorted(build_metaphysics_charts(requests, workers=1), key=lambda item: item["index"])
+
+    assert items == [
+        {"index": 0, "error": metaphysics.BATCH_CHART_FAILED},
+        {"index": 1, "chart": {"timestamp": "1990-01-01T00:00:00"}},
+    ]
+
+
 def test_current_flow_year_changes_at_lichun_not_midnight() -> None:
     before = build_metaphysics_chart(
         datetime(1990, 8, 4, 1),
@@ -0,0 +1,103 @@
+import multiprocessing
+from pathlib import Path
+
+import pytest
+
+from iching.web.chat_service import ChatRateLimitError, UserTokenLimiter
+from iching.web.rate_limits import MemoryCounterStore, SQLiteCounterStore, build_counter_store
+from iching.web.service import RateLimiter, RateLimitError
+
+
+WINDOW = 100.0
+
+
+class _Clock:
+    def __init__(self, now: float = 1000.0) -> None:
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store_and_clock(request: pytest.FixtureRequest, tmp_path: Path):
+    clock = _Clock()
+    if request.param == "memory":
+        return MemoryCounterStore(clock=clock), clock
+    return SQLiteCounterStore(tmp_path / "limits.db", clock=clock), clock
+
+
+def test_sliding_window_weights_the_previous_bucket(store_and_clock) -> None:
+    store, clock = store_and_clock
+    store.add("k", 10, window=WINDOW)
+    assert store.total("k", window=WINDOW) == 10
+
+    clock.now += WINDOW * 1.25  # a quarter into the next window
+    assert store.total("k", window=WINDOW) == pytest.approx(7.5)
+    assert store.add("k", 1, window=WINDOW) == pytest.approx(8.5)
+
+    clock.now += WINDOW * 2
+    assert store.total("k", window=WINDOW) == 0
+
+
+def test_sweep_evicts_counters_past_their_window(store_and_clock) -> None:
+    store, clock = store_and_clock
+    store.add("old", 1, window=WINDOW)
+    clock.now += WINDOW * 2
+    store.add("new", 1, window=WINDOW)
+
+    assert store.sweep() == 1
+    assert store.total("new", window=WINDOW) == 1
+
+
+def test_memory_store_sweeps_periodically() -> None:
+    clock = _Clock()
+    store = MemoryCounterStore(clock=clock, sweep_interval=WINDOW)
+    for index in range(5):
+        store.add(f"ip-{index}", 1, window=WINDOW)
+    clock.now += WINDOW * 3
+    store.add("fresh", 1, window=WINDOW)
+
+    assert len(store) == 1
+
+
+def _hammer(db_path: str, count: int) -> None:
+    store = SQLiteCounterStore(Path(db_path))
+    for _ in range(count):
+        store.add("shared", 1, window=86400)
+
+
+def test_sqlite_store_shares_counters_across_processes(tmp_path: Path) -> None:
+    db_path = tmp_path / "limits.db"
+    context = multiprocessing.get_context("spawn")
+    workers = [context.Process(target=_hammer, args=(str(db_path), 50)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(timeout=60)
+        assert worker.exitcode == 0
+
+    assert SQLiteCounterStore(db_path).total("shared", window=86400) == pytest.approx(150, abs=1)
+
+
+def test_limiters_share_one_store() -> None:
+    store = build_counter_store("memory")
+    limiter = RateLimiter(max_attempts=2, max_ai_successes=1, store=store)
+    tokens = UserTokenLimiter(100, store=store)
+
+    limiter.record_attempt("1.2.3.4")
+    limiter.record_attempt("1.2.3.4")
+    with pytest.raises(RateLimitError):
+        limiter.record_attempt("1.2.3.4")
+    limiter.record_attempt("5.6.7.8")
+
+    limiter.ensure_ai_quota("1.2.3.4")
+    limiter.record_ai_success("1.2.3.4")
+    with pytest.raises(RateLimitError):
+        limiter.ensure_ai_quota("1.2.3.4")
+
+    tokens.ensure_allowance("user-1")
+    tokens.record_usage("user-1", 100)
+    with pytest.raises(ChatRateLimitError):
+        tokens.ensure_allowance("user-1")
+    tokens.ensure_allowance("user-2")
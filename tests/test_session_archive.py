@@ -0,0 +1,58 @@
+import gzip
+from pathlib import Path
+
+from iching.web.archive import INDEX_FILENAME, SegmentArchive, archive_key
+
+
+def _archive(directory: Path, **kwargs: object) -> SegmentArchive:
+    return SegmentArchive(directory, flush_interval=3600, **kwargs)
+
+
+def test_saves_are_batched_into_one_gzip_segment(tmp_path: Path) -> None:
+    archive = _archive(tmp_path)
+    keys = [archive.save(archive_key("session", f"s{n}"), f"卦象 {n}") for n in range(3)]
+    assert archive.read(keys[1]) == "卦象 1"
+    assert not list(tmp_path.glob("*.gz"))
+
+    archive.flush()
+
+    segments = list(tmp_path.glob("sessions-*.gz"))
+    assert len(segments) == 1
+    assert gzip.decompress(segments[0].read_bytes()).decode("utf-8") == "卦象 0卦象 1卦象 2"
+    assert [archive.read(key) for key in keys] == ["卦象 0", "卦象 1", "卦象 2"]
+    assert (tmp_path / INDEX_FILENAME).exists()
+    archive.close()
+
+
+def test_saving_a_key_again_repoints_the_index(tmp_path: Path) -> None:
+    archive = _archive(tmp_path)
+    key = archive.save("session_a", "reading")
+    archive.flush()
+    archive.save(key, "reading + analysis")
+    archive.close()
+
+    reopened = _archive(tmp_path)
+    assert reopened.read(key) == "reading + analysis"
+    assert reopened.read("missing") is None
+    reopened.close()
+
+
+def test_segments_rotate_by_size(tmp_path: Path) -> None:
+    archive = _archive(tmp_path, segment_bytes=1)
+    for n in range(3):
+        archive.save(f"k{n}", "x" * 100)
+        archive.flush()
+    archive.close()
+
+    assert len(list(tmp_path.glob("sessions-*.gz"))) == 3
+
+
+def test_a_full_queue_writes_inline(tmp_path: Path) -> None:
+    archive = _archive(tmp_path, max_pending=2)
+    archive.save("k1", "one")
+    assert archive.pending == 1
+    archive.save("k2", "two")
+
+    assert archive.pending == 0
+    assert archive.read("k1") == "one"
+    archive.close()
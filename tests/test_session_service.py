@@ -1,3 +1,4 @@
+import asyncio
 from datetime import datetime
 from types import SimpleNamespace
 
@@ -430,3 +431,99 @@ def test_session_service_keeps_yongliu_when_kun_all_lines_moving():
         section.get("source") == "takashima" and section.get("line_key") == "all"
         for section in primary
     )
+
+
+def test_session_service_serves_repeated_line_vectors_from_reading_cache():
+    service = SessionService(config=build_app_config(enable_ai=False))
+    lines = [9, 8, 7, 8, 6, 7]
+
+    first = service.create_session(
+        topic="事业",
+        user_question=None,
+        method_key="x",
+        use_current_time=False,
+        timestamp=datetime(2026, 3, 1, 9, 0),
+        manual_lines=lines,
+        enable_ai=False,
+    )
+    first.hex_sections[0]["content"] = "mutated by caller"
+    first.najia_table["rows"][0]["hidden"] = "mutated by caller"
+
+    second = service.create_session(
+        topic="事业",
+        user_question=None,
+        method_key="x",
+        use_current_time=False,
+        timestamp=datetime(2026, 3, 4, 9, 0),
+        manual_lines=lines,
+        enable_ai=False,
+    )
+
+    stats = service.reading_cache.stats()
+    assert stats.misses == 1
+    assert stats.hits == 1
+    assert second.hex_text == first.hex_text
+    assert second.hex_sections[0]["content"] != "mutated by caller"
+    assert second.najia_table["rows"][0]["hidden"] != "mutated by caller"
+    # The six gods follow each session's own day stem rather than the cached entry.
+    assert [row["god"] for row in second.najia_table["rows"]] != [
+        row["god"] for row in first.najia_table["rows"]
+    ]
+
+
+def test_create_session_async_matches_sync_reading_and_awaits_ai(monkeypatch):
+    calls = []
+
+    async def fake_start_analysis_async(data, **kwargs):
+        calls.append(kwargs)
+        return AIResponseData(
+            text="# 一句话结论\n- 先稳后进。",
+            response_id="resp_async",
+            usage={"input_tokens": 1, "output_tokens": 2, "total_tokens": 3},
+        )
+
+    monkeypatch.setattr("iching.services.session.start_analysis_async", fake_start_analysis_async)
+    service = SessionService(config=build_app_config(enable_ai=True))
+    arguments = dict(
+        topic="事业",
+        user_question="是否推进？",
+        method_key="x",
+        manual_lines=[7, 8, 9, 8, 6, 7],
+        timestamp=datetime(2026, 7, 2, 12, 0),
+        use_current_time=False,
+    )
+
+    sync_result = service.create_session(**arguments, enable_ai=False, interactive=False)
+    async_result = asyncio.run(
+        service.create_session_async(**arguments, enable_ai=True, ai_model="gpt-5.5")
+    )
+
+    assert async_result.hex_text == sync_result.hex_text
+    assert async_result.najia_table == sync_result.najia_table
+    assert async_result.bazi_output == sync_result.bazi_output
+    assert async_result.ai_analysis == "# 一句话结论\n- 先稳后进。"
+    assert async_result.ai_response_id == "resp_async"
+    assert "先稳后进" in async_result.reading_brief["headline"]
+    assert calls[0]["model_hint"] == "gpt-5.5"
+    assert service.history[-1] is async_result
+
+
+def test_session_history_is_a_bounded_ring_buffer():
+    config = build_app_config(enable_ai=False)
+    arguments = dict(
+        topic="事业",
+        user_question=None,
+        method_key="x",
+        use_current_time=True,
+        manual_lines=[7, 8, 9, 6, 7, 8],
+        enable_ai=False,
+        interactive=False,
+    )
+    service = SessionService(config=config, history_limit=2)
+    results = [service.create_session(**arguments) for _ in range(3)]
+
+    assert service.history == results[1:]
+
+    disabled = SessionService(config=config, history_limit=0)
+    disabled.create_session(**arguments)
+    assert disabled.history == []
@@ -0,0 +1,88 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from iching.web import chat_state
+from iching.web.chat_state import SessionStateStore, SQLiteSessionStateTier
+
+
+def _register(store: SessionStateStore, session_id: str, **overrides: object):
+    fields = dict(
+        session_id=session_id,
+        summary_text="主题: 事业",
+        ai_text="初始解读",
+        ai_enabled=True,
+        ai_model="gpt-5.6-terra",
+        ai_reasoning=None,
+        ai_verbosity=None,
+        ai_tone="normal",
+        last_response_id="resp_1",
+        initial_tokens=10,
+        session_payload={"session_id": session_id, "topic": "事业"},
+    )
+    fields.update(overrides)
+    return store.register(**fields)
+
+
+def test_local_tier_evicts_least_recently_used(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(chat_state, "MAX_SESSION_CACHE", 2)
+    store = SessionStateStore()
+    _register(store, "a")
+    _register(store, "b")
+    assert store.get("a") is not None
+    _register(store, "c")
+
+    assert store.get("b") is None
+    assert store.get("a") is not None and store.get("c") is not None
+    stats = store.stats()
+    assert (stats.evictions, stats.size, stats.misses) == (1, 2, 1)
+
+
+def test_expiry_pops_only_idle_sessions_from_the_front(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(chat_state, "SESSION_CACHE_TTL_SECONDS", 60)
+    now = [1000.0]
+    monkeypatch.setattr(chat_state.time, "time", lambda: now[0])
+    store = SessionStateStore()
+    _register(store, "old")
+    now[0] += 50
+    _register(store, "new")
+    now[0] += 20
+
+    assert store.get("old") is None
+    assert store.get("new") is not None
+    assert store.stats().expirations == 1
+
+
+def test_shared_tier_serves_sessions_registered_by_another_worker(tmp_path: Path) -> None:
+    db_path = tmp_path / "states.db"
+    first = SessionStateStore(shared=SQLiteSessionStateTier(db_path))
+    second = SessionStateStore(shared=SQLiteSessionStateTier(db_path))
+    _register(first, "s1")
+
+    state = second.get("s1")
+    assert state is not None
+    assert state.session_payload == {"session_id": "s1", "topic": "事业"}
+    assert second.get("s1") is state
+
+    second.update_response("s1", "resp_2", increment_turn=True)
+    second.add_tokens("s1", 5)
+    refreshed = first.get("s1")
+    assert (refreshed.last_response_id, refreshed.chat_turns, refreshed.initial_tokens) == ("resp_2", 1, 15)
+
+    second.remove("s1")
+    assert first.get("s1") is None
+
+    assert second.stats().to_dict()["shared_hits"] == 1
+    assert second.stats().local_hits == 1
+    assert first.stats().hit_rate == pytest.approx(0.5)
+
+
+def test_shared_tier_drops_expired_states(tmp_path: Path) -> None:
+    tier = SQLiteSessionStateTier(tmp_path / "states.db", ttl_seconds=0.05)
+    store = SessionStateStore(shared=tier)
+    _register(store, "s1")
+    time.sleep(0.1)
+
+    assert tier.version("s1") is None
+    assert store.get("s1") is None
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import dataclasses
 import json
+import random
 from datetime import datetime
 
+import pytest
+
 from iching.core import shensha
+from iching.core.bazi_structure import added_relations, structured_relations
 from iching.core.metaphysics import build_metaphysics_chart
 from iching.core.shensha import CORE_RULE_IDS, RULES_VERSION, evaluate_shensha
 
@@ -151,3 +156,63 @@ def test_hits_trace_tianyi_and_year_day_trine_anchors() -> None:
         {"reference": "日支", "label": "日", "field": "branch", "value": "午", "targets": ["申"]},
     ]
     assert "年支、日支分别起例" in hits["驿马"]["school_note"]
+
+
+def test_incremental_period_hits_and_relations_match_full_context_evaluation() -> None:
+    natal = [
+        {"label": "年", "stem": "庚", "branch": "子", "text": "庚子"},
+        {"label": "月", "stem": "乙", "branch": "寅", "text": "乙寅"},
+        {"label": "日", "stem": "甲", "branch": "午", "text": "甲午"},
+        {"label": "时", "stem": "丙", "branch": "申", "text": "丙申"},
+    ]
+    basis = shensha.natal_shensha(natal)
+    assert shensha.natal_shensha([dict(pillar) for pillar in natal]) is basis
+
+    for stem, branch in zip("甲乙丙丁戊己庚辛壬癸" * 6, "子丑寅卯辰巳午未申酉戌亥" * 5):
+        extras = [
+            {"label": "大运", "stem": "丁", "branch": "丑", "text": "丁丑"},
+            {"label": "流年", "stem": stem, "branch": branch, "text": stem + branch},
+        ]
+        context = [*natal, *extras]
+        assert basis.hits(extras, label="流年") == [
+            hit for hit in evaluate_shensha(context) if "流年" in hit["pillar_labels"]
+        ]
+        assert added_relations(context[:-1], context[-1]) == [
+            relation
+            for relation in structured_relations(context)
+            if any(item["pillar"] == "流年" for item in relation["participants"])
+        ]
+
+    # A pillar that takes an anchor label falls back to scoring the whole context.
+    day = {"label": "日", "stem": "壬", "branch": "辰", "text": "壬辰"}
+    assert basis.hits([day]) == evaluate_shensha([*natal, day])
+
+
+def test_compiled_tables_agree_with_the_rule_interpreter() -> None:
+    stems, branches = "甲乙丙丁戊己庚辛壬癸", "子丑寅卯辰巳午未申酉戌亥"
+    rng = random.Random(20260717)
+    for _ in range(400):
+        pillars = []
+        for label in ("年", "月", "日", "时", "大运", "流年"):
+            stem, branch = rng.choice(stems), rng.choice(branches)
+            pillars.append({"label": label, "stem": stem, "branch": branch, "text": stem + branch})
+        expected = []
+        for rule in shensha.RULES:
+            labels, _, anchors = shensha._match_details(rule, pillars)
+            if labels:
+                expected.append(shensha._hit_payload(rule, labels, anchors))
+        assert shensha.NatalShenSha(pillars).hits() == expected
+        assert shensha.NatalShenSha(pillars, include_extended=False).hits() == [
+            hit for hit in expected if hit["level"] == "core"
+        ]
+
+
+def test_rule_compiler_rejects_formulas_that_drift_from_their_digest() -> None:
+    assert shensha.COMPILED_RULES.rule_ids == tuple(rule.rule_id for rule in shensha.RULES)
+    assert len(shensha.COMPILED_RULES.day_stem) == 10
+    assert all(len(row) == 120 for row in shensha.COMPILED_RULES.month_branch)
+
+    tianyi = shensha.RULE_BY_ID["tianyi"]
+    drifted = dataclasses.replace(tianyi, mapping={**tianyi.mapping, "甲": ("子",)})
+    with pytest.raises(ValueError):
+        shensha.compile_rules((drifted,))
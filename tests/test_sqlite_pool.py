@@ -0,0 +1,65 @@
+import os
+import sqlite3
+import threading
+from pathlib import Path
+
+import pytest
+
+from iching.integrations.sqlite_pool import SQLiteConnectionPool, get_connection_pool
+
+
+def _make_db(path: Path, value: str) -> None:
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE item (value TEXT)")
+        conn.execute("INSERT INTO item VALUES (?)", (value,))
+    conn.close()
+
+
+def test_pool_reuses_one_query_only_connection_per_thread(tmp_path: Path) -> None:
+    db_path = tmp_path / "pool.db"
+    _make_db(db_path, "a")
+    pool = SQLiteConnectionPool(db_path)
+
+    with pool.connection() as first:
+        pass
+    with pool.connection() as second:
+        assert second is first
+        assert second.execute("PRAGMA query_only").fetchone()[0] == 1
+        with pytest.raises(sqlite3.OperationalError):
+            second.execute("INSERT INTO item VALUES ('b')")
+
+    seen = []
+
+    def worker() -> None:
+        with pool.connection() as conn:
+            seen.append(conn)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+    assert seen and seen[0] is not first
+
+
+def test_pool_reset_picks_up_replaced_file(tmp_path: Path) -> None:
+    db_path = tmp_path / "pool.db"
+    _make_db(db_path, "old")
+    pool = SQLiteConnectionPool(db_path, immutable=True)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT value FROM item").fetchone()[0] == "old"
+
+    replacement = tmp_path / "pool.db.tmp"
+    _make_db(replacement, "new")
+    os.replace(replacement, db_path)
+    with pool.connection() as conn:
+        assert conn.execute("SELECT value FROM item").fetchone()[0] == "old"
+
+    pool.reset()
+    with pool.connection() as conn:
+        assert conn.execute("SELECT value FROM item").fetchone()[0] == "new"
+
+
+def test_get_connection_pool_is_shared_per_path(tmp_path: Path) -> None:
+    db_path = tmp_path / "pool.db"
+    _make_db(db_path, "a")
+    assert get_connection_pool(db_path) is get_connection_pool(tmp_path / "." / "pool.db")
+    assert get_connection_pool(db_path) is not get_connection_pool(db_path, immutable=True)
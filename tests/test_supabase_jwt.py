@@ -0,0 +1,140 @@
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+from typing import Dict, List
+
+import httpx
+import pytest
+
+from iching.integrations.supabase_client import (
+    AsyncSupabaseRestClient,
+    SupabaseAuthError,
+    SupabaseRestClient,
+)
+from iching.integrations.supabase_jwt import SupabaseTokenVerifier
+
+
+SECRET = "test-jwt-secret"
+NOW = 1_800_000_000.0
+
+
+def _segment(value: Dict[str, object]) -> str:
+    raw = json.dumps(value, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def _token(claims: Dict[str, object], *, secret: str = SECRET, alg: str = "HS256") -> str:
+    signing_input = f"{_segment({'alg': alg, 'typ': 'JWT'})}.{_segment(claims)}"
+    signature = hmac.new(secret.encode("utf-8"), signing_input.encode("ascii"), hashlib.sha256).digest()
+    return f"{signing_input}.{base64.urlsafe_b64encode(signature).rstrip(b'=').decode('ascii')}"
+
+
+def _claims(**overrides: object) -> Dict[str, object]:
+    claims: Dict[str, object] = {
+        "sub": "user-1",
+        "email": "a@example.com",
+        "aud": "authenticated",
+        "exp": NOW + 3600,
+        "user_metadata": {"name": "A"},
+    }
+    claims.update(overrides)
+    return claims
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = NOW
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _client(secret: str, calls: List[str], clock: _Clock) -> SupabaseRestClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"id": "user-1", "email": "a@example.com"})
+
+    return SupabaseRestClient(
+        project_url="https://example.supabase.co",
+        service_key="service-key",
+        client=httpx.Client(transport=httpx.MockTransport(handler)),
+        token_verifier=SupabaseTokenVerifier(secret=secret, clock=clock),
+    )
+
+
+def test_hs256_tokens_verify_locally_without_a_round_trip() -> None:
+    calls: List[str] = []
+    client = _client(SECRET, calls, _Clock())
+
+    user = client.verify_access_token(_token(_claims()))
+
+    assert (user.id, user.email, user.metadata) == ("user-1", "a@example.com", {"name": "A"})
+    assert calls == []
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        _token(_claims(), secret="other-secret"),
+        _token(_claims(exp=NOW - 1)),
+        _token(_claims(aud="anon")),
+        _token(_claims(sub="")),
+    ],
+)
+def test_rejected_tokens_never_reach_supabase(token: str) -> None:
+    calls: List[str] = []
+    client = _client(SECRET, calls, _Clock())
+
+    with pytest.raises(SupabaseAuthError):
+        client.verify_access_token(token)
+    assert calls == []
+
+
+def test_remote_fallback_is_cached_until_the_token_expires() -> None:
+    calls: List[str] = []
+    clock = _Clock()
+    client = _client("", calls, clock)
+    token = _token(_claims(exp=NOW + 120))
+
+    client.verify_access_token(token)
+    client.verify_access_token(token)
+    assert calls == ["/auth/v1/user"]
+
+    clock.now = NOW + 121
+    client.verify_access_token(token)
+    assert calls == ["/auth/v1/user", "/auth/v1/user"]
+
+
+@pytest.mark.parametrize("token", [_token(_claims(), alg="HS512"), "opaque-token"])
+def test_undecidable_tokens_fall_back_to_supabase(token: str) -> None:
+    calls: List[str] = []
+    client = _client(SECRET, calls, _Clock())
+
+    client.verify_access_token(token)
+
+    assert calls == ["/auth/v1/user"]
+
+
+def test_async_client_shares_the_verified_token_cache() -> None:
+    calls: List[str] = []
+    clock = _Clock()
+    sync_client = _client("", calls, clock)
+    token = _token(_claims())
+    sync_client.verify_access_token(token)
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.url.path)
+        return httpx.Response(401)
+
+    async_client = AsyncSupabaseRestClient(
+        project_url="https://example.supabase.co",
+        service_key="service-key",
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        token_verifier=sync_client.token_verifier,
+    )
+    user = asyncio.run(async_client.verify_access_token(token))
+
+    assert user.id == "user-1"
+    assert calls == ["/auth/v1/user"]
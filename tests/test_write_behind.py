@@ -0,0 +1,247 @@
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Tuple
+
+import pytest
+
+from iching.integrations.supabase_client import SupabaseUser
+from iching.web.chat_service import WRITE_MESSAGES, WRITE_SNAPSHOT, WRITE_UPDATE, ChatService
+from iching.web.chat_state import SessionStateStore
+from iching.web.write_behind import WriteBehindQueue
+
+
+class _Writer:
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, List[Dict[str, object]]]] = []
+        self.failures: List[Exception] = []
+
+    def __call__(self, kind: str, payloads: List[Dict[str, object]]) -> None:
+        if self.failures:
+            raise self.failures.pop(0)
+        self.calls.append((kind, [dict(payload) for payload in payloads]))
+
+
+def _queue(writer: _Writer, spool: Optional[Path] = None, **kwargs: object) -> WriteBehindQueue:
+    queue = WriteBehindQueue(spool_path=spool, flush_interval=3600, **kwargs)
+    queue.set_writer(writer)
+    return queue
+
+
+def _rejected(status_code: int) -> Exception:
+    exc = RuntimeError("rejected")
+    exc.response = SimpleNamespace(status_code=status_code)  # type: ignore[attr-defined]
+    return exc
+
+
+def test_consecutive_writes_of_one_kind_are_batched_in_order() -> None:
+    writer = _Writer()
+    queue = _queue(writer)
+    queue.submit("a", {"n": 1}, session_id="s1")
+    queue.submit("a", {"n": 2}, session_id="s2")
+    queue.submit("b", {"n": 3}, session_id="s1")
+    queue.submit("a", {"n": 4}, session_id="s1")
+    assert writer.calls == []
+
+    queue.flush()
+
+    assert writer.calls == [("a", [{"n": 1}, {"n": 2}]), ("b", [{"n": 3}]), ("a", [{"n": 4}])]
+    assert queue.pending == 0
+    queue.close()
+
+
+def test_drain_applies_only_the_requested_session() -> None:
+    writer = _Writer()
+    queue = _queue(writer)
+    queue.submit("a", {"n": 1}, session_id="s1")
+    queue.submit("a", {"n": 2}, session_id="s2")
+
+    queue.drain("s2")
+
+    assert writer.calls == [("a", [{"n": 2}])]
+    assert queue.pending == 1
+    queue.close()
+
+
+def test_transient_failures_keep_writes_queued_for_a_retry() -> None:
+    writer = _Writer()
+    writer.failures.append(ConnectionError("down"))
+    queue = _queue(writer)
+    queue.submit("a", {"n": 1}, session_id="s1")
+    queue.submit("b", {"n": 2}, session_id="s1")
+
+    queue.flush()
+    assert writer.calls == [] and queue.pending == 2
+
+    queue.flush()
+    assert writer.calls == [("a", [{"n": 1}]), ("b", [{"n": 2}])]
+    queue.close()
+
+
+def test_rejected_batches_are_retried_row_by_row_and_bad_rows_dropped() -> None:
+    writer = _Writer()
+    writer.failures.extend([_rejected(400), _rejected(400)])
+    queue = _queue(writer)
+    for n in range(3):
+        queue.submit("a", {"n": n}, session_id="s1")
+
+    queue.flush()
+
+    assert writer.calls == [("a", [{"n": 1}]), ("a", [{"n": 2}])]
+    assert queue.pending == 0
+    queue.close()
+
+
+def test_a_full_queue_applies_writes_inline_after_the_session_backlog() -> None:
+    writer = _Writer()
+    queue = _queue(writer, max_pending=1)
+    queue.submit("a", {"n": 1}, session_id="s1")
+    queue.submit("a", {"n": 2}, session_id="s1")
+
+    assert writer.calls == [("a", [{"n": 1}]), ("a", [{"n": 2}])]
+    assert queue.pending == 0
+    queue.close()
+
+
+def test_a_full_queue_never_overtakes_a_session_backlog_it_could_not_apply() -> None:
+    writer = _Writer()
+    queue = _queue(writer, max_pending=1)
+    queue.submit("a", {"n": 1}, session_id="s1")
+    writer.failures.append(ConnectionError("down"))
+
+    queue.submit("a", {"n": 2}, session_id="s1")
+
+    assert writer.calls == [] and queue.pending == 2
+    queue.flush()
+    assert writer.calls == [("a", [{"n": 1}, {"n": 2}])]
+    queue.close()
+
+
+def test_spooled_writes_survive_a_restart(tmp_path: Path) -> None:
+    spool = tmp_path / "spool.db"
+    crashed = _queue(_Writer(), spool, lease_seconds=0)
+    crashed.submit("a", {"n": 1, "label": "卦"}, session_id="s1")
+    crashed.submit("b", {"n": 2}, session_id="s1")
+    # No close(): the process died with both writes undelivered.
+
+    writer = _Writer()
+    restarted = _queue(writer, spool)
+    restarted.start()
+    assert restarted.pending == 2
+    restarted.flush()
+    restarted.close()
+
+    assert writer.calls == [("a", [{"n": 1, "label": "卦"}]), ("b", [{"n": 2}])]
+    again = _queue(_Writer(), spool)
+    again.start()
+    assert again.pending == 0
+    again.close()
+
+
+def test_close_releases_undelivered_writes_to_the_next_process(tmp_path: Path) -> None:
+    spool = tmp_path / "spool.db"
+    failing = _Writer()
+    failing.failures.extend([ConnectionError("down")] * 2)
+    first = _queue(failing, spool)
+    first.submit("a", {"n": 1}, session_id="s1")
+    first.close()
+
+    writer = _Writer()
+    second = _queue(writer, spool)
+    second.start()
+    second.flush()
+    second.close()
+    assert writer.calls == [("a", [{"n": 1}])]
+
+
+class _RecordingClient:
+    enabled = True
+
+    def __init__(self) -> None:
+        self.calls: List[Tuple[str, object]] = []
+        self.rows: Dict[Tuple[str, str], Dict[str, object]] = {}
+
+    def fetch_session(self, *, session_id: str, user_id: str) -> Optional[Dict[str, object]]:
+        self.calls.append(("fetch", session_id))
+        row = self.rows.get((session_id, user_id))
+        return dict(row) if row else None
+
+    def update_session(self, session_id: str, user_id: str, payload: Dict[str, object]) -> None:
+        self.calls.append(("update", dict(payload)))
+        self.rows.setdefault((session_id, user_id), {}).update(payload)
+
+    def insert_chat_messages(self, records: List[Dict[str, object]]) -> None:
+        self.calls.append(("insert", [record["id"] for record in records]))
+
+    def delete_session(self, session_id: str, user_id: str) -> None:
+        self.calls.append(("delete", session_id))
+
+    def list_session_ids(self, *, user_id: str, limit: int, offset: int) -> List[Dict[str, object]]:
+        self.calls.append(("list", limit))
+        return []
+
+    def upsert_sessions(self, rows: List[Dict[str, object]]) -> None:
+        self.calls.append(("upsert", [row["session_id"] for row in rows]))
+
+
+def test_chat_service_reads_its_own_queued_writes() -> None:
+    client = _RecordingClient()
+    client.rows[("s1", "u1")] = {"session_id": "s1", "followup_model": "gpt-5.6-terra", "chat_turns": 0}
+    queue = WriteBehindQueue(flush_interval=3600)
+    service = ChatService(store=SessionStateStore(), client=client, write_queue=queue)  # type: ignore[arg-type]
+    user = SupabaseUser(id="u1")
+
+    service._update_session("s1", "u1", {"chat_turns": 1})
+    service._update_session("s1", "u1", {"tokens_used": 10})
+    service._insert_chat_messages("s1", [{"role": "user", "content": "q"}])
+    assert client.calls == []
+
+    record = service.ensure_session_row("s1", user)
+
+    assert client.calls[0][0] == "update"
+    assert client.calls[0][1] == {"chat_turns": 1, "tokens_used": 10}
+    assert client.calls[1][0] == "insert" and client.calls[1][1][0]
+    assert client.calls[2] == ("fetch", "s1")
+    assert record["chat_turns"] == 1
+    queue.close()
+
+
+def test_deleting_a_session_discards_its_queued_writes() -> None:
+    client = _RecordingClient()
+    queue = WriteBehindQueue(flush_interval=3600)
+    service = ChatService(store=SessionStateStore(), client=client, write_queue=queue)  # type: ignore[arg-type]
+
+    service._update_session("s1", "u1", {"chat_turns": 1})
+    service.delete_session("s1", SupabaseUser(id="u1"))
+    queue.flush()
+
+    assert client.calls == [("delete", "s1")]
+    queue.close()
+
+
+@pytest.mark.parametrize("kind", [WRITE_UPDATE, WRITE_MESSAGES])
+def test_chat_service_writes_directly_without_a_queue(kind: str) -> None:
+    client = _RecordingClient()
+    service = ChatService(store=SessionStateStore(), client=client)  # type: ignore[arg-type]
+
+    if kind == WRITE_UPDATE:
+        service._update_session("s1", "u1", {"chat_turns": 1})
+        assert client.calls == [("update", {"chat_turns": 1})]
+    else:
+        service._insert_chat_messages("s1", [{"id": "m1", "role": "user", "content": "q"}])
+        assert client.calls == [("insert", ["m1"])]
+
+
+def test_session_limit_counts_each_new_session_once() -> None:
+    client = _RecordingClient()
+    service = ChatService(store=SessionStateStore(), client=client)  # type: ignore[arg-type]
+
+    service._apply_writes(
+        WRITE_SNAPSHOT,
+        [
+            {"session_id": "s1", "user_id": "u1", "chat_turns": 0},
+            {"session_id": "s1", "user_id": "u1", "chat_turns": 0},
+            {"session_id": "s2", "user_id": "u1", "chat_turns": 0},
+        ],
+    )
+
+    assert client.calls == [("list", 2), ("upsert", ["s1", "s2"])]
@@ -4,14 +4,18 @@ from __future__ import annotations
 
 import json
 import re
-import sqlite3
 from collections import defaultdict
 from pathlib import Path
 from typing import Any
 
+from iching.config import PATHS
+from iching.integrations.interpretation_repository import (
+    InterpretationEntry,
+    InterpretationRepository,
+)
+
 
 ROOT = Path(__file__).resolve().parents[1]
-DB_PATH = ROOT / "data" / "interpretations.db"
 LIBRARY_PATH = ROOT / "frontend" / "src" / "lib" / "hexagram-library.ts"
 OUTPUT_PATH = ROOT / "frontend" / "src" / "lib" / "hexagram-archive.ts"
 DATA_DIR = ROOT / "frontend" / "src" / "lib" / "hexagram-archive-data"
@@ -57,76 +61,65 @@ def _source_count_literal(counts: dict[str, int]) -> str:
     )
 
 
+def _slot_sort_index(entry: InterpretationEntry) -> int:
+    if entry.slot_kind == "gua":
+        return 0
+    if entry.slot_kind == "line" and entry.line_no is not None:
+        return entry.line_no
+    return 7
+
+
 def _json(value: Any) -> str:
     return json.dumps(value, ensure_ascii=False, indent=4)
 
 
 def main() -> None:
     library_entries = _read_library_entries()
-    connection = sqlite3.connect(DB_PATH)
-    connection.row_factory = sqlite3.Row
-
-    slot_counts = {
-        row["hexagram_id"]: row["slot_count"]
-        for row in connection.execute(
-            """
-            SELECT hexagram_id, COUNT(*) AS slot_count
-            FROM interpretation_slot
-            GROUP BY hexagram_id
-            """
-        )
-    }
+    repo = InterpretationRepository(
+        db_path=PATHS.interpretation_db,
+        index_file=PATHS.gua_index_file,
+        guaci_dir=PATHS.guaci_dir,
+        takashima_dir=PATHS.takashima_dir,
+        symbolic_dir=PATHS.symbolic_dir,
+        english_structured_dir=PATHS.english_structured_dir,
+    )
+
+    slot_counts = repo.count_slots_by_hexagram()
     global_slot_count = sum(slot_counts.values())
 
-    rows = connection.execute(
-        """
-        SELECT
-            h.id AS hexagram_number,
-            sl.canonical_key AS slot_key,
-            sl.slot_kind AS slot_kind,
-            sl.line_no AS line_no,
-            sl.use_kind AS use_kind,
-            src.source_key AS source_key,
-            src.display_name AS source_label,
-            ent.locale AS locale,
-            ent.content AS content
-        FROM interpretation_entry ent
-        JOIN interpretation_slot sl ON sl.id = ent.slot_id
-        JOIN interpretation_hexagram h ON h.id = sl.hexagram_id
-        JOIN interpretation_source src ON src.id = ent.source_id
-        WHERE ent.is_current = 1 AND ent.status = 'published'
-        ORDER BY
-            h.id ASC,
-            sl.sort_index ASC,
-            CASE src.source_key
-                WHEN 'guaci' THEN 0
-                WHEN 'takashima' THEN 1
-                WHEN 'english_commentary' THEN 2
-                WHEN 'symbolic' THEN 3
-                ELSE 9
-            END ASC
-        """
-    ).fetchall()
+    grouped_entries = repo.list_entries_bulk(range(1, 65), locales=("zh-CN", "en-US"))
 
     grouped: dict[int, list[dict[str, Any]]] = defaultdict(list)
     source_counts: dict[str, int] = defaultdict(int)
     per_hex_source_counts: dict[int, dict[str, int]] = defaultdict(lambda: defaultdict(int))
 
-    for row in rows:
-        number = row["hexagram_number"]
-        source_key = row["source_key"]
+    located = sorted(
+        (
+            (entry, locale)
+            for (_, locale), entries in grouped_entries.items()
+            for entry in entries
+        ),
+        key=lambda item: (
+            item[0].hexagram_number,
+            _slot_sort_index(item[0]),
+            SOURCE_ORDER.get(item[0].source_key, 9),
+        ),
+    )
+    for entry, locale in located:
+        number = entry.hexagram_number
+        source_key = entry.source_key
         source_counts[source_key] += 1
         per_hex_source_counts[number][source_key] += 1
         grouped[number].append(
             {
-                "slotKey": row["slot_key"],
-                "slotKind": row["slot_kind"],
-                "lineNo": row["line_no"],
-                "useKind": row["use_kind"],
+                "slotKey": entry.slot_key,
+                "slotKind": entry.slot_kind,
+                "lineNo": entry.line_no,
+                "useKind": entry.use_kind,
                 "sourceKey": source_key,
-                "sourceLabel": row["source_label"],
-                "locale": row["locale"],
-                "content": row["content"].strip(),
+                "sourceLabel": entry.source_label,
+                "locale": locale,
+                "content": entry.content.strip(),
             }
         )
 
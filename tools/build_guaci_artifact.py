@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+from __future__ import annotations
+
+from iching.config import PATHS
+from iching.core.guaci_repository import compile_guaci_artifact, read_guaci_artifact
+
+
+def main() -> None:
+    digest = compile_guaci_artifact(
+        {"guaci": PATHS.guaci_dir, "takashima": PATHS.takashima_dir},
+        PATHS.guaci_artifact,
+    )
+    packed = read_guaci_artifact(PATHS.guaci_artifact)
+    print(f"Compiled guaci artifact: {PATHS.guaci_artifact}")
+    print(f"Payload digest: {digest}")
+    for label, source in sorted(packed.items()):
+        print(f"Texts ({label}): {len(source.by_number)} digest={source.source_digest[:12]}")
+
+
+if __name__ == "__main__":
+    main()
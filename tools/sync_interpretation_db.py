@@ -1,11 +1,26 @@
 #!/usr/bin/env python3
 from __future__ import annotations
 
+import argparse
+
 from iching.config import PATHS
 from iching.integrations.interpretation_repository import InterpretationRepository
 
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Build the interpretation artifact from the source text files."
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Rebuild even when the recorded source digest is unchanged.",
+    )
+    return parser.parse_args()
+
+
 def main() -> None:
+    args = parse_args()
     repo = InterpretationRepository(
         db_path=PATHS.interpretation_db,
         index_file=PATHS.gua_index_file,
@@ -14,7 +29,16 @@ def main() -> None:
         symbolic_dir=PATHS.symbolic_dir,
         english_structured_dir=PATHS.english_structured_dir,
     )
+    if args.force:
+        repo.build_artifact()
+    else:
+        summary = repo.sync_from_files()
+        print(
+            f"Changed files: {summary.files_parsed} parsed, {summary.files_removed} removed "
+            f"({summary.hexagrams_updated} hexagram/source pairs rewritten)"
+        )
     print(f"Synced interpretation DB: {PATHS.interpretation_db}")
+    print(f"Source digest: {repo.source_digest}")
     print(f"Slots: {repo.count_slots()}")
     print(f"Entries (guaci): {repo.count_entries('guaci')}")
     print(f"Entries (takashima): {repo.count_entries('takashima')}")